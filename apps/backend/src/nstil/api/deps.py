@@ -2,6 +2,7 @@ from functools import lru_cache
 from typing import Annotated
 
 import redis.asyncio as aioredis
+from arq.connections import ArqRedis
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from supabase import AsyncClient
@@ -15,13 +16,17 @@ from nstil.services.ai.check_in import CheckInOrchestrator
 from nstil.services.ai.context import AIContextService
 from nstil.services.ai.insight import AIInsightService
 from nstil.services.ai.insight_engine import InsightEngine
+from nstil.services.ai.insight_scheduler import InsightScheduler
+from nstil.services.ai.mood_baseline import MoodBaselineService
 from nstil.services.ai.profile import AIProfileService
 from nstil.services.ai.prompt import AIPromptService
 from nstil.services.ai.prompt_engine import PromptEngine
+from nstil.services.ai.prompt_queue import PromptQueue
 from nstil.services.ai.session import AISessionService
 from nstil.services.breathing import BreathingService
-from nstil.services.cache import EntryCacheService, SpaceCacheService
+from nstil.services.cache import EntryCacheService, MediaCacheService, SpaceCacheService
 from nstil.services.cache.ai_cache import AICacheService
+from nstil.services.cache.invalidator import CacheInvalidator
 from nstil.services.cached_ai_context import CachedAIContextService
 from nstil.services.cached_ai_profile import CachedAIProfileService
 from nstil.services.cached_journal import CachedJournalService
@@ -30,6 +35,11 @@ from nstil.services.cached_profile import CachedProfileService
 from nstil.services.cached_space import CachedSpaceService
 from nstil.services.journal import JournalService
 from nstil.services.media import MediaService
+from nstil.services.media_reservations import MediaReservationStore
+from nstil.services.media_resumable import ResumableUploadService
+from nstil.services.media_signer import MediaUrlSigner
+from nstil.services.media_variants import MediaVariantScheduler
+from nstil.services.media_waveform import MediaWaveformScheduler
 from nstil.services.notification import NotificationService
 from nstil.services.profile import ProfileService
 from nstil.services.space import JournalSpaceService
@@ -56,6 +66,34 @@ def get_supabase(request: Request) -> AsyncClient:
     return _get_app_state(request).supabase
 
 
+def get_job_queue(request: Request) -> ArqRedis | None:
+    return _get_app_state(request).job_queue
+
+
+def get_insight_scheduler(
+    redis: Annotated[aioredis.Redis, Depends(get_redis)],
+    queue: Annotated[ArqRedis | None, Depends(get_job_queue)],
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> InsightScheduler | None:
+    if queue is None:
+        return None
+    return InsightScheduler(redis, queue, settings.insight_quiet_period_seconds)
+
+
+def get_prompt_queue(
+    redis: Annotated[aioredis.Redis, Depends(get_redis)],
+    queue: Annotated[ArqRedis | None, Depends(get_job_queue)],
+) -> PromptQueue:
+    return PromptQueue(redis, queue)
+
+
+def get_cache_invalidator(
+    redis: Annotated[aioredis.Redis, Depends(get_redis)],
+    prompt_queue: Annotated[PromptQueue, Depends(get_prompt_queue)],
+) -> CacheInvalidator:
+    return CacheInvalidator(redis, prompt_queue)
+
+
 def get_cache_service(
     redis: Annotated[aioredis.Redis, Depends(get_redis)],
 ) -> EntryCacheService:
@@ -71,24 +109,78 @@ def get_space_cache_service(
 def get_journal_service(
     supabase: Annotated[AsyncClient, Depends(get_supabase)],
     cache: Annotated[EntryCacheService, Depends(get_cache_service)],
+    invalidator: Annotated[CacheInvalidator, Depends(get_cache_invalidator)],
+    insight_scheduler: Annotated[InsightScheduler | None, Depends(get_insight_scheduler)],
 ) -> CachedJournalService:
     db_service = JournalService(supabase)
-    return CachedJournalService(db_service, cache)
+    return CachedJournalService(db_service, cache, invalidator, insight_scheduler)
 
 
 def get_space_service(
     supabase: Annotated[AsyncClient, Depends(get_supabase)],
     space_cache: Annotated[SpaceCacheService, Depends(get_space_cache_service)],
-    entry_cache: Annotated[EntryCacheService, Depends(get_cache_service)],
+    invalidator: Annotated[CacheInvalidator, Depends(get_cache_invalidator)],
 ) -> CachedSpaceService:
     db_service = JournalSpaceService(supabase)
-    return CachedSpaceService(db_service, space_cache, entry_cache)
+    return CachedSpaceService(db_service, space_cache, invalidator)
+
+
+def get_media_cache_service(
+    redis: Annotated[aioredis.Redis, Depends(get_redis)],
+) -> MediaCacheService:
+    return MediaCacheService(redis)
+
+
+def get_media_url_signer(
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> MediaUrlSigner | None:
+    if not settings.media_local_signing_enabled:
+        return None
+    return MediaUrlSigner(settings.supabase_url, settings.supabase_jwt_secret.get_secret_value())
+
+
+def get_media_reservation_store(
+    redis: Annotated[aioredis.Redis, Depends(get_redis)],
+) -> MediaReservationStore:
+    return MediaReservationStore(redis)
+
+
+def get_media_variant_scheduler(
+    queue: Annotated[ArqRedis | None, Depends(get_job_queue)],
+) -> MediaVariantScheduler | None:
+    if queue is None:
+        return None
+    return MediaVariantScheduler(queue)
+
+
+def get_media_waveform_scheduler(
+    queue: Annotated[ArqRedis | None, Depends(get_job_queue)],
+) -> MediaWaveformScheduler | None:
+    if queue is None:
+        return None
+    return MediaWaveformScheduler(queue)
 
 
 def get_media_service(
     supabase: Annotated[AsyncClient, Depends(get_supabase)],
+    url_cache: Annotated[MediaCacheService, Depends(get_media_cache_service)],
+    signer: Annotated[MediaUrlSigner | None, Depends(get_media_url_signer)],
+    invalidator: Annotated[CacheInvalidator, Depends(get_cache_invalidator)],
+    reservations: Annotated[MediaReservationStore, Depends(get_media_reservation_store)],
+    variants: Annotated[MediaVariantScheduler | None, Depends(get_media_variant_scheduler)],
+    waveforms: Annotated[MediaWaveformScheduler | None, Depends(get_media_waveform_scheduler)],
 ) -> MediaService:
-    return MediaService(supabase)
+    return MediaService(
+        supabase, url_cache, signer, invalidator, reservations, variants, waveforms
+    )
+
+
+def get_resumable_upload_service(
+    redis: Annotated[aioredis.Redis, Depends(get_redis)],
+    media_service: Annotated[MediaService, Depends(get_media_service)],
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> ResumableUploadService:
+    return ResumableUploadService(redis, media_service, settings.media_staging_dir)
 
 
 def get_breathing_service(
@@ -113,8 +205,9 @@ def get_ai_context_service(
 def get_ai_profile_service(
     supabase: Annotated[AsyncClient, Depends(get_supabase)],
     ai_cache: Annotated[AICacheService, Depends(get_ai_cache_service)],
+    invalidator: Annotated[CacheInvalidator, Depends(get_cache_invalidator)],
 ) -> CachedAIProfileService:
-    return CachedAIProfileService(AIProfileService(supabase), ai_cache)
+    return CachedAIProfileService(AIProfileService(supabase), ai_cache, invalidator)
 
 
 def get_notification_service(
@@ -152,8 +245,10 @@ def get_ai_insight_service(
 def get_prompt_engine(
     context_service: Annotated[CachedAIContextService, Depends(get_ai_context_service)],
     prompt_service: Annotated[AIPromptService, Depends(get_ai_prompt_service)],
+    prompt_queue: Annotated[PromptQueue, Depends(get_prompt_queue)],
+    invalidator: Annotated[CacheInvalidator, Depends(get_cache_invalidator)],
 ) -> PromptEngine:
-    return PromptEngine(context_service, prompt_service)
+    return PromptEngine(context_service, prompt_service, prompt_queue, invalidator)
 
 
 def get_check_in_orchestrator(
@@ -163,7 +258,8 @@ def get_check_in_orchestrator(
     journal_service: Annotated[CachedJournalService, Depends(get_journal_service)],
     space_service: Annotated[CachedSpaceService, Depends(get_space_service)],
     profile_service: Annotated[CachedAIProfileService, Depends(get_ai_profile_service)],
-    context_service: Annotated[CachedAIContextService, Depends(get_ai_context_service)],
+    ai_cache: Annotated[AICacheService, Depends(get_ai_cache_service)],
+    invalidator: Annotated[CacheInvalidator, Depends(get_cache_invalidator)],
 ) -> CheckInOrchestrator:
     return CheckInOrchestrator(
         session_service=session_service,
@@ -172,16 +268,24 @@ def get_check_in_orchestrator(
         journal_service=journal_service,
         space_service=space_service,
         profile_service=profile_service,
-        context_service=context_service,
+        cache=ai_cache,
+        invalidator=invalidator,
     )
 
 
+def get_mood_baseline_service(
+    supabase: Annotated[AsyncClient, Depends(get_supabase)],
+) -> MoodBaselineService:
+    return MoodBaselineService(supabase, JournalService(supabase))
+
+
 def get_insight_engine(
     insight_service: Annotated[AIInsightService, Depends(get_ai_insight_service)],
     context_service: Annotated[CachedAIContextService, Depends(get_ai_context_service)],
     journal_service: Annotated[CachedJournalService, Depends(get_journal_service)],
+    baseline_service: Annotated[MoodBaselineService, Depends(get_mood_baseline_service)],
 ) -> InsightEngine:
-    return InsightEngine(insight_service, context_service, journal_service)
+    return InsightEngine(insight_service, context_service, journal_service, baseline_service)
 
 
 def get_token_blacklist(request: Request) -> TokenBlacklistService | None:
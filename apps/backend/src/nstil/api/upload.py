@@ -1,8 +1,9 @@
+from collections.abc import AsyncIterator
 from typing import Final
 
 from fastapi import UploadFile
 
-_READ_CHUNK_SIZE: Final[int] = 64 * 1024
+_READ_CHUNK_SIZE: Final[int] = 1024 * 1024
 
 
 class UploadTooLargeError(Exception):
@@ -11,19 +12,15 @@ class UploadTooLargeError(Exception):
         super().__init__(f"File exceeds maximum size of {max_bytes} bytes")
 
 
-async def read_upload_with_limit(file: UploadFile, max_bytes: int) -> bytes:
-    chunks = bytearray()
-    bytes_read = 0
+def check_declared_size(file: UploadFile, max_bytes: int) -> None:
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
 
-    while True:
-        chunk = await file.read(_READ_CHUNK_SIZE)
-        if not chunk:
-            break
 
+async def iter_upload_with_limit(file: UploadFile, max_bytes: int) -> AsyncIterator[bytes]:
+    bytes_read = 0
+    while chunk := await file.read(_READ_CHUNK_SIZE):
         bytes_read += len(chunk)
         if bytes_read > max_bytes:
             raise UploadTooLargeError(max_bytes)
-
-        chunks.extend(chunk)
-
-    return bytes(chunks)
+        yield chunk
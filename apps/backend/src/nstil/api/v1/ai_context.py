@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field, field_validator
 from nstil.api.deps import (
     get_ai_context_service,
     get_ai_prompt_service,
+    get_cache_invalidator,
     get_current_user,
     get_prompt_engine,
 )
@@ -24,6 +25,8 @@ from nstil.models import (
 )
 from nstil.services.ai.prompt import AIPromptService
 from nstil.services.ai.prompt_engine import PromptEngine
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
 from nstil.services.cached_ai_context import CachedAIContextService
 
 router = APIRouter(prefix="/ai", tags=["ai-context"])
@@ -129,6 +132,7 @@ async def create_prompt(
     data: CreatePromptRequest,
     user: Annotated[UserPayload, Depends(get_current_user)],
     service: Annotated[AIPromptService, Depends(get_ai_prompt_service)],
+    invalidator: Annotated[CacheInvalidator, Depends(get_cache_invalidator)],
 ) -> AIPromptResponse:
     create_data = AIPromptCreate(
         prompt_type=data.prompt_type,
@@ -140,6 +144,7 @@ async def create_prompt(
         context=data.context,
     )
     row = await service.create(UUID(user.sub), create_data)
+    await invalidator.invalidate(UUID(user.sub), CacheEvent.PROMPT_CREATED, row.id)
     return AIPromptResponse.from_row(row)
 
 
@@ -172,6 +177,7 @@ async def update_prompt(
     data: AIPromptUpdate,
     user: Annotated[UserPayload, Depends(get_current_user)],
     service: Annotated[AIPromptService, Depends(get_ai_prompt_service)],
+    invalidator: Annotated[CacheInvalidator, Depends(get_cache_invalidator)],
 ) -> AIPromptResponse:
     row = await service.update(UUID(user.sub), prompt_id, data)
     if row is None:
@@ -179,4 +185,5 @@ async def update_prompt(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prompt not found",
         )
+    await invalidator.invalidate(UUID(user.sub), CacheEvent.PROMPT_UPDATED, prompt_id)
     return AIPromptResponse.from_row(row)
@@ -29,12 +29,10 @@ router = APIRouter(prefix="/entries", tags=["entries"])
 
 async def _build_responses_with_previews(
     rows: list[JournalEntryRow],
-    user_id: UUID,
     media_service: MediaService,
 ) -> list[JournalEntryResponse]:
-    entry_ids = [row.id for row in rows]
-    previews: dict[UUID, MediaPreview] = await media_service.get_previews_for_entries(
-        entry_ids, user_id
+    previews: dict[UUID, MediaPreview] = await media_service.sign_previews(
+        {row.id: row.media_preview for row in rows if row.media_preview is not None}
     )
     return [JournalEntryResponse.from_row(row, previews.get(row.id)) for row in rows]
 
@@ -73,7 +71,7 @@ async def list_entries(
         entry_date=entry_date,
         timezone=timezone,
     )
-    items = await _build_responses_with_previews(rows, user_id, media_service)
+    items = await _build_responses_with_previews(rows, media_service)
     next_cursor = rows[-1].created_at.isoformat() if has_more and rows else None
     return JournalEntryListResponse(
         items=items,
@@ -136,7 +134,7 @@ async def search_entries(
     user_id = UUID(user.sub)
     params = SearchParams(query=stripped, cursor=cursor, limit=limit)
     rows, has_more = await service.search(user_id, params, journal_id=journal_id)
-    items = await _build_responses_with_previews(rows, user_id, media_service)
+    items = await _build_responses_with_previews(rows, media_service)
     next_cursor = rows[-1].created_at.isoformat() if has_more and rows else None
     return JournalEntryListResponse(
         items=items,
@@ -1,16 +1,38 @@
-import json
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Form,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from pydantic import TypeAdapter, ValidationError
 
-from nstil.api.deps import get_current_user, get_journal_service, get_media_service
-from nstil.api.upload import UploadTooLargeError, read_upload_with_limit
+from nstil.api.deps import (
+    get_current_user,
+    get_journal_service,
+    get_media_service,
+    get_resumable_upload_service,
+)
+from nstil.api.upload import UploadTooLargeError, check_declared_size, iter_upload_with_limit
 from nstil.models import UserPayload
 from nstil.models.media import (
     ALLOWED_CONTENT_TYPES,
+    MAX_BATCH_UPLOAD_FILES,
+    ClientWaveform,
     EntryMediaListResponse,
     EntryMediaResponse,
+    MediaFinalizeRequest,
+    MediaUploadMetadata,
+    MediaUploadUrlRequest,
+    MediaUploadUrlResponse,
+    ResumableUploadResponse,
     max_file_size_for_content_type,
 )
 from nstil.services.cached_journal import CachedJournalService
@@ -20,10 +42,23 @@ from nstil.services.media import (
     InvalidMediaTypeError,
     MediaLimitExceededError,
     MediaService,
+    MediaUploadError,
+    MediaUploadFile,
+    UploadNotReceivedError,
+    UploadReservationNotFoundError,
+)
+from nstil.services.media_resumable import (
+    ResumableUploadService,
+    UploadExpiredError,
+    UploadInProgressError,
+    UploadOffsetMismatchError,
 )
 
 router = APIRouter(prefix="/entries/{entry_id}/media", tags=["media"])
 
+UPLOAD_OFFSET_HEADER = "Upload-Offset"
+UPLOAD_LENGTH_HEADER = "Upload-Length"
+
 
 async def _verify_entry_ownership(
     entry_id: UUID,
@@ -38,16 +73,211 @@ async def _verify_entry_ownership(
         )
 
 
+_WAVEFORM_ADAPTER = TypeAdapter(ClientWaveform)
+_METADATA_ADAPTER = TypeAdapter(list[MediaUploadMetadata])
+
+
 def _parse_waveform(raw: str | None) -> list[float] | None:
     if raw is None:
         return None
     try:
-        parsed = json.loads(raw)
-    except (json.JSONDecodeError, TypeError):
-        return None
-    if not isinstance(parsed, list):
-        return None
-    return [float(v) for v in parsed]
+        return _WAVEFORM_ADAPTER.validate_json(raw)
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Invalid waveform",
+        ) from exc
+
+
+def _check_upload_file(file: UploadFile) -> str:
+    content_type = file.content_type or ""
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"File type '{content_type}' is not supported. "
+            f"Allowed: {', '.join(sorted(ALLOWED_CONTENT_TYPES))}",
+        )
+    return content_type
+
+
+def _parse_batch_metadata(raw: str | None, count: int) -> list[MediaUploadMetadata]:
+    if raw is None:
+        return [MediaUploadMetadata() for _ in range(count)]
+    try:
+        metadata = _METADATA_ADAPTER.validate_json(raw)
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Invalid upload metadata",
+        ) from exc
+    if len(metadata) != count:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Upload metadata must have one item per file",
+        )
+    return metadata
+
+
+def _upload_error_status(exc: MediaUploadError) -> int:
+    if isinstance(exc, FileTooLargeError):
+        return status.HTTP_413_CONTENT_TOO_LARGE
+    if isinstance(exc, UploadExpiredError):
+        return status.HTTP_410_GONE
+    if isinstance(exc, UploadReservationNotFoundError):
+        return status.HTTP_404_NOT_FOUND
+    if isinstance(exc, UploadNotReceivedError | UploadOffsetMismatchError | UploadInProgressError):
+        return status.HTTP_409_CONFLICT
+    return status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+@router.post(
+    "/upload-url",
+    response_model=MediaUploadUrlResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_upload_url(
+    entry_id: UUID,
+    data: MediaUploadUrlRequest,
+    user: Annotated[UserPayload, Depends(get_current_user)],
+    media_service: Annotated[MediaService, Depends(get_media_service)],
+    journal_service: Annotated[CachedJournalService, Depends(get_journal_service)],
+) -> MediaUploadUrlResponse:
+    user_id = UUID(user.sub)
+    await _verify_entry_ownership(entry_id, user_id, journal_service)
+    try:
+        return await media_service.reserve_upload(user_id, entry_id, data)
+    except MediaUploadError as exc:
+        raise HTTPException(status_code=_upload_error_status(exc), detail=str(exc)) from exc
+
+
+@router.post(
+    "/finalize",
+    response_model=EntryMediaResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def finalize_upload(
+    entry_id: UUID,
+    data: MediaFinalizeRequest,
+    user: Annotated[UserPayload, Depends(get_current_user)],
+    media_service: Annotated[MediaService, Depends(get_media_service)],
+    journal_service: Annotated[CachedJournalService, Depends(get_journal_service)],
+) -> EntryMediaResponse:
+    user_id = UUID(user.sub)
+    await _verify_entry_ownership(entry_id, user_id, journal_service)
+    try:
+        row = await media_service.finalize_upload(user_id, entry_id, data.reservation_id)
+    except MediaUploadError as exc:
+        raise HTTPException(status_code=_upload_error_status(exc), detail=str(exc)) from exc
+
+    signed_url = await media_service.create_signed_url(row.storage_path)
+    return EntryMediaResponse.from_row(row, signed_url)
+
+
+def _upload_error(exc: MediaUploadError) -> HTTPException:
+    headers = (
+        {UPLOAD_OFFSET_HEADER: str(exc.offset)}
+        if isinstance(exc, UploadOffsetMismatchError)
+        else None
+    )
+    return HTTPException(status_code=_upload_error_status(exc), detail=str(exc), headers=headers)
+
+
+@router.post(
+    "/resumable",
+    response_model=ResumableUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_resumable_upload(
+    entry_id: UUID,
+    data: MediaUploadUrlRequest,
+    user: Annotated[UserPayload, Depends(get_current_user)],
+    uploads: Annotated[ResumableUploadService, Depends(get_resumable_upload_service)],
+    journal_service: Annotated[CachedJournalService, Depends(get_journal_service)],
+) -> ResumableUploadResponse:
+    user_id = UUID(user.sub)
+    await _verify_entry_ownership(entry_id, user_id, journal_service)
+    try:
+        return await uploads.create(user_id, entry_id, data)
+    except MediaUploadError as exc:
+        raise _upload_error(exc) from exc
+
+
+@router.head("/resumable/{upload_id}")
+async def get_resumable_upload_offset(
+    entry_id: UUID,
+    upload_id: UUID,
+    user: Annotated[UserPayload, Depends(get_current_user)],
+    uploads: Annotated[ResumableUploadService, Depends(get_resumable_upload_service)],
+) -> Response:
+    try:
+        upload = await uploads.status(UUID(user.sub), entry_id, upload_id)
+    except MediaUploadError as exc:
+        raise _upload_error(exc) from exc
+    return Response(
+        headers={
+            UPLOAD_OFFSET_HEADER: str(upload.offset),
+            UPLOAD_LENGTH_HEADER: str(upload.size_bytes),
+            "Cache-Control": "no-store",
+        }
+    )
+
+
+@router.patch("/resumable/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def append_resumable_upload(
+    entry_id: UUID,
+    upload_id: UUID,
+    request: Request,
+    upload_offset: Annotated[int, Header(alias=UPLOAD_OFFSET_HEADER, ge=0)],
+    user: Annotated[UserPayload, Depends(get_current_user)],
+    uploads: Annotated[ResumableUploadService, Depends(get_resumable_upload_service)],
+) -> Response:
+    try:
+        offset = await uploads.append(
+            UUID(user.sub), entry_id, upload_id, upload_offset, request.stream()
+        )
+    except MediaUploadError as exc:
+        raise _upload_error(exc) from exc
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={UPLOAD_OFFSET_HEADER: str(offset)},
+    )
+
+
+@router.post(
+    "/resumable/{upload_id}/complete",
+    response_model=EntryMediaResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def complete_resumable_upload(
+    entry_id: UUID,
+    upload_id: UUID,
+    user: Annotated[UserPayload, Depends(get_current_user)],
+    media_service: Annotated[MediaService, Depends(get_media_service)],
+    uploads: Annotated[ResumableUploadService, Depends(get_resumable_upload_service)],
+    journal_service: Annotated[CachedJournalService, Depends(get_journal_service)],
+) -> EntryMediaResponse:
+    user_id = UUID(user.sub)
+    await _verify_entry_ownership(entry_id, user_id, journal_service)
+    try:
+        row = await uploads.complete(user_id, entry_id, upload_id)
+    except MediaUploadError as exc:
+        raise _upload_error(exc) from exc
+
+    signed_url = await media_service.create_signed_url(row.storage_path)
+    return EntryMediaResponse.from_row(row, signed_url)
+
+
+@router.delete("/resumable/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_resumable_upload(
+    entry_id: UUID,
+    upload_id: UUID,
+    user: Annotated[UserPayload, Depends(get_current_user)],
+    uploads: Annotated[ResumableUploadService, Depends(get_resumable_upload_service)],
+) -> None:
+    try:
+        await uploads.abort(UUID(user.sub), entry_id, upload_id)
+    except MediaUploadError as exc:
+        raise _upload_error(exc) from exc
 
 
 @router.post(
@@ -67,22 +297,17 @@ async def upload_media(
     user_id = UUID(user.sub)
     await _verify_entry_ownership(entry_id, user_id, journal_service)
 
-    content_type = file.content_type or ""
-    if content_type not in ALLOWED_CONTENT_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
-            detail=f"File type '{content_type}' is not supported. "
-            f"Allowed: {', '.join(sorted(ALLOWED_CONTENT_TYPES))}",
-        )
+    content_type = _check_upload_file(file)
 
     max_size = max_file_size_for_content_type(content_type)
+    too_large = HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"File exceeds maximum size of {max_size // (1024 * 1024)}MB",
+    )
     try:
-        file_bytes = await read_upload_with_limit(file, max_size)
+        check_declared_size(file, max_size)
     except UploadTooLargeError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
-            detail=f"File exceeds maximum size of {max_size // (1024 * 1024)}MB",
-        ) from exc
+        raise too_large from exc
 
     file_name = file.filename or "untitled"
 
@@ -92,12 +317,14 @@ async def upload_media(
         row = await media_service.upload(
             user_id=user_id,
             entry_id=entry_id,
-            file_bytes=file_bytes,
+            chunks=iter_upload_with_limit(file, max_size),
             file_name=file_name,
             content_type=content_type,
             duration_ms=duration_ms,
             waveform=parsed_waveform,
         )
+    except UploadTooLargeError as exc:
+        raise too_large from exc
     except MediaLimitExceededError as exc:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
@@ -118,6 +345,65 @@ async def upload_media(
     return EntryMediaResponse.from_row(row, signed_url)
 
 
+@router.post(
+    "/batch",
+    response_model=EntryMediaListResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def upload_media_batch(
+    entry_id: UUID,
+    files: list[UploadFile],
+    user: Annotated[UserPayload, Depends(get_current_user)],
+    media_service: Annotated[MediaService, Depends(get_media_service)],
+    journal_service: Annotated[CachedJournalService, Depends(get_journal_service)],
+    metadata: Annotated[str | None, Form()] = None,
+) -> EntryMediaListResponse:
+    if len(files) > MAX_BATCH_UPLOAD_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Maximum of {MAX_BATCH_UPLOAD_FILES} files per batch",
+        )
+    user_id = UUID(user.sub)
+    await _verify_entry_ownership(entry_id, user_id, journal_service)
+
+    uploads: list[MediaUploadFile] = []
+    for file, meta in zip(files, _parse_batch_metadata(metadata, len(files)), strict=True):
+        content_type = _check_upload_file(file)
+        max_size = max_file_size_for_content_type(content_type)
+        try:
+            check_declared_size(file, max_size)
+        except UploadTooLargeError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(exc)
+            ) from exc
+        uploads.append(
+            MediaUploadFile(
+                chunks=iter_upload_with_limit(file, max_size),
+                file_name=file.filename or "untitled",
+                content_type=content_type,
+                width=meta.width,
+                height=meta.height,
+                duration_ms=meta.duration_ms,
+                waveform=meta.waveform,
+            )
+        )
+
+    try:
+        rows = await media_service.upload_batch(user_id, entry_id, uploads)
+    except UploadTooLargeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(exc)
+        ) from exc
+    except MediaUploadError as exc:
+        raise HTTPException(status_code=_upload_error_status(exc), detail=str(exc)) from exc
+
+    signed_urls = await media_service.create_signed_urls([row.storage_path for row in rows])
+    items = [
+        EntryMediaResponse.from_row(row, url) for row, url in zip(rows, signed_urls, strict=True)
+    ]
+    return EntryMediaListResponse(items=items, count=len(items))
+
+
 @router.get("", response_model=EntryMediaListResponse)
 async def list_media(
     entry_id: UUID,
@@ -134,10 +420,19 @@ async def list_media(
         return EntryMediaListResponse(items=[], count=0)
 
     paths = [row.storage_path for row in rows]
-    signed_urls = await media_service.create_signed_urls(paths)
+    paths += [
+        path for row in rows for path in (row.thumbnail_path, row.medium_path) if path is not None
+    ]
+    urls = dict(zip(paths, await media_service.create_signed_urls(paths), strict=True))
 
     items = [
-        EntryMediaResponse.from_row(row, url) for row, url in zip(rows, signed_urls, strict=True)
+        EntryMediaResponse.from_row(
+            row,
+            urls[row.storage_path],
+            thumbnail_url=urls.get(row.thumbnail_path) if row.thumbnail_path else None,
+            medium_url=urls.get(row.medium_path) if row.medium_path else None,
+        )
+        for row in rows
     ]
     return EntryMediaListResponse(items=items, count=len(items))
 
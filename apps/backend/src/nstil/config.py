@@ -1,3 +1,6 @@
+import tempfile
+from pathlib import Path
+
 from pydantic import SecretStr, model_validator
 from pydantic_settings import BaseSettings
 
@@ -13,8 +16,13 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     log_format: str = "console"
     rate_limit_enabled: bool = True
+    cache_row_changes_enabled: bool = True
     jwks_refresh_interval_seconds: int = 300
     max_request_body_bytes: int = 30 * 1024 * 1024
+    media_local_signing_enabled: bool = True
+    media_staging_dir: Path = Path(tempfile.gettempdir()) / "nstil-uploads"
+    media_variant_workers: int = 2
+    insight_quiet_period_seconds: int = 300
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
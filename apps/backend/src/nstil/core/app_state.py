@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 import redis.asyncio as aioredis
+from arq.connections import ArqRedis
 from supabase import AsyncClient
 
 if TYPE_CHECKING:
@@ -17,3 +18,4 @@ class AppState:
     supabase: AsyncClient
     rate_limiter: RateLimitService | None = None
     token_blacklist: TokenBlacklistService | None = None
+    job_queue: ArqRedis | None = None
@@ -12,8 +12,11 @@ from nstil.api.router import api_router
 from nstil.core.app_state import AppState
 from nstil.core.jwks import jwks_store
 from nstil.observability import RequestLoggingMiddleware, configure_logging, get_logger
+from nstil.services.ai.prompt_queue import PromptQueue
+from nstil.services.cache.invalidator import CacheInvalidator
+from nstil.services.cache.row_changes import RowChangeListener
 from nstil.services.rate_limit import RateLimitService
-from nstil.services.redis import close_redis_pool, create_redis_pool
+from nstil.services.redis import close_redis_pool, create_job_queue, create_redis_pool
 from nstil.services.supabase import create_supabase_client
 from nstil.services.token_blacklist import TokenBlacklistService
 
@@ -30,21 +33,33 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     )
     rate_limiter = RateLimitService(redis) if settings.rate_limit_enabled else None
     token_blacklist = TokenBlacklistService(redis)
+    job_queue = await create_job_queue(settings.redis_url)
     app.state.app = AppState(
         redis=redis,
         supabase=supabase,
         rate_limiter=rate_limiter,
         token_blacklist=token_blacklist,
+        job_queue=job_queue,
     )
     try:
         await jwks_store.load(settings.supabase_url)
         jwks_store.start_background_refresh(settings.jwks_refresh_interval_seconds)
     except Exception:
         logger.warning("jwks.load_failed", supabase_url=settings.supabase_url)
+    row_changes = (
+        RowChangeListener(supabase, CacheInvalidator(redis, PromptQueue(redis, job_queue)))
+        if settings.cache_row_changes_enabled
+        else None
+    )
+    if row_changes is not None:
+        row_changes.start()
     logger.info("app.startup", redis_url=settings.redis_url)
     yield
+    if row_changes is not None:
+        await row_changes.stop()
     await jwks_store.stop_background_refresh()
     await close_redis_pool(app.state.app.redis)
+    await close_redis_pool(job_queue)
     logger.info("app.shutdown")
 
 
@@ -67,6 +82,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Upload-Offset", "Upload-Length"],
     )
     application.add_middleware(CacheControlMiddleware)
     application.add_middleware(RateLimitMiddleware, enabled=settings.rate_limit_enabled)
@@ -1,4 +1,6 @@
 from nstil.models.ai_context import (
+    AIContextActivity,
+    AIContextAggregates,
     AIContextEntry,
     AIContextMoodDistribution,
     AIContextProfile,
@@ -6,6 +8,7 @@ from nstil.models.ai_context import (
     AIContextResponse,
     AIContextSession,
     AIContextStats,
+    AIContextWindow,
 )
 from nstil.models.ai_feedback import (
     AIFeedbackCreate,
@@ -43,11 +46,13 @@ from nstil.models.ai_prompt import (
     AIPromptResponse,
     AIPromptRow,
     AIPromptUpdate,
+    PlannedPrompt,
     PromptSource,
     PromptStatus,
     PromptType,
 )
 from nstil.models.ai_session import (
+    ActiveCheckInState,
     AISessionCreate,
     AISessionListResponse,
     AISessionResponse,
@@ -81,6 +86,7 @@ from nstil.models.calendar import (
     CalendarParams,
     CalendarResponse,
     DailyMoodCount,
+    DailyMoodRollup,
     MoodTrendParams,
     MoodTrendResponse,
 )
@@ -95,19 +101,31 @@ from nstil.models.journal import (
     BODYLESS_ENTRY_TYPES,
     EntryType,
     JournalEntryCreate,
+    JournalEntryDigest,
     JournalEntryListResponse,
     JournalEntryResponse,
     JournalEntryRow,
     JournalEntryUpdate,
+    JournalEntryVersion,
 )
 from nstil.models.media import (
     EntryMediaListResponse,
     EntryMediaResponse,
     EntryMediaRow,
+    MediaFinalizeRequest,
     MediaPreview,
     MediaPreviewItem,
+    MediaPreviewRow,
+    MediaPreviewRowItem,
+    MediaUploadMetadata,
+    MediaUploadReservation,
+    MediaUploadUrlRequest,
+    MediaUploadUrlResponse,
+    ResumableUpload,
+    ResumableUploadResponse,
 )
 from nstil.models.mood import MoodCategory, MoodSpecific
+from nstil.models.mood_baseline import MoodBaselineRow
 from nstil.models.notification import (
     NotificationPreferencesResponse,
     NotificationPreferencesRow,
@@ -124,6 +142,7 @@ from nstil.models.space import (
     JournalSpaceRow,
     JournalSpaceUpdate,
 )
+from nstil.models.tag_mood_stats import TagMoodStatsRow
 
 __all__ = [
     "BODYLESS_ENTRY_TYPES",
@@ -139,6 +158,8 @@ __all__ = [
     "AIAgentTaskResponse",
     "AIAgentTaskRow",
     "AIAgentTaskUpdate",
+    "AIContextActivity",
+    "AIContextAggregates",
     "AIContextEntry",
     "AIContextMoodDistribution",
     "AIContextProfile",
@@ -146,6 +167,7 @@ __all__ = [
     "AIContextResponse",
     "AIContextSession",
     "AIContextStats",
+    "AIContextWindow",
     "AIFeedbackCreate",
     "AIFeedbackListResponse",
     "AIFeedbackResponse",
@@ -164,6 +186,7 @@ __all__ = [
     "AIPromptResponse",
     "AIPromptRow",
     "AIPromptUpdate",
+    "ActiveCheckInState",
     "AISessionCreate",
     "AISessionListResponse",
     "AISessionResponse",
@@ -174,6 +197,7 @@ __all__ = [
     "CalendarResponse",
     "CursorParams",
     "DailyMoodCount",
+    "DailyMoodRollup",
     "EntryEmbeddingCreate",
     "EntryEmbeddingResponse",
     "EntryEmbeddingRow",
@@ -186,18 +210,28 @@ __all__ = [
     "InsightStatus",
     "InsightType",
     "JournalEntryCreate",
+    "JournalEntryDigest",
     "JournalEntryListResponse",
     "JournalEntryResponse",
     "JournalEntryRow",
     "JournalEntryUpdate",
+    "JournalEntryVersion",
     "JournalSpaceCreate",
     "JournalSpaceListResponse",
     "JournalSpaceResponse",
     "JournalSpaceRow",
     "JournalSpaceUpdate",
+    "MediaFinalizeRequest",
     "MediaPreview",
     "MediaPreviewItem",
+    "MediaPreviewRow",
+    "MediaPreviewRowItem",
+    "MediaUploadMetadata",
+    "MediaUploadReservation",
+    "MediaUploadUrlRequest",
+    "MediaUploadUrlResponse",
     "MessageRole",
+    "MoodBaselineRow",
     "MoodCategory",
     "MoodSpecific",
     "MoodTrendParams",
@@ -208,17 +242,21 @@ __all__ = [
     "ProfileResponse",
     "ProfileRow",
     "ProfileUpdate",
+    "PlannedPrompt",
     "PromptSource",
     "PromptStatus",
     "PromptStyle",
     "PromptType",
     "ReminderFrequency",
     "ReminderTime",
+    "ResumableUpload",
+    "ResumableUploadResponse",
     "SearchParams",
     "SemanticSearchResponse",
     "SemanticSearchResult",
     "SessionStatus",
     "SessionType",
+    "TagMoodStatsRow",
     "TaskStatus",
     "TaskType",
     "TriggerSource",
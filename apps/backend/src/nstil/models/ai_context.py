@@ -7,6 +7,7 @@ class AIContextEntry(BaseModel):
     id: str
     title: str
     body: str
+    body_length: int | None = None
     mood_category: str | None
     mood_specific: str | None
     tags: list[str]
@@ -27,6 +28,7 @@ class AIContextPrompt(BaseModel):
     content: str
     status: str
     source: str
+    curated_id: str | None = None
     created_at: datetime
 
 
@@ -61,3 +63,20 @@ class AIContextResponse(BaseModel):
     recent_sessions: list[AIContextSession]
     stats: AIContextStats
     profile: AIContextProfile
+
+
+class AIContextWindow(BaseModel):
+    entry_limit: int
+    days_back: int
+    fetched_at: datetime
+    recent_entries: list[AIContextEntry]
+
+
+class AIContextAggregates(BaseModel):
+    mood_distribution: list[AIContextMoodDistribution]
+    stats: AIContextStats
+
+
+class AIContextActivity(BaseModel):
+    recent_prompts: list[AIContextPrompt]
+    recent_sessions: list[AIContextSession]
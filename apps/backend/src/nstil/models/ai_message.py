@@ -36,7 +36,6 @@ class AIMessageCreate(BaseModel):
     session_id: UUID = Field(...)
     role: MessageRole = Field(...)
     content: str = Field(..., min_length=1, max_length=MAX_MESSAGE_CONTENT_LENGTH)
-    sort_order: int = Field(default=0, ge=0)
     token_count: int | None = Field(default=None, ge=0)
     latency_ms: int | None = Field(default=None, ge=0)
     model_id: str | None = Field(default=None, max_length=100)
@@ -47,36 +46,12 @@ class AIMessageCreate(BaseModel):
         return cls(session_id=session_id, role=MessageRole.SYSTEM, content=content, **kwargs)
 
     @classmethod
-    def assistant(
-        cls,
-        session_id: UUID,
-        content: str,
-        sort_order: int = 0,
-        **kwargs: object,
-    ) -> "AIMessageCreate":
-        return cls(
-            session_id=session_id,
-            role=MessageRole.ASSISTANT,
-            content=content,
-            sort_order=sort_order,
-            **kwargs,
-        )
+    def assistant(cls, session_id: UUID, content: str, **kwargs: object) -> "AIMessageCreate":
+        return cls(session_id=session_id, role=MessageRole.ASSISTANT, content=content, **kwargs)
 
     @classmethod
-    def user(
-        cls,
-        session_id: UUID,
-        content: str,
-        sort_order: int = 0,
-        **kwargs: object,
-    ) -> "AIMessageCreate":
-        return cls(
-            session_id=session_id,
-            role=MessageRole.USER,
-            content=content,
-            sort_order=sort_order,
-            **kwargs,
-        )
+    def user(cls, session_id: UUID, content: str, **kwargs: object) -> "AIMessageCreate":
+        return cls(session_id=session_id, role=MessageRole.USER, content=content, **kwargs)
 
 
 class AIMessageResponse(BaseModel):
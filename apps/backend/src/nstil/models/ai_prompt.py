@@ -46,6 +46,7 @@ class AIPromptRow(BaseModel):
     content: str
     context: dict[str, object]
     source: str
+    curated_id: str | None
     mood_category: str | None
     session_id: UUID | None
     entry_id: UUID | None
@@ -66,6 +67,7 @@ class AIPromptCreate(BaseModel):
     prompt_type: PromptType = Field(...)
     content: str = Field(..., min_length=1, max_length=MAX_PROMPT_CONTENT_LENGTH)
     source: PromptSource = Field(default=PromptSource.CURATED)
+    curated_id: str | None = Field(default=None)
     mood_category: MoodCategory | None = Field(default=None)
     session_id: UUID | None = Field(default=None)
     entry_id: UUID | None = Field(default=None)
@@ -81,6 +83,11 @@ class AIPromptCreate(BaseModel):
         return stripped
 
 
+class PlannedPrompt(BaseModel):
+    curated_id: str
+    data: AIPromptCreate
+
+
 class AIPromptUpdate(BaseModel):
     status: PromptStatus | None = Field(default=None)
     converted_entry_id: UUID | None = Field(default=None)
@@ -109,6 +116,7 @@ class AIPromptResponse(BaseModel):
     content: str
     context: dict[str, object]
     source: str
+    curated_id: str | None
     mood_category: str | None
     session_id: UUID | None
     entry_id: UUID | None
@@ -130,6 +138,7 @@ class AIPromptResponse(BaseModel):
             content=row.content,
             context=row.context,
             source=row.source,
+            curated_id=row.curated_id,
             mood_category=row.mood_category,
             session_id=row.session_id,
             entry_id=row.entry_id,
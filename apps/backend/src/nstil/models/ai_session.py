@@ -54,6 +54,10 @@ class AISessionRow(BaseModel):
     model_config = {"extra": "ignore"}
 
 
+class ActiveCheckInState(BaseModel):
+    session: AISessionRow | None
+
+
 class AISessionCreate(BaseModel):
     session_type: SessionType = Field(...)
     trigger_source: TriggerSource | None = Field(default=None)
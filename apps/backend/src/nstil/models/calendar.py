@@ -24,6 +24,15 @@ class DailyMoodCount(BaseModel):
     model_config = {"extra": "ignore"}
 
 
+class DailyMoodRollup(BaseModel):
+    user_id: UUID
+    day: date
+    mood_category: str | None
+    entry_count: int
+
+    model_config = {"extra": "ignore"}
+
+
 class MoodTrendResponse(BaseModel):
     items: list[DailyMoodCount]
     days: int
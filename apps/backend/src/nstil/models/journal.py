@@ -4,7 +4,7 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
-from nstil.models.media import MediaPreview
+from nstil.models.media import MediaPreview, MediaPreviewRow
 from nstil.models.mood import MoodCategory, MoodSpecific, validate_mood_pair
 
 
@@ -208,6 +208,26 @@ class JournalEntryRow(BaseModel):
     created_at: datetime
     updated_at: datetime
     deleted_at: datetime | None
+    media_preview: MediaPreviewRow | None = None
+
+    model_config = {"extra": "ignore"}
+
+
+class JournalEntryVersion(BaseModel):
+    id: UUID
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"extra": "ignore"}
+
+
+class JournalEntryDigest(BaseModel):
+    id: UUID
+    created_at: datetime
+    mood_category: str | None
+    tags: list[str]
+    entry_type: str
+    body: str = ""
 
     model_config = {"extra": "ignore"}
 
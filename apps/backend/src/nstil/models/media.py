@@ -1,8 +1,10 @@
+import base64
 from datetime import datetime
 from enum import StrEnum
+from typing import Annotated
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class MediaContentType(StrEnum):
@@ -58,6 +60,12 @@ MAX_AUDIO_FILE_SIZE_BYTES = 25 * 1024 * 1024
 MAX_IMAGES_PER_ENTRY = 10
 MAX_AUDIO_PER_ENTRY = 1
 MAX_AUDIO_DURATION_MS = 5 * 60 * 1000
+WAVEFORM_SAMPLE_INTERVAL_MS = 100
+MAX_WAVEFORM_SAMPLES = MAX_AUDIO_DURATION_MS // WAVEFORM_SAMPLE_INTERVAL_MS
+
+WaveformSample = Annotated[float, Field(ge=0.0, le=1.0, allow_inf_nan=False)]
+ClientWaveform = Annotated[list[WaveformSample], Field(max_length=MAX_WAVEFORM_SAMPLES)]
+MAX_BATCH_UPLOAD_FILES = MAX_IMAGES_PER_ENTRY + MAX_AUDIO_PER_ENTRY
 
 
 def is_audio_content_type(content_type: str) -> bool:
@@ -82,11 +90,22 @@ class EntryMediaRow(BaseModel):
     height: int | None
     duration_ms: int | None
     waveform: list[float] | None = None
+    waveform_peaks: bytes | None = None
+    thumbnail_path: str | None = None
+    medium_path: str | None = None
+    content_hash: str | None = None
     sort_order: int
     created_at: datetime
 
     model_config = {"extra": "ignore"}
 
+    @field_validator("waveform_peaks", mode="before")
+    @classmethod
+    def decode_bytea(cls, v: object) -> object:
+        if isinstance(v, str) and v.startswith("\\x"):
+            return bytes.fromhex(v[2:])
+        return v
+
 
 class EntryMediaResponse(BaseModel):
     id: UUID
@@ -98,12 +117,23 @@ class EntryMediaResponse(BaseModel):
     height: int | None
     duration_ms: int | None
     waveform: list[float] | None = None
+    waveform_peaks: str | None = Field(
+        default=None, description="Base64-encoded uint8 peak envelope"
+    )
     sort_order: int
     url: str
+    thumbnail_url: str | None = None
+    medium_url: str | None = None
     created_at: datetime
 
     @classmethod
-    def from_row(cls, row: EntryMediaRow, signed_url: str) -> "EntryMediaResponse":
+    def from_row(
+        cls,
+        row: EntryMediaRow,
+        signed_url: str,
+        thumbnail_url: str | None = None,
+        medium_url: str | None = None,
+    ) -> "EntryMediaResponse":
         return cls(
             id=row.id,
             entry_id=row.entry_id,
@@ -114,12 +144,84 @@ class EntryMediaResponse(BaseModel):
             height=row.height,
             duration_ms=row.duration_ms,
             waveform=row.waveform,
+            waveform_peaks=(
+                base64.b64encode(row.waveform_peaks).decode()
+                if row.waveform_peaks is not None
+                else None
+            ),
             sort_order=row.sort_order,
             url=signed_url,
+            thumbnail_url=thumbnail_url,
+            medium_url=medium_url,
             created_at=row.created_at,
         )
 
 
+class MediaUploadUrlRequest(BaseModel):
+    file_name: str = Field(min_length=1, max_length=255)
+    content_type: str
+    size_bytes: int = Field(gt=0)
+    width: int | None = Field(default=None, gt=0)
+    height: int | None = Field(default=None, gt=0)
+    duration_ms: int | None = Field(default=None, gt=0)
+    waveform: ClientWaveform | None = None
+
+
+class MediaUploadReservation(BaseModel):
+    id: UUID
+    user_id: UUID
+    entry_id: UUID
+    storage_path: str
+    file_name: str
+    content_type: str
+    size_bytes: int
+    width: int | None = None
+    height: int | None = None
+    duration_ms: int | None = None
+    waveform: list[float] | None = None
+    expires_at: datetime
+
+
+class MediaUploadUrlResponse(BaseModel):
+    reservation_id: UUID
+    upload_url: str
+    token: str
+    storage_path: str
+    expires_at: datetime
+
+
+class MediaFinalizeRequest(BaseModel):
+    reservation_id: UUID
+
+
+class MediaUploadMetadata(BaseModel):
+    width: int | None = Field(default=None, gt=0)
+    height: int | None = Field(default=None, gt=0)
+    duration_ms: int | None = Field(default=None, gt=0)
+    waveform: ClientWaveform | None = None
+
+
+class ResumableUpload(BaseModel):
+    id: UUID
+    user_id: UUID
+    entry_id: UUID
+    file_name: str
+    content_type: str
+    size_bytes: int
+    width: int | None = None
+    height: int | None = None
+    duration_ms: int | None = None
+    waveform: list[float] | None = None
+    expires_at: datetime
+
+
+class ResumableUploadResponse(BaseModel):
+    upload_id: UUID
+    offset: int
+    size_bytes: int
+    expires_at: datetime
+
+
 class EntryMediaListResponse(BaseModel):
     items: list[EntryMediaResponse]
     count: int = Field(description="Total number of media items for this entry")
@@ -128,6 +230,17 @@ class EntryMediaListResponse(BaseModel):
 PREVIEW_LIMIT = 3
 
 
+class MediaPreviewRowItem(BaseModel):
+    id: UUID
+    storage_path: str
+    thumbnail_path: str | None = None
+
+
+class MediaPreviewRow(BaseModel):
+    items: list[MediaPreviewRowItem]
+    total_count: int
+
+
 class MediaPreviewItem(BaseModel):
     id: UUID
     url: str
@@ -0,0 +1,13 @@
+from datetime import date, datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class MoodBaselineRow(BaseModel):
+    user_id: UUID
+    ewma_mean: float
+    ewma_variance: float
+    observations: int
+    last_day: date
+    updated_at: datetime
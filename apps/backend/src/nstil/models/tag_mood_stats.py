@@ -0,0 +1,14 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class TagMoodStatsRow(BaseModel):
+    user_id: UUID
+    counts: dict[str, dict[str, int]]
+    mood_totals: dict[str, int]
+    entries_scanned: int
+    watermark: datetime | None
+    synced_at: datetime | None = None
+    updated_at: datetime
@@ -1,11 +1,14 @@
+import asyncio
+from collections.abc import Awaitable
 from datetime import UTC, datetime
 from enum import StrEnum
+from typing import Final
 from uuid import UUID
 
-from nstil.models.ai_message import AIMessageCreate
+from postgrest.exceptions import APIError
+
 from nstil.models.ai_prompt import PromptType
 from nstil.models.ai_session import (
-    AISessionCreate,
     AISessionRow,
     AISessionUpdate,
     SessionStatus,
@@ -19,13 +22,17 @@ from nstil.observability import get_logger
 from nstil.services.ai.prompt import AIPromptService
 from nstil.services.ai.prompt_engine import PromptEngine
 from nstil.services.ai.session import AISessionService
-from nstil.services.cached_ai_context import CachedAIContextService
+from nstil.services.cache.ai_cache import AICacheService
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
 from nstil.services.cached_ai_profile import CachedAIProfileService
 from nstil.services.cached_journal import CachedJournalService
 from nstil.services.cached_space import CachedSpaceService
 
 logger = get_logger("nstil.ai.check_in")
 
+CHECK_IN_STEP_ERROR_CODE: Final = "NS001"
+
 
 class CheckInStep(StrEnum):
     PROMPTED = "prompted"
@@ -63,6 +70,15 @@ def _validate_active_session(session: AISessionRow | None, session_id: UUID) ->
     return session
 
 
+async def _run_step(step: Awaitable[AISessionRow]) -> AISessionRow:
+    try:
+        return await step
+    except APIError as exc:
+        if exc.code == CHECK_IN_STEP_ERROR_CODE:
+            raise CheckInError(exc.message or "Check-in step failed") from exc
+        raise
+
+
 def _get_flow_step(session: AISessionRow) -> str:
     return str(session.flow_state.get("step", ""))
 
@@ -83,7 +99,8 @@ class CheckInOrchestrator:
         journal_service: CachedJournalService,
         space_service: CachedSpaceService,
         profile_service: CachedAIProfileService,
-        context_service: CachedAIContextService,
+        cache: AICacheService,
+        invalidator: CacheInvalidator,
     ) -> None:
         self._sessions = session_service
         self._prompt_engine = prompt_engine
@@ -91,7 +108,8 @@ class CheckInOrchestrator:
         self._journal = journal_service
         self._spaces = space_service
         self._profile = profile_service
-        self._context = context_service
+        self._cache = cache
+        self._invalidator = invalidator
 
     async def start(
         self,
@@ -105,48 +123,18 @@ class CheckInOrchestrator:
             else:
                 return await self._resume(user_id, existing)
 
-        session = await self._sessions.create(
-            user_id,
-            AISessionCreate(
-                session_type=SessionType.CHECK_IN,
-                trigger_source=trigger_source,
-            ),
-        )
-
         prompt_row = await self._prompt_engine.generate(
             user_id=user_id,
             prompt_type=PromptType.CHECK_IN,
-            session_id=session.id,
         )
 
         if prompt_row is None:
             raise CheckInError("Failed to generate check-in prompt")
 
-        await self._prompts.mark_delivered(user_id, prompt_row.id)
-
-        sort_order = await self._sessions.get_next_sort_order(session.id)
-        await self._sessions.add_message(
-            user_id,
-            AIMessageCreate.assistant(
-                session_id=session.id,
-                content=prompt_row.content,
-                sort_order=sort_order,
-            ),
-        )
-
-        flow_state: dict[str, object] = {
-            "step": CheckInStep.PROMPTED.value,
-            "prompt_id": str(prompt_row.id),
-        }
-        updated_session = await self._sessions.update(
-            user_id,
-            session.id,
-            AISessionUpdate(flow_state=flow_state),
+        session = await _run_step(
+            self._sessions.start_check_in(user_id, trigger_source, prompt_row.id)
         )
-
-        if updated_session is None:
-            raise CheckInError("Failed to update session flow state")
-        session = updated_session
+        await self._invalidator.invalidate(user_id, CacheEvent.SESSION_CREATED, session.id)
 
         logger.info(
             "check_in.started",
@@ -168,48 +156,20 @@ class CheckInOrchestrator:
         mood_specific: MoodSpecific | None = None,
         response_text: str = "",
     ) -> CheckInResult:
-        session = await self._sessions.get_by_id(user_id, session_id)
-        session = _validate_active_session(session, session_id)
-
-        current_step = _get_flow_step(session)
-        if current_step != CheckInStep.PROMPTED.value:
-            raise CheckInError(f"Cannot respond: session is in step '{current_step}'")
-
-        prompt_id = _get_flow_prompt_id(session)
-        if prompt_id is not None:
-            await self._prompts.mark_engaged(user_id, prompt_id)
-
-        if response_text.strip():
-            sort_order = await self._sessions.get_next_sort_order(session.id)
-            await self._sessions.add_message(
+        session = await _run_step(
+            self._sessions.respond_check_in(
                 user_id,
-                AIMessageCreate.user(
-                    session_id=session.id,
-                    content=response_text.strip(),
-                    sort_order=sort_order,
-                ),
+                session_id,
+                mood_category.value,
+                mood_specific.value if mood_specific else None,
+                response_text.strip(),
             )
-
-        flow_state: dict[str, object] = {
-            **session.flow_state,
-            "step": CheckInStep.RESPONDED.value,
-            "mood_category": mood_category.value,
-            "mood_specific": mood_specific.value if mood_specific else None,
-            "response_text": response_text.strip(),
-        }
-        updated = await self._sessions.update(
-            user_id,
-            session.id,
-            AISessionUpdate(flow_state=flow_state),
         )
-
-        if updated is None:
-            raise CheckInError("Failed to update session")
-        session = updated
-
         now = datetime.now(UTC).isoformat()
-        await self._profile.update_last_check_in(user_id, now)
-        await self._context.invalidate(user_id)
+        await asyncio.gather(
+            self._profile.update_last_check_in(user_id, now),
+            self._invalidator.invalidate(user_id, CacheEvent.SESSION_UPDATED, session.id),
+        )
 
         logger.info(
             "check_in.responded",
@@ -243,17 +203,20 @@ class CheckInOrchestrator:
         journal_id: UUID | None = None,
         title: str = "",
     ) -> CheckInResult:
-        session = await self._sessions.get_by_id(user_id, session_id)
-        session = _validate_active_session(session, session_id)
+        if journal_id is None:
+            found, target_journal_id = await asyncio.gather(
+                self._get_session(user_id, session_id),
+                self._resolve_default_journal_id(user_id),
+            )
+        else:
+            found = await self._get_session(user_id, session_id)
+            target_journal_id = journal_id
+        session = _validate_active_session(found, session_id)
 
         current_step = _get_flow_step(session)
         if current_step != CheckInStep.RESPONDED.value:
             raise CheckInError(f"Cannot convert: session is in step '{current_step}'")
 
-        target_journal_id = journal_id
-        if target_journal_id is None:
-            target_journal_id = await self._resolve_default_journal_id(user_id)
-
         mood_category, mood_specific = self._extract_mood_from_flow(session.flow_state)
         response_text = str(session.flow_state.get("response_text", ""))
 
@@ -269,32 +232,10 @@ class CheckInOrchestrator:
             ),
         )
 
-        prompt_id = _get_flow_prompt_id(session)
-        if prompt_id is not None:
-            await self._prompts.mark_converted(user_id, prompt_id, entry.id)
-
-        now = datetime.now(UTC).isoformat()
-        flow_state: dict[str, object] = {
-            **session.flow_state,
-            "step": CheckInStep.COMPLETED.value,
-            "entry_id": str(entry.id),
-        }
-        updated_session = await self._sessions.update(
-            user_id,
-            session.id,
-            AISessionUpdate(
-                status=SessionStatus.CONVERTED,
-                entry_id=entry.id,
-                flow_state=flow_state,
-                completed_at=now,
-            ),
+        session = await self._finish_with_entry(
+            user_id, session.id, SessionStatus.CONVERTED, entry
         )
-
-        if updated_session is None:
-            raise CheckInError("Failed to update session")
-        session = updated_session
-
-        await self._context.invalidate(user_id)
+        await self._invalidator.invalidate(user_id, CacheEvent.SESSION_UPDATED, session.id)
 
         logger.info(
             "check_in.converted",
@@ -310,8 +251,9 @@ class CheckInOrchestrator:
         user_id: UUID,
         session_id: UUID,
     ) -> CheckInResult:
-        session = await self._sessions.get_by_id(user_id, session_id)
-        session = _validate_active_session(session, session_id)
+        session = _validate_active_session(
+            await self._get_session(user_id, session_id), session_id
+        )
 
         current_step = _get_flow_step(session)
         if current_step != CheckInStep.RESPONDED.value:
@@ -332,38 +274,10 @@ class CheckInOrchestrator:
                 ),
             )
 
-        now = datetime.now(UTC).isoformat()
-        flow_state: dict[str, object] = {
-            **session.flow_state,
-            "step": CheckInStep.COMPLETED.value,
-        }
-
-        session_update = AISessionUpdate(
-            status=SessionStatus.COMPLETED,
-            flow_state=flow_state,
-            completed_at=now,
+        session = await self._finish_with_entry(
+            user_id, session.id, SessionStatus.COMPLETED, entry
         )
-
-        if entry is not None:
-            flow_state["entry_id"] = str(entry.id)
-            session_update = AISessionUpdate(
-                status=SessionStatus.COMPLETED,
-                entry_id=entry.id,
-                flow_state=flow_state,
-                completed_at=now,
-            )
-
-        updated_session = await self._sessions.update(
-            user_id,
-            session.id,
-            session_update,
-        )
-
-        if updated_session is None:
-            raise CheckInError("Failed to update session")
-        session = updated_session
-
-        await self._context.invalidate(user_id)
+        await self._invalidator.invalidate(user_id, CacheEvent.SESSION_UPDATED, session.id)
 
         logger.info(
             "check_in.completed",
@@ -374,31 +288,39 @@ class CheckInOrchestrator:
 
         return CheckInResult(session=session, entry=entry)
 
+    async def _finish_with_entry(
+        self,
+        user_id: UUID,
+        session_id: UUID,
+        status: SessionStatus,
+        entry: JournalEntryRow | None,
+    ) -> AISessionRow:
+        try:
+            return await _run_step(
+                self._sessions.finish_check_in(
+                    user_id, session_id, status, entry.id if entry else None
+                )
+            )
+        except Exception:
+            if entry is not None:
+                await self._journal.soft_delete(user_id, entry.id)
+                logger.info(
+                    "check_in.entry_discarded",
+                    user_id=str(user_id),
+                    session_id=str(session_id),
+                    entry_id=str(entry.id),
+                )
+            raise
+
     async def abandon(
         self,
         user_id: UUID,
         session_id: UUID,
     ) -> CheckInResult:
-        session = await self._sessions.get_by_id(user_id, session_id)
-        session = _validate_active_session(session, session_id)
-
-        now = datetime.now(UTC).isoformat()
-        updated_session = await self._sessions.update(
-            user_id,
-            session.id,
-            AISessionUpdate(
-                status=SessionStatus.ABANDONED,
-                completed_at=now,
-            ),
+        session = await _run_step(
+            self._sessions.finish_check_in(user_id, session_id, SessionStatus.ABANDONED)
         )
-
-        if updated_session is None:
-            raise CheckInError("Failed to update session")
-        session = updated_session
-
-        prompt_id = _get_flow_prompt_id(session)
-        if prompt_id is not None:
-            await self._prompts.mark_dismissed(user_id, prompt_id)
+        await self._invalidator.invalidate(user_id, CacheEvent.SESSION_UPDATED, session.id)
 
         logger.info(
             "check_in.abandoned",
@@ -415,15 +337,25 @@ class CheckInOrchestrator:
         return await self._resume(user_id, session)
 
     async def _find_active_check_in(self, user_id: UUID) -> AISessionRow | None:
+        cached = await self._cache.get_active_check_in(user_id)
+        if cached.state is not None:
+            return cached.state.session
+
         rows, _ = await self._sessions.list_sessions(
             user_id,
             CursorParams(limit=1),
             session_type=SessionType.CHECK_IN.value,
             status=SessionStatus.ACTIVE.value,
         )
-        if not rows:
-            return None
-        return rows[0]
+        session = rows[0] if rows else None
+        await self._cache.set_active_check_in(user_id, session, generation=cached.generation)
+        return session
+
+    async def _get_session(self, user_id: UUID, session_id: UUID) -> AISessionRow | None:
+        cached = (await self._cache.get_active_check_in(user_id)).state
+        if cached is not None and cached.session is not None and cached.session.id == session_id:
+            return cached.session
+        return await self._sessions.get_by_id(user_id, session_id)
 
     async def _force_abandon(self, user_id: UUID, session: AISessionRow) -> None:
         now = datetime.now(UTC).isoformat()
@@ -435,6 +367,7 @@ class CheckInOrchestrator:
                 completed_at=now,
             ),
         )
+        await self._invalidator.invalidate(user_id, CacheEvent.SESSION_UPDATED, session.id)
         logger.warning(
             "check_in.orphaned_session_abandoned",
             user_id=str(user_id),
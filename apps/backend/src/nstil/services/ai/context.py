@@ -1,9 +1,16 @@
+from datetime import UTC, datetime
 from typing import Any
 from uuid import UUID
 
 from supabase import AsyncClient
 
-from nstil.models.ai_context import AIContextResponse
+from nstil.models.ai_context import (
+    AIContextActivity,
+    AIContextAggregates,
+    AIContextProfile,
+    AIContextResponse,
+    AIContextWindow,
+)
 
 
 class AIContextService:
@@ -24,3 +31,38 @@ class AIContextService:
         result = await self._client.rpc("get_ai_context", rpc_params).execute()
         data: dict[str, Any] = result.data  # type: ignore[assignment]
         return AIContextResponse.model_validate(data)
+
+    async def get_profile(self, user_id: UUID) -> AIContextProfile:
+        data = await self._call("get_ai_context_profile", {"p_user_id": str(user_id)})
+        return AIContextProfile.model_validate(data)
+
+    async def get_activity(self, user_id: UUID) -> AIContextActivity:
+        data = await self._call("get_ai_context_activity", {"p_user_id": str(user_id)})
+        return AIContextActivity.model_validate(data)
+
+    async def get_aggregates(self, user_id: UUID, days_back: int) -> AIContextAggregates:
+        data = await self._call(
+            "get_ai_context_aggregates",
+            {"p_user_id": str(user_id), "p_days_back": days_back},
+        )
+        return AIContextAggregates.model_validate(data)
+
+    async def get_window(self, user_id: UUID, entry_limit: int, days_back: int) -> AIContextWindow:
+        fetched_at = datetime.now(UTC)
+        data = await self._call(
+            "get_ai_context_entries",
+            {"p_user_id": str(user_id), "p_entry_limit": entry_limit, "p_days_back": days_back},
+        )
+        return AIContextWindow.model_validate(
+            {
+                **data,
+                "entry_limit": entry_limit,
+                "days_back": days_back,
+                "fetched_at": fetched_at,
+            }
+        )
+
+    async def _call(self, function: str, params: dict[str, str | int]) -> dict[str, Any]:
+        result = await self._client.rpc(function, params).execute()
+        data: dict[str, Any] = result.data  # type: ignore[assignment]
+        return data
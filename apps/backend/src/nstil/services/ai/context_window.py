@@ -0,0 +1,87 @@
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import islice, takewhile
+from typing import Final
+
+from nstil.models.ai_context import (
+    AIContextAggregates,
+    AIContextEntry,
+    AIContextMoodDistribution,
+    AIContextStats,
+    AIContextWindow,
+)
+from nstil.models.journal import EntryType
+
+CANONICAL_ENTRY_LIMIT: Final[int] = 100
+CANONICAL_DAYS_BACK: Final[int] = 28
+RECENT_STATS_DAYS: Final[int] = 7
+
+
+def superset_shape(entry_limit: int, days_back: int) -> tuple[int, int]:
+    return (
+        max(entry_limit, CANONICAL_ENTRY_LIMIT),
+        max(days_back, CANONICAL_DAYS_BACK),
+    )
+
+
+def window_dominates(
+    window: AIContextWindow, entry_limit: int, days_back: int, now: datetime
+) -> bool:
+    window_start = window.fetched_at - timedelta(days=window.days_back)
+    return window.entry_limit >= entry_limit and window_start <= now - timedelta(days=days_back)
+
+
+def window_entries(window: AIContextWindow, days_back: int, now: datetime) -> list[AIContextEntry]:
+    cutoff = now - timedelta(days=days_back)
+    return list(takewhile(lambda e: e.created_at >= cutoff, window.recent_entries))
+
+
+def window_covers(window: AIContextWindow, days_back: int, now: datetime) -> bool:
+    entries = window.recent_entries
+    if len(entries) < window.entry_limit:
+        return True
+    return entries[-1].created_at < now - timedelta(days=days_back)
+
+
+def slice_entries(entries: list[AIContextEntry], entry_limit: int) -> list[AIContextEntry]:
+    return list(islice(entries, entry_limit))
+
+
+def compute_aggregates(entries: list[AIContextEntry], now: datetime) -> AIContextAggregates:
+    recent_cutoff = now - timedelta(days=RECENT_STATS_DAYS)
+    moods: Counter[tuple[str, str | None]] = Counter()
+    recent_lengths: list[int] = []
+    check_ins_total = 0
+    check_ins_recent = 0
+
+    for entry in entries:
+        if entry.mood_category is not None:
+            moods[(entry.mood_category, entry.mood_specific)] += 1
+        is_recent = entry.created_at >= recent_cutoff
+        if entry.entry_type == EntryType.CHECK_IN:
+            check_ins_total += 1
+            if is_recent:
+                check_ins_recent += 1
+        if is_recent:
+            recent_lengths.append(
+                entry.body_length if entry.body_length is not None else len(entry.body)
+            )
+
+    avg_length = (
+        math.floor(sum(recent_lengths) / len(recent_lengths) + 0.5) if recent_lengths else None
+    )
+    return AIContextAggregates(
+        mood_distribution=[
+            AIContextMoodDistribution(mood_category=category, mood_specific=specific, count=count)
+            for (category, specific), count in moods.most_common()
+        ],
+        stats=AIContextStats(
+            total_entries=len(entries),
+            entries_last_7d=len(recent_lengths),
+            check_ins_total=check_ins_total,
+            check_ins_last_7d=check_ins_recent,
+            avg_entry_length_7d=avg_length,
+            last_entry_at=max((e.created_at for e in entries), default=None),
+        ),
+    )
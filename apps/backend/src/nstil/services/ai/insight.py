@@ -15,24 +15,17 @@ class AIInsightService:
         self._client = client
 
     async def create(self, user_id: UUID, data: AIInsightCreate) -> AIInsightRow:
-        payload: dict[str, Any] = {
-            "user_id": str(user_id),
-            "insight_type": data.insight_type.value,
-            "title": data.title,
-            "content": data.content,
-            "supporting_entry_ids": [str(eid) for eid in data.supporting_entry_ids],
-            "source": data.source.value,
-            "model_id": data.model_id,
-            "confidence": data.confidence,
-            "period_start": data.period_start.isoformat() if data.period_start else None,
-            "period_end": data.period_end.isoformat() if data.period_end else None,
-            "session_id": str(data.session_id) if data.session_id else None,
-            "metadata": data.metadata,
-            "expires_at": data.expires_at.isoformat() if data.expires_at else None,
-        }
+        payload = _build_payload(user_id, data)
         result = await self._client.table(TABLE).insert(payload).execute()
         return AIInsightRow.model_validate(result.data[0])
 
+    async def create_many(self, items: list[tuple[UUID, AIInsightCreate]]) -> list[AIInsightRow]:
+        if not items:
+            return []
+        payloads = [_build_payload(user_id, data) for user_id, data in items]
+        result = await self._client.table(TABLE).insert(payloads).execute()
+        return [AIInsightRow.model_validate(row) for row in result.data]
+
     async def get_by_id(self, user_id: UUID, insight_id: UUID) -> AIInsightRow | None:
         result = await (
             self._client.table(TABLE)
@@ -105,6 +98,26 @@ class AIInsightService:
         result = await query.execute()
         return [AIInsightRow.model_validate(row) for row in result.data]
 
+    async def list_recent_for_users(
+        self,
+        user_ids: list[UUID],
+        insight_types: list[str],
+        since: date,
+    ) -> list[AIInsightRow]:
+        if not user_ids:
+            return []
+        result = await (
+            self._client.table(TABLE)
+            .select("*")
+            .in_("user_id", [str(uid) for uid in user_ids])
+            .in_("insight_type", insight_types)
+            .is_("deleted_at", "null")
+            .is_("superseded_by", "null")
+            .gte("period_start", since.isoformat())
+            .execute()
+        )
+        return [AIInsightRow.model_validate(row) for row in result.data]
+
     async def update(
         self, user_id: UUID, insight_id: UUID, data: AIInsightUpdate
     ) -> AIInsightRow | None:
@@ -149,3 +162,21 @@ class AIInsightService:
             .execute()
         )
         return len(result.data) > 0
+
+
+def _build_payload(user_id: UUID, data: AIInsightCreate) -> dict[str, Any]:
+    return {
+        "user_id": str(user_id),
+        "insight_type": data.insight_type.value,
+        "title": data.title,
+        "content": data.content,
+        "supporting_entry_ids": [str(eid) for eid in data.supporting_entry_ids],
+        "source": data.source.value,
+        "model_id": data.model_id,
+        "confidence": data.confidence,
+        "period_start": data.period_start.isoformat() if data.period_start else None,
+        "period_end": data.period_end.isoformat() if data.period_end else None,
+        "session_id": str(data.session_id) if data.session_id else None,
+        "metadata": data.metadata,
+        "expires_at": data.expires_at.isoformat() if data.expires_at else None,
+    }
@@ -0,0 +1,183 @@
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from typing import Any, Final
+from uuid import UUID
+
+import numpy as np
+import numpy.typing as npt
+
+from nstil.models.ai_insight import AIInsightCreate, AIInsightRow, InsightType
+from nstil.models.calendar import DailyMoodRollup
+from nstil.models.mood import MoodCategory
+from nstil.observability import get_logger
+from nstil.services.ai.insight import AIInsightService
+from nstil.services.ai.insight_computations import STREAK_MILESTONES, build_streak_insight
+from nstil.services.ai.mood_baseline import (
+    RECENT_DEVIATION_DAYS,
+    MoodBaselineService,
+    build_deviation_insight,
+)
+from nstil.services.journal import JournalService
+
+logger = get_logger("nstil.ai.insight_batch")
+
+MOOD_CATEGORIES: Final[tuple[str, ...]] = tuple(m.value for m in MoodCategory)
+STREAK_WINDOW_DAYS: Final[int] = max(STREAK_MILESTONES) + 2
+BATCH_CHUNK_SIZE: Final[int] = 500
+NIGHTLY_INSIGHTS_TASK: Final[str] = "nightly_insights"
+NIGHTLY_INSIGHTS_HOUR: Final[int] = 3
+NIGHTLY_INSIGHTS_TIMEOUT_SECONDS: Final[int] = 3600
+
+_MILESTONES: Final = np.array(STREAK_MILESTONES)
+
+IntArray = npt.NDArray[np.int64]
+
+
+@dataclass(frozen=True, slots=True)
+class MoodRollupTensor:
+    user_ids: list[UUID]
+    start: date
+    entries: IntArray
+
+    def day_index(self, day: date) -> int:
+        return (day - self.start).days
+
+
+def build_rollup_tensor(
+    rollups: list[DailyMoodRollup],
+    user_ids: list[UUID],
+    start: date,
+    end: date,
+) -> MoodRollupTensor:
+    days = (end - start).days + 1
+    user_index = {uid: i for i, uid in enumerate(user_ids)}
+
+    indexed = np.array(
+        [(user_index.get(r.user_id, -1), (r.day - start).days, r.entry_count) for r in rollups],
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    in_window = (indexed[:, 0] >= 0) & (indexed[:, 1] >= 0) & (indexed[:, 1] < days)
+    user_arr, day_arr, count_arr = indexed[in_window].T
+
+    entry_grid = np.zeros((len(user_ids), days), dtype=np.int64)
+    np.add.at(entry_grid, (user_arr, day_arr), count_arr)
+
+    return MoodRollupTensor(user_ids=user_ids, start=start, entries=entry_grid)
+
+
+def compute_streaks(entries: IntArray, reference_index: int) -> IntArray:
+    active = entries[:, : reference_index + 1] > 0
+    if active.shape[1] == 0:
+        return np.zeros(entries.shape[0], dtype=np.int64)
+    through_today = _trailing_run(active)
+    through_yesterday = _trailing_run(active[:, :-1])
+    return np.where(active[:, -1], through_today, through_yesterday)
+
+
+def compute_batch_insights(
+    tensor: MoodRollupTensor,
+    today: date,
+) -> list[tuple[UUID, AIInsightCreate]]:
+    reference = tensor.day_index(today)
+    results: list[tuple[UUID, AIInsightCreate]] = []
+
+    streaks = compute_streaks(tensor.entries, reference)
+    for i in np.flatnonzero(np.isin(streaks, _MILESTONES)):
+        streak = int(streaks[i])
+        results.append((tensor.user_ids[i], build_streak_insight(streak, streak, today)))
+    return results
+
+
+def _trailing_run(active: npt.NDArray[np.bool_]) -> IntArray:
+    if active.shape[1] == 0:
+        return np.zeros(active.shape[0], dtype=np.int64)
+    reversed_active = active[:, ::-1]
+    first_gap = np.argmin(reversed_active, axis=1)
+    runs: IntArray = np.where(reversed_active.all(axis=1), active.shape[1], first_gap)
+    return runs
+
+
+def _dedup_key(
+    insight_type: str, metadata: dict[str, Any], period_start: date | None
+) -> tuple[str, object]:
+    if insight_type == InsightType.ANOMALY.value:
+        return insight_type, period_start
+    return insight_type, metadata.get("milestone")
+
+
+class BatchInsightEngine:
+    def __init__(
+        self,
+        journal_service: JournalService,
+        insight_service: AIInsightService,
+        baseline_service: MoodBaselineService,
+    ) -> None:
+        self._journal = journal_service
+        self._insights = insight_service
+        self._baselines = baseline_service
+
+    async def run(self, user_ids: list[UUID], today: date | None = None) -> list[AIInsightRow]:
+        if today is None:
+            today = datetime.now(UTC).date()
+
+        created: list[AIInsightRow] = []
+        for offset in range(0, len(user_ids), BATCH_CHUNK_SIZE):
+            chunk = user_ids[offset : offset + BATCH_CHUNK_SIZE]
+            created.extend(await self._run_chunk(chunk, today))
+
+        logger.info(
+            "insight_batch.run.completed",
+            users=len(user_ids),
+            insights_generated=len(created),
+        )
+        return created
+
+    async def _run_chunk(self, user_ids: list[UUID], today: date) -> list[AIInsightRow]:
+        start = today - timedelta(days=STREAK_WINDOW_DAYS - 1)
+        rollups = await self._journal.get_daily_mood_rollups(user_ids, start, today)
+        tensor = build_rollup_tensor(rollups, user_ids, start, today)
+
+        candidates = compute_batch_insights(tensor, today)
+        deviations = await self._baselines.advance_many(user_ids, today)
+        candidates.extend(
+            (uid, build_deviation_insight(deviations[uid][-1]))
+            for uid in user_ids
+            if uid in deviations
+        )
+        if not candidates:
+            return []
+
+        fresh = await self._drop_existing(candidates, today)
+        return await self._insights.create_many(fresh)
+
+    async def _drop_existing(
+        self,
+        candidates: list[tuple[UUID, AIInsightCreate]],
+        today: date,
+    ) -> list[tuple[UUID, AIInsightCreate]]:
+        lookback = {
+            InsightType.STREAK_MILESTONE.value: today - timedelta(days=1),
+            InsightType.ANOMALY.value: today - timedelta(days=RECENT_DEVIATION_DAYS),
+        }
+
+        existing = await self._insights.list_recent_for_users(
+            sorted({uid for uid, _ in candidates}),
+            list(lookback),
+            min(lookback.values()),
+        )
+        seen: set[tuple[UUID, tuple[str, object]]] = set()
+        for row in existing:
+            since = lookback.get(row.insight_type)
+            if since is None or row.period_start is None or row.period_start < since:
+                continue
+            seen.add((row.user_id, _dedup_key(row.insight_type, row.metadata, row.period_start)))
+
+        return [
+            (uid, insight)
+            for uid, insight in candidates
+            if (
+                uid,
+                _dedup_key(insight.insight_type.value, insight.metadata, insight.period_start),
+            )
+            not in seen
+        ]
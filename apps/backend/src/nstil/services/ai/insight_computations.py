@@ -1,14 +1,39 @@
+import hashlib
 from collections import Counter
-from datetime import date, timedelta
-from uuid import UUID
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
 
-from nstil.models.ai_context import AIContextEntry, AIContextResponse
 from nstil.models.ai_insight import AIInsightCreate, InsightSource, InsightType
 from nstil.models.calendar import CalendarDay
+from nstil.models.journal import JournalEntryDigest, JournalEntryVersion
 
 STREAK_MILESTONES: tuple[int, ...] = (3, 7, 14, 21, 30, 50, 60, 90, 100, 150, 180, 200, 365)
 ENTRY_MILESTONES: tuple[int, ...] = (1, 5, 10, 25, 50, 100, 200, 365, 500, 1000)
-ANOMALY_THRESHOLD = 0.3
+DIFFICULT_MOODS: frozenset[str] = frozenset({"sad", "anxious", "angry"})
+EMPTY_FINGERPRINT = hashlib.sha256(b"").hexdigest()
+
+
+def sunday_week_start(reference: date) -> date:
+    days_since_sunday = (reference.weekday() + 1) % 7
+    return reference - timedelta(days=days_since_sunday)
+
+
+def week_start_for(timestamp: datetime) -> date:
+    return sunday_week_start(timestamp.astimezone(UTC).date())
+
+
+def compute_entries_fingerprint(versions: Iterable[JournalEntryVersion]) -> str:
+    digest = hashlib.sha256()
+    for version in sorted(versions, key=lambda v: str(v.id)):
+        digest.update(f"{version.id}:{version.updated_at.isoformat()}\n".encode())
+    return digest.hexdigest()
+
+
+def fingerprint_weeks(versions: Iterable[JournalEntryVersion]) -> dict[date, str]:
+    grouped: dict[date, list[JournalEntryVersion]] = {}
+    for version in versions:
+        grouped.setdefault(week_start_for(version.created_at), []).append(version)
+    return {week: compute_entries_fingerprint(items) for week, items in grouped.items()}
 
 
 def compute_streak_from_calendar(days: list[CalendarDay], reference_date: date) -> int:
@@ -71,13 +96,14 @@ def build_entry_milestone_insight(
 
 
 def compute_weekly_summary(
-    context: AIContextResponse,
+    digests: list[JournalEntryDigest],
     period_start: date,
     period_end: date,
+    fingerprint: str | None = None,
 ) -> AIInsightCreate:
-    entries = _entries_in_period(context.recent_entries, period_start, period_end)
+    entries = _entries_in_period(digests, period_start, period_end)
     entry_count = len(entries)
-    entry_ids = [UUID(e.id) for e in entries]
+    entry_ids = [e.id for e in entries]
 
     mood_counts = _mood_distribution_from_entries(entries)
     dominant_mood = mood_counts.most_common(1)[0][0] if mood_counts else None
@@ -98,6 +124,17 @@ def compute_weekly_summary(
         avg_length=avg_length,
     )
 
+    metadata: dict[str, object] = {
+        "entry_count": entry_count,
+        "dominant_mood": dominant_mood,
+        "mood_distribution": dict(mood_counts),
+        "top_tags": top_tags,
+        "avg_entry_length": avg_length,
+        "entry_types": dict(entry_types),
+    }
+    if fingerprint is not None:
+        metadata["fingerprint"] = fingerprint
+
     return AIInsightCreate(
         insight_type=InsightType.WEEKLY_SUMMARY,
         title=title,
@@ -107,104 +144,26 @@ def compute_weekly_summary(
         confidence=1.0,
         period_start=period_start,
         period_end=period_end,
-        metadata={
-            "entry_count": entry_count,
-            "dominant_mood": dominant_mood,
-            "mood_distribution": dict(mood_counts),
-            "top_tags": top_tags,
-            "avg_entry_length": avg_length,
-            "entry_types": dict(entry_types),
-        },
-    )
-
-
-def detect_mood_anomaly(
-    context: AIContextResponse,
-    period_start: date,
-    period_end: date,
-) -> AIInsightCreate | None:
-    if not context.mood_distribution:
-        return None
-
-    entries = _entries_in_period(context.recent_entries, period_start, period_end)
-    if len(entries) < 2:
-        return None
-
-    week_moods = _mood_distribution_from_entries(entries)
-    if not week_moods:
-        return None
-
-    overall_total = sum(m.count for m in context.mood_distribution)
-    if overall_total == 0:
-        return None
-
-    difficult_moods = frozenset({"sad", "anxious", "angry"})
-
-    overall_difficult_ratio = (
-        sum(m.count for m in context.mood_distribution if m.mood_category in difficult_moods)
-        / overall_total
-    )
-
-    week_total = sum(week_moods.values())
-    week_difficult_ratio = (
-        sum(count for mood, count in week_moods.items() if mood in difficult_moods) / week_total
-    )
-
-    diff = week_difficult_ratio - overall_difficult_ratio
-    if abs(diff) < ANOMALY_THRESHOLD:
-        return None
-
-    entry_ids = [UUID(e.id) for e in entries]
-
-    if diff > 0:
-        title = "Your mood has been lower than usual"
-        content = (
-            "This week's entries show more difficult emotions"
-            " compared to your recent average."
-            " It's okay to have tough weeks — acknowledging it is a strength."
-        )
-    else:
-        title = "Your mood has been brighter than usual"
-        content = (
-            "This week's entries show more positive emotions"
-            " compared to your recent average."
-            " Take a moment to appreciate what's going well."
-        )
-
-    return AIInsightCreate(
-        insight_type=InsightType.ANOMALY,
-        title=title,
-        content=content,
-        supporting_entry_ids=entry_ids,
-        source=InsightSource.COMPUTED,
-        confidence=min(abs(diff) / 0.5, 1.0),
-        period_start=period_start,
-        period_end=period_end,
-        metadata={
-            "overall_difficult_ratio": round(overall_difficult_ratio, 3),
-            "week_difficult_ratio": round(week_difficult_ratio, 3),
-            "difference": round(diff, 3),
-            "direction": "negative" if diff > 0 else "positive",
-        },
+        metadata=metadata,
     )
 
 
 def _entries_in_period(
-    entries: list[AIContextEntry],
+    entries: list[JournalEntryDigest],
     period_start: date,
     period_end: date,
-) -> list[AIContextEntry]:
+) -> list[JournalEntryDigest]:
     return [e for e in entries if period_start <= e.created_at.date() <= period_end]
 
 
 def _mood_distribution_from_entries(
-    entries: list[AIContextEntry],
+    entries: list[JournalEntryDigest],
 ) -> Counter[str]:
     return Counter(e.mood_category for e in entries if e.mood_category is not None)
 
 
 def _tag_distribution_from_entries(
-    entries: list[AIContextEntry],
+    entries: list[JournalEntryDigest],
 ) -> Counter[str]:
     counter: Counter[str] = Counter()
     for entry in entries:
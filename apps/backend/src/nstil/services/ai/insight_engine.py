@@ -1,33 +1,29 @@
 from datetime import UTC, date, datetime, timedelta
 from uuid import UUID
 
-from nstil.models.ai_context import AIContextResponse
 from nstil.models.ai_insight import AIInsightRow, InsightType
 from nstil.models.calendar import CalendarDay, CalendarParams
 from nstil.models.pagination import CursorParams
 from nstil.observability import get_logger
 from nstil.services.ai.insight import AIInsightService
 from nstil.services.ai.insight_computations import (
+    EMPTY_FINGERPRINT,
     build_entry_milestone_insight,
     build_streak_insight,
     compute_streak_from_calendar,
     compute_weekly_summary,
-    detect_mood_anomaly,
     find_entry_milestone,
     find_streak_milestone,
+    fingerprint_weeks,
+    sunday_week_start,
 )
+from nstil.services.ai.mood_baseline import MoodBaselineService, build_deviation_insight
 from nstil.services.cached_ai_context import CachedAIContextService
 from nstil.services.cached_journal import CachedJournalService
 
 logger = get_logger("nstil.ai.insight_engine")
 
 PAST_WEEKS_TO_BACKFILL = 3
-BACKFILL_DAYS_BACK = 28
-
-
-def _sunday_week_start(reference: date) -> date:
-    days_since_sunday = (reference.weekday() + 1) % 7
-    return reference - timedelta(days=days_since_sunday)
 
 
 def _find_weeks_with_entries(
@@ -57,10 +53,12 @@ class InsightEngine:
         insight_service: AIInsightService,
         context_service: CachedAIContextService,
         journal_service: CachedJournalService,
+        baseline_service: MoodBaselineService,
     ) -> None:
         self._insights = insight_service
         self._context = context_service
         self._journal = journal_service
+        self._baselines = baseline_service
 
     async def run(self, user_id: UUID) -> list[AIInsightRow]:
         await self._cleanup_empty_summaries(user_id)
@@ -162,69 +160,119 @@ class InsightEngine:
         user_id: UUID,
     ) -> list[AIInsightRow]:
         today = datetime.now(UTC).date()
-        current_week_start = _sunday_week_start(today)
+        current_week_start = sunday_week_start(today)
         calendar_days = await self._fetch_calendar_days(user_id, today, months_back=2)
         weeks_with_entries = _find_weeks_with_entries(
             calendar_days, current_week_start, PAST_WEEKS_TO_BACKFILL
         )
 
-        context = await self._context.get_context(
-            user_id, entry_limit=100, days_back=BACKFILL_DAYS_BACK
-        )
-
-        generated: list[AIInsightRow] = []
-        for week_start in weeks_with_entries:
-            row = await self._generate_summary_for_week(user_id, week_start, context)
-            if row is not None:
-                generated.append(row)
-
-        return generated
+        return await self._refresh_summaries(user_id, weeks_with_entries)
 
     async def generate_weekly_summary(
         self,
         user_id: UUID,
         week_start: date | None = None,
     ) -> AIInsightRow | None:
-        today = datetime.now(UTC).date()
         if week_start is None:
-            week_start = _sunday_week_start(today)
+            week_start = sunday_week_start(datetime.now(UTC).date())
 
-        days_from_start = (today - week_start).days
-        days_back = max(days_from_start + 7, 14)
-        context = await self._context.get_context(user_id, entry_limit=100, days_back=days_back)
-        return await self._generate_summary_for_week(user_id, week_start, context)
+        rows = await self._refresh_summaries(user_id, [week_start])
+        return rows[0] if rows else None
 
-    async def _generate_summary_for_week(
+    async def recompute_weeks(
         self,
         user_id: UUID,
-        week_start: date,
-        context: AIContextResponse,
-    ) -> AIInsightRow | None:
-        week_end = week_start + timedelta(days=6)
+        week_starts: list[date],
+    ) -> list[AIInsightRow]:
+        if not week_starts:
+            return []
+
+        ordered_weeks = sorted(set(week_starts))
+        generated = await self._refresh_summaries(user_id, ordered_weeks)
+
+        logger.info(
+            "insight_engine.recompute_weeks.completed",
+            user_id=str(user_id),
+            weeks=[w.isoformat() for w in ordered_weeks],
+            insights_generated=len(generated),
+        )
+
+        return generated
+
+    async def _refresh_summaries(
+        self,
+        user_id: UUID,
+        week_starts: list[date],
+    ) -> list[AIInsightRow]:
+        if not week_starts:
+            return []
+
+        ordered_weeks = sorted(set(week_starts))
+        window_start = ordered_weeks[0]
+        window_end = ordered_weeks[-1] + timedelta(days=6)
+
+        versions = await self._journal.list_entry_versions(user_id, window_start, window_end)
+        fingerprints = fingerprint_weeks(versions)
 
         existing = await self._insights.list_by_period(
             user_id,
-            period_start=week_start,
-            period_end=week_end,
+            period_start=window_start,
+            period_end=window_end,
             insight_type=InsightType.WEEKLY_SUMMARY.value,
         )
+        existing_by_week: dict[date, AIInsightRow] = {}
+        for summary in existing:
+            if summary.period_start is not None:
+                existing_by_week.setdefault(summary.period_start, summary)
 
-        create_data = compute_weekly_summary(context, week_start, week_end)
+        generated: list[AIInsightRow] = []
+        for week_start in ordered_weeks:
+            fingerprint = fingerprints.get(week_start, EMPTY_FINGERPRINT)
+            current = existing_by_week.get(week_start)
+            if current is not None and current.metadata.get("fingerprint") == fingerprint:
+                logger.debug(
+                    "insight_engine.weekly_summary.unchanged",
+                    user_id=str(user_id),
+                    week_start=week_start.isoformat(),
+                )
+                continue
+
+            row = await self._generate_summary_for_week(user_id, week_start, current, fingerprint)
+            if row is not None:
+                generated.append(row)
+
+        return generated
+
+    async def _generate_summary_for_week(
+        self,
+        user_id: UUID,
+        week_start: date,
+        existing: AIInsightRow | None,
+        fingerprint: str,
+    ) -> AIInsightRow | None:
+        week_end = week_start + timedelta(days=6)
+        range_start = datetime(week_start.year, week_start.month, week_start.day, tzinfo=UTC)
+        digests = [
+            digest
+            async for page in self._journal.iter_entry_digests(
+                user_id, range_start, range_start + timedelta(days=7)
+            )
+            for digest in page
+        ]
+
+        create_data = compute_weekly_summary(digests, week_start, week_end, fingerprint)
         entry_count: int = create_data.metadata.get("entry_count", 0)  # type: ignore[assignment]
 
-        if existing:
-            old_entry_count: int = existing[0].metadata.get("entry_count", 0)  # type: ignore[assignment]
-            if entry_count == old_entry_count:
-                return None
+        if existing is not None:
             if entry_count == 0:
                 return None
-            row = await self._insights.supersede(user_id, existing[0].id, create_data)
+            row = await self._insights.supersede(user_id, existing.id, create_data)
             logger.info(
                 "insight_engine.weekly_summary.regenerated",
                 user_id=str(user_id),
                 period=f"{week_start} to {week_end}",
                 entry_count=entry_count,
-                superseded=str(existing[0].id),
+                superseded=str(existing.id),
             )
             return row
 
@@ -237,45 +285,36 @@ class InsightEngine:
         )
         return row
 
-    async def detect_mood_anomaly(
-        self,
-        user_id: UUID,
-        week_start: date | None = None,
-    ) -> AIInsightRow | None:
+    async def detect_mood_anomaly(self, user_id: UUID) -> AIInsightRow | None:
         today = datetime.now(UTC).date()
-        if week_start is None:
-            week_start = _sunday_week_start(today)
-        week_end = week_start + timedelta(days=6)
+        deviations = await self._baselines.advance(user_id, today)
+        if not deviations:
+            return None
 
+        latest = deviations[-1]
         existing = await self._insights.list_by_period(
             user_id,
-            period_start=week_start,
-            period_end=week_end,
+            period_start=latest.day,
+            period_end=latest.day,
             insight_type=InsightType.ANOMALY.value,
         )
         if existing:
             return None
 
-        context = await self._context.get_context(user_id, entry_limit=50, days_back=28)
-
-        create_data = detect_mood_anomaly(context, week_start, week_end)
-        if create_data is None:
-            return None
-
-        row = await self._insights.create(user_id, create_data)
+        row = await self._insights.create(user_id, build_deviation_insight(latest))
 
         logger.info(
             "insight_engine.mood_anomaly",
             user_id=str(user_id),
-            direction=create_data.metadata.get("direction"),
-            difference=create_data.metadata.get("difference"),
+            day=latest.day.isoformat(),
+            z_score=round(latest.z_score, 2),
         )
 
         return row
 
     async def _cleanup_empty_summaries(self, user_id: UUID) -> None:
         today = datetime.now(UTC).date()
-        current_week_start = _sunday_week_start(today)
+        current_week_start = sunday_week_start(today)
 
         params = CursorParams(limit=50)
         rows, _ = await self._insights.list_insights(
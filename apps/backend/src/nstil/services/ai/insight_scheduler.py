@@ -0,0 +1,88 @@
+import time
+from collections.abc import Iterable
+from datetime import date
+from typing import Final
+from uuid import UUID
+
+import redis.asyncio as aioredis
+from arq.connections import ArqRedis
+
+from nstil.observability import get_logger
+from nstil.services.cache.ai_keys import insight_pending_weeks_key, insight_quiet_until_key
+from nstil.services.cache.constants import INSIGHT_PENDING_TTL_SECONDS
+
+logger = get_logger("nstil.ai.insight_scheduler")
+
+RECOMPUTE_WEEKLY_INSIGHTS_TASK: Final[str] = "recompute_weekly_insights"
+
+
+def recompute_job_id(user_id: UUID) -> str:
+    return f"{RECOMPUTE_WEEKLY_INSIGHTS_TASK}:{user_id}"
+
+
+class InsightScheduler:
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        queue: ArqRedis,
+        quiet_period_seconds: int,
+    ) -> None:
+        self._redis = redis
+        self._queue = queue
+        self._quiet_period_seconds = quiet_period_seconds
+
+    @property
+    def quiet_period_seconds(self) -> int:
+        return self._quiet_period_seconds
+
+    async def schedule(self, user_id: UUID, week_starts: Iterable[date]) -> None:
+        weeks = sorted({w.isoformat() for w in week_starts})
+        if not weeks:
+            return
+
+        pending_key = insight_pending_weeks_key(user_id)
+        quiet_until = time.time() + self._quiet_period_seconds
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.sadd(pending_key, *weeks)
+                pipe.expire(pending_key, INSIGHT_PENDING_TTL_SECONDS)
+                pipe.setex(
+                    insight_quiet_until_key(user_id),
+                    INSIGHT_PENDING_TTL_SECONDS,
+                    str(quiet_until),
+                )
+                await pipe.execute()
+
+            await self._queue.enqueue_job(
+                RECOMPUTE_WEEKLY_INSIGHTS_TASK,
+                str(user_id),
+                _job_id=recompute_job_id(user_id),
+                _defer_by=self._quiet_period_seconds,
+            )
+        except Exception:
+            logger.warning("insight_scheduler.schedule_failed", user_id=str(user_id))
+            return
+
+        logger.debug(
+            "insight_scheduler.scheduled",
+            user_id=str(user_id),
+            weeks=weeks,
+        )
+
+    async def seconds_until_quiet(self, user_id: UUID) -> float:
+        raw: str | None = await self._redis.get(insight_quiet_until_key(user_id))
+        if raw is None:
+            return 0.0
+        return max(float(raw) - time.time(), 0.0)
+
+    async def claim_pending_weeks(self, user_id: UUID) -> list[date]:
+        pending_key = insight_pending_weeks_key(user_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.smembers(pending_key)
+            pipe.delete(pending_key)
+            members, _ = await pipe.execute()
+        return sorted(date.fromisoformat(str(m)) for m in members)
+
+    async def has_pending(self, user_id: UUID) -> bool:
+        count: int = await self._redis.exists(insight_pending_weeks_key(user_id))
+        return count > 0
@@ -0,0 +1,270 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Final
+from uuid import UUID
+
+from supabase import AsyncClient
+
+from nstil.models.ai_insight import AIInsightCreate, InsightSource, InsightType
+from nstil.models.calendar import DailyMoodRollup
+from nstil.models.mood_baseline import MoodBaselineRow
+from nstil.observability import get_logger
+from nstil.services.ai.insight_computations import DIFFICULT_MOODS
+from nstil.services.journal import JournalService
+
+logger = get_logger("nstil.ai.mood_baseline")
+
+TABLE = "mood_baselines"
+
+EWMA_ALPHA: Final[float] = 0.1
+Z_SCORE_THRESHOLD: Final[float] = 2.0
+MIN_OBSERVATIONS: Final[int] = 14
+MIN_STD: Final[float] = 0.1
+SEED_DAYS: Final[int] = 90
+RECENT_DEVIATION_DAYS: Final[int] = 7
+
+
+@dataclass(frozen=True, slots=True)
+class MoodBaselineState:
+    mean: float = 0.0
+    variance: float = 0.0
+    observations: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class MoodDeviation:
+    day: date
+    ratio: float
+    baseline_mean: float
+    baseline_std: float
+    z_score: float
+
+
+def daily_difficult_ratios(rollups: list[DailyMoodRollup]) -> dict[date, float]:
+    totals: dict[date, int] = defaultdict(int)
+    difficult: dict[date, int] = defaultdict(int)
+    for rollup in rollups:
+        if rollup.mood_category is None:
+            continue
+        totals[rollup.day] += rollup.entry_count
+        if rollup.mood_category in DIFFICULT_MOODS:
+            difficult[rollup.day] += rollup.entry_count
+    return {day: difficult[day] / total for day, total in totals.items() if total > 0}
+
+
+def baseline_std(state: MoodBaselineState) -> float:
+    return max(math.sqrt(state.variance), MIN_STD)
+
+
+def z_score(state: MoodBaselineState, ratio: float) -> float | None:
+    if state.observations < MIN_OBSERVATIONS:
+        return None
+    return (ratio - state.mean) / baseline_std(state)
+
+
+def fold_observation(state: MoodBaselineState, ratio: float) -> MoodBaselineState:
+    if state.observations == 0:
+        return MoodBaselineState(mean=ratio, variance=0.0, observations=1)
+    diff = ratio - state.mean
+    increment = EWMA_ALPHA * diff
+    return MoodBaselineState(
+        mean=state.mean + increment,
+        variance=(1 - EWMA_ALPHA) * (state.variance + diff * increment),
+        observations=state.observations + 1,
+    )
+
+
+def advance_state(
+    state: MoodBaselineState, rollups: list[DailyMoodRollup]
+) -> tuple[MoodBaselineState, list[MoodDeviation]]:
+    deviations: list[MoodDeviation] = []
+    for day, ratio in sorted(daily_difficult_ratios(rollups).items()):
+        score = z_score(state, ratio)
+        if score is not None and abs(score) >= Z_SCORE_THRESHOLD:
+            deviations.append(
+                MoodDeviation(
+                    day=day,
+                    ratio=ratio,
+                    baseline_mean=state.mean,
+                    baseline_std=baseline_std(state),
+                    z_score=score,
+                )
+            )
+        state = fold_observation(state, ratio)
+    return state, deviations
+
+
+def build_deviation_insight(deviation: MoodDeviation) -> AIInsightCreate:
+    negative = deviation.z_score > 0
+    if negative:
+        title = "Your mood has been lower than usual"
+        content = (
+            "Your recent entries show more difficult emotions than your usual pattern."
+            " It's okay to have tough days — acknowledging it is a strength."
+        )
+    else:
+        title = "Your mood has been brighter than usual"
+        content = (
+            "Your recent entries show more positive emotions than your usual pattern."
+            " Take a moment to appreciate what's going well."
+        )
+
+    return AIInsightCreate(
+        insight_type=InsightType.ANOMALY,
+        title=title,
+        content=content,
+        source=InsightSource.COMPUTED,
+        confidence=min(abs(deviation.z_score) / (2 * Z_SCORE_THRESHOLD), 1.0),
+        period_start=deviation.day,
+        period_end=deviation.day,
+        metadata={
+            "method": "ewma",
+            "day_difficult_ratio": round(deviation.ratio, 3),
+            "baseline_mean": round(deviation.baseline_mean, 3),
+            "baseline_std": round(deviation.baseline_std, 3),
+            "z_score": round(deviation.z_score, 2),
+            "direction": "negative" if negative else "positive",
+        },
+    )
+
+
+class MoodBaselineService:
+    def __init__(self, client: AsyncClient, journal_service: JournalService) -> None:
+        self._client = client
+        self._journal = journal_service
+
+    async def get(self, user_id: UUID) -> MoodBaselineRow | None:
+        result = await (
+            self._client.table(TABLE).select("*").eq("user_id", str(user_id)).limit(1).execute()
+        )
+        if not result.data:
+            return None
+        return MoodBaselineRow.model_validate(result.data[0])
+
+    async def get_many(self, user_ids: list[UUID]) -> dict[UUID, MoodBaselineRow]:
+        if not user_ids:
+            return {}
+        result = await (
+            self._client.table(TABLE)
+            .select("*")
+            .in_("user_id", [str(uid) for uid in user_ids])
+            .execute()
+        )
+        rows = [MoodBaselineRow.model_validate(row) for row in result.data]
+        return {row.user_id: row for row in rows}
+
+    async def advance(self, user_id: UUID, today: date) -> list[MoodDeviation]:
+        row = await self.get(user_id)
+        through = today - timedelta(days=1)
+        start = _advance_start(row, today)
+        if start > through:
+            return []
+
+        rollups = await self._journal.get_daily_mood_rollups([user_id], start, through)
+        state, deviations = advance_state(_initial_state(row), rollups)
+
+        if not await self._save(user_id, state, through, _last_day(row)):
+            return []
+        _log_deviations(user_id, deviations)
+        return _recent(deviations, today)
+
+    async def advance_many(
+        self, user_ids: list[UUID], today: date
+    ) -> dict[UUID, list[MoodDeviation]]:
+        rows = await self.get_many(user_ids)
+        through = today - timedelta(days=1)
+        starts = {uid: _advance_start(rows.get(uid), today) for uid in user_ids}
+        due = [uid for uid in user_ids if starts[uid] <= through]
+        if not due:
+            return {}
+
+        rollups = await self._journal.get_daily_mood_rollups(
+            due, min(starts[uid] for uid in due), through
+        )
+        by_user: dict[UUID, list[DailyMoodRollup]] = defaultdict(list)
+        for rollup in rollups:
+            if rollup.user_id in starts and rollup.day >= starts[rollup.user_id]:
+                by_user[rollup.user_id].append(rollup)
+
+        states: dict[UUID, MoodBaselineState] = {}
+        found: dict[UUID, list[MoodDeviation]] = {}
+        for uid in due:
+            states[uid], found[uid] = advance_state(_initial_state(rows.get(uid)), by_user[uid])
+
+        expected = {uid: _last_day(rows.get(uid)) for uid in due}
+        saved = await self._save_many(states, through, expected)
+        recent: dict[UUID, list[MoodDeviation]] = {}
+        for uid in due:
+            if uid not in saved:
+                continue
+            _log_deviations(uid, found[uid])
+            if fresh := _recent(found[uid], today):
+                recent[uid] = fresh
+        return recent
+
+    async def _save(
+        self,
+        user_id: UUID,
+        state: MoodBaselineState,
+        last_day: date,
+        expected_last_day: date | None,
+    ) -> bool:
+        saved = await self._save_many({user_id: state}, last_day, {user_id: expected_last_day})
+        return user_id in saved
+
+    async def _save_many(
+        self,
+        states: dict[UUID, MoodBaselineState],
+        last_day: date,
+        expected_last_days: dict[UUID, date | None],
+    ) -> set[UUID]:
+        payload: list[dict[str, Any]] = [
+            {
+                "user_id": str(user_id),
+                "ewma_mean": state.mean,
+                "ewma_variance": state.variance,
+                "observations": state.observations,
+                "last_day": last_day.isoformat(),
+                "expected_last_day": _iso(expected_last_days.get(user_id)),
+            }
+            for user_id, state in states.items()
+        ]
+        result = await self._client.rpc("advance_mood_baselines", {"p_items": payload}).execute()
+        data: list[Any] = result.data  # type: ignore[assignment]
+        saved = {UUID(str(row)) for row in data}
+        if lost := [str(uid) for uid in states if uid not in saved]:
+            logger.info("mood_baseline.advance_superseded", user_ids=lost)
+        return saved
+
+
+def _advance_start(row: MoodBaselineRow | None, today: date) -> date:
+    return row.last_day + timedelta(days=1) if row else today - timedelta(days=SEED_DAYS)
+
+
+def _last_day(row: MoodBaselineRow | None) -> date | None:
+    return row.last_day if row else None
+
+
+def _iso(day: date | None) -> str | None:
+    return day.isoformat() if day else None
+
+
+def _initial_state(row: MoodBaselineRow | None) -> MoodBaselineState:
+    if row is None:
+        return MoodBaselineState()
+    return MoodBaselineState(row.ewma_mean, row.ewma_variance, row.observations)
+
+
+def _recent(deviations: list[MoodDeviation], today: date) -> list[MoodDeviation]:
+    return [d for d in deviations if d.day > today - timedelta(days=RECENT_DEVIATION_DAYS)]
+
+
+def _log_deviations(user_id: UUID, deviations: list[MoodDeviation]) -> None:
+    if deviations:
+        logger.info(
+            "mood_baseline.deviations",
+            user_id=str(user_id),
+            days=[d.day.isoformat() for d in deviations],
+        )
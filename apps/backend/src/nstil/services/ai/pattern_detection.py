@@ -0,0 +1,236 @@
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any, Final
+from uuid import UUID
+
+import numpy as np
+from supabase import AsyncClient
+
+from nstil.models.ai_insight import AIInsightCreate, AIInsightRow, InsightSource, InsightType
+from nstil.models.journal import JournalEntryDigest
+from nstil.models.pagination import CursorParams
+from nstil.models.tag_mood_stats import TagMoodStatsRow
+from nstil.observability import get_logger
+from nstil.services.ai.insight import AIInsightService
+from nstil.services.ai.insight_batch import MOOD_CATEGORIES
+from nstil.services.journal import JournalService
+
+logger = get_logger("nstil.ai.pattern_detection")
+
+TABLE = "tag_mood_stats"
+PATTERN_COLUMNS = "id, created_at, mood_category, tags, entry_type"
+PATTERN_METHOD = "tag_mood_lift"
+
+MIN_SUPPORT: Final[int] = 5
+MIN_LIFT: Final[float] = 1.5
+TOP_PATTERNS: Final[int] = 3
+CHI_SQUARE_SATURATION: Final[float] = 20.0
+EXISTING_PATTERN_LIMIT: Final[int] = 50
+EPOCH: Final = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+@dataclass(slots=True)
+class TagMoodCounts:
+    counts: dict[str, dict[str, int]] = field(default_factory=dict)
+    mood_totals: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_row(cls, row: TagMoodStatsRow) -> "TagMoodCounts":
+        return cls(
+            counts={tag: dict(moods) for tag, moods in row.counts.items()},
+            mood_totals=dict(row.mood_totals),
+        )
+
+    def add(self, entry: JournalEntryDigest) -> None:
+        mood = entry.mood_category
+        if mood is None:
+            return
+        self.mood_totals[mood] = self.mood_totals.get(mood, 0) + 1
+        for tag in set(entry.tags):
+            moods = self.counts.setdefault(tag, {})
+            moods[mood] = moods.get(mood, 0) + 1
+
+
+@dataclass(frozen=True, slots=True)
+class TagMoodAssociation:
+    tag: str
+    mood: str
+    observed: int
+    tag_total: int
+    expected: float
+    lift: float
+    chi_square: float
+
+
+def score_associations(stats: TagMoodCounts) -> list[TagMoodAssociation]:
+    total = sum(stats.mood_totals.values())
+    if total == 0 or not stats.counts:
+        return []
+
+    tags = sorted(stats.counts)
+    mood_index = {mood: j for j, mood in enumerate(MOOD_CATEGORIES)}
+    observed = np.zeros((len(tags), len(MOOD_CATEGORIES)), dtype=np.float64)
+    for i, tag in enumerate(tags):
+        for mood, count in stats.counts[tag].items():
+            j = mood_index.get(mood)
+            if j is not None:
+                observed[i, j] = count
+
+    mood_share = np.array([stats.mood_totals.get(m, 0) for m in MOOD_CATEGORIES]) / total
+    tag_totals = observed.sum(axis=1)
+    expected = np.outer(tag_totals, mood_share)
+
+    lift = np.zeros_like(observed)
+    chi_square = np.zeros_like(observed)
+    has_expectation = expected > 0
+    np.divide(observed, expected, out=lift, where=has_expectation)
+    np.divide((observed - expected) ** 2, expected, out=chi_square, where=has_expectation)
+
+    rows, cols = np.nonzero((observed >= MIN_SUPPORT) & (lift >= MIN_LIFT))
+    order = np.argsort(-chi_square[rows, cols], kind="stable")
+
+    return [
+        TagMoodAssociation(
+            tag=tags[rows[k]],
+            mood=MOOD_CATEGORIES[cols[k]],
+            observed=int(observed[rows[k], cols[k]]),
+            tag_total=int(tag_totals[rows[k]]),
+            expected=float(expected[rows[k], cols[k]]),
+            lift=float(lift[rows[k], cols[k]]),
+            chi_square=float(chi_square[rows[k], cols[k]]),
+        )
+        for k in order
+    ]
+
+
+def build_pattern_insight(association: TagMoodAssociation) -> AIInsightCreate:
+    return AIInsightCreate(
+        insight_type=InsightType.PATTERN,
+        title=f"{association.tag.capitalize()} often comes with feeling {association.mood}",
+        content=(
+            f"{association.observed} of your {association.tag_total} entries tagged"
+            f" {association.tag} were {association.mood} —"
+            f" {association.lift:.1f}x more often than across all your entries."
+        ),
+        source=InsightSource.COMPUTED,
+        confidence=min(association.chi_square / CHI_SQUARE_SATURATION, 1.0),
+        metadata={
+            "method": PATTERN_METHOD,
+            "tag": association.tag,
+            "mood": association.mood,
+            "observed": association.observed,
+            "tag_total": association.tag_total,
+            "expected": round(association.expected, 2),
+            "lift": round(association.lift, 2),
+            "chi_square": round(association.chi_square, 2),
+        },
+    )
+
+
+class PatternDetectionService:
+    def __init__(
+        self,
+        client: AsyncClient,
+        journal_service: JournalService,
+        insight_service: AIInsightService,
+    ) -> None:
+        self._client = client
+        self._journal = journal_service
+        self._insights = insight_service
+
+    async def get_stats(self, user_id: UUID) -> TagMoodStatsRow | None:
+        result = await (
+            self._client.table(TABLE).select("*").eq("user_id", str(user_id)).limit(1).execute()
+        )
+        if not result.data:
+            return None
+        return TagMoodStatsRow.model_validate(result.data[0])
+
+    async def detect(self, user_id: UUID, full: bool = False) -> list[AIInsightRow]:
+        synced_at = datetime.now(UTC)
+        row = None if full else await self.get_stats(user_id)
+        if row is not None and await self._is_stale(row):
+            logger.info("pattern_detection.rebuilding", user_id=str(user_id))
+            row = None
+        stats = TagMoodCounts.from_row(row) if row else TagMoodCounts()
+        watermark = row.watermark if row else None
+        start = watermark + timedelta(microseconds=1) if watermark else EPOCH
+
+        scanned = 0
+        async for page in self._journal.iter_entry_digests(
+            user_id, start, datetime.now(UTC), columns=PATTERN_COLUMNS
+        ):
+            for entry in page:
+                stats.add(entry)
+            scanned += len(page)
+            watermark = page[-1].created_at
+
+        if row is not None and scanned == 0:
+            return []
+
+        entries_scanned = (row.entries_scanned if row else 0) + scanned
+        await self._save(user_id, stats, entries_scanned, watermark, synced_at)
+
+        associations = score_associations(stats)[:TOP_PATTERNS]
+        created = await self._persist(user_id, associations)
+
+        logger.info(
+            "pattern_detection.completed",
+            user_id=str(user_id),
+            entries_folded=scanned,
+            candidates=len(associations),
+            insights_generated=len(created),
+        )
+        return created
+
+    async def _is_stale(self, row: TagMoodStatsRow) -> bool:
+        if row.watermark is None:
+            return False
+        if row.synced_at is None:
+            return True
+        return await self._journal.has_revisions(row.user_id, row.synced_at, row.watermark)
+
+    async def _persist(
+        self,
+        user_id: UUID,
+        associations: list[TagMoodAssociation],
+    ) -> list[AIInsightRow]:
+        if not associations:
+            return []
+
+        existing, _ = await self._insights.list_insights(
+            user_id,
+            CursorParams(limit=EXISTING_PATTERN_LIMIT),
+            insight_type=InsightType.PATTERN.value,
+        )
+        known = {
+            (row.metadata.get("tag"), row.metadata.get("mood"))
+            for row in existing
+            if row.metadata.get("method") == PATTERN_METHOD
+        }
+
+        fresh = [
+            (user_id, build_pattern_insight(a))
+            for a in associations
+            if (a.tag, a.mood) not in known
+        ]
+        return await self._insights.create_many(fresh)
+
+    async def _save(
+        self,
+        user_id: UUID,
+        stats: TagMoodCounts,
+        entries_scanned: int,
+        watermark: datetime | None,
+        synced_at: datetime,
+    ) -> None:
+        payload: dict[str, Any] = {
+            "user_id": str(user_id),
+            "counts": stats.counts,
+            "mood_totals": stats.mood_totals,
+            "entries_scanned": entries_scanned,
+            "watermark": watermark.isoformat() if watermark else None,
+            "synced_at": synced_at.isoformat(),
+            "updated_at": datetime.now(UTC).isoformat(),
+        }
+        await self._client.table(TABLE).upsert(payload, on_conflict="user_id").execute()
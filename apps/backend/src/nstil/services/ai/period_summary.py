@@ -0,0 +1,193 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from uuid import UUID
+
+from nstil.models.ai_insight import AIInsightCreate, AIInsightRow, InsightSource, InsightType
+from nstil.models.journal import JournalEntryDigest
+from nstil.observability import get_logger
+from nstil.services.ai.insight import AIInsightService
+from nstil.services.journal import JournalService
+
+logger = get_logger("nstil.ai.period_summary")
+
+TOP_TAG_COUNT = 5
+
+
+@dataclass(slots=True)
+class PeriodAccumulator:
+    entry_count: int = 0
+    total_length: int = 0
+    mood_counts: Counter[str] = field(default_factory=Counter)
+    tag_counts: Counter[str] = field(default_factory=Counter)
+    type_counts: Counter[str] = field(default_factory=Counter)
+    active_days: set[date] = field(default_factory=set)
+
+    def add(self, entry: JournalEntryDigest) -> None:
+        self.entry_count += 1
+        self.total_length += len(entry.body)
+        if entry.mood_category is not None:
+            self.mood_counts[entry.mood_category] += 1
+        self.tag_counts.update(entry.tags)
+        self.type_counts[entry.entry_type] += 1
+        self.active_days.add(entry.created_at.astimezone(UTC).date())
+
+    def to_insight(
+        self,
+        insight_type: InsightType,
+        title: str,
+        period_label: str,
+        period_start: date,
+        period_end: date,
+    ) -> AIInsightCreate:
+        dominant_mood = self.mood_counts.most_common(1)[0][0] if self.mood_counts else None
+        top_tags = [tag for tag, _ in self.tag_counts.most_common(TOP_TAG_COUNT)]
+        avg_length = self.total_length // self.entry_count if self.entry_count > 0 else 0
+
+        return AIInsightCreate(
+            insight_type=insight_type,
+            title=title,
+            content=_format_period_content(
+                period_label=period_label,
+                entry_count=self.entry_count,
+                active_days=len(self.active_days),
+                dominant_mood=dominant_mood,
+                top_tags=top_tags,
+                avg_length=avg_length,
+            ),
+            source=InsightSource.COMPUTED,
+            confidence=1.0,
+            period_start=period_start,
+            period_end=period_end,
+            metadata={
+                "entry_count": self.entry_count,
+                "active_days": len(self.active_days),
+                "dominant_mood": dominant_mood,
+                "mood_distribution": dict(self.mood_counts),
+                "top_tags": top_tags,
+                "avg_entry_length": avg_length,
+                "entry_types": dict(self.type_counts),
+            },
+        )
+
+
+def month_bounds(year: int, month: int) -> tuple[date, date]:
+    start = date(year, month, 1)
+    next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, next_month - timedelta(days=1)
+
+
+def year_bounds(year: int) -> tuple[date, date]:
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+class PeriodSummaryService:
+    def __init__(
+        self,
+        journal_service: JournalService,
+        insight_service: AIInsightService,
+    ) -> None:
+        self._journal = journal_service
+        self._insights = insight_service
+
+    async def summarize_month(self, user_id: UUID, year: int, month: int) -> AIInsightRow | None:
+        start, end = month_bounds(year, month)
+        return await self._summarize(
+            user_id,
+            InsightType.MONTHLY_SUMMARY,
+            start,
+            end,
+            title=start.strftime("%B %Y"),
+            period_label="this month",
+        )
+
+    async def summarize_year(self, user_id: UUID, year: int) -> AIInsightRow | None:
+        start, end = year_bounds(year)
+        return await self._summarize(
+            user_id,
+            InsightType.YEARLY_SUMMARY,
+            start,
+            end,
+            title=f"{year} in review",
+            period_label="this year",
+        )
+
+    async def _summarize(
+        self,
+        user_id: UUID,
+        insight_type: InsightType,
+        period_start: date,
+        period_end: date,
+        title: str,
+        period_label: str,
+    ) -> AIInsightRow | None:
+        range_start = datetime(period_start.year, period_start.month, period_start.day, tzinfo=UTC)
+        range_end = datetime(
+            period_end.year, period_end.month, period_end.day, tzinfo=UTC
+        ) + timedelta(days=1)
+
+        accumulator = PeriodAccumulator()
+        async for page in self._journal.iter_entry_digests(user_id, range_start, range_end):
+            for entry in page:
+                accumulator.add(entry)
+
+        existing = await self._insights.list_by_period(
+            user_id,
+            period_start=period_start,
+            period_end=period_end,
+            insight_type=insight_type.value,
+        )
+        if accumulator.entry_count == 0:
+            for row in existing:
+                await self._insights.soft_delete(user_id, row.id)
+            if existing:
+                logger.info(
+                    "period_summary.retired",
+                    user_id=str(user_id),
+                    insight_type=insight_type.value,
+                    period=f"{period_start} to {period_end}",
+                )
+            return None
+
+        create_data = accumulator.to_insight(
+            insight_type, title, period_label, period_start, period_end
+        )
+        if existing:
+            if existing[0].metadata == create_data.metadata:
+                return None
+            row = await self._insights.supersede(user_id, existing[0].id, create_data)
+        else:
+            row = await self._insights.create(user_id, create_data)
+
+        logger.info(
+            "period_summary.generated",
+            user_id=str(user_id),
+            insight_type=insight_type.value,
+            period=f"{period_start} to {period_end}",
+            entry_count=accumulator.entry_count,
+        )
+        return row
+
+
+def _format_period_content(
+    period_label: str,
+    entry_count: int,
+    active_days: int,
+    dominant_mood: str | None,
+    top_tags: list[str],
+    avg_length: int,
+) -> str:
+    label = "entry" if entry_count == 1 else "entries"
+    day_label = "day" if active_days == 1 else "days"
+    parts = [f"You wrote {entry_count} {label} across {active_days} {day_label} {period_label}."]
+
+    if dominant_mood:
+        parts.append(f"Your most common mood was {dominant_mood}.")
+
+    if top_tags:
+        parts.append(f"Top themes: {', '.join(top_tags[:3])}.")
+
+    if avg_length > 0:
+        parts.append(f"Average entry length: {avg_length} characters.")
+
+    return " ".join(parts)
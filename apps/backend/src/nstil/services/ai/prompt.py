@@ -20,6 +20,7 @@ class AIPromptService:
             "prompt_type": data.prompt_type.value,
             "content": data.content,
             "source": data.source.value,
+            "curated_id": data.curated_id,
             "mood_category": data.mood_category.value if data.mood_category else None,
             "session_id": str(data.session_id) if data.session_id else None,
             "entry_id": str(data.entry_id) if data.entry_id else None,
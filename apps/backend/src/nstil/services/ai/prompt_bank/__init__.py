@@ -1,10 +1,11 @@
-import random
+import hashlib
 from collections import defaultdict
 
 from nstil.services.ai.prompt_bank.affirmation import AFFIRMATION_PROMPTS
 from nstil.services.ai.prompt_bank.check_in import CHECK_IN_PROMPTS
 from nstil.services.ai.prompt_bank.goal_check import GOAL_CHECK_PROMPTS
 from nstil.services.ai.prompt_bank.guided import GUIDED_PROMPTS
+from nstil.services.ai.prompt_bank.index import PromptIndex
 from nstil.services.ai.prompt_bank.nudge import NUDGE_PROMPTS
 from nstil.services.ai.prompt_bank.reflection import REFLECTION_PROMPTS
 from nstil.services.ai.prompt_bank.reframe import REFRAME_PROMPTS
@@ -22,6 +23,12 @@ _ALL_PROMPTS: tuple[CuratedPrompt, ...] = (
 
 _BY_TYPE: dict[str, tuple[CuratedPrompt, ...]] = {}
 _BY_ID: dict[str, CuratedPrompt] = {}
+_INDEX_BY_TYPE: dict[str, PromptIndex] = {}
+_ID_BY_CONTENT: dict[tuple[str, str], str] = {}
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.strip().encode()).hexdigest()
 
 
 def _build_indexes() -> None:
@@ -33,9 +40,11 @@ def _build_indexes() -> None:
             raise ValueError(msg)
         seen_ids.add(prompt.id)
         _BY_ID[prompt.id] = prompt
+        _ID_BY_CONTENT[(prompt.prompt_type, content_hash(prompt.content))] = prompt.id
         grouped[prompt.prompt_type].append(prompt)
     for prompt_type, prompts in grouped.items():
         _BY_TYPE[prompt_type] = tuple(prompts)
+        _INDEX_BY_TYPE[prompt_type] = PromptIndex.build(_BY_TYPE[prompt_type])
 
 
 _build_indexes()
@@ -46,16 +55,21 @@ class PromptBank:
     def get_by_id(prompt_id: str) -> CuratedPrompt | None:
         return _BY_ID.get(prompt_id)
 
+    @staticmethod
+    def get_id_by_content(prompt_type: str, content: str) -> str | None:
+        return _ID_BY_CONTENT.get((prompt_type, content_hash(content)))
+
     @staticmethod
     def get_by_type(
         prompt_type: str,
         mood_category: str | None = None,
     ) -> list[CuratedPrompt]:
-        prompts = _BY_TYPE.get(prompt_type, ())
+        index = _INDEX_BY_TYPE.get(prompt_type)
+        if index is None:
+            return []
         if mood_category is None:
-            return list(prompts)
-        mood = mood_category
-        return [p for p in prompts if mood in p.mood_categories or "neutral" in p.mood_categories]
+            return list(index.prompts)
+        return index.members(index.mood_mask(mood_category))
 
     @staticmethod
     def get_filtered(
@@ -65,25 +79,12 @@ class PromptBank:
         exclude_topics: frozenset[str] | None = None,
         max_intensity: PromptIntensity | None = None,
     ) -> list[CuratedPrompt]:
-        _intensity_order = {
-            PromptIntensity.LIGHT: 0,
-            PromptIntensity.MODERATE: 1,
-            PromptIntensity.DEEP: 2,
-        }
-
-        candidates = PromptBank.get_by_type(prompt_type, mood_category)
-
-        if exclude_ids:
-            candidates = [p for p in candidates if p.id not in exclude_ids]
-
-        if exclude_topics:
-            candidates = [p for p in candidates if not p.tags & exclude_topics]
-
-        if max_intensity is not None:
-            threshold = _intensity_order[max_intensity]
-            candidates = [p for p in candidates if _intensity_order[p.intensity] <= threshold]
-
-        return candidates
+        index = _INDEX_BY_TYPE.get(prompt_type)
+        if index is None:
+            return []
+        return index.members(
+            index.select(mood_category, exclude_ids, exclude_topics, max_intensity)
+        )
 
     @staticmethod
     def get_random(
@@ -93,16 +94,10 @@ class PromptBank:
         exclude_topics: frozenset[str] | None = None,
         max_intensity: PromptIntensity | None = None,
     ) -> CuratedPrompt | None:
-        candidates = PromptBank.get_filtered(
-            prompt_type=prompt_type,
-            mood_category=mood_category,
-            exclude_ids=exclude_ids,
-            exclude_topics=exclude_topics,
-            max_intensity=max_intensity,
-        )
-        if not candidates:
+        index = _INDEX_BY_TYPE.get(prompt_type)
+        if index is None:
             return None
-        return random.choice(candidates)
+        return index.pick(index.select(mood_category, exclude_ids, exclude_topics, max_intensity))
 
     @staticmethod
     def count() -> int:
@@ -0,0 +1,104 @@
+import random
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Final
+
+from nstil.services.ai.prompt_bank.types import CuratedPrompt, PromptIntensity
+
+NEUTRAL_MOOD: Final[str] = "neutral"
+INTENSITY_ORDER: Final[tuple[PromptIntensity, ...]] = (
+    PromptIntensity.LIGHT,
+    PromptIntensity.MODERATE,
+    PromptIntensity.DEEP,
+)
+
+
+def nth_set_bit(mask: int, n: int) -> int:
+    lo, hi = 0, mask.bit_length() - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (mask & ((1 << (mid + 1)) - 1)).bit_count() > n:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def iter_set_bits(mask: int) -> Iterable[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+@dataclass(frozen=True, slots=True)
+class PromptIndex:
+    prompts: tuple[CuratedPrompt, ...]
+    full: int
+    by_mood: dict[str, int]
+    by_tag: dict[str, int]
+    up_to_intensity: dict[PromptIntensity, int]
+    ordinals: dict[str, int]
+
+    @classmethod
+    def build(cls, prompts: tuple[CuratedPrompt, ...]) -> "PromptIndex":
+        by_mood: dict[str, int] = defaultdict(int)
+        by_tag: dict[str, int] = defaultdict(int)
+        by_intensity: dict[PromptIntensity, int] = defaultdict(int)
+        for ordinal, prompt in enumerate(prompts):
+            bit = 1 << ordinal
+            for mood in prompt.mood_categories:
+                by_mood[mood] |= bit
+            for tag in prompt.tags:
+                by_tag[tag] |= bit
+            by_intensity[prompt.intensity] |= bit
+
+        up_to_intensity: dict[PromptIntensity, int] = {}
+        cumulative = 0
+        for intensity in INTENSITY_ORDER:
+            cumulative |= by_intensity[intensity]
+            up_to_intensity[intensity] = cumulative
+
+        return cls(
+            prompts=prompts,
+            full=(1 << len(prompts)) - 1,
+            by_mood=dict(by_mood),
+            by_tag=dict(by_tag),
+            up_to_intensity=up_to_intensity,
+            ordinals={p.id: i for i, p in enumerate(prompts)},
+        )
+
+    def mood_mask(self, mood_category: str | None) -> int:
+        if mood_category is None:
+            return self.full
+        return self.by_mood.get(mood_category, 0) | self.by_mood.get(NEUTRAL_MOOD, 0)
+
+    def select(
+        self,
+        mood_category: str | None = None,
+        exclude_ids: frozenset[str] | None = None,
+        exclude_topics: frozenset[str] | None = None,
+        max_intensity: PromptIntensity | None = None,
+    ) -> int:
+        mask = self.mood_mask(mood_category)
+        if max_intensity is not None:
+            mask &= self.up_to_intensity[max_intensity]
+        if exclude_topics:
+            for topic in exclude_topics:
+                mask &= ~self.by_tag.get(topic, 0)
+        if exclude_ids:
+            for prompt_id in exclude_ids:
+                ordinal = self.ordinals.get(prompt_id)
+                if ordinal is not None:
+                    mask &= ~(1 << ordinal)
+        return mask
+
+    def members(self, mask: int) -> list[CuratedPrompt]:
+        return [self.prompts[i] for i in iter_set_bits(mask)]
+
+    def pick(self, mask: int) -> CuratedPrompt | None:
+        size = mask.bit_count()
+        if size == 0:
+            return None
+        return self.prompts[nth_set_bit(mask, random.randrange(size))]
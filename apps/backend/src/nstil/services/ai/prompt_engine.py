@@ -2,11 +2,20 @@ from datetime import UTC, datetime, timedelta
 from uuid import UUID
 
 from nstil.models.ai_context import AIContextResponse
-from nstil.models.ai_prompt import AIPromptCreate, AIPromptRow, PromptSource, PromptType
+from nstil.models.ai_prompt import (
+    AIPromptCreate,
+    AIPromptRow,
+    PlannedPrompt,
+    PromptSource,
+    PromptType,
+)
 from nstil.models.mood import MoodCategory
 from nstil.observability import get_logger
 from nstil.services.ai.prompt import AIPromptService
 from nstil.services.ai.prompt_bank import CuratedPrompt, PromptBank, PromptIntensity
+from nstil.services.ai.prompt_queue import AUTO_PROMPT_SLOT, PromptQueue, prompt_slots
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
 from nstil.services.cached_ai_context import CachedAIContextService
 
 logger = get_logger("nstil.ai.prompt_engine")
@@ -67,11 +76,13 @@ def _count_difficult_moods(context: AIContextResponse) -> int:
 def _build_exclude_ids(context: AIContextResponse) -> frozenset[str]:
     ids: set[str] = set()
     for prompt in context.recent_prompts:
-        if prompt.source == "curated":
-            for p in PromptBank.get_by_type(prompt.prompt_type):
-                if p.content == prompt.content:
-                    ids.add(p.id)
-                    break
+        if prompt.source != PromptSource.CURATED:
+            continue
+        curated_id = prompt.curated_id or PromptBank.get_id_by_content(
+            prompt.prompt_type, prompt.content
+        )
+        if curated_id is not None:
+            ids.add(curated_id)
     return frozenset(ids)
 
 
@@ -108,14 +119,86 @@ def _build_context_snapshot(
     }
 
 
+def determine_prompt_type(context: AIContextResponse, entry_id: UUID | None) -> str:
+    if entry_id is not None:
+        return PromptType.REFLECTION.value
+
+    days_inactive = _days_since_last_entry(context)
+    if days_inactive is not None and days_inactive >= INACTIVITY_THRESHOLD_DAYS:
+        return PromptType.NUDGE.value
+
+    if not _has_engaged_today(context):
+        return PromptType.CHECK_IN.value
+
+    difficult_count = _count_difficult_moods(context)
+    if difficult_count >= DIFFICULT_MOOD_THRESHOLD:
+        return PromptType.AFFIRMATION.value
+
+    if context.profile.goals and not _has_recent_goal_check(context):
+        return PromptType.GOAL_CHECK.value
+
+    return PromptType.GUIDED.value
+
+
+def plan_prompt(context: AIContextResponse, prompt_type: str) -> PlannedPrompt | None:
+    dominant_mood = _get_dominant_mood(context)
+    max_intensity = _STYLE_TO_INTENSITY.get(context.profile.prompt_style, PromptIntensity.MODERATE)
+
+    selected = _select_with_fallback(
+        prompt_type=prompt_type,
+        mood_category=dominant_mood,
+        max_intensity=max_intensity,
+        exclude_ids=_build_exclude_ids(context),
+        exclude_topics=_build_exclude_topics(context),
+    )
+    if selected is None:
+        return None
+
+    return PlannedPrompt(
+        curated_id=selected.id,
+        data=AIPromptCreate(
+            prompt_type=PromptType(prompt_type),
+            content=selected.content,
+            source=PromptSource.CURATED,
+            curated_id=selected.id,
+            mood_category=_resolve_mood_for_db(dominant_mood),
+            context=_build_context_snapshot(context, prompt_type, dominant_mood),
+        ),
+    )
+
+
+def plan_prompt_queue(context: AIContextResponse) -> dict[str, PlannedPrompt]:
+    slot_types = {slot: slot for slot in prompt_slots() if slot != AUTO_PROMPT_SLOT}
+    slot_types[AUTO_PROMPT_SLOT] = determine_prompt_type(context, None)
+
+    plans: dict[str, PlannedPrompt] = {}
+    for slot, prompt_type in slot_types.items():
+        planned = plan_prompt(context, prompt_type)
+        if planned is not None:
+            plans[slot] = planned
+    return plans
+
+
+def _queue_slot(prompt_type: PromptType | None, entry_id: UUID | None) -> str:
+    if prompt_type is not None:
+        return prompt_type.value
+    if entry_id is not None:
+        return PromptType.REFLECTION.value
+    return AUTO_PROMPT_SLOT
+
+
 class PromptEngine:
     def __init__(
         self,
         context_service: CachedAIContextService,
         prompt_service: AIPromptService,
+        prompt_queue: PromptQueue | None = None,
+        invalidator: CacheInvalidator | None = None,
     ) -> None:
         self._context = context_service
         self._prompts = prompt_service
+        self._queue = prompt_queue
+        self._invalidator = invalidator
 
     async def generate(
         self,
@@ -124,84 +207,47 @@ class PromptEngine:
         session_id: UUID | None = None,
         entry_id: UUID | None = None,
     ) -> AIPromptRow | None:
-        context = await self._context.get_context(user_id)
-
-        determined_type = (
-            prompt_type.value
-            if prompt_type is not None
-            else self._determine_type(context, entry_id)
-        )
-
-        dominant_mood = _get_dominant_mood(context)
-        max_intensity = _STYLE_TO_INTENSITY.get(
-            context.profile.prompt_style, PromptIntensity.MODERATE
-        )
-        exclude_ids = _build_exclude_ids(context)
-        exclude_topics = _build_exclude_topics(context)
-
-        selected = _select_with_fallback(
-            prompt_type=determined_type,
-            mood_category=dominant_mood,
-            max_intensity=max_intensity,
-            exclude_ids=exclude_ids,
-            exclude_topics=exclude_topics,
-        )
-
-        if selected is None:
-            logger.warning(
-                "prompt_engine.no_prompt_available",
-                user_id=str(user_id),
-                prompt_type=determined_type,
-                mood=dominant_mood,
+        planned: PlannedPrompt | None = None
+        if self._queue is not None:
+            planned = await self._queue.pop(user_id, _queue_slot(prompt_type, entry_id))
+        precomputed = planned is not None
+
+        if planned is None:
+            context = await self._context.get_context(user_id)
+            determined_type = (
+                prompt_type.value
+                if prompt_type is not None
+                else determine_prompt_type(context, entry_id)
             )
-            return None
-
-        create_data = AIPromptCreate(
-            prompt_type=PromptType(determined_type),
-            content=selected.content,
-            source=PromptSource.CURATED,
-            mood_category=_resolve_mood_for_db(dominant_mood),
-            session_id=session_id,
-            entry_id=entry_id,
-            context=_build_context_snapshot(context, determined_type, dominant_mood),
+            planned = plan_prompt(context, determined_type)
+            if planned is None:
+                logger.warning(
+                    "prompt_engine.no_prompt_available",
+                    user_id=str(user_id),
+                    prompt_type=determined_type,
+                    mood=_get_dominant_mood(context),
+                )
+                return None
+
+        create_data = planned.data.model_copy(
+            update={"session_id": session_id, "entry_id": entry_id}
         )
-
         row = await self._prompts.create(user_id, create_data)
 
+        if self._invalidator is not None:
+            await self._invalidator.invalidate(user_id, CacheEvent.PROMPT_CREATED, row.id)
+
         logger.info(
             "prompt_engine.generated",
             user_id=str(user_id),
-            prompt_type=determined_type,
-            prompt_id=selected.id,
-            mood=dominant_mood,
+            prompt_type=create_data.prompt_type.value,
+            prompt_id=planned.curated_id,
+            mood=create_data.mood_category.value if create_data.mood_category else None,
+            precomputed=precomputed,
         )
 
         return row
 
-    def _determine_type(
-        self,
-        context: AIContextResponse,
-        entry_id: UUID | None,
-    ) -> str:
-        if entry_id is not None:
-            return PromptType.REFLECTION.value
-
-        days_inactive = _days_since_last_entry(context)
-        if days_inactive is not None and days_inactive >= INACTIVITY_THRESHOLD_DAYS:
-            return PromptType.NUDGE.value
-
-        if not _has_engaged_today(context):
-            return PromptType.CHECK_IN.value
-
-        difficult_count = _count_difficult_moods(context)
-        if difficult_count >= DIFFICULT_MOOD_THRESHOLD:
-            return PromptType.AFFIRMATION.value
-
-        if context.profile.goals and not _has_recent_goal_check(context):
-            return PromptType.GOAL_CHECK.value
-
-        return PromptType.GUIDED.value
-
 
 def _select_with_fallback(
     prompt_type: str,
@@ -0,0 +1,105 @@
+from collections.abc import Sequence
+from typing import Final, Protocol, cast
+from uuid import UUID
+
+import redis.asyncio as aioredis
+from arq.connections import ArqRedis
+
+from nstil.models.ai_prompt import PlannedPrompt
+from nstil.observability import get_logger
+from nstil.services.ai.prompt_bank import PromptBank
+from nstil.services.cache.ai_keys import prompt_queue_key
+from nstil.services.cache.constants import PROMPT_QUEUE_TTL_SECONDS
+from nstil.services.cache.families import CacheFamily
+from nstil.services.cache.keys import generation_key
+
+logger = get_logger("nstil.ai.prompt_queue")
+
+PRECOMPUTE_PROMPTS_TASK: Final[str] = "precompute_prompts"
+AUTO_PROMPT_SLOT: Final[str] = "auto"
+REFILL_DELAY_SECONDS: Final[int] = 2
+
+_LUA_STORE_IF_CURRENT: Final[str] = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+for i = 2, #KEYS do
+    redis.call('SETEX', KEYS[i], ARGV[2], ARGV[i + 1])
+end
+return 1
+"""
+
+
+class _RedisScript(Protocol):
+    async def __call__(self, keys: Sequence[str], args: Sequence[object]) -> int: ...
+
+
+def precompute_job_id(user_id: UUID) -> str:
+    return f"{PRECOMPUTE_PROMPTS_TASK}:{user_id}"
+
+
+def prompt_slots() -> list[str]:
+    return [AUTO_PROMPT_SLOT, *PromptBank.available_types()]
+
+
+def prompt_queue_generation_key(user_id: UUID) -> str:
+    return generation_key(user_id, CacheFamily.PROMPT_QUEUE)
+
+
+class PromptQueue:
+    def __init__(self, redis: aioredis.Redis, queue: ArqRedis | None = None) -> None:
+        self._redis = redis
+        self._queue = queue
+        self._store_script: _RedisScript | None = None
+
+    def _get_store_script(self) -> _RedisScript:
+        if self._store_script is None:
+            self._store_script = cast(
+                _RedisScript,
+                self._redis.register_script(_LUA_STORE_IF_CURRENT),
+            )
+        return self._store_script
+
+    async def generation(self, user_id: UUID) -> int:
+        raw = await self._redis.get(prompt_queue_generation_key(user_id))
+        return int(raw) if raw is not None else 0
+
+    async def pop(self, user_id: UUID, slot: str) -> PlannedPrompt | None:
+        keys = [prompt_queue_key(user_id, s) for s in prompt_slots()]
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.get(prompt_queue_key(user_id, slot))
+                pipe.delete(*keys)
+                raw, _ = await pipe.execute()
+        except Exception:
+            logger.warning("prompt_queue.pop_failed", user_id=str(user_id), slot=slot)
+            return None
+
+        if raw is None:
+            return None
+        return PlannedPrompt.model_validate_json(raw)
+
+    async def store(self, user_id: UUID, plans: dict[str, PlannedPrompt], generation: int) -> bool:
+        if not plans:
+            return True
+        keys = [prompt_queue_generation_key(user_id)]
+        keys.extend(prompt_queue_key(user_id, slot) for slot in plans)
+        args: list[object] = [generation, PROMPT_QUEUE_TTL_SECONDS]
+        args.extend(plan.model_dump_json() for plan in plans.values())
+        stored = bool(await self._get_store_script()(keys=keys, args=args))
+        if not stored:
+            logger.info("prompt_queue.stale_plans", user_id=str(user_id), generation=generation)
+        return stored
+
+    async def schedule_refill(self, user_id: UUID) -> None:
+        if self._queue is None:
+            return
+        try:
+            await self._queue.enqueue_job(
+                PRECOMPUTE_PROMPTS_TASK,
+                str(user_id),
+                _job_id=precompute_job_id(user_id),
+                _defer_by=REFILL_DELAY_SECONDS,
+            )
+        except Exception:
+            logger.warning("prompt_queue.schedule_failed", user_id=str(user_id))
@@ -4,8 +4,14 @@ from uuid import UUID
 
 from supabase import AsyncClient
 
-from nstil.models.ai_message import AIMessageCreate, AIMessageRow
-from nstil.models.ai_session import AISessionCreate, AISessionRow, AISessionUpdate
+from nstil.models.ai_message import AIMessageRow
+from nstil.models.ai_session import (
+    AISessionCreate,
+    AISessionRow,
+    AISessionUpdate,
+    SessionStatus,
+    TriggerSource,
+)
 from nstil.models.pagination import CursorParams
 
 SESSIONS_TABLE = "ai_sessions"
@@ -94,6 +100,59 @@ class AISessionService:
             return None
         return AISessionRow.model_validate(result.data[0])
 
+    async def start_check_in(
+        self, user_id: UUID, trigger_source: TriggerSource, prompt_id: UUID
+    ) -> AISessionRow:
+        return await self._call_session_rpc(
+            "check_in_start",
+            {
+                "p_user_id": str(user_id),
+                "p_trigger_source": trigger_source.value,
+                "p_prompt_id": str(prompt_id),
+            },
+        )
+
+    async def respond_check_in(
+        self,
+        user_id: UUID,
+        session_id: UUID,
+        mood_category: str,
+        mood_specific: str | None,
+        response_text: str,
+    ) -> AISessionRow:
+        return await self._call_session_rpc(
+            "check_in_respond",
+            {
+                "p_user_id": str(user_id),
+                "p_session_id": str(session_id),
+                "p_mood_category": mood_category,
+                "p_mood_specific": mood_specific,
+                "p_response_text": response_text,
+            },
+        )
+
+    async def finish_check_in(
+        self,
+        user_id: UUID,
+        session_id: UUID,
+        status: SessionStatus,
+        entry_id: UUID | None = None,
+    ) -> AISessionRow:
+        return await self._call_session_rpc(
+            "check_in_finish",
+            {
+                "p_user_id": str(user_id),
+                "p_session_id": str(session_id),
+                "p_status": status.value,
+                "p_entry_id": str(entry_id) if entry_id else None,
+            },
+        )
+
+    async def _call_session_rpc(self, function: str, params: dict[str, Any]) -> AISessionRow:
+        result = await self._client.rpc(function, params).execute()
+        data: list[dict[str, Any]] = result.data  # type: ignore[assignment]
+        return AISessionRow.model_validate(data[0])
+
     async def soft_delete(self, user_id: UUID, session_id: UUID) -> bool:
         now = datetime.now(UTC).isoformat()
         result = await (
@@ -106,21 +165,6 @@ class AISessionService:
         )
         return len(result.data) > 0
 
-    async def add_message(self, user_id: UUID, data: AIMessageCreate) -> AIMessageRow:
-        payload: dict[str, Any] = {
-            "session_id": str(data.session_id),
-            "user_id": str(user_id),
-            "role": data.role.value,
-            "content": data.content,
-            "sort_order": data.sort_order,
-            "token_count": data.token_count,
-            "latency_ms": data.latency_ms,
-            "model_id": data.model_id,
-            "metadata": data.metadata,
-        }
-        result = await self._client.table(MESSAGES_TABLE).insert(payload).execute()
-        return AIMessageRow.model_validate(result.data[0])
-
     async def get_messages(self, user_id: UUID, session_id: UUID) -> list[AIMessageRow]:
         result = await (
             self._client.table(MESSAGES_TABLE)
@@ -132,19 +176,3 @@ class AISessionService:
             .execute()
         )
         return [AIMessageRow.model_validate(row) for row in result.data]
-
-    async def get_next_sort_order(self, session_id: UUID) -> int:
-        result = await (
-            self._client.table(MESSAGES_TABLE)
-            .select("sort_order")
-            .eq("session_id", str(session_id))
-            .is_("deleted_at", "null")
-            .order("sort_order", desc=True)
-            .limit(1)
-            .execute()
-        )
-        if not result.data:
-            return 0
-        row: dict[str, Any] = result.data[0]  # type: ignore[assignment]
-        last_order: int = row["sort_order"]
-        return last_order + 1
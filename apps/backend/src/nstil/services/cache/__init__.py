@@ -1,6 +1,16 @@
 from nstil.services.cache.ai_cache import AICacheService
 from nstil.services.cache.base import BaseCacheService
 from nstil.services.cache.entry_cache import EntryCacheService
+from nstil.services.cache.families import CacheEvent, CacheFamily
+from nstil.services.cache.media_cache import MediaCacheService
 from nstil.services.cache.space_cache import SpaceCacheService
 
-__all__ = ["AICacheService", "BaseCacheService", "EntryCacheService", "SpaceCacheService"]
+__all__ = [
+    "AICacheService",
+    "BaseCacheService",
+    "CacheEvent",
+    "CacheFamily",
+    "EntryCacheService",
+    "MediaCacheService",
+    "SpaceCacheService",
+]
@@ -1,76 +1,165 @@
+from dataclasses import dataclass
 from uuid import UUID
 
-from nstil.models.ai_context import AIContextResponse
+from nstil.models.ai_context import (
+    AIContextActivity,
+    AIContextAggregates,
+    AIContextProfile,
+    AIContextWindow,
+)
 from nstil.models.ai_profile import UserAIProfileRow
+from nstil.models.ai_session import ActiveCheckInState, AISessionRow
 from nstil.models.notification import NotificationPreferencesRow
 from nstil.models.profile import ProfileRow
-from nstil.observability import get_logger
 from nstil.services.cache.ai_keys import (
-    ai_context_key,
-    ai_context_pattern,
+    active_check_in_key,
+    ai_context_activity_key,
+    ai_context_aggregates_key,
+    ai_context_profile_key,
+    ai_context_window_key,
     ai_profile_key,
     notification_prefs_key,
     user_profile_key,
 )
 from nstil.services.cache.base import BaseCacheService
 from nstil.services.cache.constants import (
-    AI_CONTEXT_TTL_SECONDS,
+    ACTIVE_CHECK_IN_TTL_SECONDS,
+    AI_CONTEXT_ACTIVITY_TTL_SECONDS,
+    AI_CONTEXT_JOURNAL_TTL_SECONDS,
+    AI_CONTEXT_PROFILE_TTL_SECONDS,
     AI_PROFILE_TTL_SECONDS,
     NOTIFICATION_PREFS_TTL_SECONDS,
     USER_PROFILE_TTL_SECONDS,
 )
+from nstil.services.cache.families import CacheFamily
+from nstil.services.cache.keys import epoch_key, generation_key
+
+
+@dataclass(frozen=True, slots=True)
+class AIContextParts:
+    profile: AIContextProfile | None
+    activity: AIContextActivity | None
+    aggregates: AIContextAggregates | None
+    window: AIContextWindow | None
+    generation: str | None = None
+    profile_generation: str | None = None
+    activity_generation: str | None = None
+
 
-logger = get_logger("nstil.cache.ai")
+@dataclass(frozen=True, slots=True)
+class CachedAIProfile:
+    row: UserAIProfileRow | None
+    generation: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class CachedActiveCheckIn:
+    state: ActiveCheckInState | None
+    generation: str | None
 
 
 class AICacheService(BaseCacheService):
-    async def get_context(
-        self, user_id: UUID, entry_limit: int, days_back: int
-    ) -> AIContextResponse | None:
-        data = await self._get(ai_context_key(user_id, entry_limit, days_back))
-        if data is None:
-            return None
-        return self._deserialize(AIContextResponse, data)
+    async def get_context_parts(self, user_id: UUID, days_back: int) -> AIContextParts:
+        (
+            epoch,
+            generation,
+            profile_generation,
+            activity_generation,
+            profile,
+            activity,
+            aggregates,
+            window,
+        ) = await self._get_many(
+            epoch_key(),
+            generation_key(user_id, CacheFamily.AI_CONTEXT_JOURNAL),
+            generation_key(user_id, CacheFamily.AI_CONTEXT_PROFILE),
+            generation_key(user_id, CacheFamily.AI_CONTEXT_ACTIVITY),
+            ai_context_profile_key(user_id),
+            ai_context_activity_key(user_id),
+            ai_context_aggregates_key(user_id, days_back),
+            ai_context_window_key(user_id),
+        )
+        generation = self._generation(epoch, generation)
+        profile_generation = self._generation(epoch, profile_generation)
+        activity_generation = self._generation(epoch, activity_generation)
+        profile = self._unstamp(profile_generation, profile)
+        activity = self._unstamp(activity_generation, activity)
+        aggregates = self._unstamp(generation, aggregates)
+        window = self._unstamp(generation, window)
+        return AIContextParts(
+            profile=self._deserialize(AIContextProfile, profile) if profile else None,
+            activity=self._deserialize(AIContextActivity, activity) if activity else None,
+            aggregates=(
+                self._deserialize(AIContextAggregates, aggregates) if aggregates else None
+            ),
+            window=self._deserialize(AIContextWindow, window) if window else None,
+            generation=generation,
+            profile_generation=profile_generation,
+            activity_generation=activity_generation,
+        )
+
+    async def set_context_profile(
+        self, user_id: UUID, profile: AIContextProfile, *, generation: str | None
+    ) -> None:
+        await self._set_current(
+            ai_context_profile_key(user_id),
+            generation,
+            self._serialize(profile),
+            AI_CONTEXT_PROFILE_TTL_SECONDS,
+        )
+
+    async def set_context_activity(
+        self, user_id: UUID, activity: AIContextActivity, *, generation: str | None
+    ) -> None:
+        await self._set_current(
+            ai_context_activity_key(user_id),
+            generation,
+            self._serialize(activity),
+            AI_CONTEXT_ACTIVITY_TTL_SECONDS,
+        )
 
-    async def set_context(
+    async def set_context_aggregates(
         self,
         user_id: UUID,
-        entry_limit: int,
         days_back: int,
-        context: AIContextResponse,
+        aggregates: AIContextAggregates,
+        *,
+        generation: str | None,
     ) -> None:
-        await self._set(
-            ai_context_key(user_id, entry_limit, days_back),
-            self._serialize(context),
-            AI_CONTEXT_TTL_SECONDS,
+        await self._set_current(
+            ai_context_aggregates_key(user_id, days_back),
+            generation,
+            self._serialize(aggregates),
+            AI_CONTEXT_JOURNAL_TTL_SECONDS,
         )
 
-    async def invalidate_context(self, user_id: UUID) -> None:
-        pattern = ai_context_pattern(user_id)
-        count = await self._delete_pattern(pattern)
-        if count > 0:
-            logger.debug(
-                "cache.ai_context.invalidated",
-                user_id=str(user_id),
-                count=count,
-            )
-
-    async def get_profile(self, user_id: UUID) -> UserAIProfileRow | None:
-        data = await self._get(ai_profile_key(user_id))
-        if data is None:
-            return None
-        return self._deserialize(UserAIProfileRow, data)
+    async def set_context_window(
+        self, user_id: UUID, window: AIContextWindow, *, generation: str | None
+    ) -> None:
+        await self._set_current(
+            ai_context_window_key(user_id),
+            generation,
+            self._serialize(window),
+            AI_CONTEXT_JOURNAL_TTL_SECONDS,
+        )
 
-    async def set_profile(self, user_id: UUID, profile: UserAIProfileRow) -> None:
-        await self._set(
+    async def get_profile(self, user_id: UUID) -> CachedAIProfile:
+        data, generation = await self._get_current(
+            generation_key(user_id, CacheFamily.AI_PROFILE), ai_profile_key(user_id)
+        )
+        row = self._deserialize(UserAIProfileRow, data) if data is not None else None
+        return CachedAIProfile(row, generation)
+
+    async def set_profile(
+        self, user_id: UUID, profile: UserAIProfileRow, *, generation: str | None
+    ) -> None:
+        await self._set_current(
             ai_profile_key(user_id),
+            generation,
             self._serialize(profile),
             AI_PROFILE_TTL_SECONDS,
         )
 
-    async def invalidate_profile(self, user_id: UUID) -> None:
-        await self._delete(ai_profile_key(user_id))
-
     async def get_notification_prefs(self, user_id: UUID) -> NotificationPreferencesRow | None:
         data = await self._get(notification_prefs_key(user_id))
         if data is None:
@@ -104,3 +193,21 @@ class AICacheService(BaseCacheService):
 
     async def invalidate_user_profile(self, user_id: UUID) -> None:
         await self._delete(user_profile_key(user_id))
+
+    async def get_active_check_in(self, user_id: UUID) -> CachedActiveCheckIn:
+        data, generation = await self._get_current(
+            generation_key(user_id, CacheFamily.ACTIVE_CHECK_IN),
+            active_check_in_key(user_id),
+        )
+        state = self._deserialize(ActiveCheckInState, data) if data is not None else None
+        return CachedActiveCheckIn(state, generation)
+
+    async def set_active_check_in(
+        self, user_id: UUID, session: AISessionRow | None, *, generation: str | None
+    ) -> None:
+        await self._set_current(
+            active_check_in_key(user_id),
+            generation,
+            self._serialize(ActiveCheckInState(session=session)),
+            ACTIVE_CHECK_IN_TTL_SECONDS,
+        )
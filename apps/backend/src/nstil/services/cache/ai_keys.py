@@ -3,8 +3,24 @@ from uuid import UUID
 from nstil.services.cache.constants import KEY_PREFIX
 
 
-def ai_context_key(user_id: UUID, entry_limit: int, days_back: int) -> str:
-    return f"{KEY_PREFIX}:user:{user_id}:ai:context:{entry_limit}:{days_back}"
+def ai_context_profile_key(user_id: UUID) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:ai:context:profile"
+
+
+def ai_context_activity_key(user_id: UUID) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:ai:context:activity"
+
+
+def ai_context_aggregates_key(user_id: UUID, days_back: int) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:ai:context:journal:aggregates:{days_back}"
+
+
+def ai_context_window_key(user_id: UUID) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:ai:context:journal:window"
+
+
+def ai_context_journal_pattern(user_id: UUID) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:ai:context:journal:*"
 
 
 def ai_context_pattern(user_id: UUID) -> str:
@@ -21,3 +37,19 @@ def notification_prefs_key(user_id: UUID) -> str:
 
 def user_profile_key(user_id: UUID) -> str:
     return f"{KEY_PREFIX}:user:{user_id}:profile"
+
+
+def active_check_in_key(user_id: UUID) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:ai:check_in:active"
+
+
+def prompt_queue_key(user_id: UUID, slot: str) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:ai:context:next_prompt:{slot}"
+
+
+def insight_pending_weeks_key(user_id: UUID) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:ai:insights:pending_weeks"
+
+
+def insight_quiet_until_key(user_id: UUID) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:ai:insights:quiet_until"
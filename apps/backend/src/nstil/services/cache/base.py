@@ -1,15 +1,20 @@
-from typing import TypeVar
+from typing import Final, TypeVar
 
 import redis.asyncio as aioredis
 from pydantic import BaseModel
 
 from nstil.observability import get_logger
 from nstil.services.cache.constants import SCAN_BATCH_SIZE
+from nstil.services.cache.keys import epoch_key
 
 logger = get_logger("nstil.cache")
 
 T = TypeVar("T", bound=BaseModel)
 
+GENERATION_SEPARATOR: Final[str] = "|"
+EPOCH_SEPARATOR: Final[str] = "."
+INITIAL_GENERATION: Final[str] = f"0{EPOCH_SEPARATOR}0"
+
 
 class BaseCacheService:
     def __init__(self, redis: aioredis.Redis) -> None:
@@ -23,17 +28,33 @@ class BaseCacheService:
             logger.warning("cache.get.failed", key=key)
             return None
 
+    async def _get_many(self, *keys: str) -> list[str | None]:
+        try:
+            result: list[str | None] = await self._redis.mget(keys)
+            return result
+        except Exception:
+            logger.warning("cache.get_many.failed", keys=list(keys))
+            return [None] * len(keys)
+
     async def _set(self, key: str, value: str, ttl: int) -> None:
         try:
             await self._redis.setex(key, ttl, value)
         except Exception:
             logger.warning("cache.set.failed", key=key)
 
-    async def _delete(self, key: str) -> None:
+    async def _get_current(self, generation_key: str, key: str) -> tuple[str | None, str | None]:
+        epoch, generation, data = await self._get_many(epoch_key(), generation_key, key)
+        current = self._generation(epoch, generation)
+        return self._unstamp(current, data), current
+
+    async def _set_current(self, key: str, generation: str | None, value: str, ttl: int) -> None:
+        await self._set(key, self._stamp(generation, value), ttl)
+
+    async def _delete(self, *keys: str) -> None:
         try:
-            await self._redis.delete(key)
+            await self._redis.delete(*keys)
         except Exception:
-            logger.warning("cache.delete.failed", key=key)
+            logger.warning("cache.delete.failed", keys=list(keys))
 
     async def _delete_pattern(self, pattern: str) -> int:
         deleted = 0
@@ -54,6 +75,23 @@ class BaseCacheService:
             logger.warning("cache.delete_pattern.failed", pattern=pattern)
         return deleted
 
+    @staticmethod
+    def _generation(epoch: str | None, generation: str | None) -> str:
+        return f"{epoch or 0}{EPOCH_SEPARATOR}{generation or 0}"
+
+    @staticmethod
+    def _stamp(generation: str | None, value: str) -> str:
+        return f"{generation or INITIAL_GENERATION}{GENERATION_SEPARATOR}{value}"
+
+    @staticmethod
+    def _unstamp(generation: str | None, data: str | None) -> str | None:
+        if data is None:
+            return None
+        stamp, separator, value = data.partition(GENERATION_SEPARATOR)
+        if not separator or stamp != (generation or INITIAL_GENERATION):
+            return None
+        return value
+
     @staticmethod
     def _serialize(model: BaseModel) -> str:
         return model.model_dump_json()
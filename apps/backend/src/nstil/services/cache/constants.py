@@ -1,13 +1,24 @@
 KEY_PREFIX = "nstil"
 
 ENTRY_TTL_SECONDS = 300
-ENTRY_LIST_TTL_SECONDS = 120
-SEARCH_TTL_SECONDS = 60
-CALENDAR_TTL_SECONDS = 300
+ENTRY_LIST_TTL_SECONDS = 600
+SEARCH_TTL_SECONDS = 300
+CALENDAR_TTL_SECONDS = 1800
 
-AI_CONTEXT_TTL_SECONDS = 60
+AI_CONTEXT_PROFILE_TTL_SECONDS = 3600
+AI_CONTEXT_ACTIVITY_TTL_SECONDS = 1800
+AI_CONTEXT_JOURNAL_TTL_SECONDS = 1800
 AI_PROFILE_TTL_SECONDS = 600
 NOTIFICATION_PREFS_TTL_SECONDS = 600
 USER_PROFILE_TTL_SECONDS = 600
+ACTIVE_CHECK_IN_TTL_SECONDS = 1800
+DEFAULT_SPACE_TTL_SECONDS = 600
+
+INSIGHT_PENDING_TTL_SECONDS = 86400
+PROMPT_QUEUE_TTL_SECONDS = 3600
+
+GENERATION_TTL_SECONDS = 604800
+
+SIGNED_URL_TTL_SECONDS = 3000
 
 SCAN_BATCH_SIZE = 100
@@ -0,0 +1,120 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Final
+from uuid import UUID
+
+from nstil.services.ai.prompt_queue import prompt_slots
+from nstil.services.cache.ai_keys import prompt_queue_key
+from nstil.services.cache.families import CacheEvent, CacheFamily
+from nstil.services.cache.keys import entry_key
+from nstil.services.cache.space_keys import space_key
+
+KeyBuilder = Callable[[UUID, UUID | None], list[str]]
+
+ENTRY_WRITES: Final[frozenset[CacheEvent]] = frozenset(
+    {CacheEvent.ENTRY_CREATED, CacheEvent.ENTRY_UPDATED, CacheEvent.ENTRY_DELETED}
+)
+SPACE_WRITES: Final[frozenset[CacheEvent]] = frozenset(
+    {CacheEvent.SPACE_CREATED, CacheEvent.SPACE_UPDATED, CacheEvent.SPACE_DELETED}
+)
+MEDIA_WRITES: Final[frozenset[CacheEvent]] = frozenset(
+    {CacheEvent.MEDIA_CREATED, CacheEvent.MEDIA_UPDATED, CacheEvent.MEDIA_DELETED}
+)
+ACTIVITY_WRITES: Final[frozenset[CacheEvent]] = frozenset(
+    {
+        CacheEvent.PROMPT_CREATED,
+        CacheEvent.PROMPT_UPDATED,
+        CacheEvent.SESSION_CREATED,
+        CacheEvent.SESSION_UPDATED,
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CacheDependency:
+    family: CacheFamily
+    events: frozenset[CacheEvent]
+    keys: KeyBuilder | None = None
+
+
+def _entity_keys(builder: Callable[[UUID, UUID], str]) -> KeyBuilder:
+    def build(user_id: UUID, entity_id: UUID | None) -> list[str]:
+        return [builder(user_id, entity_id)] if entity_id is not None else []
+
+    return build
+
+
+def _prompt_queue_keys(user_id: UUID, entity_id: UUID | None) -> list[str]:
+    return [prompt_queue_key(user_id, slot) for slot in prompt_slots()]
+
+
+CACHE_DEPENDENCIES: Final[tuple[CacheDependency, ...]] = (
+    CacheDependency(
+        CacheFamily.ENTRY,
+        frozenset({CacheEvent.ENTRY_UPDATED, CacheEvent.ENTRY_DELETED}),
+        _entity_keys(entry_key),
+    ),
+    CacheDependency(
+        CacheFamily.ENTRY_LISTS, ENTRY_WRITES | MEDIA_WRITES | {CacheEvent.SPACE_DELETED}
+    ),
+    CacheDependency(
+        CacheFamily.ENTRY_SEARCHES, ENTRY_WRITES | MEDIA_WRITES | {CacheEvent.SPACE_DELETED}
+    ),
+    CacheDependency(CacheFamily.CALENDARS, ENTRY_WRITES | {CacheEvent.SPACE_DELETED}),
+    CacheDependency(
+        CacheFamily.SPACE,
+        frozenset({CacheEvent.SPACE_UPDATED, CacheEvent.SPACE_DELETED}),
+        _entity_keys(space_key),
+    ),
+    CacheDependency(CacheFamily.SPACE_LIST, SPACE_WRITES),
+    CacheDependency(CacheFamily.DEFAULT_SPACE, SPACE_WRITES),
+    CacheDependency(CacheFamily.AI_PROFILE, frozenset({CacheEvent.AI_PROFILE_UPDATED})),
+    CacheDependency(CacheFamily.AI_CONTEXT_PROFILE, frozenset({CacheEvent.AI_PROFILE_UPDATED})),
+    CacheDependency(CacheFamily.AI_CONTEXT_ACTIVITY, ACTIVITY_WRITES),
+    CacheDependency(
+        CacheFamily.AI_CONTEXT_JOURNAL,
+        ENTRY_WRITES | {CacheEvent.SPACE_UPDATED, CacheEvent.SPACE_DELETED},
+    ),
+    CacheDependency(
+        CacheFamily.PROMPT_QUEUE,
+        ENTRY_WRITES | ACTIVITY_WRITES | {CacheEvent.AI_PROFILE_UPDATED},
+        _prompt_queue_keys,
+    ),
+    CacheDependency(
+        CacheFamily.ACTIVE_CHECK_IN,
+        frozenset({CacheEvent.SESSION_CREATED, CacheEvent.SESSION_UPDATED}),
+    ),
+)
+
+TABLE_EVENTS: Final[dict[tuple[str, str], CacheEvent]] = {
+    ("journal_entries", "insert"): CacheEvent.ENTRY_CREATED,
+    ("journal_entries", "update"): CacheEvent.ENTRY_UPDATED,
+    ("journal_entries", "delete"): CacheEvent.ENTRY_DELETED,
+    ("journals", "insert"): CacheEvent.SPACE_CREATED,
+    ("journals", "update"): CacheEvent.SPACE_UPDATED,
+    ("journals", "delete"): CacheEvent.SPACE_DELETED,
+    ("user_ai_profiles", "insert"): CacheEvent.AI_PROFILE_UPDATED,
+    ("user_ai_profiles", "update"): CacheEvent.AI_PROFILE_UPDATED,
+    ("user_ai_profiles", "delete"): CacheEvent.AI_PROFILE_UPDATED,
+    ("ai_prompts", "insert"): CacheEvent.PROMPT_CREATED,
+    ("ai_prompts", "update"): CacheEvent.PROMPT_UPDATED,
+    ("ai_prompts", "delete"): CacheEvent.PROMPT_UPDATED,
+    ("ai_sessions", "insert"): CacheEvent.SESSION_CREATED,
+    ("ai_sessions", "update"): CacheEvent.SESSION_UPDATED,
+    ("ai_sessions", "delete"): CacheEvent.SESSION_UPDATED,
+    ("entry_media", "insert"): CacheEvent.MEDIA_CREATED,
+    ("entry_media", "update"): CacheEvent.MEDIA_UPDATED,
+    ("entry_media", "delete"): CacheEvent.MEDIA_DELETED,
+}
+
+_BY_EVENT: Final[dict[CacheEvent, tuple[CacheDependency, ...]]] = {
+    event: tuple(dep for dep in CACHE_DEPENDENCIES if event in dep.events) for event in CacheEvent
+}
+
+
+def dependents_of(event: CacheEvent) -> tuple[CacheDependency, ...]:
+    return _BY_EVENT[event]
+
+
+def event_for_row_change(table: str, op: str) -> CacheEvent | None:
+    return TABLE_EVENTS.get((table, op))
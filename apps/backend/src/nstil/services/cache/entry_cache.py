@@ -1,4 +1,5 @@
 import json
+from dataclasses import dataclass
 from uuid import UUID
 
 from nstil.models.calendar import CalendarDay
@@ -11,19 +12,30 @@ from nstil.services.cache.constants import (
     ENTRY_TTL_SECONDS,
     SEARCH_TTL_SECONDS,
 )
+from nstil.services.cache.families import CacheFamily
 from nstil.services.cache.keys import (
     calendar_key,
-    calendar_pattern,
     entry_key,
     entry_list_key,
-    entry_list_pattern,
+    generation_key,
     search_key,
-    search_pattern,
 )
 
 logger = get_logger("nstil.cache.entry")
 
 
+@dataclass(frozen=True, slots=True)
+class CachedPage:
+    page: tuple[list[JournalEntryRow], bool] | None
+    generation: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class CachedCalendar:
+    days: list[CalendarDay] | None
+    generation: str | None
+
+
 class EntryCacheService(BaseCacheService):
     async def get_entry(self, user_id: UUID, entry_id: UUID) -> JournalEntryRow | None:
         data = await self._get(entry_key(user_id, entry_id))
@@ -38,30 +50,18 @@ class EntryCacheService(BaseCacheService):
             ENTRY_TTL_SECONDS,
         )
 
-    async def invalidate_entry(self, user_id: UUID, entry_id: UUID) -> None:
-        await self._delete(entry_key(user_id, entry_id))
-
     async def get_list(
         self,
         user_id: UUID,
         cursor: str | None,
         limit: int,
         journal_id: str | None = None,
-    ) -> tuple[list[JournalEntryRow], bool] | None:
-        data = await self._get(entry_list_key(user_id, cursor, limit, journal_id))
-        if data is None:
-            return None
-        try:
-            parsed: dict[str, object] = json.loads(data)
-            items_raw = parsed["items"]
-            has_more = parsed["has_more"]
-            if not isinstance(items_raw, list) or not isinstance(has_more, bool):
-                return None
-            rows = [JournalEntryRow.model_validate(item) for item in items_raw]
-            return rows, has_more
-        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
-            logger.warning("cache.list.deserialize_failed", user_id=str(user_id))
-            return None
+    ) -> CachedPage:
+        data, generation = await self._get_current(
+            generation_key(user_id, CacheFamily.ENTRY_LISTS),
+            entry_list_key(user_id, cursor, limit, journal_id),
+        )
+        return CachedPage(self._parse_page(data, user_id), generation)
 
     async def set_list(
         self,
@@ -71,16 +71,13 @@ class EntryCacheService(BaseCacheService):
         rows: list[JournalEntryRow],
         has_more: bool,
         journal_id: str | None = None,
+        *,
+        generation: str | None,
     ) -> None:
-        payload = json.dumps(
-            {
-                "items": [row.model_dump(mode="json") for row in rows],
-                "has_more": has_more,
-            }
-        )
-        await self._set(
+        await self._set_current(
             entry_list_key(user_id, cursor, limit, journal_id),
-            payload,
+            generation,
+            self._dump_page(rows, has_more),
             ENTRY_LIST_TTL_SECONDS,
         )
 
@@ -91,21 +88,12 @@ class EntryCacheService(BaseCacheService):
         cursor: str | None,
         limit: int,
         journal_id: str | None = None,
-    ) -> tuple[list[JournalEntryRow], bool] | None:
-        data = await self._get(search_key(user_id, query, cursor, limit, journal_id))
-        if data is None:
-            return None
-        try:
-            parsed: dict[str, object] = json.loads(data)
-            items_raw = parsed["items"]
-            has_more = parsed["has_more"]
-            if not isinstance(items_raw, list) or not isinstance(has_more, bool):
-                return None
-            rows = [JournalEntryRow.model_validate(item) for item in items_raw]
-            return rows, has_more
-        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
-            logger.warning("cache.search.deserialize_failed", user_id=str(user_id))
-            return None
+    ) -> CachedPage:
+        data, generation = await self._get_current(
+            generation_key(user_id, CacheFamily.ENTRY_SEARCHES),
+            search_key(user_id, query, cursor, limit, journal_id),
+        )
+        return CachedPage(self._parse_page(data, user_id), generation)
 
     async def set_search(
         self,
@@ -116,39 +104,16 @@ class EntryCacheService(BaseCacheService):
         rows: list[JournalEntryRow],
         has_more: bool,
         journal_id: str | None = None,
+        *,
+        generation: str | None,
     ) -> None:
-        payload = json.dumps(
-            {
-                "items": [row.model_dump(mode="json") for row in rows],
-                "has_more": has_more,
-            }
-        )
-        await self._set(
+        await self._set_current(
             search_key(user_id, query, cursor, limit, journal_id),
-            payload,
+            generation,
+            self._dump_page(rows, has_more),
             SEARCH_TTL_SECONDS,
         )
 
-    async def invalidate_user_lists(self, user_id: UUID) -> None:
-        pattern = entry_list_pattern(user_id)
-        count = await self._delete_pattern(pattern)
-        if count > 0:
-            logger.debug(
-                "cache.lists.invalidated",
-                user_id=str(user_id),
-                count=count,
-            )
-
-    async def invalidate_user_searches(self, user_id: UUID) -> None:
-        pattern = search_pattern(user_id)
-        count = await self._delete_pattern(pattern)
-        if count > 0:
-            logger.debug(
-                "cache.searches.invalidated",
-                user_id=str(user_id),
-                count=count,
-            )
-
     async def get_calendar(
         self,
         user_id: UUID,
@@ -156,16 +121,20 @@ class EntryCacheService(BaseCacheService):
         month: int,
         timezone: str = "UTC",
         journal_id: str | None = None,
-    ) -> list[CalendarDay] | None:
-        data = await self._get(calendar_key(user_id, year, month, timezone, journal_id))
+    ) -> CachedCalendar:
+        data, generation = await self._get_current(
+            generation_key(user_id, CacheFamily.CALENDARS),
+            calendar_key(user_id, year, month, timezone, journal_id),
+        )
         if data is None:
-            return None
+            return CachedCalendar(None, generation)
         try:
             parsed: list[object] = json.loads(data)
-            return [CalendarDay.model_validate(item) for item in parsed]
+            days = [CalendarDay.model_validate(item) for item in parsed]
         except (json.JSONDecodeError, TypeError, ValueError):
             logger.warning("cache.calendar.deserialize_failed", user_id=str(user_id))
-            return None
+            return CachedCalendar(None, generation)
+        return CachedCalendar(days, generation)
 
     async def set_calendar(
         self,
@@ -175,26 +144,38 @@ class EntryCacheService(BaseCacheService):
         days: list[CalendarDay],
         timezone: str = "UTC",
         journal_id: str | None = None,
+        *,
+        generation: str | None,
     ) -> None:
         payload = json.dumps([day.model_dump(mode="json") for day in days])
-        await self._set(
+        await self._set_current(
             calendar_key(user_id, year, month, timezone, journal_id),
+            generation,
             payload,
             CALENDAR_TTL_SECONDS,
         )
 
-    async def invalidate_user_calendars(self, user_id: UUID) -> None:
-        pattern = calendar_pattern(user_id)
-        count = await self._delete_pattern(pattern)
-        if count > 0:
-            logger.debug(
-                "cache.calendars.invalidated",
-                user_id=str(user_id),
-                count=count,
-            )
-
-    async def invalidate_all(self, user_id: UUID, entry_id: UUID) -> None:
-        await self.invalidate_entry(user_id, entry_id)
-        await self.invalidate_user_lists(user_id)
-        await self.invalidate_user_searches(user_id)
-        await self.invalidate_user_calendars(user_id)
+    @staticmethod
+    def _dump_page(rows: list[JournalEntryRow], has_more: bool) -> str:
+        return json.dumps(
+            {
+                "items": [row.model_dump(mode="json") for row in rows],
+                "has_more": has_more,
+            }
+        )
+
+    @staticmethod
+    def _parse_page(data: str | None, user_id: UUID) -> tuple[list[JournalEntryRow], bool] | None:
+        if data is None:
+            return None
+        try:
+            parsed: dict[str, object] = json.loads(data)
+            items_raw = parsed["items"]
+            has_more = parsed["has_more"]
+            if not isinstance(items_raw, list) or not isinstance(has_more, bool):
+                return None
+            rows = [JournalEntryRow.model_validate(item) for item in items_raw]
+            return rows, has_more
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            logger.warning("cache.page.deserialize_failed", user_id=str(user_id))
+            return None
@@ -0,0 +1,34 @@
+from enum import StrEnum
+
+
+class CacheEvent(StrEnum):
+    ENTRY_CREATED = "entry.created"
+    ENTRY_UPDATED = "entry.updated"
+    ENTRY_DELETED = "entry.deleted"
+    SPACE_CREATED = "space.created"
+    SPACE_UPDATED = "space.updated"
+    SPACE_DELETED = "space.deleted"
+    AI_PROFILE_UPDATED = "ai_profile.updated"
+    PROMPT_CREATED = "prompt.created"
+    PROMPT_UPDATED = "prompt.updated"
+    SESSION_CREATED = "session.created"
+    SESSION_UPDATED = "session.updated"
+    MEDIA_CREATED = "media.created"
+    MEDIA_UPDATED = "media.updated"
+    MEDIA_DELETED = "media.deleted"
+
+
+class CacheFamily(StrEnum):
+    ENTRY = "entry"
+    ENTRY_LISTS = "entries:list"
+    ENTRY_SEARCHES = "entries:search"
+    CALENDARS = "calendar"
+    SPACE = "space"
+    SPACE_LIST = "spaces:list"
+    DEFAULT_SPACE = "spaces:default"
+    AI_PROFILE = "ai:profile"
+    AI_CONTEXT_PROFILE = "ai:context:profile"
+    AI_CONTEXT_ACTIVITY = "ai:context:activity"
+    AI_CONTEXT_JOURNAL = "ai:context:journal"
+    PROMPT_QUEUE = "ai:context:next_prompt"
+    ACTIVE_CHECK_IN = "ai:check_in:active"
@@ -0,0 +1,60 @@
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from nstil.observability import get_logger
+from nstil.services.ai.prompt_queue import PromptQueue, prompt_queue_generation_key
+from nstil.services.cache.constants import GENERATION_TTL_SECONDS
+from nstil.services.cache.dependencies import dependents_of
+from nstil.services.cache.families import CacheEvent, CacheFamily
+from nstil.services.cache.keys import epoch_key, generation_key
+
+logger = get_logger("nstil.cache.invalidator")
+
+
+class CacheInvalidator:
+    def __init__(self, redis: aioredis.Redis, prompt_queue: PromptQueue | None = None) -> None:
+        self._redis = redis
+        self._prompt_queue = prompt_queue
+
+    async def invalidate(
+        self, user_id: UUID, event: CacheEvent, entity_id: UUID | None = None
+    ) -> None:
+        dependents = dependents_of(event)
+        families = frozenset(dep.family for dep in dependents)
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                if CacheFamily.PROMPT_QUEUE in families:
+                    key = prompt_queue_generation_key(user_id)
+                    pipe.incr(key)
+                    pipe.expire(key, GENERATION_TTL_SECONDS)
+                for dep in dependents:
+                    if dep.keys is None:
+                        key = generation_key(user_id, dep.family)
+                        pipe.incr(key)
+                        pipe.expire(key, GENERATION_TTL_SECONDS)
+                    elif keys := dep.keys(user_id, entity_id):
+                        pipe.delete(*keys)
+                await pipe.execute()
+        except Exception:
+            logger.warning(
+                "cache.invalidate.failed", user_id=str(user_id), cache_event=event.value
+            )
+        else:
+            logger.debug(
+                "cache.invalidated",
+                user_id=str(user_id),
+                cache_event=event.value,
+                families=sorted(families),
+            )
+
+        if CacheFamily.PROMPT_QUEUE in families and self._prompt_queue is not None:
+            await self._prompt_queue.schedule_refill(user_id)
+
+    async def invalidate_all(self) -> None:
+        try:
+            epoch = await self._redis.incr(epoch_key())
+        except Exception:
+            logger.warning("cache.invalidate_all.failed")
+        else:
+            logger.info("cache.invalidated_all", epoch=epoch)
@@ -52,3 +52,11 @@ def calendar_key(
 
 def calendar_pattern(user_id: UUID) -> str:
     return f"{KEY_PREFIX}:user:{user_id}:calendar:*"
+
+
+def generation_key(user_id: UUID, family: str) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:gen:{family}"
+
+
+def epoch_key() -> str:
+    return f"{KEY_PREFIX}:gen:epoch"
@@ -0,0 +1,28 @@
+from nstil.observability import get_logger
+from nstil.services.cache.base import BaseCacheService
+from nstil.services.cache.constants import SIGNED_URL_TTL_SECONDS
+from nstil.services.cache.media_keys import signed_url_key
+
+logger = get_logger("nstil.cache.media")
+
+
+class MediaCacheService(BaseCacheService):
+    async def get_signed_urls(self, paths: list[str]) -> list[str | None]:
+        if not paths:
+            return []
+        return await self._get_many(*(signed_url_key(path) for path in paths))
+
+    async def set_signed_urls(self, urls: dict[str, str]) -> None:
+        if not urls:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for path, url in urls.items():
+                    pipe.setex(signed_url_key(path), SIGNED_URL_TTL_SECONDS, url)
+                await pipe.execute()
+        except Exception:
+            logger.warning("cache.signed_urls.set_failed", count=len(urls))
+
+    async def delete_signed_urls(self, paths: list[str]) -> None:
+        if paths:
+            await self._delete(*(signed_url_key(path) for path in paths))
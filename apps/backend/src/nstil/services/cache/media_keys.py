@@ -0,0 +1,27 @@
+from uuid import UUID
+
+from nstil.services.cache.constants import KEY_PREFIX
+
+
+def signed_url_key(storage_path: str) -> str:
+    return f"{KEY_PREFIX}:media:url:{storage_path}"
+
+
+def upload_reservation_key(reservation_id: UUID) -> str:
+    return f"{KEY_PREFIX}:media:reservation:{reservation_id}"
+
+
+def upload_reservations_key() -> str:
+    return f"{KEY_PREFIX}:media:reservations"
+
+
+def resumable_upload_key(upload_id: UUID) -> str:
+    return f"{KEY_PREFIX}:media:resumable:{upload_id}"
+
+
+def resumable_offset_key(upload_id: UUID) -> str:
+    return f"{KEY_PREFIX}:media:resumable:{upload_id}:offset"
+
+
+def resumable_upload_lock_key(upload_id: UUID) -> str:
+    return f"{KEY_PREFIX}:media:resumable:{upload_id}:lock"
@@ -0,0 +1,166 @@
+import asyncio
+import contextlib
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Final
+from uuid import UUID
+
+from realtime import BroadcastPayload, RealtimeSubscribeStates
+from realtime._async.channel import AsyncRealtimeChannel
+from supabase import AsyncClient
+
+from nstil.observability import get_logger
+from nstil.services.cache.dependencies import event_for_row_change
+from nstil.services.cache.invalidator import CacheInvalidator
+
+logger = get_logger("nstil.cache.row_changes")
+
+ROW_CHANGE_TOPIC: Final[str] = "cache:row_changes"
+ROW_CHANGE_EVENT: Final[str] = "row_change"
+ROW_CHANGE_QUEUE_SIZE: Final[int] = 1000
+ROW_CHANGE_RETRY_BASE_SECONDS: Final[float] = 1.0
+ROW_CHANGE_RETRY_MAX_SECONDS: Final[float] = 60.0
+ROW_CHANGE_HEALTH_CHECK_SECONDS: Final[float] = 30.0
+
+
+@dataclass(frozen=True, slots=True)
+class RowChange:
+    table: str
+    user_id: UUID
+    row_id: UUID | None
+    op: str
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, object]) -> "RowChange | None":
+        try:
+            row_id = payload.get("id")
+            return cls(
+                table=str(payload["table"]),
+                user_id=UUID(str(payload["user_id"])),
+                row_id=UUID(str(row_id)) if row_id is not None else None,
+                op=str(payload["op"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+class RowChangeListener:
+    def __init__(
+        self,
+        supabase: AsyncClient,
+        invalidator: CacheInvalidator,
+        queue_size: int = ROW_CHANGE_QUEUE_SIZE,
+        retry_base_seconds: float = ROW_CHANGE_RETRY_BASE_SECONDS,
+        health_check_seconds: float = ROW_CHANGE_HEALTH_CHECK_SECONDS,
+    ) -> None:
+        self._supabase = supabase
+        self._invalidator = invalidator
+        self._queue: asyncio.Queue[RowChange] = asyncio.Queue(maxsize=queue_size)
+        self._retry_base_seconds = retry_base_seconds
+        self._health_check_seconds = health_check_seconds
+        self._channel: AsyncRealtimeChannel | None = None
+        self._dropped = asyncio.Event()
+        self._resync = asyncio.Event()
+        self._lost = False
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._consume()),
+                asyncio.create_task(self._supervise()),
+                asyncio.create_task(self._resync_all()),
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        await self._remove_channel()
+
+    async def handle(self, change: RowChange) -> None:
+        event = event_for_row_change(change.table, change.op)
+        if event is None:
+            return
+        await self._invalidator.invalidate(change.user_id, event, change.row_id)
+
+    def on_broadcast(self, message: BroadcastPayload) -> None:
+        change = RowChange.from_payload(message.get("payload", {}))
+        if change is None:
+            logger.warning("row_changes.malformed", payload=message.get("payload"))
+            return
+        try:
+            self._queue.put_nowait(change)
+        except asyncio.QueueFull:
+            logger.warning("row_changes.dropped", table=change.table, user_id=str(change.user_id))
+            self._resync.set()
+
+    def on_subscribe_state(
+        self, state: RealtimeSubscribeStates, error: Exception | None = None
+    ) -> None:
+        if state == RealtimeSubscribeStates.SUBSCRIBED:
+            logger.info("row_changes.listening", topic=ROW_CHANGE_TOPIC)
+            if self._lost:
+                self._lost = False
+                self._resync.set()
+            return
+        logger.warning("row_changes.channel_lost", state=state.value, error=str(error))
+        self._dropped.set()
+
+    async def _supervise(self) -> None:
+        attempt = 0
+        while True:
+            self._dropped.clear()
+            try:
+                await self._subscribe()
+            except Exception:
+                logger.warning("row_changes.subscribe_failed", attempt=attempt)
+            else:
+                attempt = 0
+                await self._watch()
+            self._lost = True
+            await self._remove_channel()
+            delay = min(self._retry_base_seconds * 2**attempt, ROW_CHANGE_RETRY_MAX_SECONDS)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _watch(self) -> None:
+        while self._channel is not None and not self._channel.is_closed:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._dropped.wait(), self._health_check_seconds)
+                return
+
+    async def _remove_channel(self) -> None:
+        if self._channel is not None:
+            with contextlib.suppress(Exception):
+                await self._supabase.remove_channel(self._channel)
+            self._channel = None
+
+    async def _consume(self) -> None:
+        while True:
+            change = await self._queue.get()
+            try:
+                await self.handle(change)
+            except Exception:
+                logger.warning(
+                    "row_changes.handle_failed", table=change.table, user_id=str(change.user_id)
+                )
+
+    async def _resync_all(self) -> None:
+        while True:
+            await self._resync.wait()
+            self._resync.clear()
+            logger.warning("row_changes.resync")
+            await self._invalidator.invalidate_all()
+
+    async def _subscribe(self) -> None:
+        channel = self._supabase.channel(
+            ROW_CHANGE_TOPIC,
+            {"config": {"broadcast": {"self": False}, "presence": None, "private": True}},
+        )
+        channel.on_broadcast(ROW_CHANGE_EVENT, self.on_broadcast)
+        self._channel = channel
+        await channel.subscribe(self.on_subscribe_state)
@@ -1,15 +1,34 @@
 import json
+from dataclasses import dataclass
 from uuid import UUID
 
 from nstil.models.space import JournalSpaceRow
 from nstil.observability import get_logger
 from nstil.services.cache.base import BaseCacheService
-from nstil.services.cache.constants import ENTRY_LIST_TTL_SECONDS, ENTRY_TTL_SECONDS
-from nstil.services.cache.space_keys import space_key, space_list_key
+from nstil.services.cache.constants import (
+    DEFAULT_SPACE_TTL_SECONDS,
+    ENTRY_LIST_TTL_SECONDS,
+    ENTRY_TTL_SECONDS,
+)
+from nstil.services.cache.families import CacheFamily
+from nstil.services.cache.keys import generation_key
+from nstil.services.cache.space_keys import default_space_key, space_key, space_list_key
 
 logger = get_logger("nstil.cache.space")
 
 
+@dataclass(frozen=True, slots=True)
+class CachedSpaceList:
+    rows: list[JournalSpaceRow] | None
+    generation: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class CachedDefaultSpace:
+    row: JournalSpaceRow | None
+    generation: str | None
+
+
 class SpaceCacheService(BaseCacheService):
     async def get_space(self, user_id: UUID, space_id: UUID) -> JournalSpaceRow | None:
         data = await self._get(space_key(user_id, space_id))
@@ -24,11 +43,42 @@ class SpaceCacheService(BaseCacheService):
             ENTRY_TTL_SECONDS,
         )
 
-    async def invalidate_space(self, user_id: UUID, space_id: UUID) -> None:
-        await self._delete(space_key(user_id, space_id))
+    async def get_space_list(self, user_id: UUID) -> CachedSpaceList:
+        data, generation = await self._get_current(
+            generation_key(user_id, CacheFamily.SPACE_LIST), space_list_key(user_id)
+        )
+        return CachedSpaceList(self._parse_space_list(data, user_id), generation)
+
+    async def set_space_list(
+        self, user_id: UUID, rows: list[JournalSpaceRow], *, generation: str | None
+    ) -> None:
+        payload = json.dumps([row.model_dump(mode="json") for row in rows])
+        await self._set_current(
+            space_list_key(user_id),
+            generation,
+            payload,
+            ENTRY_LIST_TTL_SECONDS,
+        )
+
+    async def get_default_space(self, user_id: UUID) -> CachedDefaultSpace:
+        data, generation = await self._get_current(
+            generation_key(user_id, CacheFamily.DEFAULT_SPACE), default_space_key(user_id)
+        )
+        row = self._deserialize(JournalSpaceRow, data) if data is not None else None
+        return CachedDefaultSpace(row, generation)
 
-    async def get_space_list(self, user_id: UUID) -> list[JournalSpaceRow] | None:
-        data = await self._get(space_list_key(user_id))
+    async def set_default_space(
+        self, user_id: UUID, row: JournalSpaceRow, *, generation: str | None
+    ) -> None:
+        await self._set_current(
+            default_space_key(user_id),
+            generation,
+            self._serialize(row),
+            DEFAULT_SPACE_TTL_SECONDS,
+        )
+
+    @staticmethod
+    def _parse_space_list(data: str | None, user_id: UUID) -> list[JournalSpaceRow] | None:
         if data is None:
             return None
         try:
@@ -39,18 +89,3 @@ class SpaceCacheService(BaseCacheService):
         except (json.JSONDecodeError, TypeError, ValueError):
             logger.warning("cache.space_list.deserialize_failed", user_id=str(user_id))
             return None
-
-    async def set_space_list(self, user_id: UUID, rows: list[JournalSpaceRow]) -> None:
-        payload = json.dumps([row.model_dump(mode="json") for row in rows])
-        await self._set(
-            space_list_key(user_id),
-            payload,
-            ENTRY_LIST_TTL_SECONDS,
-        )
-
-    async def invalidate_space_list(self, user_id: UUID) -> None:
-        await self._delete(space_list_key(user_id))
-
-    async def invalidate_all(self, user_id: UUID, space_id: UUID) -> None:
-        await self.invalidate_space(user_id, space_id)
-        await self.invalidate_space_list(user_id)
@@ -11,5 +11,9 @@ def space_list_key(user_id: UUID) -> str:
     return f"{KEY_PREFIX}:user:{user_id}:spaces:list"
 
 
+def default_space_key(user_id: UUID) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}:spaces:default"
+
+
 def space_list_pattern(user_id: UUID) -> str:
     return f"{KEY_PREFIX}:user:{user_id}:spaces:*"
@@ -1,7 +1,23 @@
+import asyncio
+from datetime import UTC, datetime
 from uuid import UUID
 
-from nstil.models.ai_context import AIContextResponse
+from nstil.models.ai_context import (
+    AIContextActivity,
+    AIContextAggregates,
+    AIContextProfile,
+    AIContextResponse,
+    AIContextWindow,
+)
 from nstil.services.ai.context import AIContextService
+from nstil.services.ai.context_window import (
+    compute_aggregates,
+    slice_entries,
+    superset_shape,
+    window_covers,
+    window_dominates,
+    window_entries,
+)
 from nstil.services.cache.ai_cache import AICacheService
 
 
@@ -16,13 +32,81 @@ class CachedAIContextService:
         entry_limit: int = 10,
         days_back: int = 14,
     ) -> AIContextResponse:
-        cached = await self._cache.get_context(user_id, entry_limit, days_back)
+        now = datetime.now(UTC)
+        parts = await self._cache.get_context_parts(user_id, days_back)
+        cached_window = parts.window
+        if cached_window is not None and not window_dominates(
+            cached_window, entry_limit, days_back, now
+        ):
+            cached_window = None
+
+        profile, activity, window = await asyncio.gather(
+            self._profile(user_id, parts.profile, parts.profile_generation),
+            self._activity(user_id, parts.activity, parts.activity_generation),
+            self._window(user_id, entry_limit, days_back, cached_window, parts.generation),
+        )
+
+        entries = window_entries(window, days_back, now)
+        if window_covers(window, days_back, now):
+            aggregates = compute_aggregates(entries, now)
+        else:
+            aggregates = await self._aggregates(
+                user_id, days_back, parts.aggregates, parts.generation
+            )
+
+        return AIContextResponse(
+            recent_entries=slice_entries(entries, entry_limit),
+            mood_distribution=aggregates.mood_distribution,
+            recent_prompts=activity.recent_prompts,
+            recent_sessions=activity.recent_sessions,
+            stats=aggregates.stats,
+            profile=profile,
+        )
+
+    async def _profile(
+        self, user_id: UUID, cached: AIContextProfile | None, generation: str | None
+    ) -> AIContextProfile:
         if cached is not None:
             return cached
+        profile = await self._db.get_profile(user_id)
+        await self._cache.set_context_profile(user_id, profile, generation=generation)
+        return profile
 
-        context = await self._db.get_context(user_id, entry_limit, days_back)
-        await self._cache.set_context(user_id, entry_limit, days_back, context)
-        return context
+    async def _activity(
+        self, user_id: UUID, cached: AIContextActivity | None, generation: str | None
+    ) -> AIContextActivity:
+        if cached is not None:
+            return cached
+        activity = await self._db.get_activity(user_id)
+        await self._cache.set_context_activity(user_id, activity, generation=generation)
+        return activity
 
-    async def invalidate(self, user_id: UUID) -> None:
-        await self._cache.invalidate_context(user_id)
+    async def _aggregates(
+        self,
+        user_id: UUID,
+        days_back: int,
+        cached: AIContextAggregates | None,
+        generation: str | None,
+    ) -> AIContextAggregates:
+        if cached is not None:
+            return cached
+        aggregates = await self._db.get_aggregates(user_id, days_back)
+        await self._cache.set_context_aggregates(
+            user_id, days_back, aggregates, generation=generation
+        )
+        return aggregates
+
+    async def _window(
+        self,
+        user_id: UUID,
+        entry_limit: int,
+        days_back: int,
+        cached: AIContextWindow | None,
+        generation: str | None,
+    ) -> AIContextWindow:
+        if cached is not None:
+            return cached
+        superset_limit, superset_days = superset_shape(entry_limit, days_back)
+        window = await self._db.get_window(user_id, superset_limit, superset_days)
+        await self._cache.set_context_window(user_id, window, generation=generation)
+        return window
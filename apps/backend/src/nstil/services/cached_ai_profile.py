@@ -3,40 +3,44 @@ from uuid import UUID
 from nstil.models.ai_profile import UserAIProfileRow, UserAIProfileUpdate
 from nstil.services.ai.profile import AIProfileService
 from nstil.services.cache.ai_cache import AICacheService
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
 
 
 class CachedAIProfileService:
-    def __init__(self, db: AIProfileService, cache: AICacheService) -> None:
+    def __init__(
+        self, db: AIProfileService, cache: AICacheService, invalidator: CacheInvalidator
+    ) -> None:
         self._db = db
         self._cache = cache
+        self._invalidator = invalidator
 
     async def get(self, user_id: UUID) -> UserAIProfileRow | None:
         cached = await self._cache.get_profile(user_id)
-        if cached is not None:
-            return cached
+        if cached.row is not None:
+            return cached.row
 
         row = await self._db.get(user_id)
         if row is not None:
-            await self._cache.set_profile(user_id, row)
+            await self._cache.set_profile(user_id, row, generation=cached.generation)
         return row
 
     async def get_or_create(self, user_id: UUID) -> UserAIProfileRow | None:
         cached = await self._cache.get_profile(user_id)
-        if cached is not None:
-            return cached
+        if cached.row is not None:
+            return cached.row
 
         row = await self._db.get_or_create(user_id)
         if row is not None:
-            await self._cache.set_profile(user_id, row)
+            await self._cache.set_profile(user_id, row, generation=cached.generation)
         return row
 
     async def update(self, user_id: UUID, data: UserAIProfileUpdate) -> UserAIProfileRow | None:
         row = await self._db.update(user_id, data)
         if row is not None:
-            await self._cache.invalidate_profile(user_id)
-            await self._cache.invalidate_context(user_id)
+            await self._invalidator.invalidate(user_id, CacheEvent.AI_PROFILE_UPDATED)
         return row
 
     async def update_last_check_in(self, user_id: UUID, timestamp: str) -> None:
         await self._db.update_last_check_in(user_id, timestamp)
-        await self._cache.invalidate_profile(user_id)
+        await self._invalidator.invalidate(user_id, CacheEvent.AI_PROFILE_UPDATED)
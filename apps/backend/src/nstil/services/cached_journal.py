@@ -1,23 +1,42 @@
-from datetime import date
+from collections.abc import AsyncIterator
+from datetime import date, datetime
 from uuid import UUID
 
 from nstil.models.calendar import CalendarDay, CalendarParams, DailyMoodCount, MoodTrendParams
-from nstil.models.journal import JournalEntryCreate, JournalEntryRow, JournalEntryUpdate
+from nstil.models.journal import (
+    JournalEntryCreate,
+    JournalEntryDigest,
+    JournalEntryRow,
+    JournalEntryUpdate,
+    JournalEntryVersion,
+)
 from nstil.models.pagination import CursorParams, SearchParams
+from nstil.services.ai.insight_computations import week_start_for
+from nstil.services.ai.insight_scheduler import InsightScheduler
 from nstil.services.cache.entry_cache import EntryCacheService
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
 from nstil.services.journal import JournalService
 
 
 class CachedJournalService:
-    def __init__(self, db: JournalService, cache: EntryCacheService) -> None:
+    def __init__(
+        self,
+        db: JournalService,
+        cache: EntryCacheService,
+        invalidator: CacheInvalidator,
+        insight_scheduler: InsightScheduler | None = None,
+    ) -> None:
         self._db = db
         self._cache = cache
+        self._invalidator = invalidator
+        self._insight_scheduler = insight_scheduler
 
     async def create(self, user_id: UUID, data: JournalEntryCreate) -> JournalEntryRow:
         row = await self._db.create(user_id, data)
         await self._cache.set_entry(user_id, row.id, row)
-        await self._cache.invalidate_user_lists(user_id)
-        await self._cache.invalidate_user_calendars(user_id)
+        await self._invalidator.invalidate(user_id, CacheEvent.ENTRY_CREATED, row.id)
+        await self._schedule_insights(user_id, [row])
         return row
 
     async def get_by_id(self, user_id: UUID, entry_id: UUID) -> JournalEntryRow | None:
@@ -43,21 +62,32 @@ class CachedJournalService:
 
         journal_id_str = str(journal_id) if journal_id else None
         cached = await self._cache.get_list(user_id, params.cursor, params.limit, journal_id_str)
-        if cached is not None:
-            return cached
+        if cached.page is not None:
+            return cached.page
 
         rows, has_more = await self._db.list_entries(user_id, params, journal_id)
         await self._cache.set_list(
-            user_id, params.cursor, params.limit, rows, has_more, journal_id_str
+            user_id,
+            params.cursor,
+            params.limit,
+            rows,
+            has_more,
+            journal_id_str,
+            generation=cached.generation,
         )
         return rows, has_more
 
     async def update(
         self, user_id: UUID, entry_id: UUID, data: JournalEntryUpdate
     ) -> JournalEntryRow | None:
+        previous: JournalEntryRow | None = None
+        if self._insight_scheduler is not None and data.created_at is not None:
+            previous = await self.get_by_id(user_id, entry_id)
+
         row = await self._db.update(user_id, entry_id, data)
         if row is not None:
-            await self._cache.invalidate_all(user_id, entry_id)
+            await self._invalidator.invalidate(user_id, CacheEvent.ENTRY_UPDATED, entry_id)
+            await self._schedule_insights(user_id, [r for r in (previous, row) if r is not None])
         return row
 
     async def search(
@@ -70,8 +100,8 @@ class CachedJournalService:
         cached = await self._cache.get_search(
             user_id, params.query, params.cursor, params.limit, journal_id_str
         )
-        if cached is not None:
-            return cached
+        if cached.page is not None:
+            return cached.page
 
         rows, has_more = await self._db.search(user_id, params, journal_id)
         await self._cache.set_search(
@@ -82,6 +112,7 @@ class CachedJournalService:
             rows,
             has_more,
             journal_id_str,
+            generation=cached.generation,
         )
         return rows, has_more
 
@@ -90,12 +121,18 @@ class CachedJournalService:
         cached = await self._cache.get_calendar(
             user_id, params.year, params.month, params.timezone, journal_id_str
         )
-        if cached is not None:
-            return cached
+        if cached.days is not None:
+            return cached.days
 
         days = await self._db.get_calendar(user_id, params)
         await self._cache.set_calendar(
-            user_id, params.year, params.month, days, params.timezone, journal_id_str
+            user_id,
+            params.year,
+            params.month,
+            days,
+            params.timezone,
+            journal_id_str,
+            generation=cached.generation,
         )
         return days
 
@@ -104,8 +141,34 @@ class CachedJournalService:
     ) -> list[DailyMoodCount]:
         return await self._db.get_mood_trends(user_id, params)
 
+    async def list_entry_versions(
+        self,
+        user_id: UUID,
+        start_date: date,
+        end_date: date,
+    ) -> list[JournalEntryVersion]:
+        return await self._db.list_entry_versions(user_id, start_date, end_date)
+
+    def iter_entry_digests(
+        self, user_id: UUID, start: datetime, end: datetime
+    ) -> AsyncIterator[list[JournalEntryDigest]]:
+        return self._db.iter_entry_digests(user_id, start, end)
+
     async def soft_delete(self, user_id: UUID, entry_id: UUID) -> bool:
+        previous: JournalEntryRow | None = None
+        if self._insight_scheduler is not None:
+            previous = await self.get_by_id(user_id, entry_id)
+
         deleted = await self._db.soft_delete(user_id, entry_id)
         if deleted:
-            await self._cache.invalidate_all(user_id, entry_id)
+            await self._invalidator.invalidate(user_id, CacheEvent.ENTRY_DELETED, entry_id)
+            if previous is not None:
+                await self._schedule_insights(user_id, [previous])
         return deleted
+
+    async def _schedule_insights(self, user_id: UUID, rows: list[JournalEntryRow]) -> None:
+        if self._insight_scheduler is None or not rows:
+            return
+        await self._insight_scheduler.schedule(
+            user_id, [week_start_for(row.created_at) for row in rows]
+        )
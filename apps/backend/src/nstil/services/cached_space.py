@@ -1,7 +1,8 @@
 from uuid import UUID
 
 from nstil.models.space import JournalSpaceCreate, JournalSpaceRow, JournalSpaceUpdate
-from nstil.services.cache.entry_cache import EntryCacheService
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
 from nstil.services.cache.space_cache import SpaceCacheService
 from nstil.services.space import JournalSpaceService
 
@@ -11,16 +12,16 @@ class CachedSpaceService:
         self,
         db: JournalSpaceService,
         cache: SpaceCacheService,
-        entry_cache: EntryCacheService,
+        invalidator: CacheInvalidator,
     ) -> None:
         self._db = db
         self._cache = cache
-        self._entry_cache = entry_cache
+        self._invalidator = invalidator
 
     async def create(self, user_id: UUID, data: JournalSpaceCreate) -> JournalSpaceRow:
         row = await self._db.create(user_id, data)
         await self._cache.set_space(user_id, row.id, row)
-        await self._cache.invalidate_space_list(user_id)
+        await self._invalidator.invalidate(user_id, CacheEvent.SPACE_CREATED, row.id)
         return row
 
     async def get_by_id(self, user_id: UUID, space_id: UUID) -> JournalSpaceRow | None:
@@ -35,11 +36,11 @@ class CachedSpaceService:
 
     async def list_spaces(self, user_id: UUID) -> list[JournalSpaceRow]:
         cached = await self._cache.get_space_list(user_id)
-        if cached is not None:
-            return cached
+        if cached.rows is not None:
+            return cached.rows
 
         rows = await self._db.list_spaces(user_id)
-        await self._cache.set_space_list(user_id, rows)
+        await self._cache.set_space_list(user_id, rows, generation=cached.generation)
         return rows
 
     async def update(
@@ -47,16 +48,21 @@ class CachedSpaceService:
     ) -> JournalSpaceRow | None:
         row = await self._db.update(user_id, space_id, data)
         if row is not None:
-            await self._cache.invalidate_all(user_id, space_id)
+            await self._invalidator.invalidate(user_id, CacheEvent.SPACE_UPDATED, space_id)
         return row
 
     async def soft_delete(self, user_id: UUID, space_id: UUID) -> bool:
         deleted = await self._db.soft_delete(user_id, space_id)
         if deleted:
-            await self._cache.invalidate_all(user_id, space_id)
-            await self._entry_cache.invalidate_user_lists(user_id)
-            await self._entry_cache.invalidate_user_searches(user_id)
+            await self._invalidator.invalidate(user_id, CacheEvent.SPACE_DELETED, space_id)
         return deleted
 
     async def get_default(self, user_id: UUID) -> JournalSpaceRow | None:
-        return await self._db.get_default(user_id)
+        cached = await self._cache.get_default_space(user_id)
+        if cached.row is not None:
+            return cached.row
+
+        row = await self._db.get_default(user_id)
+        if row is not None:
+            await self._cache.set_default_space(user_id, row, generation=cached.generation)
+        return row
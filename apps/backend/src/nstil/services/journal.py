@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from datetime import UTC, date, datetime, timedelta
 from typing import Any
 from uuid import UUID
@@ -5,11 +6,27 @@ from zoneinfo import ZoneInfo
 
 from supabase import AsyncClient
 
-from nstil.models.calendar import CalendarDay, CalendarParams, DailyMoodCount, MoodTrendParams
-from nstil.models.journal import JournalEntryCreate, JournalEntryRow, JournalEntryUpdate
+from nstil.models.calendar import (
+    CalendarDay,
+    CalendarParams,
+    DailyMoodCount,
+    DailyMoodRollup,
+    MoodTrendParams,
+)
+from nstil.models.journal import (
+    JournalEntryCreate,
+    JournalEntryDigest,
+    JournalEntryRow,
+    JournalEntryUpdate,
+    JournalEntryVersion,
+)
 from nstil.models.pagination import CursorParams, SearchParams
 
 TABLE = "journal_entries"
+LIST_COLUMNS = "*, media_preview"
+DIGEST_COLUMNS = "id, created_at, mood_category, tags, entry_type, body"
+DIGEST_PAGE_SIZE = 500
+VERSION_COLUMNS = "id, created_at, updated_at"
 
 
 class JournalService:
@@ -60,7 +77,7 @@ class JournalService:
     ) -> tuple[list[JournalEntryRow], bool]:
         query = (
             self._client.table(TABLE)
-            .select("*")
+            .select(LIST_COLUMNS)
             .eq("user_id", str(user_id))
             .is_("deleted_at", "null")
             .order("is_pinned", desc=True)
@@ -125,7 +142,9 @@ class JournalService:
         if journal_id is not None:
             rpc_params["p_journal_id"] = str(journal_id)
 
-        result = await self._client.rpc("search_journal_entries", rpc_params).execute()
+        result = await (
+            self._client.rpc("search_journal_entries", rpc_params).select(LIST_COLUMNS).execute()
+        )
 
         data: list[dict[str, Any]] = result.data  # type: ignore[assignment]
         rows = [JournalEntryRow.model_validate(row) for row in data]
@@ -160,6 +179,96 @@ class JournalService:
         data: list[dict[str, Any]] = result.data  # type: ignore[assignment]
         return [DailyMoodCount.model_validate(row) for row in data]
 
+    async def get_daily_mood_rollups(
+        self,
+        user_ids: list[UUID],
+        start_date: date,
+        end_date: date,
+    ) -> list[DailyMoodRollup]:
+        rpc_params: dict[str, str | list[str]] = {
+            "p_user_ids": [str(uid) for uid in user_ids],
+            "p_start": start_date.isoformat(),
+            "p_end": end_date.isoformat(),
+        }
+        result = await self._client.rpc("get_daily_mood_rollups", rpc_params).execute()
+        data: list[dict[str, Any]] = result.data  # type: ignore[assignment]
+        return [DailyMoodRollup.model_validate(row) for row in data]
+
+    async def list_entry_versions(
+        self,
+        user_id: UUID,
+        start_date: date,
+        end_date: date,
+    ) -> list[JournalEntryVersion]:
+        range_start = datetime(start_date.year, start_date.month, start_date.day, tzinfo=UTC)
+        range_end = datetime(end_date.year, end_date.month, end_date.day, tzinfo=UTC) + timedelta(
+            days=1
+        )
+        return [
+            JournalEntryVersion.model_validate(row)
+            async for page in self._iter_entry_rows(
+                user_id, range_start, range_end, VERSION_COLUMNS, DIGEST_PAGE_SIZE
+            )
+            for row in page
+        ]
+
+    async def iter_entry_digests(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: datetime,
+        page_size: int = DIGEST_PAGE_SIZE,
+        columns: str = DIGEST_COLUMNS,
+    ) -> AsyncIterator[list[JournalEntryDigest]]:
+        async for page in self._iter_entry_rows(user_id, start, end, columns, page_size):
+            yield [JournalEntryDigest.model_validate(row) for row in page]
+
+    async def _iter_entry_rows(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: datetime,
+        columns: str,
+        page_size: int,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        last: dict[str, Any] | None = None
+        while True:
+            query = (
+                self._client.table(TABLE)
+                .select(columns)
+                .eq("user_id", str(user_id))
+                .is_("deleted_at", "null")
+                .gte("created_at", start.isoformat())
+                .lt("created_at", end.isoformat())
+                .order("created_at")
+                .order("id")
+                .limit(page_size)
+            )
+            if last is not None:
+                ts = datetime.fromisoformat(str(last["created_at"])).isoformat()
+                query = query.or_(f"created_at.gt.{ts},and(created_at.eq.{ts},id.gt.{last['id']})")
+
+            result = await query.execute()
+            page: list[dict[str, Any]] = result.data  # type: ignore[assignment]
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            last = page[-1]
+
+    async def has_revisions(self, user_id: UUID, since: datetime, created_until: datetime) -> bool:
+        result = await (
+            self._client.table(TABLE)
+            .select("id")
+            .eq("user_id", str(user_id))
+            .gt("updated_at", since.isoformat())
+            .lte("created_at", created_until.isoformat())
+            .limit(1)
+            .execute()
+        )
+        return bool(result.data)
+
     async def soft_delete(self, user_id: UUID, entry_id: UUID) -> bool:
         now = datetime.now(UTC).isoformat()
         result = await (
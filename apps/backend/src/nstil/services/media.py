@@ -1,6 +1,13 @@
+import asyncio
+import hashlib
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import UUID, uuid4
 
+from postgrest.exceptions import APIError
+from storage3.utils import StorageException
 from supabase import AsyncClient
 
 from nstil.models.media import (
@@ -8,17 +15,38 @@ from nstil.models.media import (
     MAX_AUDIO_DURATION_MS,
     MAX_AUDIO_PER_ENTRY,
     MAX_IMAGES_PER_ENTRY,
-    PREVIEW_LIMIT,
     EntryMediaRow,
     MediaPreview,
     MediaPreviewItem,
+    MediaPreviewRow,
+    MediaUploadReservation,
+    MediaUploadUrlRequest,
+    MediaUploadUrlResponse,
     is_audio_content_type,
     max_file_size_for_content_type,
 )
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
+from nstil.services.cache.media_cache import MediaCacheService
+from nstil.services.media_reservations import (
+    UPLOAD_RESERVATION_TTL_SECONDS,
+    MediaReservationStore,
+)
+from nstil.services.media_signer import MediaUrlSigner
+from nstil.services.media_variants import (
+    VARIANT_CONTENT_TYPE,
+    ImageVariant,
+    MediaVariantScheduler,
+    variant_path,
+)
+from nstil.services.media_waveform import MediaWaveformScheduler, waveform_from_amplitudes
 
 TABLE = "entry_media"
+OBJECTS_TABLE = "media_objects"
 BUCKET = "entry-media"
 SIGNED_URL_EXPIRY = 3600
+BATCH_UPLOAD_CONCURRENCY = 4
+MEDIA_LIMIT_ERROR_CODE = "NS002"
 
 
 class MediaUploadError(Exception):
@@ -41,46 +69,134 @@ class AudioDurationExceededError(MediaUploadError):
     pass
 
 
-class MediaService:
-    def __init__(self, client: AsyncClient) -> None:
-        self._client = client
+class UploadReservationNotFoundError(MediaUploadError):
+    pass
 
-    def _storage_path(self, user_id: UUID, entry_id: UUID, file_id: UUID, ext: str) -> str:
-        return f"{user_id}/{entry_id}/{file_id}{ext}"
 
-    async def _count_media_by_type(self, entry_id: UUID, audio: bool) -> int:
+class UploadNotReceivedError(MediaUploadError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class MediaSlots:
+    images: int
+    audio: int
+
+    def check_capacity(self, audio: bool, adding: int = 1) -> None:
+        if audio and self.audio + adding > MAX_AUDIO_PER_ENTRY:
+            msg = f"Maximum of {MAX_AUDIO_PER_ENTRY} audio file per entry"
+            raise MediaLimitExceededError(msg)
+        if not audio and self.images + adding > MAX_IMAGES_PER_ENTRY:
+            msg = f"Maximum of {MAX_IMAGES_PER_ENTRY} images per entry"
+            raise MediaLimitExceededError(msg)
+
+
+@dataclass(frozen=True, slots=True)
+class MediaUploadFile:
+    chunks: AsyncIterable[bytes]
+    file_name: str
+    content_type: str
+    width: int | None = None
+    height: int | None = None
+    duration_ms: int | None = None
+    waveform: list[float] | None = None
+
+
+class SizedChunks:
+    def __init__(self, chunks: AsyncIterable[bytes], max_bytes: int) -> None:
+        self._chunks = chunks
+        self._max_bytes = max_bytes
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    @property
+    def content_hash(self) -> str:
+        return self._digest.hexdigest()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._chunks:
+            self.size += len(chunk)
+            if self.size > self._max_bytes:
+                msg = f"File exceeds maximum size of {self._max_bytes} bytes"
+                raise FileTooLargeError(msg)
+            self._digest.update(chunk)
+            yield chunk
+
+
+class MediaService:
+    def __init__(
+        self,
+        client: AsyncClient,
+        url_cache: MediaCacheService | None = None,
+        signer: MediaUrlSigner | None = None,
+        invalidator: CacheInvalidator | None = None,
+        reservations: MediaReservationStore | None = None,
+        variants: MediaVariantScheduler | None = None,
+        waveforms: MediaWaveformScheduler | None = None,
+    ) -> None:
+        self._client = client
+        self._url_cache = url_cache
+        self._signer = signer
+        self._invalidator = invalidator
+        self._reservations = reservations
+        self._variants = variants
+        self._waveforms = waveforms
+
+    def _new_storage_path(
+        self, user_id: UUID, entry_id: UUID, file_id: UUID, content_type: str
+    ) -> str:
+        return f"{user_id}/{entry_id}/{file_id}{_extension_for_content_type(content_type)}"
+
+    async def _media_slots(self, entry_id: UUID) -> MediaSlots:
         result = await (
             self._client.table(TABLE)
-            .select("id, content_type")
+            .select("content_type")
             .eq("entry_id", str(entry_id))
             .execute()
         )
-        count = 0
+        images = audio = 0
         for item in result.data:
             raw: dict[str, Any] = item  # type: ignore[assignment]
-            if is_audio_content_type(str(raw["content_type"])) == audio:
-                count += 1
-        return count
-
-    async def _get_next_sort_order(self, entry_id: UUID) -> int:
-        result = await (
-            self._client.table(TABLE)
-            .select("sort_order")
-            .eq("entry_id", str(entry_id))
-            .order("sort_order", desc=True)
-            .limit(1)
-            .execute()
+            if is_audio_content_type(str(raw["content_type"])):
+                audio += 1
+            else:
+                images += 1
+        return MediaSlots(images=images, audio=audio)
+
+    async def _put_object(
+        self, storage_path: str, chunks: AsyncIterable[bytes], content_type: str
+    ) -> None:
+        storage = self._client.storage
+        response = await storage.session.post(
+            f"{self._client.storage_url}object/{BUCKET}/{storage_path}",
+            content=chunks,
+            headers={
+                **self._client.options.headers,
+                "content-type": content_type,
+                "x-upsert": "false",
+            },
         )
-        if not result.data:
-            return 0
-        row: dict[str, Any] = result.data[0]  # type: ignore[assignment]
-        return int(row["sort_order"]) + 1
+        response.raise_for_status()
+
+    async def _abort_transfers(
+        self, transfers: list[asyncio.Task[None]], storage_paths: list[str]
+    ) -> None:
+        for transfer in transfers:
+            transfer.cancel()
+        await asyncio.gather(*transfers, return_exceptions=True)
+        stored = [
+            path
+            for path, transfer in zip(storage_paths, transfers, strict=True)
+            if not transfer.cancelled() and transfer.exception() is None
+        ]
+        if stored:
+            await self._client.storage.from_(BUCKET).remove(stored)
 
     async def upload(
         self,
         user_id: UUID,
         entry_id: UUID,
-        file_bytes: bytes,
+        chunks: AsyncIterable[bytes],
         file_name: str,
         content_type: str,
         width: int | None = None,
@@ -88,63 +204,328 @@ class MediaService:
         duration_ms: int | None = None,
         waveform: list[float] | None = None,
     ) -> EntryMediaRow:
-        if content_type not in ALLOWED_CONTENT_TYPES:
-            msg = f"Content type '{content_type}' is not allowed"
-            raise InvalidMediaTypeError(msg)
-
-        max_size = max_file_size_for_content_type(content_type)
-        if len(file_bytes) > max_size:
-            msg = f"File exceeds maximum size of {max_size} bytes"
-            raise FileTooLargeError(msg)
-
-        is_audio = is_audio_content_type(content_type)
-
-        if is_audio:
-            if duration_ms is not None and duration_ms > MAX_AUDIO_DURATION_MS:
-                msg = f"Audio exceeds maximum duration of {MAX_AUDIO_DURATION_MS}ms"
-                raise AudioDurationExceededError(msg)
-
-            audio_count = await self._count_media_by_type(entry_id, audio=True)
-            if audio_count >= MAX_AUDIO_PER_ENTRY:
-                msg = f"Maximum of {MAX_AUDIO_PER_ENTRY} audio file per entry"
-                raise MediaLimitExceededError(msg)
-        else:
-            image_count = await self._count_media_by_type(entry_id, audio=False)
-            if image_count >= MAX_IMAGES_PER_ENTRY:
-                msg = f"Maximum of {MAX_IMAGES_PER_ENTRY} images per entry"
-                raise MediaLimitExceededError(msg)
-
-        ext = _extension_for_content_type(content_type)
-        file_id = uuid4()
-        storage_path = self._storage_path(user_id, entry_id, file_id, ext)
-        sort_order = await self._get_next_sort_order(entry_id)
-
-        await self._client.storage.from_(BUCKET).upload(
-            path=storage_path,
-            file=file_bytes,
-            file_options={"content-type": content_type},
+        is_audio = _validate_media(content_type, duration_ms)
+        storage_path = self._new_storage_path(user_id, entry_id, uuid4(), content_type)
+        body = SizedChunks(chunks, max_file_size_for_content_type(content_type))
+
+        transfer = asyncio.create_task(self._put_object(storage_path, body, content_type))
+        try:
+            (await self._media_slots(entry_id)).check_capacity(is_audio)
+            await transfer
+            (row,) = await self._insert_batch(
+                user_id,
+                entry_id,
+                [
+                    {
+                        "storage_path": storage_path,
+                        "file_name": file_name,
+                        "content_type": content_type,
+                        "size_bytes": body.size,
+                        "width": width,
+                        "height": height,
+                        "duration_ms": duration_ms,
+                        "waveform_peaks": _encode_waveform(waveform),
+                        "content_hash": body.content_hash,
+                    }
+                ],
+            )
+        except BaseException:
+            await self._abort_transfers([transfer], [storage_path])
+            raise
+
+        await self._remove_duplicates([storage_path], [row])
+        await self._publish_created(row, storage_path)
+        return row
+
+    async def upload_batch(
+        self, user_id: UUID, entry_id: UUID, files: list[MediaUploadFile]
+    ) -> list[EntryMediaRow]:
+        audio = sum(_validate_media(f.content_type, f.duration_ms) for f in files)
+        storage_paths = [
+            self._new_storage_path(user_id, entry_id, uuid4(), f.content_type) for f in files
+        ]
+        bodies = [
+            SizedChunks(f.chunks, max_file_size_for_content_type(f.content_type)) for f in files
+        ]
+        semaphore = asyncio.Semaphore(BATCH_UPLOAD_CONCURRENCY)
+
+        async def put(storage_path: str, body: SizedChunks, content_type: str) -> None:
+            async with semaphore:
+                await self._put_object(storage_path, body, content_type)
+
+        transfers = [
+            asyncio.create_task(put(path, body, f.content_type))
+            for path, body, f in zip(storage_paths, bodies, files, strict=True)
+        ]
+        try:
+            slots = await self._media_slots(entry_id)
+            slots.check_capacity(audio=True, adding=audio)
+            slots.check_capacity(audio=False, adding=len(files) - audio)
+            await asyncio.gather(*transfers)
+            rows = await self._insert_batch(
+                user_id,
+                entry_id,
+                [
+                    {
+                        "storage_path": path,
+                        "file_name": f.file_name,
+                        "content_type": f.content_type,
+                        "size_bytes": body.size,
+                        "width": f.width,
+                        "height": f.height,
+                        "duration_ms": f.duration_ms,
+                        "waveform_peaks": _encode_waveform(f.waveform),
+                        "content_hash": body.content_hash,
+                    }
+                    for path, body, f in zip(storage_paths, bodies, files, strict=True)
+                ],
+            )
+        except BaseException:
+            await self._abort_transfers(transfers, storage_paths)
+            raise
+
+        await self._remove_duplicates(storage_paths, rows)
+        if self._invalidator is not None:
+            await self._invalidator.invalidate(user_id, CacheEvent.MEDIA_CREATED)
+        await self._schedule_processing(rows, storage_paths)
+        return rows
+
+    async def _remove_duplicates(
+        self, storage_paths: list[str], rows: list[EntryMediaRow]
+    ) -> None:
+        duplicates = [
+            path for path, row in zip(storage_paths, rows, strict=True) if row.storage_path != path
+        ]
+        if duplicates:
+            await self._client.storage.from_(BUCKET).remove(duplicates)
+
+    async def _is_shared(self, media: EntryMediaRow) -> bool:
+        if media.content_hash is None:
+            return False
+        result = await (
+            self._client.table(OBJECTS_TABLE)
+            .select("ref_count")
+            .eq("user_id", str(media.user_id))
+            .eq("content_hash", media.content_hash)
+            .eq("storage_path", media.storage_path)
+            .limit(1)
+            .execute()
+        )
+        return bool(result.data)
+
+    async def _insert_batch(
+        self, user_id: UUID, entry_id: UUID, items: list[dict[str, Any]]
+    ) -> list[EntryMediaRow]:
+        try:
+            result = await self._client.rpc(
+                "insert_entry_media_batch",
+                {
+                    "p_user_id": str(user_id),
+                    "p_entry_id": str(entry_id),
+                    "p_items": items,
+                    "p_max_images": MAX_IMAGES_PER_ENTRY,
+                    "p_max_audio": MAX_AUDIO_PER_ENTRY,
+                },
+            ).execute()
+        except APIError as exc:
+            if exc.code == MEDIA_LIMIT_ERROR_CODE:
+                raise MediaLimitExceededError(exc.message or "Media limit exceeded") from exc
+            raise
+        data: list[dict[str, Any]] = result.data  # type: ignore[assignment]
+        return [EntryMediaRow.model_validate(row) for row in data]
+
+    async def _publish_created(self, row: EntryMediaRow, storage_path: str) -> None:
+        if self._invalidator is not None:
+            await self._invalidator.invalidate(row.user_id, CacheEvent.MEDIA_CREATED, row.id)
+        await self._schedule_processing([row], [storage_path])
+
+    async def _schedule_processing(
+        self, rows: list[EntryMediaRow], storage_paths: list[str]
+    ) -> None:
+        for row, storage_path in zip(rows, storage_paths, strict=True):
+            if not _needs_processing(row, storage_path):
+                continue
+            if is_audio_content_type(row.content_type):
+                if self._waveforms is not None:
+                    await self._waveforms.schedule(row.id, row.user_id)
+            elif self._variants is not None:
+                await self._variants.schedule(row.id, row.user_id)
+
+    async def download(self, storage_path: str) -> bytes:
+        return await self._client.storage.from_(BUCKET).download(storage_path)
+
+    async def store_variants(
+        self, media: EntryMediaRow, variants: dict[ImageVariant, bytes]
+    ) -> EntryMediaRow | None:
+        storage = self._client.storage.from_(BUCKET)
+        paths = {variant: variant_path(media.storage_path, variant) for variant in variants}
+        await asyncio.gather(
+            *(
+                storage.upload(
+                    path=paths[variant],
+                    file=data,
+                    file_options={"content-type": VARIANT_CONTENT_TYPE, "upsert": "true"},
+                )
+                for variant, data in variants.items()
+            )
         )
-
         result = await (
             self._client.table(TABLE)
-            .insert(
+            .update(
                 {
-                    "entry_id": str(entry_id),
-                    "user_id": str(user_id),
-                    "storage_path": storage_path,
-                    "file_name": file_name,
-                    "content_type": content_type,
-                    "size_bytes": len(file_bytes),
-                    "width": width,
-                    "height": height,
-                    "duration_ms": duration_ms,
-                    "waveform": waveform,
-                    "sort_order": sort_order,
+                    "thumbnail_path": paths.get(ImageVariant.THUMBNAIL),
+                    "medium_path": paths.get(ImageVariant.MEDIUM),
                 }
             )
+            .eq("id", str(media.id))
+            .eq("user_id", str(media.user_id))
             .execute()
         )
-        return EntryMediaRow.model_validate(result.data[0])
+        if not result.data:
+            if not await self._is_shared(media):
+                await storage.remove(list(paths.values()))
+            return None
+        row = EntryMediaRow.model_validate(result.data[0])
+        if self._invalidator is not None:
+            await self._invalidator.invalidate(row.user_id, CacheEvent.MEDIA_UPDATED, row.id)
+        return row
+
+    async def store_waveform(self, media: EntryMediaRow, peaks: bytes) -> EntryMediaRow | None:
+        result = await (
+            self._client.table(TABLE)
+            .update({"waveform_peaks": _bytea(peaks), "waveform": None})
+            .eq("id", str(media.id))
+            .eq("user_id", str(media.user_id))
+            .execute()
+        )
+        if not result.data:
+            return None
+        row = EntryMediaRow.model_validate(result.data[0])
+        if self._invalidator is not None:
+            await self._invalidator.invalidate(row.user_id, CacheEvent.MEDIA_UPDATED, row.id)
+        return row
+
+    def _require_reservations(self) -> MediaReservationStore:
+        if self._reservations is None:
+            msg = "Direct uploads are not configured"
+            raise RuntimeError(msg)
+        return self._reservations
+
+    async def check_declared_upload(self, entry_id: UUID, request: MediaUploadUrlRequest) -> None:
+        is_audio = _validate_media(request.content_type, request.duration_ms)
+        max_size = max_file_size_for_content_type(request.content_type)
+        if request.size_bytes > max_size:
+            msg = f"File exceeds maximum size of {max_size} bytes"
+            raise FileTooLargeError(msg)
+        (await self._media_slots(entry_id)).check_capacity(is_audio)
+
+    async def reserve_upload(
+        self, user_id: UUID, entry_id: UUID, request: MediaUploadUrlRequest
+    ) -> MediaUploadUrlResponse:
+        reservations = self._require_reservations()
+        await self.check_declared_upload(entry_id, request)
+
+        reservation_id = uuid4()
+        storage_path = self._new_storage_path(
+            user_id, entry_id, reservation_id, request.content_type
+        )
+        signed = await self._client.storage.from_(BUCKET).create_signed_upload_url(storage_path)
+        reservation = MediaUploadReservation(
+            id=reservation_id,
+            user_id=user_id,
+            entry_id=entry_id,
+            storage_path=storage_path,
+            file_name=request.file_name,
+            content_type=request.content_type,
+            size_bytes=request.size_bytes,
+            width=request.width,
+            height=request.height,
+            duration_ms=request.duration_ms,
+            waveform=request.waveform,
+            expires_at=datetime.now(UTC) + timedelta(seconds=UPLOAD_RESERVATION_TTL_SECONDS),
+        )
+        await reservations.save(reservation)
+        return MediaUploadUrlResponse(
+            reservation_id=reservation_id,
+            upload_url=signed["signed_url"],
+            token=signed["token"],
+            storage_path=storage_path,
+            expires_at=reservation.expires_at,
+        )
+
+    async def finalize_upload(
+        self, user_id: UUID, entry_id: UUID, reservation_id: UUID
+    ) -> EntryMediaRow:
+        reservations = self._require_reservations()
+        reservation = await reservations.get(reservation_id)
+        if (
+            reservation is None
+            or reservation.user_id != user_id
+            or reservation.entry_id != entry_id
+        ):
+            msg = "Upload reservation not found"
+            raise UploadReservationNotFoundError(msg)
+
+        size, content_type = await self._object_info(reservation.storage_path)
+        if size is None:
+            msg = "Uploaded object not found"
+            raise UploadNotReceivedError(msg)
+        if not await reservations.claim(reservation):
+            msg = "Upload reservation not found"
+            raise UploadReservationNotFoundError(msg)
+
+        try:
+            if content_type != reservation.content_type:
+                msg = f"Uploaded content type '{content_type}' does not match reservation"
+                raise InvalidMediaTypeError(msg)
+            max_size = max_file_size_for_content_type(reservation.content_type)
+            if size > max_size:
+                msg = f"File exceeds maximum size of {max_size} bytes"
+                raise FileTooLargeError(msg)
+            (await self._media_slots(entry_id)).check_capacity(
+                is_audio_content_type(reservation.content_type)
+            )
+            (row,) = await self._insert_batch(
+                user_id,
+                entry_id,
+                [
+                    {
+                        "storage_path": reservation.storage_path,
+                        "file_name": reservation.file_name,
+                        "content_type": reservation.content_type,
+                        "size_bytes": size,
+                        "width": reservation.width,
+                        "height": reservation.height,
+                        "duration_ms": reservation.duration_ms,
+                        "waveform_peaks": _encode_waveform(reservation.waveform),
+                    }
+                ],
+            )
+        except BaseException:
+            await self._client.storage.from_(BUCKET).remove([reservation.storage_path])
+            raise
+
+        await self._publish_created(row, reservation.storage_path)
+        return row
+
+    async def _object_info(self, storage_path: str) -> tuple[int | None, str | None]:
+        try:
+            info = await self._client.storage.from_(BUCKET).info(storage_path)
+        except StorageException:
+            return None, None
+        metadata: dict[str, Any] = info.get("metadata") or {}
+        size = info.get("size", metadata.get("size"))
+        content_type = info.get("content_type", metadata.get("mimetype"))
+        return (
+            int(size) if size is not None else None,
+            str(content_type) if content_type is not None else None,
+        )
+
+    async def collect_stale_uploads(self, now: datetime) -> int:
+        paths = await self._require_reservations().claim_expired(now)
+        if paths:
+            await self._client.storage.from_(BUCKET).remove(paths)
+        return len(paths)
 
     async def list_media(self, entry_id: UUID, user_id: UUID) -> list[EntryMediaRow]:
         result = await (
@@ -175,8 +556,6 @@ class MediaService:
         if media is None:
             return False
 
-        await self._client.storage.from_(BUCKET).remove([media.storage_path])
-
         await (
             self._client.table(TABLE)
             .delete()
@@ -184,71 +563,64 @@ class MediaService:
             .eq("user_id", str(user_id))
             .execute()
         )
+        if not await self._is_shared(media):
+            paths = [
+                path
+                for path in (media.storage_path, media.thumbnail_path, media.medium_path)
+                if path is not None
+            ]
+            await self._client.storage.from_(BUCKET).remove(paths)
+            if self._url_cache is not None:
+                await self._url_cache.delete_signed_urls(paths)
+        if self._invalidator is not None:
+            await self._invalidator.invalidate(user_id, CacheEvent.MEDIA_DELETED, media_id)
         return True
 
     async def create_signed_url(self, storage_path: str) -> str:
-        result = await self._client.storage.from_(BUCKET).create_signed_url(
-            path=storage_path,
-            expires_in=SIGNED_URL_EXPIRY,
-        )
-        return str(result["signedURL"])
+        urls = await self.create_signed_urls([storage_path])
+        return urls[0]
 
     async def create_signed_urls(self, paths: list[str]) -> list[str]:
         if not paths:
             return []
+        cached = (
+            await self._url_cache.get_signed_urls(paths)
+            if self._url_cache is not None
+            else [None] * len(paths)
+        )
+        missing = list(dict.fromkeys(p for p, url in zip(paths, cached, strict=True) if not url))
+        signed = await self._sign(missing)
+        if signed and self._url_cache is not None:
+            await self._url_cache.set_signed_urls(signed)
+        return [url or signed[path] for path, url in zip(paths, cached, strict=True)]
+
+    async def _sign(self, paths: list[str]) -> dict[str, str]:
+        if not paths:
+            return {}
+        if self._signer is not None:
+            return {path: self._signer.sign(BUCKET, path, SIGNED_URL_EXPIRY) for path in paths}
         results = await self._client.storage.from_(BUCKET).create_signed_urls(
             paths=paths,
             expires_in=SIGNED_URL_EXPIRY,
         )
-        return [str(r["signedURL"]) for r in results]
+        return {path: str(r["signedURL"]) for path, r in zip(paths, results, strict=True)}
 
-    async def get_previews_for_entries(
-        self, entry_ids: list[UUID], user_id: UUID
+    async def sign_previews(
+        self, previews: dict[UUID, MediaPreviewRow]
     ) -> dict[UUID, MediaPreview]:
-        if not entry_ids:
-            return {}
-
-        str_ids = [str(eid) for eid in entry_ids]
-        result = await (
-            self._client.table(TABLE)
-            .select("id, entry_id, storage_path, sort_order")
-            .eq("user_id", str(user_id))
-            .in_("entry_id", str_ids)
-            .order("sort_order")
-            .execute()
-        )
-
-        grouped: dict[UUID, list[dict[str, Any]]] = {}
-        for row_data in result.data:
-            raw: dict[str, Any] = row_data  # type: ignore[assignment]
-            eid = UUID(str(raw["entry_id"]))
-            grouped.setdefault(eid, []).append(raw)
-
-        all_preview_paths: list[str] = []
-        path_index_map: list[tuple[UUID, int]] = []
-
-        for eid, rows in grouped.items():
-            for i, raw in enumerate(rows[:PREVIEW_LIMIT]):
-                all_preview_paths.append(str(raw["storage_path"]))
-                path_index_map.append((eid, i))
-
-        signed_urls = await self.create_signed_urls(all_preview_paths)
-
-        url_map: dict[UUID, list[str]] = {}
-        for idx, (eid, _) in enumerate(path_index_map):
-            url_map.setdefault(eid, []).append(signed_urls[idx])
-
-        previews: dict[UUID, MediaPreview] = {}
-        for eid in entry_ids:
-            rows = grouped.get(eid, [])
-            urls = url_map.get(eid, [])
-            items = [
-                MediaPreviewItem(id=UUID(str(rows[i]["id"])), url=urls[i])
-                for i in range(len(urls))
-            ]
-            previews[eid] = MediaPreview(items=items, total_count=len(rows))
-
-        return previews
+        paths = [
+            item.thumbnail_path or item.storage_path
+            for preview in previews.values()
+            for item in preview.items
+        ]
+        urls = iter(await self.create_signed_urls(paths))
+        return {
+            entry_id: MediaPreview(
+                items=[MediaPreviewItem(id=item.id, url=next(urls)) for item in preview.items],
+                total_count=preview.total_count,
+            )
+            for entry_id, preview in previews.items()
+        }
 
 
 _EXTENSION_MAP: dict[str, str] = {
@@ -267,3 +639,32 @@ _EXTENSION_MAP: dict[str, str] = {
 
 def _extension_for_content_type(content_type: str) -> str:
     return _EXTENSION_MAP.get(content_type, ".bin")
+
+
+def _bytea(data: bytes) -> str:
+    return f"\\x{data.hex()}"
+
+
+def _encode_waveform(waveform: list[float] | None) -> str | None:
+    if not waveform:
+        return None
+    return _bytea(waveform_from_amplitudes(waveform))
+
+
+def _needs_processing(row: EntryMediaRow, storage_path: str) -> bool:
+    if row.storage_path == storage_path:
+        return True
+    if is_audio_content_type(row.content_type):
+        return row.waveform_peaks is None
+    return row.thumbnail_path is None
+
+
+def _validate_media(content_type: str, duration_ms: int | None) -> bool:
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        msg = f"Content type '{content_type}' is not allowed"
+        raise InvalidMediaTypeError(msg)
+    is_audio = is_audio_content_type(content_type)
+    if is_audio and duration_ms is not None and duration_ms > MAX_AUDIO_DURATION_MS:
+        msg = f"Audio exceeds maximum duration of {MAX_AUDIO_DURATION_MS}ms"
+        raise AudioDurationExceededError(msg)
+    return is_audio
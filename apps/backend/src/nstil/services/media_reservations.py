@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Final
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from nstil.models.media import MediaUploadReservation
+from nstil.services.cache.media_keys import upload_reservation_key, upload_reservations_key
+
+UPLOAD_RESERVATION_TTL_SECONDS: Final[int] = 7200
+STALE_UPLOAD_BATCH_SIZE: Final[int] = 100
+
+
+class MediaReservationStore:
+    def __init__(self, redis: aioredis.Redis) -> None:
+        self._redis = redis
+
+    async def save(self, reservation: MediaUploadReservation) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.setex(
+                upload_reservation_key(reservation.id),
+                UPLOAD_RESERVATION_TTL_SECONDS,
+                reservation.model_dump_json(),
+            )
+            pipe.zadd(
+                upload_reservations_key(),
+                {reservation.storage_path: reservation.expires_at.timestamp()},
+            )
+            await pipe.execute()
+
+    async def get(self, reservation_id: UUID) -> MediaUploadReservation | None:
+        raw: str | None = await self._redis.get(upload_reservation_key(reservation_id))
+        if raw is None:
+            return None
+        return MediaUploadReservation.model_validate_json(raw)
+
+    async def claim(self, reservation: MediaUploadReservation) -> bool:
+        removed: int = await self._redis.zrem(upload_reservations_key(), reservation.storage_path)
+        if removed:
+            await self._redis.delete(upload_reservation_key(reservation.id))
+        return removed > 0
+
+    async def claim_expired(
+        self, now: datetime, limit: int = STALE_UPLOAD_BATCH_SIZE
+    ) -> list[str]:
+        paths: list[str] = await self._redis.zrangebyscore(
+            upload_reservations_key(), "-inf", now.timestamp(), start=0, num=limit
+        )
+        if not paths:
+            return []
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for path in paths:
+                pipe.zrem(upload_reservations_key(), path)
+            removed: list[int] = await pipe.execute()
+        return [path for path, claimed in zip(paths, removed, strict=True) if claimed]
@@ -0,0 +1,283 @@
+import asyncio
+import contextlib
+import secrets
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, Final, Protocol, cast
+from uuid import UUID, uuid4
+
+import redis.asyncio as aioredis
+
+from nstil.models.media import (
+    EntryMediaRow,
+    MediaUploadUrlRequest,
+    ResumableUpload,
+    ResumableUploadResponse,
+)
+from nstil.observability import get_logger
+from nstil.services.cache.media_keys import (
+    resumable_offset_key,
+    resumable_upload_key,
+    resumable_upload_lock_key,
+)
+from nstil.services.media import (
+    FileTooLargeError,
+    MediaService,
+    MediaUploadError,
+    UploadNotReceivedError,
+    UploadReservationNotFoundError,
+)
+
+RESUMABLE_UPLOAD_TTL_SECONDS: Final[int] = 86400
+RESUMABLE_LOCK_TTL_SECONDS: Final[int] = 60
+RESUMABLE_LOCK_REFRESH_SECONDS: Final[float] = 20.0
+STAGING_READ_CHUNK_SIZE: Final[int] = 1024 * 1024
+STAGING_SUFFIX: Final[str] = ".part"
+
+logger = get_logger("nstil.media.resumable")
+
+_LUA_RELEASE_LOCK: Final[str] = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_LUA_REFRESH_LOCK: Final[str] = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class _RedisScript(Protocol):
+    async def __call__(self, keys: Sequence[str], args: Sequence[object]) -> int: ...
+
+
+class UploadOffsetMismatchError(MediaUploadError):
+    def __init__(self, offset: int) -> None:
+        self.offset = offset
+        super().__init__(f"Upload offset is {offset}")
+
+
+class UploadInProgressError(MediaUploadError):
+    pass
+
+
+class UploadExpiredError(UploadReservationNotFoundError):
+    pass
+
+
+@dataclass(slots=True)
+class UploadLock:
+    lost: bool = False
+
+    def check(self) -> None:
+        if self.lost:
+            msg = "Upload lock expired"
+            raise UploadInProgressError(msg)
+
+
+class ResumableUploadService:
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        media: MediaService,
+        staging_dir: Path,
+        lock_refresh_seconds: float = RESUMABLE_LOCK_REFRESH_SECONDS,
+    ) -> None:
+        self._redis = redis
+        self._media = media
+        self._staging_dir = staging_dir
+        self._lock_refresh_seconds = lock_refresh_seconds
+        self._scripts: dict[str, _RedisScript] = {}
+
+    def _staging_path(self, upload_id: UUID) -> Path:
+        return self._staging_dir / f"{upload_id}{STAGING_SUFFIX}"
+
+    async def create(
+        self, user_id: UUID, entry_id: UUID, request: MediaUploadUrlRequest
+    ) -> ResumableUploadResponse:
+        await self._media.check_declared_upload(entry_id, request)
+        now = datetime.now(UTC)
+        upload = ResumableUpload(
+            id=uuid4(),
+            user_id=user_id,
+            entry_id=entry_id,
+            file_name=request.file_name,
+            content_type=request.content_type,
+            size_bytes=request.size_bytes,
+            width=request.width,
+            height=request.height,
+            duration_ms=request.duration_ms,
+            waveform=request.waveform,
+            expires_at=now + timedelta(seconds=RESUMABLE_UPLOAD_TTL_SECONDS),
+        )
+        await asyncio.to_thread(self._prepare_staging, upload.id, now)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.setex(
+                resumable_upload_key(upload.id),
+                RESUMABLE_UPLOAD_TTL_SECONDS,
+                upload.model_dump_json(),
+            )
+            pipe.setex(resumable_offset_key(upload.id), RESUMABLE_UPLOAD_TTL_SECONDS, 0)
+            await pipe.execute()
+        return _response(upload, 0)
+
+    async def status(
+        self, user_id: UUID, entry_id: UUID, upload_id: UUID
+    ) -> ResumableUploadResponse:
+        upload, offset = await self._load(user_id, entry_id, upload_id)
+        return _response(upload, offset)
+
+    async def append(
+        self,
+        user_id: UUID,
+        entry_id: UUID,
+        upload_id: UUID,
+        offset: int,
+        chunks: AsyncIterable[bytes],
+    ) -> int:
+        async with self._locked(upload_id) as lock:
+            upload, current = await self._load(user_id, entry_id, upload_id)
+            if offset != current:
+                raise UploadOffsetMismatchError(current)
+            written = 0
+            handle = await self._open_staged(upload_id, "r+b")
+            try:
+                await asyncio.to_thread(handle.truncate, current)
+                handle.seek(current)
+                async for chunk in chunks:
+                    if current + written + len(chunk) > upload.size_bytes:
+                        msg = f"Upload exceeds declared size of {upload.size_bytes} bytes"
+                        raise FileTooLargeError(msg)
+                    lock.check()
+                    await asyncio.to_thread(handle.write, chunk)
+                    written += len(chunk)
+            finally:
+                await asyncio.to_thread(handle.close)
+                await self._record_offset(upload_id, current + written)
+            return current + written
+
+    async def complete(self, user_id: UUID, entry_id: UUID, upload_id: UUID) -> EntryMediaRow:
+        async with self._locked(upload_id) as lock:
+            upload, offset = await self._load(user_id, entry_id, upload_id)
+            if offset < upload.size_bytes:
+                msg = f"Upload incomplete: {offset} of {upload.size_bytes} bytes received"
+                raise UploadNotReceivedError(msg)
+            handle = await self._open_staged(upload_id, "rb")
+            try:
+                row = await self._media.upload(
+                    user_id=user_id,
+                    entry_id=entry_id,
+                    chunks=self._read_staged(handle, lock),
+                    file_name=upload.file_name,
+                    content_type=upload.content_type,
+                    width=upload.width,
+                    height=upload.height,
+                    duration_ms=upload.duration_ms,
+                    waveform=upload.waveform,
+                )
+            finally:
+                await asyncio.to_thread(handle.close)
+            await self._discard(upload_id)
+            return row
+
+    async def abort(self, user_id: UUID, entry_id: UUID, upload_id: UUID) -> None:
+        async with self._locked(upload_id):
+            await self._load(user_id, entry_id, upload_id)
+            await self._discard(upload_id)
+
+    async def _load(
+        self, user_id: UUID, entry_id: UUID, upload_id: UUID
+    ) -> tuple[ResumableUpload, int]:
+        upload_json, offset = await self._redis.mget(
+            resumable_upload_key(upload_id), resumable_offset_key(upload_id)
+        )
+        if upload_json is None or offset is None:
+            msg = "Upload not found"
+            raise UploadReservationNotFoundError(msg)
+        upload = ResumableUpload.model_validate_json(upload_json)
+        if upload.user_id != user_id or upload.entry_id != entry_id:
+            msg = "Upload not found"
+            raise UploadReservationNotFoundError(msg)
+        return upload, int(offset)
+
+    async def _record_offset(self, upload_id: UUID, offset: int) -> None:
+        await self._redis.set(resumable_offset_key(upload_id), offset, xx=True, keepttl=True)
+
+    def _script(self, source: str) -> _RedisScript:
+        script = self._scripts.get(source)
+        if script is None:
+            script = cast(_RedisScript, self._redis.register_script(source))
+            self._scripts[source] = script
+        return script
+
+    @asynccontextmanager
+    async def _locked(self, upload_id: UUID) -> AsyncIterator[UploadLock]:
+        key = resumable_upload_lock_key(upload_id)
+        token = secrets.token_hex(16)
+        if not await self._redis.set(key, token, nx=True, ex=RESUMABLE_LOCK_TTL_SECONDS):
+            msg = "Another request is writing to this upload"
+            raise UploadInProgressError(msg)
+        lock = UploadLock()
+        refresher = asyncio.create_task(self._keep_locked(key, token, lock))
+        try:
+            yield lock
+        finally:
+            refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await refresher
+            await self._script(_LUA_RELEASE_LOCK)(keys=[key], args=[token])
+
+    async def _keep_locked(self, key: str, token: str, lock: UploadLock) -> None:
+        refresh = self._script(_LUA_REFRESH_LOCK)
+        while True:
+            await asyncio.sleep(self._lock_refresh_seconds)
+            if not await refresh(keys=[key], args=[token, RESUMABLE_LOCK_TTL_SECONDS]):
+                lock.lost = True
+                logger.warning("resumable.lock_lost", key=key)
+                return
+
+    async def _discard(self, upload_id: UUID) -> None:
+        await self._redis.delete(resumable_upload_key(upload_id), resumable_offset_key(upload_id))
+        await asyncio.to_thread(self._staging_path(upload_id).unlink, missing_ok=True)
+
+    async def _open_staged(self, upload_id: UUID, mode: str) -> BinaryIO:
+        path = self._staging_path(upload_id)
+        try:
+            return cast(BinaryIO, await asyncio.to_thread(path.open, mode))
+        except FileNotFoundError as exc:
+            logger.warning("resumable.staging_missing", upload_id=str(upload_id))
+            await self._discard(upload_id)
+            msg = "Upload expired, start a new upload"
+            raise UploadExpiredError(msg) from exc
+
+    async def _read_staged(self, handle: BinaryIO, lock: UploadLock) -> AsyncIterator[bytes]:
+        while chunk := await asyncio.to_thread(handle.read, STAGING_READ_CHUNK_SIZE):
+            lock.check()
+            yield chunk
+
+    def _prepare_staging(self, upload_id: UUID, now: datetime) -> None:
+        self._staging_dir.mkdir(parents=True, exist_ok=True)
+        cutoff = (now - timedelta(seconds=RESUMABLE_UPLOAD_TTL_SECONDS)).timestamp()
+        for path in self._staging_dir.glob(f"*{STAGING_SUFFIX}"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+            except OSError as exc:
+                logger.warning("resumable.sweep_failed", path=str(path), error=str(exc))
+        self._staging_path(upload_id).touch()
+
+
+def _response(upload: ResumableUpload, offset: int) -> ResumableUploadResponse:
+    return ResumableUploadResponse(
+        upload_id=upload.id,
+        offset=offset,
+        size_bytes=upload.size_bytes,
+        expires_at=upload.expires_at,
+    )
@@ -0,0 +1,22 @@
+import time
+from typing import Final
+from urllib.parse import quote
+
+import jwt
+
+SIGNING_ALGORITHM: Final[str] = "HS256"
+
+
+class MediaUrlSigner:
+    def __init__(self, supabase_url: str, jwt_secret: str) -> None:
+        self._base_url = f"{supabase_url.rstrip('/')}/storage/v1"
+        self._secret = jwt_secret
+
+    def sign(self, bucket: str, path: str, expires_in: int) -> str:
+        issued_at = int(time.time())
+        token = jwt.encode(
+            {"url": f"{bucket}/{path}", "iat": issued_at, "exp": issued_at + expires_in},
+            self._secret,
+            algorithm=SIGNING_ALGORITHM,
+        )
+        return f"{self._base_url}/object/sign/{bucket}/{quote(path)}?token={token}"
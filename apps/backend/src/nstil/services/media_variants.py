@@ -0,0 +1,70 @@
+import io
+from enum import StrEnum
+from typing import Final
+from uuid import UUID
+
+import pillow_heif
+from arq.connections import ArqRedis
+from PIL import Image, ImageOps
+
+from nstil.observability import get_logger
+
+logger = get_logger("nstil.media.variants")
+
+GENERATE_MEDIA_VARIANTS_TASK: Final[str] = "generate_media_variants"
+VARIANT_CONTENT_TYPE: Final[str] = "image/webp"
+VARIANT_WEBP_QUALITY: Final[int] = 80
+
+
+class ImageVariant(StrEnum):
+    THUMBNAIL = "thumb"
+    MEDIUM = "medium"
+
+
+VARIANT_MAX_EDGE: Final[dict[ImageVariant, int]] = {
+    ImageVariant.THUMBNAIL: 320,
+    ImageVariant.MEDIUM: 1280,
+}
+
+
+def media_variants_job_id(media_id: UUID) -> str:
+    return f"{GENERATE_MEDIA_VARIANTS_TASK}:{media_id}"
+
+
+def variant_path(storage_path: str, variant: ImageVariant) -> str:
+    stem, _, _ = storage_path.rpartition(".")
+    return f"{stem or storage_path}.{variant.value}.webp"
+
+
+def render_variants(data: bytes) -> dict[ImageVariant, bytes]:
+    pillow_heif.register_heif_opener()
+    largest = max(VARIANT_MAX_EDGE.values())
+    with Image.open(io.BytesIO(data)) as source:
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+        mode = "RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB"
+        image = image.convert(mode)
+
+    rendered: dict[ImageVariant, bytes] = {}
+    for variant, edge in sorted(VARIANT_MAX_EDGE.items(), key=lambda item: -item[1]):
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="WEBP", quality=VARIANT_WEBP_QUALITY, method=4)
+        rendered[variant] = buffer.getvalue()
+    return rendered
+
+
+class MediaVariantScheduler:
+    def __init__(self, queue: ArqRedis) -> None:
+        self._queue = queue
+
+    async def schedule(self, media_id: UUID, user_id: UUID) -> None:
+        try:
+            await self._queue.enqueue_job(
+                GENERATE_MEDIA_VARIANTS_TASK,
+                str(media_id),
+                str(user_id),
+                _job_id=media_variants_job_id(media_id),
+            )
+        except Exception:
+            logger.warning("media_variants.schedule_failed", media_id=str(media_id))
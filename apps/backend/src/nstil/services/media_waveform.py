@@ -0,0 +1,76 @@
+import io
+from typing import Final
+from uuid import UUID
+
+import av
+import numpy as np
+from arq.connections import ArqRedis
+from numpy.typing import NDArray
+
+from nstil.observability import get_logger
+
+logger = get_logger("nstil.media.waveform")
+
+GENERATE_MEDIA_WAVEFORM_TASK: Final[str] = "generate_media_waveform"
+WAVEFORM_BINS: Final[int] = 100
+WAVEFORM_LEVELS: Final[int] = 255
+WAVEFORM_SAMPLE_RATE: Final[int] = 8000
+
+
+class WaveformDecodeError(ValueError):
+    pass
+
+
+def media_waveform_job_id(media_id: UUID) -> str:
+    return f"{GENERATE_MEDIA_WAVEFORM_TASK}:{media_id}"
+
+
+def peak_envelope(samples: NDArray[np.float32], bins: int = WAVEFORM_BINS) -> NDArray[np.float32]:
+    if samples.size == 0:
+        return np.zeros(bins, dtype=np.float32)
+    edges = np.arange(bins, dtype=np.int64) * samples.size // bins
+    return np.maximum.reduceat(np.abs(samples), edges).astype(np.float32, copy=False)
+
+
+def quantize_peaks(envelope: NDArray[np.float32]) -> bytes:
+    levels = np.rint(np.clip(envelope, 0.0, 1.0) * WAVEFORM_LEVELS)
+    return levels.astype(np.uint8).tobytes()
+
+
+def waveform_from_amplitudes(amplitudes: list[float]) -> bytes:
+    return quantize_peaks(peak_envelope(np.asarray(amplitudes, dtype=np.float32)))
+
+
+def extract_waveform(data: bytes) -> bytes:
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=WAVEFORM_SAMPLE_RATE)
+    chunks: list[NDArray[np.float32]] = []
+    try:
+        with av.open(io.BytesIO(data), mode="r") as container:
+            stream = container.streams.audio[0]
+            for frame in container.decode(stream):
+                chunks.extend(out.to_ndarray()[0] for out in resampler.resample(frame))
+            chunks.extend(out.to_ndarray()[0] for out in resampler.resample(None))
+    except (av.FFmpegError, IndexError) as exc:
+        msg = f"Could not decode audio: {exc}"
+        raise WaveformDecodeError(msg) from exc
+
+    samples = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    envelope = peak_envelope(samples)
+    loudest = float(envelope.max())
+    return quantize_peaks(envelope / loudest if loudest > 0 else envelope)
+
+
+class MediaWaveformScheduler:
+    def __init__(self, queue: ArqRedis) -> None:
+        self._queue = queue
+
+    async def schedule(self, media_id: UUID, user_id: UUID) -> None:
+        try:
+            await self._queue.enqueue_job(
+                GENERATE_MEDIA_WAVEFORM_TASK,
+                str(media_id),
+                str(user_id),
+                _job_id=media_waveform_job_id(media_id),
+            )
+        except Exception:
+            logger.warning("media_waveform.schedule_failed", media_id=str(media_id))
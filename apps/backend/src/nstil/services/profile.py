@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 from uuid import UUID
 
@@ -8,6 +9,7 @@ from nstil.core.exceptions import ProfileCreationError
 from nstil.models.profile import ProfileRow, ProfileUpdate
 
 TABLE = "profiles"
+USER_ID_PAGE_SIZE = 500
 
 FK_VIOLATION_CODE = "23503"
 
@@ -54,6 +56,21 @@ class ProfileService:
             return None
         return ProfileRow.model_validate(result.data[0])
 
+    async def iter_user_ids(self, page_size: int = USER_ID_PAGE_SIZE) -> AsyncIterator[list[UUID]]:
+        last: str | None = None
+        while True:
+            query = self._client.table(TABLE).select("id").order("id").limit(page_size)
+            if last is not None:
+                query = query.gt("id", last)
+            result = await query.execute()
+            rows: list[dict[str, str]] = result.data  # type: ignore[assignment]
+            if not rows:
+                return
+            yield [UUID(row["id"]) for row in rows]
+            if len(rows) < page_size:
+                return
+            last = rows[-1]["id"]
+
     async def complete_onboarding(self, user_id: UUID) -> ProfileRow | None:
         result = await (
             self._client.table(TABLE)
@@ -1,4 +1,5 @@
 import redis.asyncio as aioredis
+from arq.connections import ArqRedis
 
 
 async def create_redis_pool(url: str, max_connections: int = 50) -> aioredis.Redis:
@@ -12,3 +13,8 @@ async def create_redis_pool(url: str, max_connections: int = 50) -> aioredis.Red
 
 async def close_redis_pool(pool: aioredis.Redis) -> None:
     await pool.aclose()
+
+
+async def create_job_queue(url: str) -> ArqRedis:
+    queue: ArqRedis = ArqRedis.from_url(url)
+    return queue
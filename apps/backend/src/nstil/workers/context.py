@@ -0,0 +1,176 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from arq.connections import ArqRedis
+
+from nstil.config import Settings
+from nstil.core.app_state import AppState
+from nstil.observability import configure_logging, get_logger
+from nstil.services.ai.context import AIContextService
+from nstil.services.ai.insight import AIInsightService
+from nstil.services.ai.insight_batch import BatchInsightEngine
+from nstil.services.ai.insight_engine import InsightEngine
+from nstil.services.ai.insight_scheduler import InsightScheduler
+from nstil.services.ai.mood_baseline import MoodBaselineService
+from nstil.services.ai.pattern_detection import PatternDetectionService
+from nstil.services.ai.period_summary import PeriodSummaryService
+from nstil.services.ai.prompt_queue import PromptQueue
+from nstil.services.cache import AICacheService, EntryCacheService
+from nstil.services.cache.invalidator import CacheInvalidator
+from nstil.services.cache.media_cache import MediaCacheService
+from nstil.services.cached_ai_context import CachedAIContextService
+from nstil.services.cached_journal import CachedJournalService
+from nstil.services.journal import JournalService
+from nstil.services.media import MediaService
+from nstil.services.media_reservations import MediaReservationStore
+from nstil.services.profile import ProfileService
+from nstil.services.redis import close_redis_pool, create_redis_pool
+from nstil.services.supabase import create_supabase_client
+
+logger = get_logger("nstil.workers")
+
+STATE_KEY = "state"
+SETTINGS_KEY = "settings"
+PROCESS_POOL_KEY = "process_pool"
+
+
+async def startup(ctx: dict[str, object]) -> None:
+    settings = Settings()
+    configure_logging(log_level=settings.log_level, log_format=settings.log_format)
+    redis = await create_redis_pool(settings.redis_url, settings.redis_max_connections)
+    supabase = await create_supabase_client(
+        settings.supabase_url,
+        settings.supabase_service_key.get_secret_value(),
+    )
+    job_queue = ctx.get("redis")
+    ctx[SETTINGS_KEY] = settings
+    ctx[PROCESS_POOL_KEY] = ProcessPoolExecutor(
+        max_workers=settings.media_variant_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    ctx[STATE_KEY] = AppState(
+        redis=redis,
+        supabase=supabase,
+        job_queue=job_queue if isinstance(job_queue, ArqRedis) else None,
+    )
+    logger.info("worker.startup", redis_url=settings.redis_url)
+
+
+async def shutdown(ctx: dict[str, object]) -> None:
+    state = ctx.get(STATE_KEY)
+    if isinstance(state, AppState):
+        await close_redis_pool(state.redis)
+    pool = ctx.get(PROCESS_POOL_KEY)
+    if isinstance(pool, ProcessPoolExecutor):
+        pool.shutdown(cancel_futures=True)
+    logger.info("worker.shutdown")
+
+
+def get_state(ctx: dict[str, object]) -> AppState:
+    state = ctx[STATE_KEY]
+    if not isinstance(state, AppState):
+        msg = "Worker context is missing application state"
+        raise RuntimeError(msg)
+    return state
+
+
+def get_settings(ctx: dict[str, object]) -> Settings:
+    settings = ctx[SETTINGS_KEY]
+    if not isinstance(settings, Settings):
+        msg = "Worker context is missing settings"
+        raise RuntimeError(msg)
+    return settings
+
+
+def get_process_pool(ctx: dict[str, object]) -> ProcessPoolExecutor:
+    pool = ctx[PROCESS_POOL_KEY]
+    if not isinstance(pool, ProcessPoolExecutor):
+        msg = "Worker context is missing the process pool"
+        raise RuntimeError(msg)
+    return pool
+
+
+def get_job_queue(ctx: dict[str, object]) -> ArqRedis:
+    queue = get_state(ctx).job_queue
+    if queue is None:
+        msg = "Worker context is missing the job queue"
+        raise RuntimeError(msg)
+    return queue
+
+
+def build_insight_scheduler(ctx: dict[str, object]) -> InsightScheduler:
+    return InsightScheduler(
+        get_state(ctx).redis,
+        get_job_queue(ctx),
+        get_settings(ctx).insight_quiet_period_seconds,
+    )
+
+
+def build_journal_service(ctx: dict[str, object]) -> CachedJournalService:
+    state = get_state(ctx)
+    return CachedJournalService(
+        JournalService(state.supabase),
+        EntryCacheService(state.redis),
+        CacheInvalidator(state.redis, PromptQueue(state.redis, state.job_queue)),
+    )
+
+
+def build_context_service(ctx: dict[str, object]) -> CachedAIContextService:
+    state = get_state(ctx)
+    return CachedAIContextService(AIContextService(state.supabase), AICacheService(state.redis))
+
+
+def build_insight_engine(ctx: dict[str, object]) -> InsightEngine:
+    state = get_state(ctx)
+    return InsightEngine(
+        AIInsightService(state.supabase),
+        build_context_service(ctx),
+        build_journal_service(ctx),
+        MoodBaselineService(state.supabase, JournalService(state.supabase)),
+    )
+
+
+def build_batch_insight_engine(ctx: dict[str, object]) -> BatchInsightEngine:
+    state = get_state(ctx)
+    journal = JournalService(state.supabase)
+    return BatchInsightEngine(
+        journal,
+        AIInsightService(state.supabase),
+        MoodBaselineService(state.supabase, journal),
+    )
+
+
+def build_profile_service(ctx: dict[str, object]) -> ProfileService:
+    return ProfileService(get_state(ctx).supabase)
+
+
+def build_period_summary_service(ctx: dict[str, object]) -> PeriodSummaryService:
+    state = get_state(ctx)
+    return PeriodSummaryService(JournalService(state.supabase), AIInsightService(state.supabase))
+
+
+def build_pattern_detection_service(ctx: dict[str, object]) -> PatternDetectionService:
+    state = get_state(ctx)
+    return PatternDetectionService(
+        state.supabase,
+        JournalService(state.supabase),
+        AIInsightService(state.supabase),
+    )
+
+
+def build_prompt_queue(ctx: dict[str, object]) -> PromptQueue:
+    return PromptQueue(get_state(ctx).redis)
+
+
+def build_uncached_context_service(ctx: dict[str, object]) -> AIContextService:
+    return AIContextService(get_state(ctx).supabase)
+
+
+def build_media_service(ctx: dict[str, object]) -> MediaService:
+    state = get_state(ctx)
+    return MediaService(
+        state.supabase,
+        MediaCacheService(state.redis),
+        invalidator=CacheInvalidator(state.redis),
+        reservations=MediaReservationStore(state.redis),
+    )
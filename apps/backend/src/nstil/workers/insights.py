@@ -0,0 +1,57 @@
+from datetime import UTC, datetime
+from uuid import UUID
+
+from arq import Retry
+
+from nstil.observability import get_logger
+from nstil.services.ai.insight_batch import BATCH_CHUNK_SIZE
+from nstil.workers.context import (
+    build_batch_insight_engine,
+    build_insight_engine,
+    build_insight_scheduler,
+    build_profile_service,
+    get_job_queue,
+)
+from nstil.workers.summaries import closed_periods, enqueue_period_summaries
+
+logger = get_logger("nstil.workers.insights")
+
+MAX_DEBOUNCE_DEFERRALS = 100
+
+
+async def recompute_weekly_insights(ctx: dict[str, object], user_id: str) -> int:
+    uid = UUID(user_id)
+    scheduler = build_insight_scheduler(ctx)
+
+    remaining = await scheduler.seconds_until_quiet(uid)
+    if remaining > 0:
+        raise Retry(defer=remaining)
+
+    weeks = await scheduler.claim_pending_weeks(uid)
+    rows = await build_insight_engine(ctx).recompute_weeks(uid, weeks)
+    months, years = closed_periods(weeks, datetime.now(UTC).date())
+    if months or years:
+        await enqueue_period_summaries(get_job_queue(ctx), uid, months, years)
+
+    logger.info(
+        "worker.insights.recomputed",
+        user_id=user_id,
+        weeks=[w.isoformat() for w in weeks],
+        insights_generated=len(rows),
+    )
+
+    if await scheduler.has_pending(uid):
+        raise Retry(defer=scheduler.quiet_period_seconds)
+
+    return len(rows)
+
+
+async def nightly_insights(ctx: dict[str, object]) -> int:
+    engine = build_batch_insight_engine(ctx)
+    today = datetime.now(UTC).date()
+    created = 0
+    async for user_ids in build_profile_service(ctx).iter_user_ids(BATCH_CHUNK_SIZE):
+        created += len(await engine.run(user_ids, today))
+
+    logger.info("worker.insights.nightly", insights_generated=created)
+    return created
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import UTC, datetime
+from uuid import UUID
+
+from nstil.models.media import is_audio_content_type
+from nstil.observability import get_logger
+from nstil.services.media_variants import render_variants
+from nstil.services.media_waveform import WaveformDecodeError, extract_waveform
+from nstil.workers.context import build_media_service, get_process_pool
+
+logger = get_logger("nstil.workers.media")
+
+COLLECT_STALE_UPLOADS_TASK = "collect_stale_uploads"
+
+
+async def collect_stale_uploads(ctx: dict[str, object]) -> int:
+    removed = await build_media_service(ctx).collect_stale_uploads(datetime.now(UTC))
+    if removed:
+        logger.info("worker.media.stale_uploads_removed", count=removed)
+    return removed
+
+
+async def generate_media_variants(ctx: dict[str, object], media_id: str, user_id: str) -> bool:
+    service = build_media_service(ctx)
+    media = await service.get_by_id(UUID(media_id), UUID(user_id))
+    if media is None or is_audio_content_type(media.content_type):
+        return False
+    if media.thumbnail_path is not None and media.medium_path is not None:
+        return False
+
+    original = await service.download(media.storage_path)
+    loop = asyncio.get_running_loop()
+    variants = await loop.run_in_executor(get_process_pool(ctx), render_variants, original)
+    stored = await service.store_variants(media, variants)
+    logger.info(
+        "worker.media.variants_stored",
+        media_id=media_id,
+        original_bytes=len(original),
+        variant_bytes={variant.value: len(data) for variant, data in variants.items()},
+        stored=stored is not None,
+    )
+    return stored is not None
+
+
+async def generate_media_waveform(ctx: dict[str, object], media_id: str, user_id: str) -> bool:
+    service = build_media_service(ctx)
+    media = await service.get_by_id(UUID(media_id), UUID(user_id))
+    if media is None or not is_audio_content_type(media.content_type):
+        return False
+
+    original = await service.download(media.storage_path)
+    loop = asyncio.get_running_loop()
+    try:
+        peaks = await loop.run_in_executor(get_process_pool(ctx), extract_waveform, original)
+    except WaveformDecodeError as exc:
+        logger.warning("worker.media.waveform_failed", media_id=media_id, error=str(exc))
+        return False
+    stored = await service.store_waveform(media, peaks)
+    logger.info(
+        "worker.media.waveform_stored",
+        media_id=media_id,
+        original_bytes=len(original),
+        peaks=len(peaks),
+        stored=stored is not None,
+    )
+    return stored is not None
@@ -0,0 +1,50 @@
+from typing import Final
+from uuid import UUID
+
+from nstil.models.ai_task import TaskType
+from nstil.observability import get_logger
+from nstil.services.ai.insight_batch import BATCH_CHUNK_SIZE
+from nstil.workers.context import (
+    build_pattern_detection_service,
+    build_profile_service,
+    get_job_queue,
+)
+
+logger = get_logger("nstil.workers.patterns")
+
+NIGHTLY_PATTERNS_TASK: Final[str] = "nightly_patterns"
+NIGHTLY_PATTERNS_HOUR: Final[int] = 3
+NIGHTLY_PATTERNS_MINUTE: Final[int] = 30
+
+
+def pattern_detection_job_id(user_id: UUID) -> str:
+    return f"{TaskType.PATTERN_DETECTION.value}:{user_id}"
+
+
+async def nightly_patterns(ctx: dict[str, object]) -> int:
+    queue = get_job_queue(ctx)
+    enqueued = 0
+    async for user_ids in build_profile_service(ctx).iter_user_ids(BATCH_CHUNK_SIZE):
+        for user_id in user_ids:
+            job = await queue.enqueue_job(
+                TaskType.PATTERN_DETECTION.value,
+                str(user_id),
+                _job_id=pattern_detection_job_id(user_id),
+            )
+            if job is not None:
+                enqueued += 1
+
+    logger.info("worker.patterns.scheduled", jobs=enqueued)
+    return enqueued
+
+
+async def pattern_detection(ctx: dict[str, object], user_id: str, full: bool = False) -> int:
+    rows = await build_pattern_detection_service(ctx).detect(UUID(user_id), full=full)
+
+    logger.info(
+        "worker.patterns.detected",
+        user_id=user_id,
+        full=full,
+        insights_generated=len(rows),
+    )
+    return len(rows)
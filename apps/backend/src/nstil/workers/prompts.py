@@ -0,0 +1,25 @@
+from typing import Final
+from uuid import UUID
+
+from nstil.observability import get_logger
+from nstil.services.ai.prompt_engine import plan_prompt_queue
+from nstil.workers.context import build_prompt_queue, build_uncached_context_service
+
+logger = get_logger("nstil.workers.prompts")
+
+PRECOMPUTE_MAX_ATTEMPTS: Final[int] = 3
+
+
+async def precompute_prompts(ctx: dict[str, object], user_id: str) -> int:
+    uid = UUID(user_id)
+    queue = build_prompt_queue(ctx)
+    context_service = build_uncached_context_service(ctx)
+    for _ in range(PRECOMPUTE_MAX_ATTEMPTS):
+        generation = await queue.generation(uid)
+        plans = plan_prompt_queue(await context_service.get_context(uid))
+        if await queue.store(uid, plans, generation):
+            logger.info("worker.prompts.precomputed", user_id=user_id, slots=sorted(plans))
+            return len(plans)
+
+    logger.warning("worker.prompts.superseded", user_id=user_id)
+    return 0
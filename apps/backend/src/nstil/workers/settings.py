@@ -1,11 +1,93 @@
+from arq import cron, func
 from arq.connections import RedisSettings
 
 from nstil.config import Settings
+from nstil.models.ai_task import TaskType
+from nstil.services.ai.insight_batch import (
+    NIGHTLY_INSIGHTS_HOUR,
+    NIGHTLY_INSIGHTS_TASK,
+    NIGHTLY_INSIGHTS_TIMEOUT_SECONDS,
+)
+from nstil.services.ai.insight_scheduler import RECOMPUTE_WEEKLY_INSIGHTS_TASK
+from nstil.services.ai.prompt_queue import PRECOMPUTE_PROMPTS_TASK
+from nstil.services.media_variants import GENERATE_MEDIA_VARIANTS_TASK
+from nstil.services.media_waveform import GENERATE_MEDIA_WAVEFORM_TASK
+from nstil.workers.context import shutdown, startup
+from nstil.workers.insights import (
+    MAX_DEBOUNCE_DEFERRALS,
+    nightly_insights,
+    recompute_weekly_insights,
+)
+from nstil.workers.media import (
+    COLLECT_STALE_UPLOADS_TASK,
+    collect_stale_uploads,
+    generate_media_variants,
+    generate_media_waveform,
+)
+from nstil.workers.patterns import (
+    NIGHTLY_PATTERNS_HOUR,
+    NIGHTLY_PATTERNS_MINUTE,
+    NIGHTLY_PATTERNS_TASK,
+    nightly_patterns,
+    pattern_detection,
+)
+from nstil.workers.prompts import precompute_prompts
+from nstil.workers.summaries import (
+    PERIOD_SUMMARIES_HOUR,
+    PERIOD_SUMMARIES_TASK,
+    monthly_summary,
+    period_summaries,
+    yearly_summary,
+)
 from nstil.workers.tasks import placeholder_task
 
 _settings = Settings()
 
 
 class WorkerSettings:
-    functions = [placeholder_task]
+    functions = [
+        placeholder_task,
+        func(
+            recompute_weekly_insights,
+            name=RECOMPUTE_WEEKLY_INSIGHTS_TASK,
+            keep_result=0,
+            max_tries=MAX_DEBOUNCE_DEFERRALS,
+        ),
+        func(monthly_summary, name=TaskType.MONTHLY_SUMMARY.value, keep_result=0),
+        func(yearly_summary, name=TaskType.YEARLY_SUMMARY.value, keep_result=0),
+        func(pattern_detection, name=TaskType.PATTERN_DETECTION.value, keep_result=0),
+        func(precompute_prompts, name=PRECOMPUTE_PROMPTS_TASK, keep_result=0),
+        func(generate_media_variants, name=GENERATE_MEDIA_VARIANTS_TASK, keep_result=0),
+        func(generate_media_waveform, name=GENERATE_MEDIA_WAVEFORM_TASK, keep_result=0),
+    ]
+    cron_jobs = [
+        cron(
+            collect_stale_uploads,
+            name=COLLECT_STALE_UPLOADS_TASK,
+            minute=set(range(0, 60, 15)),
+            run_at_startup=True,
+        ),
+        cron(
+            nightly_insights,
+            name=NIGHTLY_INSIGHTS_TASK,
+            hour=NIGHTLY_INSIGHTS_HOUR,
+            minute=0,
+            timeout=NIGHTLY_INSIGHTS_TIMEOUT_SECONDS,
+        ),
+        cron(
+            nightly_patterns,
+            name=NIGHTLY_PATTERNS_TASK,
+            hour=NIGHTLY_PATTERNS_HOUR,
+            minute=NIGHTLY_PATTERNS_MINUTE,
+        ),
+        cron(
+            period_summaries,
+            name=PERIOD_SUMMARIES_TASK,
+            day=1,
+            hour=PERIOD_SUMMARIES_HOUR,
+            minute=0,
+        ),
+    ]
+    on_startup = startup
+    on_shutdown = shutdown
     redis_settings = RedisSettings.from_dsn(_settings.redis_url)
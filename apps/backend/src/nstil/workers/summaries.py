@@ -0,0 +1,134 @@
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from typing import Final
+from uuid import UUID
+
+from arq.connections import ArqRedis
+
+from nstil.models.ai_task import TaskType
+from nstil.observability import get_logger
+from nstil.services.ai.insight_batch import BATCH_CHUNK_SIZE
+from nstil.workers.context import (
+    build_period_summary_service,
+    build_profile_service,
+    get_job_queue,
+)
+
+logger = get_logger("nstil.workers.summaries")
+
+PERIOD_SUMMARIES_TASK: Final[str] = "period_summaries"
+PERIOD_SUMMARIES_HOUR: Final[int] = 4
+
+
+def previous_month(reference: datetime) -> tuple[int, int]:
+    if reference.month == 1:
+        return reference.year - 1, 12
+    return reference.year, reference.month - 1
+
+
+def monthly_summary_job_id(user_id: UUID, year: int, month: int) -> str:
+    return f"{TaskType.MONTHLY_SUMMARY.value}:{user_id}:{year}-{month:02d}"
+
+
+def yearly_summary_job_id(user_id: UUID, year: int) -> str:
+    return f"{TaskType.YEARLY_SUMMARY.value}:{user_id}:{year}"
+
+
+def closed_periods(
+    week_starts: Iterable[date], today: date
+) -> tuple[set[tuple[int, int]], set[int]]:
+    months: set[tuple[int, int]] = set()
+    years: set[int] = set()
+    for week_start in week_starts:
+        for day in (week_start, week_start + timedelta(days=6)):
+            if (day.year, day.month) < (today.year, today.month):
+                months.add((day.year, day.month))
+            if day.year < today.year:
+                years.add(day.year)
+    return months, years
+
+
+async def enqueue_period_summaries(
+    queue: ArqRedis,
+    user_id: UUID,
+    months: Iterable[tuple[int, int]],
+    years: Iterable[int],
+) -> int:
+    enqueued = 0
+    for year, month in sorted(months):
+        job = await queue.enqueue_job(
+            TaskType.MONTHLY_SUMMARY.value,
+            str(user_id),
+            year,
+            month,
+            _job_id=monthly_summary_job_id(user_id, year, month),
+        )
+        enqueued += job is not None
+    for year in sorted(years):
+        job = await queue.enqueue_job(
+            TaskType.YEARLY_SUMMARY.value,
+            str(user_id),
+            year,
+            _job_id=yearly_summary_job_id(user_id, year),
+        )
+        enqueued += job is not None
+    return enqueued
+
+
+async def period_summaries(ctx: dict[str, object]) -> int:
+    now = datetime.now(UTC)
+    months = {previous_month(now)}
+    years = {now.year - 1} if now.month == 1 else set()
+    queue = get_job_queue(ctx)
+
+    enqueued = 0
+    async for user_ids in build_profile_service(ctx).iter_user_ids(BATCH_CHUNK_SIZE):
+        for user_id in user_ids:
+            enqueued += await enqueue_period_summaries(queue, user_id, months, years)
+
+    logger.info(
+        "worker.summaries.scheduled",
+        months=[f"{y}-{m:02d}" for y, m in sorted(months)],
+        years=sorted(years),
+        jobs=enqueued,
+    )
+    return enqueued
+
+
+async def monthly_summary(
+    ctx: dict[str, object],
+    user_id: str,
+    year: int | None = None,
+    month: int | None = None,
+) -> str | None:
+    if year is None or month is None:
+        year, month = previous_month(datetime.now(UTC))
+
+    row = await build_period_summary_service(ctx).summarize_month(UUID(user_id), year, month)
+
+    logger.info(
+        "worker.summaries.monthly",
+        user_id=user_id,
+        period=f"{year}-{month:02d}",
+        generated=row is not None,
+    )
+    return str(row.id) if row is not None else None
+
+
+async def yearly_summary(
+    ctx: dict[str, object],
+    user_id: str,
+    year: int | None = None,
+) -> str | None:
+    if year is None:
+        year = datetime.now(UTC).year - 1
+
+    row = await build_period_summary_service(ctx).summarize_year(UUID(user_id), year)
+
+    logger.info(
+        "worker.summaries.yearly",
+        user_id=user_id,
+        year=year,
+        generated=row is not None,
+    )
+    return str(row.id) if row is not None else None
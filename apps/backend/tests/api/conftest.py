@@ -11,6 +11,7 @@ from nstil.api.deps import (
     get_ai_profile_service,
     get_ai_prompt_service,
     get_breathing_service,
+    get_cache_invalidator,
     get_check_in_orchestrator,
     get_insight_engine,
     get_journal_service,
@@ -19,6 +20,7 @@ from nstil.api.deps import (
     get_profile_service,
     get_prompt_engine,
     get_redis,
+    get_resumable_upload_service,
     get_settings,
     get_space_service,
     get_supabase,
@@ -31,6 +33,7 @@ from nstil.services.ai.insight_engine import InsightEngine
 from nstil.services.ai.prompt import AIPromptService
 from nstil.services.ai.prompt_engine import PromptEngine
 from nstil.services.breathing import BreathingService
+from nstil.services.cache.invalidator import CacheInvalidator
 from nstil.services.cached_ai_context import CachedAIContextService
 from nstil.services.cached_ai_profile import CachedAIProfileService
 from nstil.services.cached_journal import CachedJournalService
@@ -38,11 +41,13 @@ from nstil.services.cached_notification import CachedNotificationService
 from nstil.services.cached_profile import CachedProfileService
 from nstil.services.cached_space import CachedSpaceService
 from nstil.services.media import MediaService
+from nstil.services.media_resumable import ResumableUploadService
 from nstil.services.token_blacklist import TokenBlacklistService
 
 os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-service-key")
 os.environ.setdefault("SUPABASE_JWT_SECRET", "test-jwt-secret")
 os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("CACHE_ROW_CHANGES_ENABLED", "false")
 
 
 @pytest.fixture
@@ -70,10 +75,15 @@ def mock_space_service() -> AsyncMock:
 @pytest.fixture
 def mock_media_service() -> AsyncMock:
     mock = AsyncMock(spec=MediaService)
-    mock.get_previews_for_entries.return_value = {}
+    mock.sign_previews.return_value = {}
     return mock
 
 
+@pytest.fixture
+def mock_resumable_upload_service() -> AsyncMock:
+    return AsyncMock(spec=ResumableUploadService)
+
+
 @pytest.fixture
 def mock_check_in_orchestrator() -> AsyncMock:
     return AsyncMock(spec=CheckInOrchestrator)
@@ -114,6 +124,11 @@ def mock_prompt_engine() -> AsyncMock:
     return AsyncMock(spec=PromptEngine)
 
 
+@pytest.fixture
+def mock_cache_invalidator() -> AsyncMock:
+    return AsyncMock(spec=CacheInvalidator)
+
+
 @pytest.fixture
 def mock_profile_service() -> AsyncMock:
     return AsyncMock(spec=CachedProfileService)
@@ -139,6 +154,7 @@ def client(
     mock_journal_service: AsyncMock,
     mock_space_service: AsyncMock,
     mock_media_service: AsyncMock,
+    mock_resumable_upload_service: AsyncMock,
     mock_breathing_service: AsyncMock,
     mock_check_in_orchestrator: AsyncMock,
     mock_insight_engine: AsyncMock,
@@ -148,6 +164,7 @@ def client(
     mock_ai_context_service: AsyncMock,
     mock_ai_prompt_service: AsyncMock,
     mock_prompt_engine: AsyncMock,
+    mock_cache_invalidator: AsyncMock,
     mock_profile_service: AsyncMock,
     mock_token_blacklist: AsyncMock,
 ) -> Iterator[TestClient]:
@@ -161,6 +178,7 @@ def client(
     app.dependency_overrides[get_journal_service] = lambda: mock_journal_service
     app.dependency_overrides[get_space_service] = lambda: mock_space_service
     app.dependency_overrides[get_media_service] = lambda: mock_media_service
+    app.dependency_overrides[get_resumable_upload_service] = lambda: mock_resumable_upload_service
     app.dependency_overrides[get_breathing_service] = lambda: mock_breathing_service
     app.dependency_overrides[get_check_in_orchestrator] = lambda: mock_check_in_orchestrator
     app.dependency_overrides[get_insight_engine] = lambda: mock_insight_engine
@@ -170,6 +188,7 @@ def client(
     app.dependency_overrides[get_ai_context_service] = lambda: mock_ai_context_service
     app.dependency_overrides[get_ai_prompt_service] = lambda: mock_ai_prompt_service
     app.dependency_overrides[get_prompt_engine] = lambda: mock_prompt_engine
+    app.dependency_overrides[get_cache_invalidator] = lambda: mock_cache_invalidator
     app.dependency_overrides[get_profile_service] = lambda: mock_profile_service
     app.dependency_overrides[get_token_blacklist] = lambda: mock_token_blacklist
     with TestClient(app) as c:
@@ -64,7 +64,7 @@ def body_limit_client() -> Iterator[TestClient]:
         mock_journal.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
 
         mock_media = AsyncMock(spec=MediaService)
-        mock_media.get_previews_for_entries.return_value = {}
+        mock_media.sign_previews.return_value = {}
         mock_media.upload.return_value = make_media_row(entry_id=ENTRY_ID)
         mock_media.create_signed_url.return_value = "https://example.com/signed"
 
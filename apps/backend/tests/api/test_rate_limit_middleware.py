@@ -95,7 +95,7 @@ def rate_limit_client(
         mock_journal = AsyncMock(spec=CachedJournalService)
         mock_journal.list_entries.return_value = ([], False)
         mock_media = AsyncMock(spec=MediaService)
-        mock_media.get_previews_for_entries.return_value = {}
+        mock_media.sign_previews.return_value = {}
         app.dependency_overrides[get_journal_service] = lambda: mock_journal
         app.dependency_overrides[get_media_service] = lambda: mock_media
 
@@ -3,25 +3,32 @@ import io
 import pytest
 from fastapi import UploadFile
 
-from nstil.api.upload import UploadTooLargeError, read_upload_with_limit
+from nstil.api.upload import UploadTooLargeError, check_declared_size, iter_upload_with_limit
 
 _1KB = 1024
 
 
-def _make_upload_file(data: bytes, content_type: str = "image/jpeg") -> UploadFile:
+def _make_upload_file(
+    data: bytes, content_type: str = "image/jpeg", size: int | None = None
+) -> UploadFile:
     return UploadFile(
         file=io.BytesIO(data),
         filename="test.bin",
+        size=size,
         headers={"content-type": content_type},
     )
 
 
-class TestReadUploadWithLimit:
-    async def test_under_limit_returns_bytes(self) -> None:
+async def _drain(file: UploadFile, max_bytes: int) -> bytes:
+    return b"".join([chunk async for chunk in iter_upload_with_limit(file, max_bytes)])
+
+
+class TestIterUploadWithLimit:
+    async def test_under_limit_yields_bytes(self) -> None:
         payload = b"\xff\xd8\xff" + b"\x00" * 500
         file = _make_upload_file(payload)
 
-        result = await read_upload_with_limit(file, _1KB)
+        result = await _drain(file, _1KB)
 
         assert result == payload
 
@@ -29,7 +36,7 @@ class TestReadUploadWithLimit:
         payload = b"\x00" * _1KB
         file = _make_upload_file(payload)
 
-        result = await read_upload_with_limit(file, _1KB)
+        result = await _drain(file, _1KB)
 
         assert result == payload
         assert len(result) == _1KB
@@ -39,34 +46,49 @@ class TestReadUploadWithLimit:
         file = _make_upload_file(payload)
 
         with pytest.raises(UploadTooLargeError) as exc_info:
-            await read_upload_with_limit(file, _1KB)
+            await _drain(file, _1KB)
 
         assert exc_info.value.max_bytes == _1KB
 
-    async def test_empty_file_returns_empty_bytes(self) -> None:
+    async def test_empty_file_yields_nothing(self) -> None:
         file = _make_upload_file(b"")
 
-        result = await read_upload_with_limit(file, _1KB)
+        chunks = [chunk async for chunk in iter_upload_with_limit(file, _1KB)]
 
-        assert result == b""
+        assert chunks == []
 
-    async def test_large_file_stops_reading_early(self) -> None:
-        large_payload = b"\x00" * (_1KB * 100)
-        file = _make_upload_file(large_payload)
+    async def test_multi_chunk_stops_at_limit(self) -> None:
+        payload = b"\xab" * (5 * _1KB * _1KB)
+        file = _make_upload_file(payload)
+        received = 0
 
         with pytest.raises(UploadTooLargeError):
-            await read_upload_with_limit(file, _1KB)
+            async for chunk in iter_upload_with_limit(file, 2 * _1KB * _1KB):
+                received += len(chunk)
+
+        assert received == 2 * _1KB * _1KB
+        assert file.file.tell() < len(payload)
 
     async def test_multi_chunk_file_under_limit(self) -> None:
-        payload = b"\xab" * (64 * _1KB + 500)
+        payload = b"\xab" * (2 * _1KB * _1KB + 500)
         file = _make_upload_file(payload)
 
-        result = await read_upload_with_limit(file, 100 * _1KB)
+        chunks = [chunk async for chunk in iter_upload_with_limit(file, 3 * _1KB * _1KB)]
 
-        assert result == payload
+        assert len(chunks) == 3
+        assert b"".join(chunks) == payload
 
     async def test_error_includes_max_bytes_in_message(self) -> None:
         file = _make_upload_file(b"\x00" * 200)
 
         with pytest.raises(UploadTooLargeError, match="100 bytes"):
-            await read_upload_with_limit(file, 100)
+            await _drain(file, 100)
+
+
+class TestCheckDeclaredSize:
+    def test_rejects_declared_oversize(self) -> None:
+        with pytest.raises(UploadTooLargeError):
+            check_declared_size(_make_upload_file(b"", size=_1KB + 1), _1KB)
+
+    def test_accepts_unknown_size(self) -> None:
+        check_declared_size(_make_upload_file(b""), _1KB)
@@ -7,6 +7,7 @@ from nstil.models.ai_context import (
     AIContextResponse,
     AIContextStats,
 )
+from nstil.services.cache.families import CacheEvent
 from tests.factories import DEFAULT_USER_ID, make_ai_prompt_row, make_token
 
 AI_URL = "/api/v1/ai"
@@ -140,7 +141,12 @@ class TestGeneratePrompt:
 
 
 class TestUpdatePrompt:
-    def test_success(self, client: TestClient, mock_ai_prompt_service: AsyncMock) -> None:
+    def test_success(
+        self,
+        client: TestClient,
+        mock_ai_prompt_service: AsyncMock,
+        mock_cache_invalidator: AsyncMock,
+    ) -> None:
         row = make_ai_prompt_row(status="seen")
         mock_ai_prompt_service.update.return_value = row
 
@@ -152,8 +158,15 @@ class TestUpdatePrompt:
 
         assert response.status_code == 200
         assert response.json()["status"] == "seen"
-
-    def test_not_found(self, client: TestClient, mock_ai_prompt_service: AsyncMock) -> None:
+        mock_cache_invalidator.invalidate.assert_awaited_once()
+        assert mock_cache_invalidator.invalidate.call_args.args[1] == CacheEvent.PROMPT_UPDATED
+
+    def test_not_found(
+        self,
+        client: TestClient,
+        mock_ai_prompt_service: AsyncMock,
+        mock_cache_invalidator: AsyncMock,
+    ) -> None:
         mock_ai_prompt_service.update.return_value = None
 
         response = client.patch(
@@ -163,3 +176,4 @@ class TestUpdatePrompt:
         )
 
         assert response.status_code == 404
+        mock_cache_invalidator.invalidate.assert_not_called()
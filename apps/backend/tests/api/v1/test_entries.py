@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock
 
 from fastapi.testclient import TestClient
 
+from nstil.models.media import MediaPreview, MediaPreviewItem, MediaPreviewRow, MediaPreviewRowItem
 from tests.factories import DEFAULT_JOURNAL_ID, DEFAULT_USER_ID, make_entry_row, make_token
 
 ENTRIES_URL = "/api/v1/entries"
@@ -206,6 +207,35 @@ class TestListEntries:
         assert len(data["items"]) == 3
         assert data["has_more"] is False
 
+    def test_list_signs_embedded_previews(
+        self,
+        client: TestClient,
+        mock_journal_service: AsyncMock,
+        mock_media_service: AsyncMock,
+    ) -> None:
+        media_id = uuid.uuid4()
+        preview = MediaPreviewRow(
+            items=[MediaPreviewRowItem(id=media_id, storage_path="u/e/m.jpg")], total_count=4
+        )
+        with_media = make_entry_row(body="Media").model_copy(update={"media_preview": preview})
+        without_media = make_entry_row(body="Plain")
+        mock_journal_service.list_entries.return_value = ([with_media, without_media], False)
+        mock_media_service.sign_previews.return_value = {
+            with_media.id: MediaPreview(
+                items=[MediaPreviewItem(id=media_id, url="https://example.com/m")],
+                total_count=4,
+            )
+        }
+
+        response = client.get(ENTRIES_URL, headers=_auth_headers())
+
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert items[0]["media_preview"]["total_count"] == 4
+        assert items[0]["media_preview"]["items"][0]["url"] == "https://example.com/m"
+        assert items[1]["media_preview"] is None
+        mock_media_service.sign_previews.assert_awaited_once_with({with_media.id: preview})
+
     def test_list_with_pagination(
         self, client: TestClient, mock_journal_service: AsyncMock
     ) -> None:
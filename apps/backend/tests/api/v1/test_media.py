@@ -1,14 +1,26 @@
 import io
 import uuid
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock
 
 from fastapi.testclient import TestClient
 
-from nstil.models.media import MAX_IMAGE_FILE_SIZE_BYTES
+from nstil.api.upload import UploadTooLargeError
+from nstil.models.media import (
+    MAX_BATCH_UPLOAD_FILES,
+    MAX_IMAGE_FILE_SIZE_BYTES,
+    MAX_WAVEFORM_SAMPLES,
+    MediaUploadUrlResponse,
+    ResumableUploadResponse,
+)
 from nstil.services.media import (
     AudioDurationExceededError,
+    FileTooLargeError,
     MediaLimitExceededError,
+    UploadNotReceivedError,
+    UploadReservationNotFoundError,
 )
+from nstil.services.media_resumable import UploadExpiredError, UploadOffsetMismatchError
 from tests.factories import DEFAULT_USER_ID, make_entry_row, make_media_row, make_token
 
 ENTRY_ID = str(uuid.uuid4())
@@ -121,6 +133,47 @@ class TestUploadMedia:
         call_kwargs = mock_media_service.upload.call_args
         assert call_kwargs.kwargs["duration_ms"] is None
 
+    def test_upload_audio_passes_waveform(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        mock_media_service.upload.return_value = make_media_row(
+            entry_id=ENTRY_ID, content_type="audio/m4a"
+        )
+        mock_media_service.create_signed_url.return_value = "https://example.com/audio"
+
+        response = client.post(
+            MEDIA_URL,
+            files={"file": _m4a_file()},
+            data={"waveform": "[0.25, 1]"},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 201
+        assert mock_media_service.upload.call_args.kwargs["waveform"] == [0.25, 1.0]
+
+    def test_upload_invalid_waveform_returns_422(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+
+        for waveform in ('["loud"]', "[NaN]", "[2.0]", '{"a": 1}', "not json"):
+            response = client.post(
+                MEDIA_URL,
+                files={"file": _m4a_file()},
+                data={"waveform": waveform},
+                headers=_auth_headers(),
+            )
+            assert response.status_code == 422, waveform
+
+        mock_media_service.upload.assert_not_called()
+
     def test_upload_audio_duration_exceeded(
         self,
         client: TestClient,
@@ -237,6 +290,444 @@ class TestUploadMedia:
         assert "maximum size" in response.json()["detail"].lower()
         mock_media_service.upload.assert_not_called()
 
+    def test_upload_streams_chunks_to_service(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        received: list[bytes] = []
+
+        async def upload(**kwargs: object) -> object:
+            chunks = kwargs["chunks"]
+            received.extend([chunk async for chunk in chunks])  # type: ignore[attr-defined]
+            return make_media_row(entry_id=ENTRY_ID)
+
+        mock_media_service.upload.side_effect = upload
+        mock_media_service.create_signed_url.return_value = "https://example.com/signed"
+
+        response = client.post(
+            MEDIA_URL, files={"file": _jpeg_file(4096)}, headers=_auth_headers()
+        )
+
+        assert response.status_code == 201
+        assert len(b"".join(received)) == 4096
+
+    def test_upload_oversized_stream_returns_413(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        mock_media_service.upload.side_effect = UploadTooLargeError(MAX_IMAGE_FILE_SIZE_BYTES)
+
+        response = client.post(MEDIA_URL, files={"file": _jpeg_file()}, headers=_auth_headers())
+
+        assert response.status_code == 413
+
+
+class TestDirectUpload:
+    def test_upload_url_success(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        reservation_id = uuid.uuid4()
+        mock_media_service.reserve_upload.return_value = MediaUploadUrlResponse(
+            reservation_id=reservation_id,
+            upload_url="https://storage/upload/path?token=t",
+            token="t",
+            storage_path="user/entry/file.jpg",
+            expires_at=datetime.now(UTC),
+        )
+
+        response = client.post(
+            f"{MEDIA_URL}/upload-url",
+            json={"file_name": "photo.jpg", "content_type": "image/jpeg", "size_bytes": 1024},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["reservation_id"] == str(reservation_id)
+        assert data["token"] == "t"
+        request = mock_media_service.reserve_upload.call_args.args[2]
+        assert request.size_bytes == 1024
+
+    def test_upload_url_rejects_oversized_waveform(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+
+        response = client.post(
+            f"{MEDIA_URL}/upload-url",
+            json={
+                "file_name": "voice.m4a",
+                "content_type": "audio/m4a",
+                "size_bytes": 1024,
+                "waveform": [0.5] * (MAX_WAVEFORM_SAMPLES + 1),
+            },
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 422
+        mock_media_service.reserve_upload.assert_not_called()
+
+    def test_upload_url_oversized_returns_413(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        mock_media_service.reserve_upload.side_effect = FileTooLargeError("too large")
+
+        response = client.post(
+            f"{MEDIA_URL}/upload-url",
+            json={"file_name": "p.jpg", "content_type": "image/jpeg", "size_bytes": 10**9},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 413
+
+    def test_upload_url_entry_not_found(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = None
+
+        response = client.post(
+            f"{MEDIA_URL}/upload-url",
+            json={"file_name": "p.jpg", "content_type": "image/jpeg", "size_bytes": 1024},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 404
+        mock_media_service.reserve_upload.assert_not_called()
+
+    def test_finalize_success(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        mock_media_service.finalize_upload.return_value = make_media_row(entry_id=ENTRY_ID)
+        mock_media_service.create_signed_url.return_value = "https://example.com/signed"
+
+        response = client.post(
+            f"{MEDIA_URL}/finalize",
+            json={"reservation_id": str(uuid.uuid4())},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 201
+        assert response.json()["url"] == "https://example.com/signed"
+
+    def test_finalize_unknown_reservation(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        mock_media_service.finalize_upload.side_effect = UploadReservationNotFoundError("gone")
+
+        response = client.post(
+            f"{MEDIA_URL}/finalize",
+            json={"reservation_id": str(uuid.uuid4())},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 404
+
+    def test_finalize_before_upload_returns_409(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        mock_media_service.finalize_upload.side_effect = UploadNotReceivedError("missing")
+
+        response = client.post(
+            f"{MEDIA_URL}/finalize",
+            json={"reservation_id": str(uuid.uuid4())},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 409
+
+
+class TestResumableUpload:
+    def test_create_returns_upload_id(
+        self,
+        client: TestClient,
+        mock_resumable_upload_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        upload_id = uuid.uuid4()
+        mock_resumable_upload_service.create.return_value = ResumableUploadResponse(
+            upload_id=upload_id, offset=0, size_bytes=2048, expires_at=datetime.now(UTC)
+        )
+
+        response = client.post(
+            f"{MEDIA_URL}/resumable",
+            json={"file_name": "a.m4a", "content_type": "audio/m4a", "size_bytes": 2048},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 201
+        assert response.json()["upload_id"] == str(upload_id)
+
+    def test_head_reports_offset(
+        self,
+        client: TestClient,
+        mock_resumable_upload_service: AsyncMock,
+    ) -> None:
+        mock_resumable_upload_service.status.return_value = ResumableUploadResponse(
+            upload_id=uuid.uuid4(), offset=512, size_bytes=2048, expires_at=datetime.now(UTC)
+        )
+
+        response = client.head(f"{MEDIA_URL}/resumable/{uuid.uuid4()}", headers=_auth_headers())
+
+        assert response.status_code == 200
+        assert response.headers["Upload-Offset"] == "512"
+        assert response.headers["Upload-Length"] == "2048"
+
+    def test_patch_appends_body(
+        self,
+        client: TestClient,
+        mock_resumable_upload_service: AsyncMock,
+    ) -> None:
+        received: list[bytes] = []
+
+        async def append(*args: object) -> int:
+            received.extend([chunk async for chunk in args[4]])  # type: ignore[attr-defined]
+            return 512 + len(b"".join(received))
+
+        mock_resumable_upload_service.append.side_effect = append
+
+        response = client.patch(
+            f"{MEDIA_URL}/resumable/{uuid.uuid4()}",
+            content=b"x" * 256,
+            headers={
+                **_auth_headers(),
+                "Upload-Offset": "512",
+                "Content-Type": "application/offset+octet-stream",
+            },
+        )
+
+        assert response.status_code == 204
+        assert response.headers["Upload-Offset"] == "768"
+        assert mock_resumable_upload_service.append.call_args.args[3] == 512
+        assert b"".join(received) == b"x" * 256
+
+    def test_patch_offset_conflict_returns_current(
+        self,
+        client: TestClient,
+        mock_resumable_upload_service: AsyncMock,
+    ) -> None:
+        mock_resumable_upload_service.append.side_effect = UploadOffsetMismatchError(1024)
+
+        response = client.patch(
+            f"{MEDIA_URL}/resumable/{uuid.uuid4()}",
+            content=b"x",
+            headers={**_auth_headers(), "Upload-Offset": "0"},
+        )
+
+        assert response.status_code == 409
+        assert response.headers["Upload-Offset"] == "1024"
+
+    def test_patch_expired_staging_returns_410(
+        self,
+        client: TestClient,
+        mock_resumable_upload_service: AsyncMock,
+    ) -> None:
+        mock_resumable_upload_service.append.side_effect = UploadExpiredError("expired")
+
+        response = client.patch(
+            f"{MEDIA_URL}/resumable/{uuid.uuid4()}",
+            content=b"x",
+            headers={**_auth_headers(), "Upload-Offset": "0"},
+        )
+
+        assert response.status_code == 410
+
+    def test_patch_requires_offset_header(self, client: TestClient) -> None:
+        response = client.patch(
+            f"{MEDIA_URL}/resumable/{uuid.uuid4()}", content=b"x", headers=_auth_headers()
+        )
+
+        assert response.status_code == 422
+
+    def test_complete_returns_media(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_resumable_upload_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        mock_resumable_upload_service.complete.return_value = make_media_row(entry_id=ENTRY_ID)
+        mock_media_service.create_signed_url.return_value = "https://example.com/signed"
+
+        response = client.post(
+            f"{MEDIA_URL}/resumable/{uuid.uuid4()}/complete", headers=_auth_headers()
+        )
+
+        assert response.status_code == 201
+        assert response.json()["url"] == "https://example.com/signed"
+
+    def test_complete_incomplete_returns_409(
+        self,
+        client: TestClient,
+        mock_resumable_upload_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        mock_resumable_upload_service.complete.side_effect = UploadNotReceivedError("partial")
+
+        response = client.post(
+            f"{MEDIA_URL}/resumable/{uuid.uuid4()}/complete", headers=_auth_headers()
+        )
+
+        assert response.status_code == 409
+
+    def test_abort_unknown_returns_404(
+        self,
+        client: TestClient,
+        mock_resumable_upload_service: AsyncMock,
+    ) -> None:
+        mock_resumable_upload_service.abort.side_effect = UploadReservationNotFoundError("gone")
+
+        response = client.delete(f"{MEDIA_URL}/resumable/{uuid.uuid4()}", headers=_auth_headers())
+
+        assert response.status_code == 404
+
+
+class TestBatchUpload:
+    def test_batch_upload_success(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        rows = [make_media_row(entry_id=ENTRY_ID, sort_order=i) for i in range(2)]
+        mock_media_service.upload_batch.return_value = rows
+        mock_media_service.create_signed_urls.return_value = ["https://a", "https://b"]
+
+        response = client.post(
+            f"{MEDIA_URL}/batch",
+            files=[("files", _jpeg_file()), ("files", _m4a_file())],
+            data={"metadata": '[{"width": 10, "height": 20}, {"duration_ms": 5000}]'},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["count"] == 2
+        assert [item["url"] for item in data["items"]] == ["https://a", "https://b"]
+        files = mock_media_service.upload_batch.call_args.args[2]
+        assert [f.content_type for f in files] == ["image/jpeg", "audio/m4a"]
+        assert files[0].width == 10
+        assert files[1].duration_ms == 5000
+
+    def test_batch_rejects_invalid_waveform(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+
+        response = client.post(
+            f"{MEDIA_URL}/batch",
+            files=[("files", _m4a_file())],
+            data={"metadata": '[{"waveform": [0.5, "x"]}]'},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 422
+        mock_media_service.upload_batch.assert_not_called()
+
+    def test_batch_metadata_length_mismatch(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+
+        response = client.post(
+            f"{MEDIA_URL}/batch",
+            files=[("files", _jpeg_file()), ("files", _jpeg_file())],
+            data={"metadata": "[{}]"},
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 422
+        mock_media_service.upload_batch.assert_not_called()
+
+    def test_batch_rejects_unsupported_type(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+
+        response = client.post(
+            f"{MEDIA_URL}/batch",
+            files=[("files", _jpeg_file()), ("files", ("a.txt", io.BytesIO(b"x"), "text/plain"))],
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 422
+        mock_media_service.upload_batch.assert_not_called()
+
+    def test_batch_rejects_too_many_files(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+    ) -> None:
+        response = client.post(
+            f"{MEDIA_URL}/batch",
+            files=[("files", _jpeg_file()) for _ in range(MAX_BATCH_UPLOAD_FILES + 1)],
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 422
+        mock_media_service.upload_batch.assert_not_called()
+
+    def test_batch_limit_exceeded(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        mock_media_service.upload_batch.side_effect = MediaLimitExceededError("full")
+
+        response = client.post(
+            f"{MEDIA_URL}/batch",
+            files=[("files", _jpeg_file())],
+            headers=_auth_headers(),
+        )
+
+        assert response.status_code == 422
+
 
 class TestListMedia:
     def test_list_empty(
@@ -279,6 +770,30 @@ class TestListMedia:
         assert data["count"] == 3
         assert data["items"][0]["url"].startswith("https://")
 
+    def test_list_includes_variant_urls(
+        self,
+        client: TestClient,
+        mock_media_service: AsyncMock,
+        mock_journal_service: AsyncMock,
+    ) -> None:
+        mock_journal_service.get_by_id.return_value = make_entry_row(entry_id=ENTRY_ID)
+        rows = [
+            make_media_row(entry_id=ENTRY_ID, thumbnail_path="t.webp", medium_path="m.webp"),
+            make_media_row(entry_id=ENTRY_ID, sort_order=1),
+        ]
+        mock_media_service.list_media.return_value = rows
+        mock_media_service.create_signed_urls.side_effect = lambda paths: [
+            f"https://signed/{p}" for p in paths
+        ]
+
+        response = client.get(MEDIA_URL, headers=_auth_headers())
+
+        items = response.json()["items"]
+        assert items[0]["thumbnail_url"] == "https://signed/t.webp"
+        assert items[0]["medium_url"] == "https://signed/m.webp"
+        assert items[1]["thumbnail_url"] is None
+        mock_media_service.create_signed_urls.assert_awaited_once()
+
     def test_list_mixed_media(
         self,
         client: TestClient,
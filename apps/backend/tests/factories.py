@@ -126,6 +126,9 @@ def make_media_row(
     height: int | None = 600,
     duration_ms: int | None = None,
     waveform: list[float] | None = None,
+    thumbnail_path: str | None = None,
+    medium_path: str | None = None,
+    content_hash: str | None = None,
     sort_order: int = 0,
     created_at: datetime | None = None,
 ) -> EntryMediaRow:
@@ -145,6 +148,9 @@ def make_media_row(
         height=height,
         duration_ms=duration_ms,
         waveform=waveform,
+        thumbnail_path=thumbnail_path,
+        medium_path=medium_path,
+        content_hash=content_hash,
         sort_order=sort_order,
         created_at=created_at or now,
     )
@@ -220,6 +226,7 @@ def make_ai_prompt_row(
     prompt_type: str = "check_in",
     content: str = "How are you feeling today?",
     source: str = "curated",
+    curated_id: str | None = None,
     mood_category: str | None = None,
     session_id: str | None = None,
     entry_id: str | None = None,
@@ -242,6 +249,7 @@ def make_ai_prompt_row(
         content=content,
         context=context or {},
         source=source,
+        curated_id=curated_id,
         mood_category=mood_category,
         session_id=uuid.UUID(session_id) if session_id else None,
         entry_id=uuid.UUID(entry_id) if entry_id else None,
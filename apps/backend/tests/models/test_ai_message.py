@@ -23,7 +23,6 @@ class TestAIMessageCreate:
         assert msg.session_id == sid
         assert msg.role == MessageRole.USER
         assert msg.content == "Hello"
-        assert msg.sort_order == 0
         assert msg.token_count is None
         assert msg.latency_ms is None
         assert msg.model_id is None
@@ -53,14 +52,8 @@ class TestAIMessageCreate:
                 content="test",
             )
 
-    def test_negative_sort_order_rejected(self) -> None:
-        with pytest.raises(ValidationError):
-            AIMessageCreate(
-                session_id=uuid.uuid4(),
-                role=MessageRole.USER,
-                content="test",
-                sort_order=-1,
-            )
+    def test_sort_order_assigned_by_database(self) -> None:
+        assert "sort_order" not in AIMessageCreate.model_fields
 
     def test_negative_token_count_rejected(self) -> None:
         with pytest.raises(ValidationError):
@@ -91,27 +84,17 @@ class TestAIMessageFactoryMethods:
 
     def test_assistant(self) -> None:
         sid = uuid.uuid4()
-        msg = AIMessageCreate.assistant(sid, "How are you?", sort_order=1)
+        msg = AIMessageCreate.assistant(sid, "How are you?", model_id="m1")
         assert msg.role == MessageRole.ASSISTANT
         assert msg.content == "How are you?"
-        assert msg.sort_order == 1
+        assert msg.model_id == "m1"
 
     def test_user(self) -> None:
         sid = uuid.uuid4()
-        msg = AIMessageCreate.user(sid, "I'm doing well", sort_order=2)
+        msg = AIMessageCreate.user(sid, "I'm doing well", token_count=4)
         assert msg.role == MessageRole.USER
         assert msg.content == "I'm doing well"
-        assert msg.sort_order == 2
-
-    def test_assistant_default_sort_order(self) -> None:
-        sid = uuid.uuid4()
-        msg = AIMessageCreate.assistant(sid, "test")
-        assert msg.sort_order == 0
-
-    def test_user_default_sort_order(self) -> None:
-        sid = uuid.uuid4()
-        msg = AIMessageCreate.user(sid, "test")
-        assert msg.sort_order == 0
+        assert msg.token_count == 4
 
 
 class TestAIMessageResponse:
@@ -1,6 +1,9 @@
 import uuid
 from datetime import UTC, datetime
 
+import pytest
+from pydantic import ValidationError
+
 from nstil.models.media import (
     ALLOWED_CONTENT_TYPES,
     ALLOWED_EXTENSIONS,
@@ -11,10 +14,13 @@ from nstil.models.media import (
     MAX_AUDIO_PER_ENTRY,
     MAX_IMAGE_FILE_SIZE_BYTES,
     MAX_IMAGES_PER_ENTRY,
+    MAX_WAVEFORM_SAMPLES,
     EntryMediaListResponse,
     EntryMediaResponse,
     EntryMediaRow,
     MediaContentType,
+    MediaUploadMetadata,
+    MediaUploadUrlRequest,
     is_audio_content_type,
     max_file_size_for_content_type,
 )
@@ -231,3 +237,28 @@ class TestEntryMediaListResponse:
         resp = EntryMediaListResponse(items=[item], count=1)
         assert resp.count == 1
         assert len(resp.items) == 1
+
+
+class TestClientWaveform:
+    def test_accepts_normalized_amplitudes(self) -> None:
+        meta = MediaUploadMetadata(waveform=[0.0, 0.5, 1.0])
+        assert meta.waveform == [0.0, 0.5, 1.0]
+
+    def test_covers_longest_recording(self) -> None:
+        assert MAX_WAVEFORM_SAMPLES * 100 >= MAX_AUDIO_DURATION_MS
+        assert MediaUploadMetadata(waveform=[0.1] * MAX_WAVEFORM_SAMPLES).waveform is not None
+
+    @pytest.mark.parametrize(
+        "waveform",
+        [[float("nan")], [float("inf")], [-0.1], [1.5], [0.1] * (MAX_WAVEFORM_SAMPLES + 1)],
+    )
+    def test_rejects_invalid_samples(self, waveform: list[float]) -> None:
+        with pytest.raises(ValidationError):
+            MediaUploadMetadata(waveform=waveform)
+        with pytest.raises(ValidationError):
+            MediaUploadUrlRequest(
+                file_name="voice.m4a",
+                content_type="audio/m4a",
+                size_bytes=10,
+                waveform=waveform,
+            )
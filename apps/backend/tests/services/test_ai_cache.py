@@ -0,0 +1,226 @@
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+
+from nstil.models.ai_context import AIContextAggregates, AIContextProfile, AIContextStats
+from nstil.services.cache.ai_cache import AICacheService
+from nstil.services.cache.ai_keys import (
+    ai_context_activity_key,
+    ai_context_aggregates_key,
+    ai_context_journal_pattern,
+    ai_context_pattern,
+    ai_context_profile_key,
+    ai_context_window_key,
+)
+from nstil.services.cache.families import CacheFamily
+from nstil.services.cache.keys import epoch_key, generation_key
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+@pytest.fixture
+def mock_redis() -> AsyncMock:
+    mock = AsyncMock()
+    mock.mget.return_value = [None] * 8
+    mock.get.return_value = None
+    mock.delete.return_value = 1
+    mock.scan.return_value = (0, [])
+    return mock
+
+
+@pytest.fixture
+def cache(mock_redis: AsyncMock) -> AICacheService:
+    return AICacheService(mock_redis)
+
+
+class TestContextKeys:
+    def test_components_live_under_context_pattern(self) -> None:
+        prefix = ai_context_pattern(USER_ID).rstrip("*")
+        keys = [
+            ai_context_profile_key(USER_ID),
+            ai_context_activity_key(USER_ID),
+            ai_context_aggregates_key(USER_ID, 14),
+            ai_context_window_key(USER_ID),
+        ]
+        assert all(key.startswith(prefix) for key in keys)
+
+    def test_journal_pattern_covers_window_and_aggregates(self) -> None:
+        prefix = ai_context_journal_pattern(USER_ID).rstrip("*")
+        assert ai_context_aggregates_key(USER_ID, 14).startswith(prefix)
+        assert ai_context_window_key(USER_ID).startswith(prefix)
+        assert not ai_context_activity_key(USER_ID).startswith(prefix)
+
+
+class TestContextParts:
+    @pytest.mark.asyncio
+    async def test_single_round_trip(self, cache: AICacheService, mock_redis: AsyncMock) -> None:
+        profile = AIContextProfile(prompt_style="direct", topics_to_avoid=["work"], goals=[])
+        mock_redis.mget.return_value = [None, None, None, None, f"0.0|{profile.model_dump_json()}"]
+        mock_redis.mget.return_value += [None, None, None]
+
+        parts = await cache.get_context_parts(USER_ID, 14)
+
+        mock_redis.mget.assert_awaited_once()
+        keys = mock_redis.mget.call_args.args[0]
+        assert ai_context_window_key(USER_ID) in keys
+        assert parts.profile == profile
+        assert parts.activity is None
+        assert parts.aggregates is None
+        assert parts.window is None
+
+    @pytest.mark.asyncio
+    async def test_components_use_their_own_generations(
+        self, cache: AICacheService, mock_redis: AsyncMock
+    ) -> None:
+        profile = AIContextProfile(prompt_style="direct", topics_to_avoid=[], goals=[])
+        mock_redis.mget.return_value = [
+            None,
+            "9",
+            "2",
+            "5",
+            f"0.2|{profile.model_dump_json()}",
+            '0.4|{"recent_prompts": [], "recent_sessions": []}',
+            None,
+            None,
+        ]
+
+        parts = await cache.get_context_parts(USER_ID, 14)
+
+        keys = mock_redis.mget.call_args.args[0]
+        assert keys[2] == generation_key(USER_ID, CacheFamily.AI_CONTEXT_PROFILE)
+        assert keys[3] == generation_key(USER_ID, CacheFamily.AI_CONTEXT_ACTIVITY)
+        assert parts.profile == profile
+        assert parts.activity is None
+        assert (parts.profile_generation, parts.activity_generation) == ("0.2", "0.5")
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_is_a_miss(
+        self, cache: AICacheService, mock_redis: AsyncMock
+    ) -> None:
+        mock_redis.mget.side_effect = ConnectionError
+
+        parts = await cache.get_context_parts(USER_ID, 14)
+
+        assert parts.profile is None
+        assert parts.window is None
+
+
+class TestJournalGeneration:
+    @pytest.mark.asyncio
+    async def test_stamped_with_generation_read_before_fetch(
+        self, cache: AICacheService, mock_redis: AsyncMock
+    ) -> None:
+        mock_redis.get.return_value = "4"
+
+        await cache.set_context_aggregates(USER_ID, 14, _aggregates(), generation="3")
+
+        mock_redis.get.assert_not_called()
+        stored = mock_redis.setex.call_args.args[2]
+        assert stored.startswith("3|")
+
+    @pytest.mark.asyncio
+    async def test_parts_carry_generation(
+        self, cache: AICacheService, mock_redis: AsyncMock
+    ) -> None:
+        mock_redis.mget.return_value = [None, "5", None, None, None, None, None, None]
+
+        parts = await cache.get_context_parts(USER_ID, 14)
+
+        assert parts.generation == "0.5"
+        keys = mock_redis.mget.call_args.args[0]
+        assert keys[0] == epoch_key()
+        assert keys[1] == generation_key(USER_ID, CacheFamily.AI_CONTEXT_JOURNAL)
+
+    @pytest.mark.asyncio
+    async def test_current_stamp_is_a_hit(
+        self, cache: AICacheService, mock_redis: AsyncMock
+    ) -> None:
+        aggregates = _aggregates()
+        mock_redis.mget.return_value = [
+            None,
+            "3",
+            None,
+            None,
+            None,
+            None,
+            f"0.3|{aggregates.model_dump_json()}",
+            None,
+        ]
+
+        parts = await cache.get_context_parts(USER_ID, 14)
+
+        assert parts.aggregates == aggregates
+
+    @pytest.mark.asyncio
+    async def test_stale_stamp_is_a_miss(
+        self, cache: AICacheService, mock_redis: AsyncMock
+    ) -> None:
+        mock_redis.mget.return_value = [
+            None,
+            "4",
+            None,
+            None,
+            None,
+            None,
+            f"0.3|{_aggregates().model_dump_json()}",
+            None,
+        ]
+
+        parts = await cache.get_context_parts(USER_ID, 14)
+
+        assert parts.aggregates is None
+
+    @pytest.mark.asyncio
+    async def test_missing_generation_matches_zero(
+        self, cache: AICacheService, mock_redis: AsyncMock
+    ) -> None:
+        aggregates = _aggregates()
+        mock_redis.mget.return_value = [
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            f"0.0|{aggregates.model_dump_json()}",
+            None,
+        ]
+
+        parts = await cache.get_context_parts(USER_ID, 14)
+
+        assert parts.aggregates == aggregates
+
+    @pytest.mark.asyncio
+    async def test_epoch_bump_is_a_miss(
+        self, cache: AICacheService, mock_redis: AsyncMock
+    ) -> None:
+        mock_redis.mget.return_value = [
+            "1",
+            "3",
+            None,
+            None,
+            None,
+            None,
+            f"0.3|{_aggregates().model_dump_json()}",
+            None,
+        ]
+
+        parts = await cache.get_context_parts(USER_ID, 14)
+
+        assert parts.aggregates is None
+        assert parts.generation == "1.3"
+
+
+def _aggregates() -> AIContextAggregates:
+    return AIContextAggregates(
+        mood_distribution=[],
+        stats=AIContextStats(
+            total_entries=0,
+            entries_last_7d=0,
+            check_ins_total=0,
+            check_ins_last_7d=0,
+            avg_entry_length_7d=None,
+            last_entry_at=None,
+        ),
+    )
@@ -0,0 +1,345 @@
+import uuid
+from datetime import UTC, datetime
+from types import TracebackType
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nstil.models.ai_context import AIContextActivity, AIContextWindow
+from nstil.services.ai.prompt_queue import PromptQueue, prompt_queue_generation_key, prompt_slots
+from nstil.services.cache.ai_cache import AICacheService
+from nstil.services.cache.ai_keys import prompt_queue_key
+from nstil.services.cache.constants import GENERATION_TTL_SECONDS
+from nstil.services.cache.dependencies import CACHE_DEPENDENCIES, dependents_of
+from nstil.services.cache.entry_cache import EntryCacheService
+from nstil.services.cache.families import CacheEvent, CacheFamily
+from nstil.services.cache.invalidator import CacheInvalidator
+from nstil.services.cache.keys import entry_key, epoch_key, generation_key
+from nstil.services.cache.space_cache import SpaceCacheService
+from tests.factories import make_ai_profile_row, make_entry_row, make_space_row
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+ENTRY_ID = uuid.UUID("00000000-0000-0000-0000-000000000099")
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, tuple[object, ...]]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        return None
+
+    def incr(self, key: str) -> None:
+        self._ops.append(("incr", (key,)))
+
+    def expire(self, key: str, ttl: int) -> None:
+        self._ops.append(("expire", (key, ttl)))
+
+    def delete(self, *keys: str) -> None:
+        self._ops.append(("delete", keys))
+
+    async def execute(self) -> list[object]:
+        self._redis.executed.append(list(self._ops))
+        results = [self._redis.apply(name, args) for name, args in self._ops]
+        self._ops.clear()
+        return results
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+        self.executed: list[list[tuple[str, tuple[object, ...]]]] = []
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    async def mget(self, keys: tuple[str, ...]) -> list[str | None]:
+        return [self.values.get(key) for key in keys]
+
+    async def setex(self, key: str, ttl: int, value: str) -> bool:
+        self.values[key] = value
+        return True
+
+    def apply(self, name: str, args: tuple[object, ...]) -> object:
+        return getattr(self, f"_{name}")(*args)
+
+    async def incr(self, key: str) -> int:
+        return self._incr(key)
+
+    def _incr(self, key: str) -> int:
+        value = int(self.values.get(key, "0")) + 1
+        self.values[key] = str(value)
+        return value
+
+    def _expire(self, key: str, ttl: int) -> bool:
+        self.ttls[key] = ttl
+        return True
+
+    def _delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+
+@pytest.fixture
+def redis() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def invalidator(redis: FakeRedis) -> CacheInvalidator:
+    return CacheInvalidator(redis)  # type: ignore[arg-type]
+
+
+def _families(event: CacheEvent) -> set[CacheFamily]:
+    return {dep.family for dep in dependents_of(event)}
+
+
+class TestRegistry:
+    def test_every_family_is_declared_once(self) -> None:
+        families = [dep.family for dep in CACHE_DEPENDENCIES]
+        assert sorted(families) == sorted(CacheFamily)
+
+    def test_every_event_has_dependents(self) -> None:
+        assert all(dependents_of(event) for event in CacheEvent)
+
+    def test_entry_created_reaches_ai_context_and_calendars(self) -> None:
+        families = _families(CacheEvent.ENTRY_CREATED)
+        assert {
+            CacheFamily.ENTRY_LISTS,
+            CacheFamily.ENTRY_SEARCHES,
+            CacheFamily.CALENDARS,
+            CacheFamily.AI_CONTEXT_JOURNAL,
+            CacheFamily.PROMPT_QUEUE,
+        } <= families
+        assert CacheFamily.ENTRY not in families
+
+    def test_space_rename_reaches_ai_context_journal(self) -> None:
+        families = _families(CacheEvent.SPACE_UPDATED)
+        assert CacheFamily.AI_CONTEXT_JOURNAL in families
+        assert CacheFamily.ENTRY_LISTS not in families
+
+    def test_media_writes_reach_entry_lists_only(self) -> None:
+        families = _families(CacheEvent.MEDIA_CREATED)
+        assert families == {CacheFamily.ENTRY_LISTS, CacheFamily.ENTRY_SEARCHES}
+
+    def test_session_events_leave_journal_families(self) -> None:
+        families = _families(CacheEvent.SESSION_UPDATED)
+        assert families == {
+            CacheFamily.AI_CONTEXT_ACTIVITY,
+            CacheFamily.PROMPT_QUEUE,
+            CacheFamily.ACTIVE_CHECK_IN,
+        }
+
+
+class TestInvalidate:
+    async def test_single_pipeline(self, invalidator: CacheInvalidator, redis: FakeRedis) -> None:
+        await invalidator.invalidate(USER_ID, CacheEvent.ENTRY_UPDATED, ENTRY_ID)
+
+        assert len(redis.executed) == 1
+        ops = redis.executed[0]
+        assert ("delete", (entry_key(USER_ID, ENTRY_ID),)) in ops
+        assert ("incr", (generation_key(USER_ID, CacheFamily.CALENDARS),)) in ops
+        deleted = {key for name, args in ops if name == "delete" for key in args}
+        assert {prompt_queue_key(USER_ID, slot) for slot in prompt_slots()} <= deleted
+
+    async def test_generation_keys_expire(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        await invalidator.invalidate(USER_ID, CacheEvent.ENTRY_CREATED, ENTRY_ID)
+
+        key = generation_key(USER_ID, CacheFamily.ENTRY_LISTS)
+        assert redis.values[key] == "1"
+        assert redis.ttls[key] == GENERATION_TTL_SECONDS
+
+    async def test_entity_family_skipped_without_id(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        await invalidator.invalidate(USER_ID, CacheEvent.ENTRY_DELETED)
+
+        deleted = {key for name, args in redis.executed[0] if name == "delete" for key in args}
+        assert not any(":entry:" in key for key in deleted)
+
+    async def test_session_events_bump_active_check_in(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        for event in (CacheEvent.SESSION_CREATED, CacheEvent.SESSION_UPDATED):
+            await invalidator.invalidate(USER_ID, event, ENTRY_ID)
+
+        key = generation_key(USER_ID, CacheFamily.ACTIVE_CHECK_IN)
+        for ops in redis.executed:
+            assert ("incr", (key,)) in ops
+        assert redis.values[key] == "2"
+
+    async def test_prompt_queue_generation_bumped_before_slots_drop(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        await invalidator.invalidate(USER_ID, CacheEvent.PROMPT_CREATED)
+
+        ops = redis.executed[0]
+        bump = ops.index(("incr", (prompt_queue_generation_key(USER_ID),)))
+        first_delete = next(i for i, (name, _) in enumerate(ops) if name == "delete")
+        assert bump < first_delete
+        assert redis.values[prompt_queue_generation_key(USER_ID)] == "1"
+
+    async def test_schedules_refill_when_queue_dropped(self, redis: FakeRedis) -> None:
+        queue = AsyncMock(spec=PromptQueue)
+        invalidator = CacheInvalidator(redis, queue)  # type: ignore[arg-type]
+
+        await invalidator.invalidate(USER_ID, CacheEvent.PROMPT_CREATED)
+
+        queue.schedule_refill.assert_awaited_once_with(USER_ID)
+
+    async def test_no_refill_for_unrelated_event(self, redis: FakeRedis) -> None:
+        queue = AsyncMock(spec=PromptQueue)
+        invalidator = CacheInvalidator(redis, queue)  # type: ignore[arg-type]
+
+        await invalidator.invalidate(USER_ID, CacheEvent.SPACE_CREATED)
+
+        queue.schedule_refill.assert_not_called()
+
+    async def test_redis_failure_is_swallowed(self) -> None:
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(side_effect=ConnectionError)
+        redis = MagicMock()
+        redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+        redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+        invalidator = CacheInvalidator(redis)
+
+        await invalidator.invalidate(USER_ID, CacheEvent.ENTRY_CREATED)
+
+        redis.pipeline.assert_called_once_with(transaction=False)
+        pipe.execute.assert_awaited_once()
+
+
+class TestGenerationStamps:
+    async def test_entry_write_retires_lists(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        cache = EntryCacheService(redis)  # type: ignore[arg-type]
+        rows = [make_entry_row(user_id=str(USER_ID))]
+        miss = await cache.get_list(USER_ID, None, 20)
+        await cache.set_list(USER_ID, None, 20, rows, False, generation=miss.generation)
+        assert (await cache.get_list(USER_ID, None, 20)).page is not None
+
+        await invalidator.invalidate(USER_ID, CacheEvent.ENTRY_CREATED, ENTRY_ID)
+
+        miss = await cache.get_list(USER_ID, None, 20)
+        assert miss.page is None
+        await cache.set_list(USER_ID, None, 20, rows, False, generation=miss.generation)
+        assert (await cache.get_list(USER_ID, None, 20)).page is not None
+
+    async def test_write_during_fetch_discards_stale_fill(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        cache = EntryCacheService(redis)  # type: ignore[arg-type]
+        miss = await cache.get_list(USER_ID, None, 20)
+
+        await invalidator.invalidate(USER_ID, CacheEvent.ENTRY_CREATED, ENTRY_ID)
+        stale = [make_entry_row(user_id=str(USER_ID))]
+        await cache.set_list(USER_ID, None, 20, stale, False, generation=miss.generation)
+
+        assert (await cache.get_list(USER_ID, None, 20)).page is None
+
+    async def test_session_event_keeps_journal_window(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        cache = AICacheService(redis)  # type: ignore[arg-type]
+        window = AIContextWindow(
+            entry_limit=100, days_back=28, fetched_at=datetime.now(UTC), recent_entries=[]
+        )
+        await cache.set_context_window(USER_ID, window, generation=None)
+        await cache.set_context_activity(
+            USER_ID, AIContextActivity(recent_prompts=[], recent_sessions=[]), generation=None
+        )
+
+        await invalidator.invalidate(USER_ID, CacheEvent.SESSION_UPDATED)
+
+        parts = await cache.get_context_parts(USER_ID, 14)
+        assert parts.window == window
+        assert parts.activity is None
+
+        await invalidator.invalidate(USER_ID, CacheEvent.SPACE_UPDATED)
+
+        assert (await cache.get_context_parts(USER_ID, 14)).window is None
+
+    async def test_space_list_fill_racing_a_delete_is_not_served(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        cache = SpaceCacheService(redis)  # type: ignore[arg-type]
+        miss = await cache.get_space_list(USER_ID)
+
+        await invalidator.invalidate(USER_ID, CacheEvent.SPACE_DELETED)
+        stale = [make_space_row(user_id=str(USER_ID))]
+        await cache.set_space_list(USER_ID, stale, generation=miss.generation)
+
+        assert (await cache.get_space_list(USER_ID)).rows is None
+
+    async def test_profile_fill_racing_an_update_is_not_served(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        cache = AICacheService(redis)  # type: ignore[arg-type]
+        miss = await cache.get_profile(USER_ID)
+
+        await invalidator.invalidate(USER_ID, CacheEvent.AI_PROFILE_UPDATED)
+        await cache.set_profile(
+            USER_ID, make_ai_profile_row(user_id=str(USER_ID)), generation=miss.generation
+        )
+
+        assert (await cache.get_profile(USER_ID)).row is None
+
+
+class TestInvalidateAll:
+    async def test_bumps_epoch_without_expiry(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        await invalidator.invalidate_all()
+        await invalidator.invalidate_all()
+
+        assert redis.values[epoch_key()] == "2"
+        assert epoch_key() not in redis.ttls
+
+    async def test_retires_every_generational_family(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        spaces = SpaceCacheService(redis)  # type: ignore[arg-type]
+        ai = AICacheService(redis)  # type: ignore[arg-type]
+        await spaces.set_space_list(
+            USER_ID, [make_space_row(user_id=str(USER_ID))], generation=None
+        )
+        await ai.set_profile(USER_ID, make_ai_profile_row(user_id=str(USER_ID)), generation=None)
+        assert (await spaces.get_space_list(USER_ID)).rows is not None
+
+        await invalidator.invalidate_all()
+
+        assert (await spaces.get_space_list(USER_ID)).rows is None
+        assert (await ai.get_profile(USER_ID)).row is None
+
+    async def test_fill_racing_a_resync_is_not_served(
+        self, invalidator: CacheInvalidator, redis: FakeRedis
+    ) -> None:
+        cache = SpaceCacheService(redis)  # type: ignore[arg-type]
+        miss = await cache.get_space_list(USER_ID)
+
+        await invalidator.invalidate_all()
+        stale = [make_space_row(user_id=str(USER_ID))]
+        await cache.set_space_list(USER_ID, stale, generation=miss.generation)
+
+        assert (await cache.get_space_list(USER_ID)).rows is None
+
+    async def test_redis_failure_is_swallowed(self) -> None:
+        redis = AsyncMock()
+        redis.incr.side_effect = ConnectionError
+
+        await CacheInvalidator(redis).invalidate_all()
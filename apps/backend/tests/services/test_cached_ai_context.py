@@ -1,45 +1,94 @@
 import uuid
+from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock
 
 import pytest
 
 from nstil.models.ai_context import (
+    AIContextActivity,
+    AIContextAggregates,
+    AIContextEntry,
     AIContextProfile,
-    AIContextResponse,
     AIContextStats,
+    AIContextWindow,
 )
 from nstil.services.ai.context import AIContextService
-from nstil.services.cache.ai_cache import AICacheService
+from nstil.services.ai.context_window import CANONICAL_DAYS_BACK, CANONICAL_ENTRY_LIMIT
+from nstil.services.cache.ai_cache import AICacheService, AIContextParts
 from nstil.services.cached_ai_context import CachedAIContextService
 
 USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 
+PROFILE = AIContextProfile(prompt_style="gentle", topics_to_avoid=[], goals=[])
+ACTIVITY = AIContextActivity(recent_prompts=[], recent_sessions=[])
+AGGREGATES = AIContextAggregates(
+    mood_distribution=[],
+    stats=AIContextStats(
+        total_entries=500,
+        entries_last_7d=100,
+        check_ins_total=0,
+        check_ins_last_7d=0,
+        avg_entry_length_7d=100,
+        last_entry_at=None,
+    ),
+)
+
+
+def _entry(hours_ago: float, mood: str | None = "calm") -> AIContextEntry:
+    return AIContextEntry(
+        id=str(uuid.uuid4()),
+        title="",
+        body="x" * 10,
+        body_length=10,
+        mood_category=mood,
+        mood_specific=None,
+        tags=[],
+        entry_type="journal",
+        location=None,
+        journal_name="Journal",
+        created_at=datetime.now(UTC) - timedelta(hours=hours_ago),
+    )
+
+
+def _window(
+    entries: list[AIContextEntry] | None = None,
+    entry_limit: int = 100,
+    days_back: int = 28,
+) -> AIContextWindow:
+    return AIContextWindow(
+        entry_limit=entry_limit,
+        days_back=days_back,
+        fetched_at=datetime.now(UTC),
+        recent_entries=entries or [],
+    )
 
-def _make_context() -> AIContextResponse:
-    return AIContextResponse(
-        recent_entries=[],
-        mood_distribution=[],
-        recent_prompts=[],
-        recent_sessions=[],
-        stats=AIContextStats(
-            total_entries=5,
-            entries_last_7d=2,
-            check_ins_total=0,
-            check_ins_last_7d=0,
-            avg_entry_length_7d=100,
-            last_entry_at=None,
-        ),
-        profile=AIContextProfile(
-            prompt_style="gentle",
-            topics_to_avoid=[],
-            goals=[],
-        ),
+
+def _parts(
+    profile: AIContextProfile | None = PROFILE,
+    activity: AIContextActivity | None = ACTIVITY,
+    aggregates: AIContextAggregates | None = AGGREGATES,
+    window: AIContextWindow | None = None,
+    generation: str | None = "6",
+) -> AIContextParts:
+    return AIContextParts(
+        profile=profile,
+        activity=activity,
+        aggregates=aggregates,
+        window=window,
+        generation=generation,
+        profile_generation="2",
+        activity_generation="3",
     )
 
 
 @pytest.fixture
 def mock_db() -> AsyncMock:
-    return AsyncMock(spec=AIContextService)
+    mock = AsyncMock(spec=AIContextService)
+    mock.get_profile.return_value = PROFILE
+    mock.get_activity.return_value = ACTIVITY
+    mock.get_aggregates.return_value = AGGREGATES
+    mock.get_window.return_value = _window()
+    return mock
 
 
 @pytest.fixture
@@ -57,47 +106,103 @@ class TestCachedGetContext:
     async def test_cache_hit_skips_db(
         self, service: CachedAIContextService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
-        ctx = _make_context()
-        mock_cache.get_context.return_value = ctx
+        mock_cache.get_context_parts.return_value = _parts(window=_window([_entry(1)]))
 
         result = await service.get_context(USER_ID, entry_limit=10, days_back=14)
 
-        assert result == ctx
+        assert result.profile == PROFILE
+        assert len(result.recent_entries) == 1
+        mock_db.get_profile.assert_not_called()
+        mock_db.get_activity.assert_not_called()
+        mock_db.get_aggregates.assert_not_called()
+        mock_db.get_window.assert_not_called()
         mock_db.get_context.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_cache_miss_queries_db_and_populates(
+    async def test_cache_miss_fetches_canonical_superset(
         self, service: CachedAIContextService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
-        ctx = _make_context()
-        mock_cache.get_context.return_value = None
-        mock_db.get_context.return_value = ctx
+        mock_cache.get_context_parts.return_value = _parts(None, None, None, None)
 
         result = await service.get_context(USER_ID, entry_limit=20, days_back=7)
 
-        assert result == ctx
-        mock_db.get_context.assert_called_once_with(USER_ID, 20, 7)
-        mock_cache.set_context.assert_called_once_with(USER_ID, 20, 7, ctx)
+        assert result.recent_entries == []
+        mock_db.get_window.assert_called_once_with(
+            USER_ID, CANONICAL_ENTRY_LIMIT, CANONICAL_DAYS_BACK
+        )
+        mock_db.get_aggregates.assert_not_called()
+        mock_cache.set_context_profile.assert_called_once_with(USER_ID, PROFILE, generation="2")
+        mock_cache.set_context_activity.assert_called_once_with(USER_ID, ACTIVITY, generation="3")
+        mock_cache.set_context_window.assert_called_once_with(
+            USER_ID, mock_db.get_window.return_value, generation="6"
+        )
+
+    @pytest.mark.asyncio
+    async def test_only_missing_components_are_fetched(
+        self, service: CachedAIContextService, mock_db: AsyncMock, mock_cache: AsyncMock
+    ) -> None:
+        mock_cache.get_context_parts.return_value = _parts(activity=None, window=_window())
+
+        await service.get_context(USER_ID)
+
+        mock_db.get_activity.assert_called_once_with(USER_ID)
+        mock_db.get_profile.assert_not_called()
+        mock_db.get_window.assert_not_called()
+        mock_cache.set_context_profile.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_default_params(
         self, service: CachedAIContextService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
-        ctx = _make_context()
-        mock_cache.get_context.return_value = None
-        mock_db.get_context.return_value = ctx
+        mock_cache.get_context_parts.return_value = _parts(None, None, None, None)
 
         await service.get_context(USER_ID)
 
-        mock_cache.get_context.assert_called_once_with(USER_ID, 10, 14)
-        mock_db.get_context.assert_called_once_with(USER_ID, 10, 14)
+        mock_cache.get_context_parts.assert_called_once_with(USER_ID, 14)
 
 
-class TestCachedInvalidate:
+class TestSupersetDerivation:
     @pytest.mark.asyncio
-    async def test_invalidate_clears_cache(
-        self, service: CachedAIContextService, mock_cache: AsyncMock
+    async def test_smaller_shape_is_sliced_and_recomputed(
+        self, service: CachedAIContextService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
-        await service.invalidate(USER_ID)
+        entries = [_entry(1, "happy"), _entry(2, "happy"), _entry(24 * 10, "sad")]
+        mock_cache.get_context_parts.return_value = _parts(
+            aggregates=None, window=_window(entries)
+        )
+
+        result = await service.get_context(USER_ID, entry_limit=1, days_back=7)
+
+        assert [e.id for e in result.recent_entries] == [entries[0].id]
+        assert result.stats.total_entries == 2
+        assert [(m.mood_category, m.count) for m in result.mood_distribution] == [("happy", 2)]
+        mock_db.get_window.assert_not_called()
+        mock_db.get_aggregates.assert_not_called()
 
-        mock_cache.invalidate_context.assert_called_once_with(USER_ID)
+    @pytest.mark.asyncio
+    async def test_larger_limit_refetches_superset(
+        self, service: CachedAIContextService, mock_db: AsyncMock, mock_cache: AsyncMock
+    ) -> None:
+        mock_cache.get_context_parts.return_value = _parts(window=_window(entry_limit=100))
+
+        await service.get_context(USER_ID, entry_limit=100, days_back=60)
+
+        mock_db.get_window.assert_called_once_with(USER_ID, 100, 60)
+
+    @pytest.mark.asyncio
+    async def test_truncated_window_falls_back_to_aggregates(
+        self, service: CachedAIContextService, mock_db: AsyncMock, mock_cache: AsyncMock
+    ) -> None:
+        entries = [_entry(hours) for hours in range(1, 4)]
+        mock_cache.get_context_parts.return_value = _parts(
+            aggregates=None, window=_window(entries, entry_limit=3)
+        )
+
+        result = await service.get_context(USER_ID, entry_limit=2, days_back=14)
+
+        assert len(result.recent_entries) == 2
+        assert result.stats == AGGREGATES.stats
+        mock_db.get_aggregates.assert_called_once_with(USER_ID, 14)
+        mock_cache.set_context_aggregates.assert_called_once_with(
+            USER_ID, 14, AGGREGATES, generation="6"
+        )
@@ -5,7 +5,9 @@ import pytest
 
 from nstil.models.ai_profile import UserAIProfileUpdate
 from nstil.services.ai.profile import AIProfileService
-from nstil.services.cache.ai_cache import AICacheService
+from nstil.services.cache.ai_cache import AICacheService, CachedAIProfile
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
 from nstil.services.cached_ai_profile import CachedAIProfileService
 from tests.factories import make_ai_profile_row
 
@@ -23,8 +25,15 @@ def mock_cache() -> AsyncMock:
 
 
 @pytest.fixture
-def service(mock_db: AsyncMock, mock_cache: AsyncMock) -> CachedAIProfileService:
-    return CachedAIProfileService(mock_db, mock_cache)
+def mock_invalidator() -> AsyncMock:
+    return AsyncMock(spec=CacheInvalidator)
+
+
+@pytest.fixture
+def service(
+    mock_db: AsyncMock, mock_cache: AsyncMock, mock_invalidator: AsyncMock
+) -> CachedAIProfileService:
+    return CachedAIProfileService(mock_db, mock_cache, mock_invalidator)
 
 
 class TestCachedGet:
@@ -33,7 +42,7 @@ class TestCachedGet:
         self, service: CachedAIProfileService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
         row = make_ai_profile_row()
-        mock_cache.get_profile.return_value = row
+        mock_cache.get_profile.return_value = CachedAIProfile(row, "1")
 
         result = await service.get(USER_ID)
 
@@ -45,20 +54,20 @@ class TestCachedGet:
         self, service: CachedAIProfileService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
         row = make_ai_profile_row()
-        mock_cache.get_profile.return_value = None
+        mock_cache.get_profile.return_value = CachedAIProfile(None, "1")
         mock_db.get.return_value = row
 
         result = await service.get(USER_ID)
 
         assert result == row
         mock_db.get.assert_called_once_with(USER_ID)
-        mock_cache.set_profile.assert_called_once_with(USER_ID, row)
+        mock_cache.set_profile.assert_called_once_with(USER_ID, row, generation="1")
 
     @pytest.mark.asyncio
     async def test_cache_miss_db_miss(
         self, service: CachedAIProfileService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
-        mock_cache.get_profile.return_value = None
+        mock_cache.get_profile.return_value = CachedAIProfile(None, "1")
         mock_db.get.return_value = None
 
         result = await service.get(USER_ID)
@@ -70,7 +79,7 @@ class TestCachedGet:
 class TestCachedUpdate:
     @pytest.mark.asyncio
     async def test_update_invalidates_profile_and_context(
-        self, service: CachedAIProfileService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self, service: CachedAIProfileService, mock_db: AsyncMock, mock_invalidator: AsyncMock
     ) -> None:
         row = make_ai_profile_row(prompt_style="direct")
         mock_db.update.return_value = row
@@ -80,12 +89,13 @@ class TestCachedUpdate:
 
         assert result == row
         mock_db.update.assert_called_once_with(USER_ID, data)
-        mock_cache.invalidate_profile.assert_called_once_with(USER_ID)
-        mock_cache.invalidate_context.assert_called_once_with(USER_ID)
+        mock_invalidator.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.AI_PROFILE_UPDATED
+        )
 
     @pytest.mark.asyncio
     async def test_update_not_found_no_invalidation(
-        self, service: CachedAIProfileService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self, service: CachedAIProfileService, mock_db: AsyncMock, mock_invalidator: AsyncMock
     ) -> None:
         mock_db.update.return_value = None
         data = UserAIProfileUpdate(prompt_style="direct")
@@ -93,18 +103,19 @@ class TestCachedUpdate:
         result = await service.update(USER_ID, data)
 
         assert result is None
-        mock_cache.invalidate_profile.assert_not_called()
-        mock_cache.invalidate_context.assert_not_called()
+        mock_invalidator.invalidate.assert_not_called()
 
 
 class TestCachedUpdateLastCheckIn:
     @pytest.mark.asyncio
     async def test_delegates_and_invalidates_profile(
-        self, service: CachedAIProfileService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self, service: CachedAIProfileService, mock_db: AsyncMock, mock_invalidator: AsyncMock
     ) -> None:
         timestamp = "2025-01-15T10:00:00+00:00"
 
         await service.update_last_check_in(USER_ID, timestamp)
 
         mock_db.update_last_check_in.assert_called_once_with(USER_ID, timestamp)
-        mock_cache.invalidate_profile.assert_called_once_with(USER_ID)
+        mock_invalidator.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.AI_PROFILE_UPDATED
+        )
@@ -1,11 +1,15 @@
 import uuid
+from datetime import UTC, date, datetime
 from unittest.mock import AsyncMock
 
 import pytest
 
 from nstil.models.journal import JournalEntryCreate, JournalEntryUpdate
 from nstil.models.pagination import CursorParams
-from nstil.services.cache.entry_cache import EntryCacheService
+from nstil.services.ai.insight_scheduler import InsightScheduler
+from nstil.services.cache.entry_cache import CachedPage, EntryCacheService
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
 from nstil.services.cached_journal import CachedJournalService
 from nstil.services.journal import JournalService
 from tests.factories import DEFAULT_JOURNAL_ID, make_entry_row
@@ -25,8 +29,15 @@ def mock_cache() -> AsyncMock:
 
 
 @pytest.fixture
-def service(mock_db: AsyncMock, mock_cache: AsyncMock) -> CachedJournalService:
-    return CachedJournalService(mock_db, mock_cache)
+def mock_invalidator() -> AsyncMock:
+    return AsyncMock(spec=CacheInvalidator)
+
+
+@pytest.fixture
+def service(
+    mock_db: AsyncMock, mock_cache: AsyncMock, mock_invalidator: AsyncMock
+) -> CachedJournalService:
+    return CachedJournalService(mock_db, mock_cache, mock_invalidator)
 
 
 class TestCachedCreate:
@@ -45,7 +56,11 @@ class TestCachedCreate:
 
     @pytest.mark.asyncio
     async def test_create_populates_cache(
-        self, service: CachedJournalService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self,
+        service: CachedJournalService,
+        mock_db: AsyncMock,
+        mock_cache: AsyncMock,
+        mock_invalidator: AsyncMock,
     ) -> None:
         row = make_entry_row(user_id=str(USER_ID))
         mock_db.create.return_value = row
@@ -54,7 +69,9 @@ class TestCachedCreate:
         await service.create(USER_ID, data)
 
         mock_cache.set_entry.assert_called_once_with(USER_ID, row.id, row)
-        mock_cache.invalidate_user_lists.assert_called_once_with(USER_ID)
+        mock_invalidator.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.ENTRY_CREATED, row.id
+        )
 
 
 class TestCachedGetById:
@@ -103,7 +120,7 @@ class TestCachedList:
         self, service: CachedJournalService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
         rows = [make_entry_row(user_id=str(USER_ID))]
-        mock_cache.get_list.return_value = (rows, False)
+        mock_cache.get_list.return_value = CachedPage((rows, False), "2")
         params = CursorParams(cursor=None, limit=20)
 
         result_rows, has_more = await service.list_entries(USER_ID, params)
@@ -117,7 +134,7 @@ class TestCachedList:
         self, service: CachedJournalService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
         rows = [make_entry_row(user_id=str(USER_ID))]
-        mock_cache.get_list.return_value = None
+        mock_cache.get_list.return_value = CachedPage(None, "2")
         mock_db.list_entries.return_value = (rows, True)
         params = CursorParams(cursor=None, limit=20)
 
@@ -125,7 +142,9 @@ class TestCachedList:
 
         assert result_rows == rows
         assert has_more is True
-        mock_cache.set_list.assert_called_once_with(USER_ID, None, 20, rows, True, None)
+        mock_cache.set_list.assert_called_once_with(
+            USER_ID, None, 20, rows, True, None, generation="2"
+        )
 
     @pytest.mark.asyncio
     async def test_list_with_journal_filter(
@@ -133,7 +152,7 @@ class TestCachedList:
     ) -> None:
         journal_uuid = uuid.UUID(DEFAULT_JOURNAL_ID)
         rows = [make_entry_row(user_id=str(USER_ID))]
-        mock_cache.get_list.return_value = None
+        mock_cache.get_list.return_value = CachedPage(None, None)
         mock_db.list_entries.return_value = (rows, False)
         params = CursorParams(cursor=None, limit=20)
 
@@ -144,14 +163,14 @@ class TestCachedList:
         assert result_rows == rows
         mock_db.list_entries.assert_called_once_with(USER_ID, params, journal_uuid)
         mock_cache.set_list.assert_called_once_with(
-            USER_ID, None, 20, rows, False, DEFAULT_JOURNAL_ID
+            USER_ID, None, 20, rows, False, DEFAULT_JOURNAL_ID, generation=None
         )
 
 
 class TestCachedUpdate:
     @pytest.mark.asyncio
     async def test_update_invalidates_cache(
-        self, service: CachedJournalService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self, service: CachedJournalService, mock_db: AsyncMock, mock_invalidator: AsyncMock
     ) -> None:
         row = make_entry_row(user_id=str(USER_ID), entry_id=str(ENTRY_ID))
         mock_db.update.return_value = row
@@ -160,11 +179,13 @@ class TestCachedUpdate:
         result = await service.update(USER_ID, ENTRY_ID, data)
 
         assert result == row
-        mock_cache.invalidate_all.assert_called_once_with(USER_ID, ENTRY_ID)
+        mock_invalidator.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.ENTRY_UPDATED, ENTRY_ID
+        )
 
     @pytest.mark.asyncio
     async def test_update_not_found_no_invalidation(
-        self, service: CachedJournalService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self, service: CachedJournalService, mock_db: AsyncMock, mock_invalidator: AsyncMock
     ) -> None:
         mock_db.update.return_value = None
         data = JournalEntryUpdate(title="Updated")
@@ -172,28 +193,130 @@ class TestCachedUpdate:
         result = await service.update(USER_ID, ENTRY_ID, data)
 
         assert result is None
-        mock_cache.invalidate_all.assert_not_called()
+        mock_invalidator.invalidate.assert_not_called()
 
 
 class TestCachedDelete:
     @pytest.mark.asyncio
     async def test_delete_invalidates_cache(
-        self, service: CachedJournalService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self, service: CachedJournalService, mock_db: AsyncMock, mock_invalidator: AsyncMock
     ) -> None:
         mock_db.soft_delete.return_value = True
 
         result = await service.soft_delete(USER_ID, ENTRY_ID)
 
         assert result is True
-        mock_cache.invalidate_all.assert_called_once_with(USER_ID, ENTRY_ID)
+        mock_invalidator.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.ENTRY_DELETED, ENTRY_ID
+        )
 
     @pytest.mark.asyncio
     async def test_delete_not_found_no_invalidation(
-        self, service: CachedJournalService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self, service: CachedJournalService, mock_db: AsyncMock, mock_invalidator: AsyncMock
     ) -> None:
         mock_db.soft_delete.return_value = False
 
         result = await service.soft_delete(USER_ID, ENTRY_ID)
 
         assert result is False
-        mock_cache.invalidate_all.assert_not_called()
+        mock_invalidator.invalidate.assert_not_called()
+
+
+@pytest.fixture
+def mock_scheduler() -> AsyncMock:
+    return AsyncMock(spec=InsightScheduler)
+
+
+@pytest.fixture
+def scheduled_service(
+    mock_db: AsyncMock,
+    mock_cache: AsyncMock,
+    mock_invalidator: AsyncMock,
+    mock_scheduler: AsyncMock,
+) -> CachedJournalService:
+    return CachedJournalService(mock_db, mock_cache, mock_invalidator, mock_scheduler)
+
+
+class TestInsightScheduling:
+    @pytest.mark.asyncio
+    async def test_create_schedules_entry_week(
+        self,
+        scheduled_service: CachedJournalService,
+        mock_db: AsyncMock,
+        mock_scheduler: AsyncMock,
+    ) -> None:
+        row = make_entry_row(created_at=datetime(2025, 1, 8, 9, tzinfo=UTC))
+        mock_db.create.return_value = row
+        data = JournalEntryCreate(journal_id=DEFAULT_JOURNAL_ID, body="Hello")
+
+        await scheduled_service.create(USER_ID, data)
+
+        mock_scheduler.schedule.assert_called_once_with(USER_ID, [date(2025, 1, 5)])
+
+    @pytest.mark.asyncio
+    async def test_update_schedules_entry_week(
+        self,
+        scheduled_service: CachedJournalService,
+        mock_db: AsyncMock,
+        mock_scheduler: AsyncMock,
+    ) -> None:
+        mock_db.update.return_value = make_entry_row(
+            created_at=datetime(2025, 1, 8, 9, tzinfo=UTC)
+        )
+
+        await scheduled_service.update(USER_ID, ENTRY_ID, JournalEntryUpdate(title="Updated"))
+
+        mock_db.get_by_id.assert_not_called()
+        mock_scheduler.schedule.assert_called_once_with(USER_ID, [date(2025, 1, 5)])
+
+    @pytest.mark.asyncio
+    async def test_backdated_update_schedules_old_and_new_weeks(
+        self,
+        scheduled_service: CachedJournalService,
+        mock_db: AsyncMock,
+        mock_cache: AsyncMock,
+        mock_scheduler: AsyncMock,
+    ) -> None:
+        mock_cache.get_entry.return_value = make_entry_row(
+            created_at=datetime(2025, 1, 8, 9, tzinfo=UTC)
+        )
+        mock_db.update.return_value = make_entry_row(
+            created_at=datetime(2024, 12, 30, 9, tzinfo=UTC)
+        )
+        data = JournalEntryUpdate(created_at=datetime(2024, 12, 30, 9, tzinfo=UTC))
+
+        await scheduled_service.update(USER_ID, ENTRY_ID, data)
+
+        mock_scheduler.schedule.assert_called_once_with(
+            USER_ID, [date(2025, 1, 5), date(2024, 12, 29)]
+        )
+
+    @pytest.mark.asyncio
+    async def test_delete_schedules_entry_week(
+        self,
+        scheduled_service: CachedJournalService,
+        mock_db: AsyncMock,
+        mock_cache: AsyncMock,
+        mock_scheduler: AsyncMock,
+    ) -> None:
+        mock_cache.get_entry.return_value = make_entry_row(
+            created_at=datetime(2025, 1, 8, 9, tzinfo=UTC)
+        )
+        mock_db.soft_delete.return_value = True
+
+        await scheduled_service.soft_delete(USER_ID, ENTRY_ID)
+
+        mock_scheduler.schedule.assert_called_once_with(USER_ID, [date(2025, 1, 5)])
+
+    @pytest.mark.asyncio
+    async def test_failed_update_does_not_schedule(
+        self,
+        scheduled_service: CachedJournalService,
+        mock_db: AsyncMock,
+        mock_scheduler: AsyncMock,
+    ) -> None:
+        mock_db.update.return_value = None
+
+        await scheduled_service.update(USER_ID, ENTRY_ID, JournalEntryUpdate(title="Updated"))
+
+        mock_scheduler.schedule.assert_not_called()
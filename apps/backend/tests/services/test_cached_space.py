@@ -4,8 +4,13 @@ from unittest.mock import AsyncMock
 import pytest
 
 from nstil.models.space import JournalSpaceCreate, JournalSpaceUpdate
-from nstil.services.cache.entry_cache import EntryCacheService
-from nstil.services.cache.space_cache import SpaceCacheService
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
+from nstil.services.cache.space_cache import (
+    CachedDefaultSpace,
+    CachedSpaceList,
+    SpaceCacheService,
+)
 from nstil.services.cached_space import CachedSpaceService
 from nstil.services.space import JournalSpaceService
 from tests.factories import make_space_row
@@ -25,15 +30,15 @@ def mock_cache() -> AsyncMock:
 
 
 @pytest.fixture
-def mock_entry_cache() -> AsyncMock:
-    return AsyncMock(spec=EntryCacheService)
+def mock_invalidator() -> AsyncMock:
+    return AsyncMock(spec=CacheInvalidator)
 
 
 @pytest.fixture
 def service(
-    mock_db: AsyncMock, mock_cache: AsyncMock, mock_entry_cache: AsyncMock
+    mock_db: AsyncMock, mock_cache: AsyncMock, mock_invalidator: AsyncMock
 ) -> CachedSpaceService:
-    return CachedSpaceService(mock_db, mock_cache, mock_entry_cache)
+    return CachedSpaceService(mock_db, mock_cache, mock_invalidator)
 
 
 class TestCachedCreate:
@@ -52,7 +57,11 @@ class TestCachedCreate:
 
     @pytest.mark.asyncio
     async def test_create_populates_cache(
-        self, service: CachedSpaceService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self,
+        service: CachedSpaceService,
+        mock_db: AsyncMock,
+        mock_cache: AsyncMock,
+        mock_invalidator: AsyncMock,
     ) -> None:
         row = make_space_row(user_id=str(USER_ID), name="Work")
         mock_db.create.return_value = row
@@ -61,7 +70,9 @@ class TestCachedCreate:
         await service.create(USER_ID, data)
 
         mock_cache.set_space.assert_called_once_with(USER_ID, row.id, row)
-        mock_cache.invalidate_space_list.assert_called_once_with(USER_ID)
+        mock_invalidator.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.SPACE_CREATED, row.id
+        )
 
 
 class TestCachedGetById:
@@ -110,7 +121,7 @@ class TestCachedList:
         self, service: CachedSpaceService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
         rows = [make_space_row(user_id=str(USER_ID))]
-        mock_cache.get_space_list.return_value = rows
+        mock_cache.get_space_list.return_value = CachedSpaceList(rows, "1")
 
         result = await service.list_spaces(USER_ID)
 
@@ -122,19 +133,67 @@ class TestCachedList:
         self, service: CachedSpaceService, mock_db: AsyncMock, mock_cache: AsyncMock
     ) -> None:
         rows = [make_space_row(user_id=str(USER_ID))]
-        mock_cache.get_space_list.return_value = None
+        mock_cache.get_space_list.return_value = CachedSpaceList(None, "1")
         mock_db.list_spaces.return_value = rows
 
         result = await service.list_spaces(USER_ID)
 
         assert result == rows
-        mock_cache.set_space_list.assert_called_once_with(USER_ID, rows)
+        mock_cache.set_space_list.assert_called_once_with(USER_ID, rows, generation="1")
+
+
+class TestCachedGetDefault:
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_db(
+        self, service: CachedSpaceService, mock_db: AsyncMock, mock_cache: AsyncMock
+    ) -> None:
+        row = make_space_row(user_id=str(USER_ID))
+        mock_cache.get_default_space.return_value = CachedDefaultSpace(row, "1")
+
+        result = await service.get_default(USER_ID)
+
+        assert result == row
+        mock_db.get_default.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cache_miss_queries_db(
+        self, service: CachedSpaceService, mock_db: AsyncMock, mock_cache: AsyncMock
+    ) -> None:
+        row = make_space_row(user_id=str(USER_ID))
+        mock_cache.get_default_space.return_value = CachedDefaultSpace(None, "1")
+        mock_db.get_default.return_value = row
+
+        result = await service.get_default(USER_ID)
+
+        assert result == row
+        mock_cache.set_default_space.assert_called_once_with(USER_ID, row, generation="1")
+
+    @pytest.mark.asyncio
+    async def test_missing_default_not_cached(
+        self, service: CachedSpaceService, mock_db: AsyncMock, mock_cache: AsyncMock
+    ) -> None:
+        mock_cache.get_default_space.return_value = CachedDefaultSpace(None, "1")
+        mock_db.get_default.return_value = None
+
+        assert await service.get_default(USER_ID) is None
+        mock_cache.set_default_space.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_invalidates_default(
+        self, service: CachedSpaceService, mock_db: AsyncMock, mock_invalidator: AsyncMock
+    ) -> None:
+        mock_db.create.return_value = make_space_row(user_id=str(USER_ID))
+
+        await service.create(USER_ID, JournalSpaceCreate(name="Work"))
+
+        mock_invalidator.invalidate.assert_awaited_once()
+        assert mock_invalidator.invalidate.call_args.args[1] == CacheEvent.SPACE_CREATED
 
 
 class TestCachedUpdate:
     @pytest.mark.asyncio
     async def test_update_invalidates_cache(
-        self, service: CachedSpaceService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self, service: CachedSpaceService, mock_db: AsyncMock, mock_invalidator: AsyncMock
     ) -> None:
         row = make_space_row(user_id=str(USER_ID), space_id=str(SPACE_ID))
         mock_db.update.return_value = row
@@ -143,11 +202,13 @@ class TestCachedUpdate:
         result = await service.update(USER_ID, SPACE_ID, data)
 
         assert result == row
-        mock_cache.invalidate_all.assert_called_once_with(USER_ID, SPACE_ID)
+        mock_invalidator.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.SPACE_UPDATED, SPACE_ID
+        )
 
     @pytest.mark.asyncio
     async def test_update_not_found_no_invalidation(
-        self, service: CachedSpaceService, mock_db: AsyncMock, mock_cache: AsyncMock
+        self, service: CachedSpaceService, mock_db: AsyncMock, mock_invalidator: AsyncMock
     ) -> None:
         mock_db.update.return_value = None
         data = JournalSpaceUpdate(name="Updated")
@@ -155,7 +216,7 @@ class TestCachedUpdate:
         result = await service.update(USER_ID, SPACE_ID, data)
 
         assert result is None
-        mock_cache.invalidate_all.assert_not_called()
+        mock_invalidator.invalidate.assert_not_called()
 
 
 class TestCachedDelete:
@@ -164,31 +225,27 @@ class TestCachedDelete:
         self,
         service: CachedSpaceService,
         mock_db: AsyncMock,
-        mock_cache: AsyncMock,
-        mock_entry_cache: AsyncMock,
+        mock_invalidator: AsyncMock,
     ) -> None:
         mock_db.soft_delete.return_value = True
 
         result = await service.soft_delete(USER_ID, SPACE_ID)
 
         assert result is True
-        mock_cache.invalidate_all.assert_called_once_with(USER_ID, SPACE_ID)
-        mock_entry_cache.invalidate_user_lists.assert_called_once_with(USER_ID)
-        mock_entry_cache.invalidate_user_searches.assert_called_once_with(USER_ID)
+        mock_invalidator.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.SPACE_DELETED, SPACE_ID
+        )
 
     @pytest.mark.asyncio
     async def test_delete_not_found_no_invalidation(
         self,
         service: CachedSpaceService,
         mock_db: AsyncMock,
-        mock_cache: AsyncMock,
-        mock_entry_cache: AsyncMock,
+        mock_invalidator: AsyncMock,
     ) -> None:
         mock_db.soft_delete.return_value = False
 
         result = await service.soft_delete(USER_ID, SPACE_ID)
 
         assert result is False
-        mock_cache.invalidate_all.assert_not_called()
-        mock_entry_cache.invalidate_user_lists.assert_not_called()
-        mock_entry_cache.invalidate_user_searches.assert_not_called()
+        mock_invalidator.invalidate.assert_not_called()
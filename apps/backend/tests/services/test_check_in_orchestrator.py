@@ -1,16 +1,29 @@
 from __future__ import annotations
 
 import uuid
+from types import TracebackType
+from typing import Any
 from unittest.mock import AsyncMock
 
 import pytest
+from postgrest.exceptions import APIError
 
+from nstil.models.ai_session import ActiveCheckInState, SessionStatus, TriggerSource
 from nstil.models.journal import EntryType
 from nstil.models.mood import MoodCategory, MoodSpecific
-from nstil.services.ai.check_in import CheckInError, CheckInOrchestrator, CheckInStep
+from nstil.services.ai.check_in import (
+    CHECK_IN_STEP_ERROR_CODE,
+    CheckInError,
+    CheckInOrchestrator,
+    CheckInStep,
+)
+from nstil.services.cache.ai_cache import AICacheService, CachedActiveCheckIn
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
 from tests.factories import (
     DEFAULT_JOURNAL_ID,
     DEFAULT_USER_ID,
+    make_ai_prompt_row,
     make_ai_session_row,
     make_entry_row,
     make_space_row,
@@ -37,21 +50,384 @@ def _responded_flow_state(
 def _build_orchestrator(
     *,
     session_service: AsyncMock | None = None,
+    prompt_engine: AsyncMock | None = None,
+    profile_service: AsyncMock | None = None,
     journal_service: AsyncMock | None = None,
     space_service: AsyncMock | None = None,
-    context_service: AsyncMock | None = None,
+    cache: AsyncMock | None = None,
+    invalidator: AsyncMock | None = None,
 ) -> CheckInOrchestrator:
     return CheckInOrchestrator(
         session_service=session_service or AsyncMock(),
-        prompt_engine=AsyncMock(),
+        prompt_engine=prompt_engine or AsyncMock(),
         prompt_service=AsyncMock(),
         journal_service=journal_service or AsyncMock(),
         space_service=space_service or AsyncMock(),
-        profile_service=AsyncMock(),
-        context_service=context_service or AsyncMock(),
+        profile_service=profile_service or AsyncMock(),
+        cache=cache or _cache(),
+        invalidator=invalidator or AsyncMock(),
     )
 
 
+def _cache(state: ActiveCheckInState | None = None, generation: str = "3") -> AsyncMock:
+    cache = AsyncMock()
+    cache.get_active_check_in.return_value = CachedActiveCheckIn(state, generation)
+    return cache
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, tuple[Any, ...]]] = []
+
+    async def __aenter__(self) -> FakePipeline:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        return None
+
+    def incr(self, key: str) -> None:
+        self._ops.append(("incr", (key,)))
+
+    def expire(self, key: str, ttl: int) -> None:
+        self._ops.append(("expire", (key, ttl)))
+
+    def delete(self, *keys: str) -> None:
+        self._ops.append(("delete", keys))
+
+    async def execute(self) -> list[object]:
+        results = [getattr(self._redis, f"_{name}")(*args) for name, args in self._ops]
+        self._ops.clear()
+        return results
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def mget(self, keys: tuple[str, ...]) -> list[str | None]:
+        return [self.values.get(key) for key in keys]
+
+    async def setex(self, key: str, ttl: int, value: str) -> bool:
+        self.values[key] = value
+        return True
+
+    def _incr(self, key: str) -> int:
+        value = int(self.values.get(key, "0")) + 1
+        self.values[key] = str(value)
+        return value
+
+    def _expire(self, key: str, ttl: int) -> bool:
+        return key in self.values
+
+    def _delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+
+class TestActiveSessionCache:
+    @pytest.mark.asyncio
+    async def test_get_active_served_from_cache(self) -> None:
+        sessions_mock = AsyncMock()
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock, cache=_cache(ActiveCheckInState(session=None))
+        )
+
+        assert await orchestrator.get_active(USER_ID) is None
+        sessions_mock.list_sessions.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_active_miss_populates_cache(self) -> None:
+        session = make_ai_session_row(flow_state={"step": CheckInStep.PROMPTED.value})
+        sessions_mock = AsyncMock()
+        sessions_mock.list_sessions.return_value = ([session], False)
+        cache = _cache()
+
+        orchestrator = _build_orchestrator(session_service=sessions_mock, cache=cache)
+        result = await orchestrator.get_active(USER_ID)
+
+        assert result is not None
+        assert result.session is session
+        cache.set_active_check_in.assert_awaited_once_with(USER_ID, session, generation="3")
+
+    @pytest.mark.asyncio
+    async def test_fill_racing_a_step_is_not_served(self) -> None:
+        redis = FakeRedis()
+        cache = AICacheService(redis)  # type: ignore[arg-type]
+        invalidator = CacheInvalidator(redis)  # type: ignore[arg-type]
+        prompted = make_ai_session_row(flow_state={"step": CheckInStep.PROMPTED.value})
+        responded = prompted.model_copy(update={"flow_state": _responded_flow_state()})
+
+        async def list_racing_respond(*args: object, **kwargs: object) -> tuple[list[Any], bool]:
+            await invalidator.invalidate(USER_ID, CacheEvent.SESSION_UPDATED, prompted.id)
+            return [prompted], False
+
+        sessions_mock = AsyncMock()
+        sessions_mock.list_sessions.side_effect = list_racing_respond
+        sessions_mock.get_by_id.return_value = responded
+        journal_mock = AsyncMock()
+        journal_mock.create.return_value = make_entry_row()
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock,
+            journal_service=journal_mock,
+            cache=cache,  # type: ignore[arg-type]
+            invalidator=invalidator,  # type: ignore[arg-type]
+        )
+
+        await orchestrator.get_active(USER_ID)
+
+        assert (await cache.get_active_check_in(USER_ID)).state is None
+        await orchestrator.convert_to_entry(USER_ID, prompted.id, journal_id=JOURNAL_ID)
+        sessions_mock.get_by_id.assert_awaited_once_with(USER_ID, prompted.id)
+
+    @pytest.mark.asyncio
+    async def test_complete_uses_cached_session(self) -> None:
+        session = make_ai_session_row(flow_state=_responded_flow_state(mood_category="happy"))
+        sessions_mock = AsyncMock()
+        sessions_mock.finish_check_in.return_value = make_ai_session_row(status="completed")
+        journal_mock = AsyncMock()
+        journal_mock.create.return_value = make_entry_row()
+        space_mock = AsyncMock()
+        space_mock.get_default.return_value = make_space_row()
+        cache = _cache(ActiveCheckInState(session=session))
+
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock,
+            journal_service=journal_mock,
+            space_service=space_mock,
+            cache=cache,
+        )
+        await orchestrator.complete(USER_ID, session.id)
+
+        sessions_mock.get_by_id.assert_not_called()
+        cache.set_active_check_in.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cached_session_for_other_id_falls_back_to_db(self) -> None:
+        cached = make_ai_session_row(flow_state=_responded_flow_state())
+        session = make_ai_session_row(flow_state=_responded_flow_state())
+        sessions_mock = AsyncMock()
+        sessions_mock.get_by_id.return_value = session
+        journal_mock = AsyncMock()
+        journal_mock.create.return_value = make_entry_row()
+
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock,
+            journal_service=journal_mock,
+            cache=_cache(ActiveCheckInState(session=cached)),
+        )
+        await orchestrator.convert_to_entry(USER_ID, session.id, journal_id=JOURNAL_ID)
+
+        sessions_mock.get_by_id.assert_awaited_once_with(USER_ID, session.id)
+
+
+class TestStart:
+    @pytest.mark.asyncio
+    async def test_creates_session_in_single_step(self) -> None:
+        prompt = make_ai_prompt_row()
+        session = make_ai_session_row()
+
+        sessions_mock = AsyncMock()
+        sessions_mock.list_sessions.return_value = ([], False)
+        sessions_mock.start_check_in.return_value = session
+
+        engine_mock = AsyncMock()
+        engine_mock.generate.return_value = prompt
+        cache = _cache()
+
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock, prompt_engine=engine_mock, cache=cache
+        )
+
+        result = await orchestrator.start(USER_ID)
+
+        sessions_mock.start_check_in.assert_awaited_once_with(
+            USER_ID, TriggerSource.MANUAL, prompt.id
+        )
+        sessions_mock.create.assert_not_called()
+        cache.set_active_check_in.assert_awaited_once_with(USER_ID, None, generation="3")
+        assert result.session is session
+        assert result.prompt_content == prompt.content
+
+    @pytest.mark.asyncio
+    async def test_raises_when_no_prompt(self) -> None:
+        sessions_mock = AsyncMock()
+        sessions_mock.list_sessions.return_value = ([], False)
+
+        engine_mock = AsyncMock()
+        engine_mock.generate.return_value = None
+
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock, prompt_engine=engine_mock
+        )
+
+        with pytest.raises(CheckInError, match="Failed to generate"):
+            await orchestrator.start(USER_ID)
+
+        sessions_mock.start_check_in.assert_not_called()
+
+
+class TestRespond:
+    @pytest.mark.asyncio
+    async def test_delegates_to_step_function(self) -> None:
+        session = make_ai_session_row(flow_state=_responded_flow_state())
+
+        sessions_mock = AsyncMock()
+        sessions_mock.respond_check_in.return_value = session
+        profile_mock = AsyncMock()
+        invalidator_mock = AsyncMock()
+
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock,
+            profile_service=profile_mock,
+            invalidator=invalidator_mock,
+        )
+
+        result = await orchestrator.respond(
+            USER_ID, session.id, MoodCategory.CALM, MoodSpecific.CONTENT, "  feeling ok  "
+        )
+
+        sessions_mock.respond_check_in.assert_awaited_once_with(
+            USER_ID, session.id, "calm", "content", "feeling ok"
+        )
+        sessions_mock.get_by_id.assert_not_called()
+        profile_mock.update_last_check_in.assert_awaited_once()
+        invalidator_mock.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.SESSION_UPDATED, session.id
+        )
+        assert result.session is session
+
+    @pytest.mark.asyncio
+    async def test_maps_step_errors(self) -> None:
+        sessions_mock = AsyncMock()
+        sessions_mock.respond_check_in.side_effect = APIError(
+            {
+                "code": CHECK_IN_STEP_ERROR_CODE,
+                "message": "Cannot respond: session is in step 'responded'",
+            }
+        )
+
+        orchestrator = _build_orchestrator(session_service=sessions_mock)
+
+        with pytest.raises(CheckInError, match="Cannot respond"):
+            await orchestrator.respond(USER_ID, uuid.uuid4(), MoodCategory.HAPPY)
+
+    @pytest.mark.asyncio
+    async def test_other_database_errors_propagate(self) -> None:
+        sessions_mock = AsyncMock()
+        sessions_mock.respond_check_in.side_effect = APIError({"code": "42P01", "message": "x"})
+
+        orchestrator = _build_orchestrator(session_service=sessions_mock)
+
+        with pytest.raises(APIError):
+            await orchestrator.respond(USER_ID, uuid.uuid4(), MoodCategory.HAPPY)
+
+
+class TestConvertToEntry:
+    @pytest.mark.asyncio
+    async def test_finishes_as_converted(self) -> None:
+        flow = _responded_flow_state(mood_category="happy", response_text="A good day")
+        session = make_ai_session_row(flow_state=flow)
+        converted = make_ai_session_row(status="converted", flow_state=flow)
+        entry = make_entry_row()
+
+        sessions_mock = AsyncMock()
+        sessions_mock.get_by_id.return_value = session
+        sessions_mock.finish_check_in.return_value = converted
+
+        journal_mock = AsyncMock()
+        journal_mock.create.return_value = entry
+
+        space_mock = AsyncMock()
+        space_mock.get_default.return_value = make_space_row()
+
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock,
+            journal_service=journal_mock,
+            space_service=space_mock,
+        )
+
+        result = await orchestrator.convert_to_entry(USER_ID, session.id)
+
+        assert journal_mock.create.call_args[0][1].body == "A good day"
+        sessions_mock.finish_check_in.assert_awaited_once_with(
+            USER_ID, session.id, SessionStatus.CONVERTED, entry.id
+        )
+        assert result.session is converted
+        assert result.entry is entry
+        journal_mock.soft_delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_discards_entry_when_finish_loses_race(self) -> None:
+        session = make_ai_session_row(flow_state=_responded_flow_state(response_text="Hi"))
+        entry = make_entry_row()
+
+        sessions_mock = AsyncMock()
+        sessions_mock.get_by_id.return_value = session
+        sessions_mock.finish_check_in.side_effect = APIError(
+            {"code": CHECK_IN_STEP_ERROR_CODE, "message": "Session is not active"}
+        )
+        journal_mock = AsyncMock()
+        journal_mock.create.return_value = entry
+        cache = _cache()
+
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock, journal_service=journal_mock, cache=cache
+        )
+
+        with pytest.raises(CheckInError, match="not active"):
+            await orchestrator.convert_to_entry(USER_ID, session.id, journal_id=JOURNAL_ID)
+
+        journal_mock.soft_delete.assert_awaited_once_with(USER_ID, entry.id)
+        cache.set_active_check_in.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_explicit_journal_skips_default_lookup(self) -> None:
+        session = make_ai_session_row(flow_state=_responded_flow_state())
+
+        sessions_mock = AsyncMock()
+        sessions_mock.get_by_id.return_value = session
+        space_mock = AsyncMock()
+        journal_mock = AsyncMock()
+        journal_mock.create.return_value = make_entry_row()
+
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock,
+            journal_service=journal_mock,
+            space_service=space_mock,
+        )
+
+        await orchestrator.convert_to_entry(USER_ID, session.id, journal_id=JOURNAL_ID)
+
+        space_mock.get_default.assert_not_called()
+        assert journal_mock.create.call_args[0][1].journal_id == JOURNAL_ID
+
+
+class TestAbandon:
+    @pytest.mark.asyncio
+    async def test_finishes_as_abandoned(self) -> None:
+        session = make_ai_session_row(status="abandoned")
+
+        sessions_mock = AsyncMock()
+        sessions_mock.finish_check_in.return_value = session
+
+        orchestrator = _build_orchestrator(session_service=sessions_mock)
+
+        result = await orchestrator.abandon(USER_ID, session.id)
+
+        sessions_mock.finish_check_in.assert_awaited_once_with(
+            USER_ID, session.id, SessionStatus.ABANDONED
+        )
+        assert result.session is session
+
+
 class TestComplete:
     @pytest.mark.asyncio
     async def test_creates_mood_snapshot_entry(self) -> None:
@@ -68,7 +444,7 @@ class TestComplete:
 
         sessions_mock = AsyncMock()
         sessions_mock.get_by_id.return_value = session
-        sessions_mock.update.return_value = completed_session
+        sessions_mock.finish_check_in.return_value = completed_session
 
         journal_mock = AsyncMock()
         journal_mock.create.return_value = entry
@@ -76,13 +452,13 @@ class TestComplete:
         space_mock = AsyncMock()
         space_mock.get_default.return_value = space
 
-        context_mock = AsyncMock()
+        invalidator_mock = AsyncMock()
 
         orchestrator = _build_orchestrator(
             session_service=sessions_mock,
             journal_service=journal_mock,
             space_service=space_mock,
-            context_service=context_mock,
+            invalidator=invalidator_mock,
         )
 
         result = await orchestrator.complete(USER_ID, session.id)
@@ -113,7 +489,7 @@ class TestComplete:
 
         sessions_mock = AsyncMock()
         sessions_mock.get_by_id.return_value = session
-        sessions_mock.update.return_value = completed_session
+        sessions_mock.finish_check_in.return_value = completed_session
 
         journal_mock = AsyncMock()
         journal_mock.create.return_value = entry
@@ -148,7 +524,7 @@ class TestComplete:
 
         sessions_mock = AsyncMock()
         sessions_mock.get_by_id.return_value = session
-        sessions_mock.update.return_value = completed_session
+        sessions_mock.finish_check_in.return_value = completed_session
 
         journal_mock = AsyncMock()
         journal_mock.create.return_value = entry
@@ -164,13 +540,12 @@ class TestComplete:
 
         await orchestrator.complete(USER_ID, session.id)
 
-        update_call = sessions_mock.update.call_args
-        session_update = update_call[0][2]
-        assert session_update.entry_id == entry.id
-        assert session_update.status == "completed"
+        sessions_mock.finish_check_in.assert_awaited_once_with(
+            USER_ID, session.id, SessionStatus.COMPLETED, entry.id
+        )
 
     @pytest.mark.asyncio
-    async def test_invalidates_ai_context(self) -> None:
+    async def test_invalidates_session_dependents(self) -> None:
         flow = _responded_flow_state(mood_category="anxious")
         session = make_ai_session_row(flow_state=flow)
         completed_session = make_ai_session_row(status="completed", flow_state=flow)
@@ -184,7 +559,7 @@ class TestComplete:
 
         sessions_mock = AsyncMock()
         sessions_mock.get_by_id.return_value = session
-        sessions_mock.update.return_value = completed_session
+        sessions_mock.finish_check_in.return_value = completed_session
 
         journal_mock = AsyncMock()
         journal_mock.create.return_value = entry
@@ -192,18 +567,20 @@ class TestComplete:
         space_mock = AsyncMock()
         space_mock.get_default.return_value = space
 
-        context_mock = AsyncMock()
+        invalidator_mock = AsyncMock()
 
         orchestrator = _build_orchestrator(
             session_service=sessions_mock,
             journal_service=journal_mock,
             space_service=space_mock,
-            context_service=context_mock,
+            invalidator=invalidator_mock,
         )
 
         await orchestrator.complete(USER_ID, session.id)
 
-        context_mock.invalidate.assert_called_once_with(USER_ID)
+        invalidator_mock.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.SESSION_UPDATED, completed_session.id
+        )
 
     @pytest.mark.asyncio
     async def test_rejects_non_responded_step(self) -> None:
@@ -249,6 +626,28 @@ class TestComplete:
         with pytest.raises(CheckInError, match="No journal found"):
             await orchestrator.complete(USER_ID, session.id)
 
+    @pytest.mark.asyncio
+    async def test_discards_snapshot_when_finish_fails(self) -> None:
+        session = make_ai_session_row(flow_state=_responded_flow_state(mood_category="calm"))
+        entry = make_entry_row(entry_type="mood_snapshot")
+
+        sessions_mock = AsyncMock()
+        sessions_mock.get_by_id.return_value = session
+        sessions_mock.finish_check_in.side_effect = APIError({"code": "40001", "message": "x"})
+        journal_mock = AsyncMock()
+        journal_mock.create.return_value = entry
+        space_mock = AsyncMock()
+        space_mock.get_default.return_value = make_space_row()
+
+        orchestrator = _build_orchestrator(
+            session_service=sessions_mock, journal_service=journal_mock, space_service=space_mock
+        )
+
+        with pytest.raises(APIError):
+            await orchestrator.complete(USER_ID, session.id)
+
+        journal_mock.soft_delete.assert_awaited_once_with(USER_ID, entry.id)
+
 
 class TestExtractMoodFromFlow:
     def test_extracts_both(self) -> None:
@@ -0,0 +1,135 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from nstil.models.ai_context import AIContextEntry, AIContextWindow
+from nstil.services.ai.context_window import (
+    CANONICAL_DAYS_BACK,
+    CANONICAL_ENTRY_LIMIT,
+    compute_aggregates,
+    slice_entries,
+    superset_shape,
+    window_covers,
+    window_dominates,
+    window_entries,
+)
+
+NOW = datetime(2026, 3, 15, 12, 0, tzinfo=UTC)
+
+
+def _entry(
+    days_ago: float,
+    mood: str | None = None,
+    specific: str | None = None,
+    entry_type: str = "journal",
+    body_length: int | None = 10,
+) -> AIContextEntry:
+    return AIContextEntry(
+        id=str(uuid.uuid4()),
+        title="",
+        body="short",
+        body_length=body_length,
+        mood_category=mood,
+        mood_specific=specific,
+        tags=[],
+        entry_type=entry_type,
+        location=None,
+        journal_name="Journal",
+        created_at=NOW - timedelta(days=days_ago),
+    )
+
+
+def _window(
+    entries: list[AIContextEntry], entry_limit: int = 100, days_back: int = 28
+) -> AIContextWindow:
+    return AIContextWindow(
+        entry_limit=entry_limit,
+        days_back=days_back,
+        fetched_at=NOW,
+        recent_entries=entries,
+    )
+
+
+class TestSupersetShape:
+    def test_small_requests_use_canonical_shape(self) -> None:
+        assert superset_shape(10, 14) == (CANONICAL_ENTRY_LIMIT, CANONICAL_DAYS_BACK)
+
+    def test_larger_requests_grow_the_shape(self) -> None:
+        assert superset_shape(100, 60) == (100, 60)
+
+
+class TestWindowDominates:
+    def test_smaller_shape(self) -> None:
+        assert window_dominates(_window([]), 10, 14, NOW)
+
+    def test_larger_limit(self) -> None:
+        assert not window_dominates(_window([], entry_limit=50), 100, 14, NOW)
+
+    def test_longer_days(self) -> None:
+        assert not window_dominates(_window([], days_back=28), 10, 60, NOW)
+
+    def test_same_days_after_time_passes(self) -> None:
+        later = NOW + timedelta(minutes=1)
+        assert window_dominates(_window([], days_back=14), 10, 14, later)
+        assert not window_dominates(_window([], days_back=14), 10, 15, later)
+
+
+class TestWindowEntries:
+    def test_filters_by_days_then_slices(self) -> None:
+        entries = [_entry(1), _entry(2), _entry(10), _entry(20)]
+        in_window = window_entries(_window(entries), 7, NOW)
+        assert in_window == entries[:2]
+        assert slice_entries(in_window, 1) == entries[:1]
+
+
+class TestWindowCovers:
+    def test_untruncated_window(self) -> None:
+        assert window_covers(_window([_entry(1)], entry_limit=5), 14, NOW)
+
+    def test_truncated_but_oldest_is_outside_request(self) -> None:
+        window = _window([_entry(1), _entry(20)], entry_limit=2)
+        assert window_covers(window, 14, NOW)
+
+    def test_truncated_inside_request(self) -> None:
+        window = _window([_entry(1), _entry(2)], entry_limit=2)
+        assert not window_covers(window, 14, NOW)
+
+
+class TestComputeAggregates:
+    def test_matches_rpc_semantics(self) -> None:
+        entries = [
+            _entry(0.5, "happy", "joyful", body_length=11),
+            _entry(1, "happy", "joyful", entry_type="check_in", body_length=20),
+            _entry(3, "sad", body_length=30),
+            _entry(10, "happy", "joyful", entry_type="check_in", body_length=1000),
+            _entry(12),
+        ]
+
+        aggregates = compute_aggregates(entries, NOW)
+
+        distribution = aggregates.mood_distribution
+        assert [(m.mood_category, m.mood_specific, m.count) for m in distribution] == [
+            ("happy", "joyful", 3),
+            ("sad", None, 1),
+        ]
+        stats = aggregates.stats
+        assert stats.total_entries == 5
+        assert stats.entries_last_7d == 3
+        assert stats.check_ins_total == 2
+        assert stats.check_ins_last_7d == 1
+        assert stats.avg_entry_length_7d == 20
+        assert stats.last_entry_at == entries[0].created_at
+
+    def test_average_rounds_half_up(self) -> None:
+        entries = [_entry(1, body_length=1), _entry(2, body_length=2)]
+        assert compute_aggregates(entries, NOW).stats.avg_entry_length_7d == 2
+
+    def test_falls_back_to_body_length_when_missing(self) -> None:
+        entries = [_entry(1, body_length=None)]
+        assert compute_aggregates(entries, NOW).stats.avg_entry_length_7d == len("short")
+
+    def test_empty(self) -> None:
+        aggregates = compute_aggregates([], NOW)
+        assert aggregates.mood_distribution == []
+        assert aggregates.stats.total_entries == 0
+        assert aggregates.stats.avg_entry_length_7d is None
+        assert aggregates.stats.last_entry_at is None
@@ -4,7 +4,14 @@ from unittest.mock import AsyncMock
 import pytest
 
 from nstil.services.cache.entry_cache import EntryCacheService
-from nstil.services.cache.keys import entry_key, entry_list_key, entry_list_pattern
+from nstil.services.cache.families import CacheFamily
+from nstil.services.cache.keys import (
+    entry_key,
+    entry_list_key,
+    entry_list_pattern,
+    epoch_key,
+    generation_key,
+)
 from tests.factories import make_entry_row
 
 USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
@@ -15,6 +22,7 @@ ENTRY_ID = uuid.UUID("00000000-0000-0000-0000-000000000099")
 def mock_redis() -> AsyncMock:
     mock = AsyncMock()
     mock.get.return_value = None
+    mock.mget.return_value = [None, None, None]
     mock.setex.return_value = True
     mock.delete.return_value = 1
     mock.scan.return_value = (0, [])
@@ -94,22 +102,21 @@ class TestEntryCacheGetSet:
 class TestEntryCacheList:
     @pytest.mark.asyncio
     async def test_get_list_miss(self, cache: EntryCacheService, mock_redis: AsyncMock) -> None:
-        mock_redis.get.return_value = None
         result = await cache.get_list(USER_ID, None, 20)
-        assert result is None
+        assert result.page is None
 
     @pytest.mark.asyncio
     async def test_set_and_get_list(self, cache: EntryCacheService, mock_redis: AsyncMock) -> None:
         rows = [make_entry_row(user_id=str(USER_ID)) for _ in range(3)]
-        await cache.set_list(USER_ID, None, 20, rows, True)
+        await cache.set_list(USER_ID, None, 20, rows, True, generation=None)
         mock_redis.setex.assert_called_once()
 
         stored_value = mock_redis.setex.call_args[0][2]
-        mock_redis.get.return_value = stored_value
+        mock_redis.mget.return_value = [None, None, stored_value]
 
         result = await cache.get_list(USER_ID, None, 20)
-        assert result is not None
-        items, has_more = result
+        assert result.page is not None
+        items, has_more = result.page
         assert len(items) == 3
         assert has_more is True
 
@@ -117,47 +124,81 @@ class TestEntryCacheList:
     async def test_set_list_uses_correct_ttl(
         self, cache: EntryCacheService, mock_redis: AsyncMock
     ) -> None:
-        await cache.set_list(USER_ID, None, 20, [], False)
+        await cache.set_list(USER_ID, None, 20, [], False, generation=None)
         ttl = mock_redis.setex.call_args[0][1]
-        assert ttl == 120
+        assert ttl == 600
 
     @pytest.mark.asyncio
     async def test_get_list_corrupted_data(
         self, cache: EntryCacheService, mock_redis: AsyncMock
     ) -> None:
-        mock_redis.get.return_value = "not valid json {"
+        mock_redis.mget.return_value = [None, None, "0.0|not valid json {"]
         result = await cache.get_list(USER_ID, None, 20)
-        assert result is None
+        assert result.page is None
 
 
-class TestEntryCacheInvalidation:
+class TestEntryCacheGeneration:
     @pytest.mark.asyncio
-    async def test_invalidate_entry(self, cache: EntryCacheService, mock_redis: AsyncMock) -> None:
-        await cache.invalidate_entry(USER_ID, ENTRY_ID)
-        mock_redis.delete.assert_called_once_with(entry_key(USER_ID, ENTRY_ID))
+    async def test_list_read_fetches_generation_with_value(
+        self, cache: EntryCacheService, mock_redis: AsyncMock
+    ) -> None:
+        await cache.get_list(USER_ID, None, 20)
+
+        keys = mock_redis.mget.call_args.args[0]
+        assert keys == (
+            epoch_key(),
+            generation_key(USER_ID, CacheFamily.ENTRY_LISTS),
+            entry_list_key(USER_ID, None, 20),
+        )
 
     @pytest.mark.asyncio
-    async def test_invalidate_user_lists(
+    async def test_list_read_returns_generation(
         self, cache: EntryCacheService, mock_redis: AsyncMock
     ) -> None:
-        mock_redis.scan.return_value = (0, [b"key1", b"key2"])
-        await cache.invalidate_user_lists(USER_ID)
-        mock_redis.scan.assert_called_once()
-        mock_redis.delete.assert_called_once_with(b"key1", b"key2")
+        mock_redis.mget.return_value = ["2", "7", None]
+
+        result = await cache.get_list(USER_ID, None, 20)
+
+        assert result.page is None
+        assert result.generation == "2.7"
 
     @pytest.mark.asyncio
-    async def test_invalidate_user_lists_no_keys(
+    async def test_list_stamped_with_generation_read_before_fetch(
         self, cache: EntryCacheService, mock_redis: AsyncMock
     ) -> None:
-        mock_redis.scan.return_value = (0, [])
-        await cache.invalidate_user_lists(USER_ID)
-        mock_redis.delete.assert_not_called()
+        mock_redis.get.return_value = "8"
+        await cache.set_list(USER_ID, None, 20, [], False, generation="7")
+
+        mock_redis.get.assert_not_called()
+        assert mock_redis.setex.call_args[0][2].startswith("7|")
 
     @pytest.mark.asyncio
-    async def test_invalidate_all(self, cache: EntryCacheService, mock_redis: AsyncMock) -> None:
-        mock_redis.scan.return_value = (0, [])
-        await cache.invalidate_all(USER_ID, ENTRY_ID)
-        mock_redis.delete.assert_called_once_with(entry_key(USER_ID, ENTRY_ID))
+    async def test_bumped_generation_is_a_miss(
+        self, cache: EntryCacheService, mock_redis: AsyncMock
+    ) -> None:
+        await cache.set_calendar(USER_ID, 2025, 1, [], generation=None)
+        stored_value = mock_redis.setex.call_args[0][2]
+        mock_redis.mget.return_value = [None, "1", stored_value]
+
+        assert (await cache.get_calendar(USER_ID, 2025, 1)).days is None
+
+    @pytest.mark.asyncio
+    async def test_bumped_epoch_is_a_miss(
+        self, cache: EntryCacheService, mock_redis: AsyncMock
+    ) -> None:
+        await cache.set_list(USER_ID, None, 20, [], False, generation="0.4")
+        stored_value = mock_redis.setex.call_args[0][2]
+        mock_redis.mget.return_value = ["1", "4", stored_value]
+
+        assert (await cache.get_list(USER_ID, None, 20)).page is None
+
+    @pytest.mark.asyncio
+    async def test_unstamped_value_is_a_miss(
+        self, cache: EntryCacheService, mock_redis: AsyncMock
+    ) -> None:
+        mock_redis.mget.return_value = [None, None, '{"items": [], "has_more": false}']
+
+        assert (await cache.get_search(USER_ID, "query", None, 20)).page is None
 
 
 class TestCacheResilience:
@@ -178,15 +219,9 @@ class TestCacheResilience:
         await cache.set_entry(USER_ID, ENTRY_ID, row)
 
     @pytest.mark.asyncio
-    async def test_delete_survives_redis_error(
-        self, cache: EntryCacheService, mock_redis: AsyncMock
-    ) -> None:
-        mock_redis.delete.side_effect = ConnectionError("Redis down")
-        await cache.invalidate_entry(USER_ID, ENTRY_ID)
-
-    @pytest.mark.asyncio
-    async def test_scan_survives_redis_error(
+    async def test_versioned_get_survives_redis_error(
         self, cache: EntryCacheService, mock_redis: AsyncMock
     ) -> None:
-        mock_redis.scan.side_effect = ConnectionError("Redis down")
-        await cache.invalidate_user_lists(USER_ID)
+        mock_redis.mget.side_effect = ConnectionError("Redis down")
+        result = await cache.get_list(USER_ID, None, 20)
+        assert result.page is None
@@ -0,0 +1,191 @@
+import uuid
+from datetime import date, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from nstil.models.ai_insight import InsightType
+from nstil.models.calendar import CalendarDay, DailyMoodRollup
+from nstil.services.ai.insight import AIInsightService
+from nstil.services.ai.insight_batch import (
+    BatchInsightEngine,
+    build_rollup_tensor,
+    compute_batch_insights,
+    compute_streaks,
+)
+from nstil.services.ai.insight_computations import compute_streak_from_calendar
+from nstil.services.ai.mood_baseline import MoodBaselineService, MoodDeviation
+from nstil.services.journal import JournalService
+from tests.factories import make_ai_insight_row
+
+TODAY = date(2025, 1, 15)
+START = TODAY - timedelta(days=59)
+USER_A = uuid.UUID("00000000-0000-0000-0000-00000000000a")
+USER_B = uuid.UUID("00000000-0000-0000-0000-00000000000b")
+
+
+def _rollup(
+    user_id: uuid.UUID, day: date, mood: str | None = "calm", count: int = 1
+) -> DailyMoodRollup:
+    return DailyMoodRollup(user_id=user_id, day=day, mood_category=mood, entry_count=count)
+
+
+def _streak_rollups(user_id: uuid.UUID, length: int, end: date = TODAY) -> list[DailyMoodRollup]:
+    return [_rollup(user_id, end - timedelta(days=i)) for i in range(length)]
+
+
+class TestBuildRollupTensor:
+    def test_places_counts_by_user_and_day(self) -> None:
+        rollups = [
+            _rollup(USER_A, TODAY, "sad", 2),
+            _rollup(USER_A, TODAY, None, 1),
+            _rollup(USER_B, START, "happy", 3),
+        ]
+        tensor = build_rollup_tensor(rollups, [USER_A, USER_B], START, TODAY)
+        assert tensor.entries[0, -1] == 3
+        assert tensor.entries[1, 0] == 3
+
+    def test_ignores_unknown_users_and_out_of_window_days(self) -> None:
+        rollups = [
+            _rollup(uuid.uuid4(), TODAY),
+            _rollup(USER_A, TODAY + timedelta(days=1)),
+            _rollup(USER_A, START - timedelta(days=1)),
+        ]
+        tensor = build_rollup_tensor(rollups, [USER_A], START, TODAY)
+        assert tensor.entries.sum() == 0
+
+
+class TestComputeStreaks:
+    @pytest.mark.parametrize(
+        "active_offsets",
+        [
+            [],
+            [0],
+            [1],
+            [2],
+            [0, 1, 2, 3],
+            [1, 2, 3],
+            [0, 2, 3],
+            list(range(60)),
+        ],
+    )
+    def test_matches_per_user_streak(self, active_offsets: list[int]) -> None:
+        rollups = [_rollup(USER_A, TODAY - timedelta(days=o)) for o in active_offsets]
+        tensor = build_rollup_tensor(rollups, [USER_A], START, TODAY)
+        days = [
+            CalendarDay(
+                date=(TODAY - timedelta(days=o)).isoformat(),
+                mood_category="calm",
+                mood_specific=None,
+                entry_count=1,
+            )
+            for o in active_offsets
+        ]
+        streaks = compute_streaks(tensor.entries, tensor.day_index(TODAY))
+        assert streaks[0] == compute_streak_from_calendar(days, TODAY)
+
+
+class TestComputeBatchInsights:
+    def test_streak_milestone_emitted(self) -> None:
+        tensor = build_rollup_tensor(
+            _streak_rollups(USER_A, 7) + _streak_rollups(USER_B, 8), [USER_A, USER_B], START, TODAY
+        )
+        results = compute_batch_insights(tensor, TODAY)
+        streaks = [
+            (uid, i) for uid, i in results if i.insight_type == InsightType.STREAK_MILESTONE
+        ]
+        assert len(streaks) == 1
+        assert streaks[0][0] == USER_A
+        assert streaks[0][1].metadata["milestone"] == 7
+
+    def test_emits_no_anomalies(self) -> None:
+        rollups = [_rollup(USER_A, TODAY - timedelta(days=d), "happy") for d in range(7, 28)]
+        rollups += [_rollup(USER_A, TODAY, "sad", 2), _rollup(USER_A, TODAY, "anxious", 1)]
+        tensor = build_rollup_tensor(rollups, [USER_A], START, TODAY)
+        results = compute_batch_insights(tensor, TODAY)
+        assert all(i.insight_type != InsightType.ANOMALY for _, i in results)
+
+
+def _baselines(deviations: dict[uuid.UUID, list[MoodDeviation]] | None = None) -> AsyncMock:
+    mock = AsyncMock(spec=MoodBaselineService)
+    mock.advance_many.return_value = deviations or {}
+    return mock
+
+
+def _deviation(day: date, z_score: float = 3.0) -> MoodDeviation:
+    return MoodDeviation(day=day, ratio=0.8, baseline_mean=0.1, baseline_std=0.2, z_score=z_score)
+
+
+class TestBatchInsightEngine:
+    async def test_skips_existing_milestones_and_bulk_inserts(self) -> None:
+        journal = AsyncMock(spec=JournalService)
+        journal.get_daily_mood_rollups.return_value = _streak_rollups(USER_A, 7) + _streak_rollups(
+            USER_B, 7
+        )
+        insights = AsyncMock(spec=AIInsightService)
+        existing = make_ai_insight_row(
+            user_id=str(USER_B),
+            insight_type="streak_milestone",
+            period_start=TODAY,
+            period_end=TODAY,
+        )
+        existing.metadata["milestone"] = 7
+        insights.list_recent_for_users.return_value = [existing]
+        insights.create_many.return_value = []
+
+        await BatchInsightEngine(journal, insights, _baselines()).run([USER_A, USER_B], TODAY)
+
+        journal.get_daily_mood_rollups.assert_awaited_once()
+        items = insights.create_many.await_args.args[0]
+        assert [uid for uid, _ in items] == [USER_A]
+
+    async def test_anomalies_come_from_ewma_baseline(self) -> None:
+        journal = AsyncMock(spec=JournalService)
+        journal.get_daily_mood_rollups.return_value = []
+        insights = AsyncMock(spec=AIInsightService)
+        insights.list_recent_for_users.return_value = []
+        insights.create_many.return_value = []
+        yesterday = TODAY - timedelta(days=1)
+        baselines = _baselines(
+            {USER_A: [_deviation(TODAY - timedelta(days=3)), _deviation(yesterday)]}
+        )
+
+        await BatchInsightEngine(journal, insights, baselines).run([USER_A, USER_B], TODAY)
+
+        baselines.advance_many.assert_awaited_once_with([USER_A, USER_B], TODAY)
+        ((uid, insight),) = insights.create_many.await_args.args[0]
+        assert uid == USER_A
+        assert insight.insight_type == InsightType.ANOMALY
+        assert insight.period_start == yesterday
+        assert insight.metadata["method"] == "ewma"
+
+    async def test_skips_anomaly_already_recorded_for_day(self) -> None:
+        journal = AsyncMock(spec=JournalService)
+        journal.get_daily_mood_rollups.return_value = []
+        insights = AsyncMock(spec=AIInsightService)
+        yesterday = TODAY - timedelta(days=1)
+        insights.list_recent_for_users.return_value = [
+            make_ai_insight_row(
+                user_id=str(USER_A),
+                insight_type="anomaly",
+                period_start=yesterday,
+                period_end=yesterday,
+            )
+        ]
+        insights.create_many.return_value = []
+        baselines = _baselines({USER_A: [_deviation(yesterday)]})
+
+        await BatchInsightEngine(journal, insights, baselines).run([USER_A], TODAY)
+
+        assert insights.create_many.await_args.args[0] == []
+
+    async def test_no_candidates_skips_writes(self) -> None:
+        journal = AsyncMock(spec=JournalService)
+        journal.get_daily_mood_rollups.return_value = []
+        insights = AsyncMock(spec=AIInsightService)
+
+        result = await BatchInsightEngine(journal, insights, _baselines()).run([USER_A], TODAY)
+
+        assert result == []
+        insights.list_recent_for_users.assert_not_awaited()
+        insights.create_many.assert_not_awaited()
@@ -1,3 +1,4 @@
+import uuid
 from datetime import UTC, date, datetime, timedelta
 
 from nstil.models.ai_context import (
@@ -8,15 +9,18 @@ from nstil.models.ai_context import (
     AIContextStats,
 )
 from nstil.models.calendar import CalendarDay
+from nstil.models.journal import JournalEntryDigest, JournalEntryVersion
 from nstil.services.ai.insight_computations import (
+    EMPTY_FINGERPRINT,
     ENTRY_MILESTONES,
     STREAK_MILESTONES,
     _format_weekly_content,
+    compute_entries_fingerprint,
     compute_streak_from_calendar,
     compute_weekly_summary,
-    detect_mood_anomaly,
     find_entry_milestone,
     find_streak_milestone,
+    fingerprint_weeks,
 )
 from nstil.services.ai.prompt_engine import _has_engaged_today
 
@@ -53,6 +57,24 @@ def _entry(
     )
 
 
+def _digest(
+    *,
+    days_ago: int = 0,
+    mood: str | None = "calm",
+    body: str = "Test entry body text.",
+    tags: list[str] | None = None,
+    entry_type: str = "journal",
+) -> JournalEntryDigest:
+    return JournalEntryDigest(
+        id=uuid.uuid4(),
+        created_at=datetime.now(UTC) - timedelta(days=days_ago),
+        mood_category=mood,
+        tags=tags or [],
+        entry_type=entry_type,
+        body=body,
+    )
+
+
 def _context(
     entries: list[AIContextEntry] | None = None,
     mood_dist: list[AIContextMoodDistribution] | None = None,
@@ -165,173 +187,114 @@ class TestFindEntryMilestone:
 
 class TestComputeWeeklySummary:
     def test_zero_entries(self) -> None:
-        ctx = _context(entries=[])
         start = date(2025, 1, 6)
         end = date(2025, 1, 12)
-        result = compute_weekly_summary(ctx, start, end)
+        result = compute_weekly_summary([], start, end)
         assert result.insight_type.value == "weekly_summary"
         assert result.metadata["entry_count"] == 0
         assert "no entries" in result.content.lower() or "No entries" in result.content
 
     def test_single_entry(self) -> None:
-        entries = [_entry(days_ago=1, mood="happy", body="Great day!", tags=["work"])]
-        ctx = _context(entries=entries)
+        digests = [_digest(days_ago=1, mood="happy", body="Great day!", tags=["work"])]
         start = date.today() - timedelta(days=7)
         end = date.today()
-        result = compute_weekly_summary(ctx, start, end)
+        result = compute_weekly_summary(digests, start, end)
         assert result.metadata["entry_count"] == 1
         assert result.metadata["dominant_mood"] == "happy"
         assert "1 entry" in result.content
 
     def test_multiple_entries_with_moods_and_tags(self) -> None:
-        entries = [
-            _entry(days_ago=1, mood="happy", body="Good day", tags=["work", "health"]),
-            _entry(days_ago=2, mood="happy", body="Another good day", tags=["work"]),
-            _entry(days_ago=3, mood="calm", body="Peaceful", tags=["nature"]),
+        digests = [
+            _digest(days_ago=1, mood="happy", body="Good day", tags=["work", "health"]),
+            _digest(days_ago=2, mood="happy", body="Another good day", tags=["work"]),
+            _digest(days_ago=3, mood="calm", body="Peaceful", tags=["nature"]),
         ]
-        ctx = _context(entries=entries)
         start = date.today() - timedelta(days=7)
         end = date.today()
-        result = compute_weekly_summary(ctx, start, end)
+        result = compute_weekly_summary(digests, start, end)
         assert result.metadata["entry_count"] == 3
         assert result.metadata["dominant_mood"] == "happy"
         assert "work" in result.metadata["top_tags"]
         assert "3 entries" in result.content
 
     def test_avg_length_calculation(self) -> None:
-        entries = [
-            _entry(days_ago=1, body="a" * 100),
-            _entry(days_ago=2, body="b" * 200),
+        digests = [
+            _digest(days_ago=1, body="a" * 100),
+            _digest(days_ago=2, body="b" * 200),
         ]
-        ctx = _context(entries=entries)
         start = date.today() - timedelta(days=7)
         end = date.today()
-        result = compute_weekly_summary(ctx, start, end)
+        result = compute_weekly_summary(digests, start, end)
         assert result.metadata["avg_entry_length"] == 150
 
     def test_entries_outside_period_excluded(self) -> None:
-        entries = [
-            _entry(days_ago=1, mood="happy"),
-            _entry(days_ago=30, mood="sad"),
+        digests = [
+            _digest(days_ago=1, mood="happy"),
+            _digest(days_ago=30, mood="sad"),
         ]
-        ctx = _context(entries=entries)
         start = date.today() - timedelta(days=7)
         end = date.today()
-        result = compute_weekly_summary(ctx, start, end)
+        result = compute_weekly_summary(digests, start, end)
         assert result.metadata["entry_count"] == 1
 
     def test_period_dates_set(self) -> None:
-        ctx = _context(entries=[])
         start = date(2025, 1, 6)
         end = date(2025, 1, 12)
-        result = compute_weekly_summary(ctx, start, end)
+        result = compute_weekly_summary([], start, end)
         assert result.period_start == start
         assert result.period_end == end
 
+    def test_fingerprint_stored_in_metadata(self) -> None:
+        result = compute_weekly_summary([], date(2025, 1, 5), date(2025, 1, 11), "abc")
+        assert result.metadata["fingerprint"] == "abc"
 
-class TestDetectMoodAnomaly:
-    def test_no_mood_data_returns_none(self) -> None:
-        ctx = _context(entries=[_entry(days_ago=1)], mood_dist=[])
-        start = date.today() - timedelta(days=7)
-        end = date.today()
-        assert detect_mood_anomaly(ctx, start, end) is None
-
-    def test_insufficient_entries_returns_none(self) -> None:
-        ctx = _context(
-            entries=[_entry(days_ago=1, mood="sad")],
-            mood_dist=[
-                AIContextMoodDistribution(mood_category="sad", mood_specific=None, count=5),
-            ],
-        )
-        start = date.today() - timedelta(days=7)
-        end = date.today()
-        assert detect_mood_anomaly(ctx, start, end) is None
+    def test_fingerprint_omitted_by_default(self) -> None:
+        result = compute_weekly_summary([], date(2025, 1, 5), date(2025, 1, 11))
+        assert "fingerprint" not in result.metadata
 
-    def test_below_threshold_returns_none(self) -> None:
-        entries = [
-            _entry(days_ago=1, mood="happy"),
-            _entry(days_ago=2, mood="calm"),
-        ]
-        mood_dist = [
-            AIContextMoodDistribution(mood_category="happy", mood_specific=None, count=10),
-            AIContextMoodDistribution(mood_category="calm", mood_specific=None, count=10),
-        ]
-        ctx = _context(entries=entries, mood_dist=mood_dist)
-        start = date.today() - timedelta(days=7)
-        end = date.today()
-        assert detect_mood_anomaly(ctx, start, end) is None
 
-    def test_negative_anomaly_detected(self) -> None:
-        entries = [
-            _entry(days_ago=1, mood="sad"),
-            _entry(days_ago=2, mood="anxious"),
-            _entry(days_ago=3, mood="sad"),
-        ]
-        mood_dist = [
-            AIContextMoodDistribution(mood_category="happy", mood_specific=None, count=15),
-            AIContextMoodDistribution(mood_category="calm", mood_specific=None, count=10),
-            AIContextMoodDistribution(mood_category="sad", mood_specific=None, count=2),
-            AIContextMoodDistribution(mood_category="anxious", mood_specific=None, count=1),
-        ]
-        ctx = _context(entries=entries, mood_dist=mood_dist)
-        start = date.today() - timedelta(days=7)
-        end = date.today()
-        result = detect_mood_anomaly(ctx, start, end)
-        assert result is not None
-        assert result.insight_type.value == "anomaly"
-        assert result.metadata["direction"] == "negative"
-        assert result.metadata["difference"] > 0
-
-    def test_positive_anomaly_detected(self) -> None:
-        entries = [
-            _entry(days_ago=1, mood="happy"),
-            _entry(days_ago=2, mood="happy"),
-            _entry(days_ago=3, mood="calm"),
-        ]
-        mood_dist = [
-            AIContextMoodDistribution(mood_category="sad", mood_specific=None, count=15),
-            AIContextMoodDistribution(mood_category="anxious", mood_specific=None, count=10),
-            AIContextMoodDistribution(mood_category="happy", mood_specific=None, count=2),
-            AIContextMoodDistribution(mood_category="calm", mood_specific=None, count=1),
-        ]
-        ctx = _context(entries=entries, mood_dist=mood_dist)
-        start = date.today() - timedelta(days=7)
-        end = date.today()
-        result = detect_mood_anomaly(ctx, start, end)
-        assert result is not None
-        assert result.metadata["direction"] == "positive"
-        assert result.metadata["difference"] < 0
-
-    def test_confidence_scales_with_magnitude(self) -> None:
-        entries = [
-            _entry(days_ago=1, mood="sad"),
-            _entry(days_ago=2, mood="anxious"),
-            _entry(days_ago=3, mood="angry"),
-        ]
-        mood_dist = [
-            AIContextMoodDistribution(mood_category="happy", mood_specific=None, count=50),
-            AIContextMoodDistribution(mood_category="calm", mood_specific=None, count=50),
-        ]
-        ctx = _context(entries=entries, mood_dist=mood_dist)
-        start = date.today() - timedelta(days=7)
-        end = date.today()
-        result = detect_mood_anomaly(ctx, start, end)
-        assert result is not None
-        assert 0.0 < result.confidence <= 1.0
-
-    def test_entries_without_mood_ignored(self) -> None:
-        entries = [
-            _entry(days_ago=1, mood=None),
-            _entry(days_ago=2, mood=None),
-            _entry(days_ago=3, mood=None),
-        ]
-        mood_dist = [
-            AIContextMoodDistribution(mood_category="happy", mood_specific=None, count=10),
-        ]
-        ctx = _context(entries=entries, mood_dist=mood_dist)
-        start = date.today() - timedelta(days=7)
-        end = date.today()
-        assert detect_mood_anomaly(ctx, start, end) is None
+def _version(
+    created_at: datetime,
+    updated_at: datetime | None = None,
+    entry_id: uuid.UUID | None = None,
+) -> JournalEntryVersion:
+    return JournalEntryVersion(
+        id=entry_id or uuid.uuid4(),
+        created_at=created_at,
+        updated_at=updated_at or created_at,
+    )
+
+
+class TestEntriesFingerprint:
+    def test_empty_matches_constant(self) -> None:
+        assert compute_entries_fingerprint([]) == EMPTY_FINGERPRINT
+
+    def test_order_independent(self) -> None:
+        a = _version(datetime(2025, 1, 6, tzinfo=UTC))
+        b = _version(datetime(2025, 1, 7, tzinfo=UTC))
+        assert compute_entries_fingerprint([a, b]) == compute_entries_fingerprint([b, a])
+
+    def test_changes_on_edit(self) -> None:
+        entry_id = uuid.uuid4()
+        created = datetime(2025, 1, 6, tzinfo=UTC)
+        before = _version(created, entry_id=entry_id)
+        after = _version(created, created + timedelta(hours=1), entry_id=entry_id)
+        assert compute_entries_fingerprint([before]) != compute_entries_fingerprint([after])
+
+    def test_changes_on_entry_swap(self) -> None:
+        created = datetime(2025, 1, 6, tzinfo=UTC)
+        assert compute_entries_fingerprint([_version(created)]) != compute_entries_fingerprint(
+            [_version(created)]
+        )
+
+    def test_groups_by_sunday_week(self) -> None:
+        first = _version(datetime(2025, 1, 5, 9, tzinfo=UTC))
+        second = _version(datetime(2025, 1, 11, 23, tzinfo=UTC))
+        third = _version(datetime(2025, 1, 12, 1, tzinfo=UTC))
+        result = fingerprint_weeks([first, second, third])
+        assert set(result) == {date(2025, 1, 5), date(2025, 1, 12)}
+        assert result[date(2025, 1, 5)] == compute_entries_fingerprint([first, second])
+        assert result[date(2025, 1, 12)] == compute_entries_fingerprint([third])
 
 
 class TestHasEngagedToday:
@@ -362,29 +325,27 @@ class TestHasEngagedToday:
 
 class TestWeeklySummaryWithMoodSnapshots:
     def test_mood_snapshots_counted_in_entry_types(self) -> None:
-        entries = [
-            _entry(days_ago=1, mood="happy", entry_type="journal"),
-            _entry(days_ago=1, mood="anxious", entry_type="mood_snapshot", body=""),
-            _entry(days_ago=2, mood="calm", entry_type="mood_snapshot", body=""),
+        digests = [
+            _digest(days_ago=1, mood="happy", entry_type="journal"),
+            _digest(days_ago=1, mood="anxious", entry_type="mood_snapshot", body=""),
+            _digest(days_ago=2, mood="calm", entry_type="mood_snapshot", body=""),
         ]
-        ctx = _context(entries=entries)
         start = date.today() - timedelta(days=7)
         end = date.today()
-        result = compute_weekly_summary(ctx, start, end)
+        result = compute_weekly_summary(digests, start, end)
         assert result.metadata["entry_count"] == 3
         assert result.metadata["entry_types"]["mood_snapshot"] == 2
         assert result.metadata["entry_types"]["journal"] == 1
 
     def test_mood_snapshots_contribute_to_mood_distribution(self) -> None:
-        entries = [
-            _entry(days_ago=1, mood="anxious", entry_type="mood_snapshot", body=""),
-            _entry(days_ago=2, mood="anxious", entry_type="mood_snapshot", body=""),
-            _entry(days_ago=3, mood="happy", entry_type="journal"),
+        digests = [
+            _digest(days_ago=1, mood="anxious", entry_type="mood_snapshot", body=""),
+            _digest(days_ago=2, mood="anxious", entry_type="mood_snapshot", body=""),
+            _digest(days_ago=3, mood="happy", entry_type="journal"),
         ]
-        ctx = _context(entries=entries)
         start = date.today() - timedelta(days=7)
         end = date.today()
-        result = compute_weekly_summary(ctx, start, end)
+        result = compute_weekly_summary(digests, start, end)
         assert result.metadata["dominant_mood"] == "anxious"
 
 
@@ -0,0 +1,199 @@
+import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from nstil.models.ai_context import AIContextProfile, AIContextResponse, AIContextStats
+from nstil.models.journal import JournalEntryDigest, JournalEntryVersion
+from nstil.services.ai.insight import AIInsightService
+from nstil.services.ai.insight_computations import EMPTY_FINGERPRINT, compute_entries_fingerprint
+from nstil.services.ai.insight_engine import InsightEngine
+from nstil.services.ai.mood_baseline import MoodBaselineService, MoodDeviation
+from nstil.services.cached_ai_context import CachedAIContextService
+from nstil.services.cached_journal import CachedJournalService
+from tests.factories import DEFAULT_USER_ID, make_ai_insight_row
+
+USER_ID = uuid.UUID(DEFAULT_USER_ID)
+WEEK = date(2025, 1, 5)
+VERSION = JournalEntryVersion(
+    id=uuid.UUID("00000000-0000-0000-0000-000000000099"),
+    created_at=datetime(2025, 1, 6, 9, tzinfo=UTC),
+    updated_at=datetime(2025, 1, 6, 9, tzinfo=UTC),
+)
+WEEK_START = datetime(2025, 1, 5, tzinfo=UTC)
+
+
+def _digest(created_at: datetime) -> JournalEntryDigest:
+    return JournalEntryDigest(
+        id=uuid.uuid4(),
+        created_at=created_at,
+        mood_category="calm",
+        tags=[],
+        entry_type="journal",
+    )
+
+
+async def _pages(*pages: list[JournalEntryDigest]) -> AsyncIterator[list[JournalEntryDigest]]:
+    for page in pages:
+        yield page
+
+
+def _empty_context() -> AIContextResponse:
+    return AIContextResponse(
+        recent_entries=[],
+        mood_distribution=[],
+        recent_prompts=[],
+        recent_sessions=[],
+        stats=AIContextStats(
+            total_entries=0,
+            entries_last_7d=0,
+            check_ins_total=0,
+            check_ins_last_7d=0,
+            avg_entry_length_7d=None,
+            last_entry_at=None,
+        ),
+        profile=AIContextProfile(
+            prompt_style="gentle",
+            topics_to_avoid=[],
+            goals=[],
+        ),
+    )
+
+
+@pytest.fixture
+def insights() -> AsyncMock:
+    return AsyncMock(spec=AIInsightService)
+
+
+@pytest.fixture
+def context() -> AsyncMock:
+    mock = AsyncMock(spec=CachedAIContextService)
+    mock.get_context.return_value = _empty_context()
+    return mock
+
+
+@pytest.fixture
+def journal() -> AsyncMock:
+    mock = AsyncMock(spec=CachedJournalService)
+    mock.list_entry_versions.return_value = [VERSION]
+    mock.iter_entry_digests.side_effect = lambda *args: _pages([_digest(VERSION.created_at)])
+    return mock
+
+
+@pytest.fixture
+def baselines() -> AsyncMock:
+    return AsyncMock(spec=MoodBaselineService)
+
+
+@pytest.fixture
+def engine(
+    insights: AsyncMock, context: AsyncMock, journal: AsyncMock, baselines: AsyncMock
+) -> InsightEngine:
+    return InsightEngine(insights, context, journal, baselines)
+
+
+class TestSummaryFingerprints:
+    async def test_unchanged_week_skips_reads_and_writes(
+        self, engine: InsightEngine, insights: AsyncMock, journal: AsyncMock
+    ) -> None:
+        existing = make_ai_insight_row(period_start=WEEK, period_end=date(2025, 1, 11))
+        existing.metadata["fingerprint"] = compute_entries_fingerprint([VERSION])
+        insights.list_by_period.return_value = [existing]
+
+        result = await engine.recompute_weeks(USER_ID, [WEEK])
+
+        assert result == []
+        journal.iter_entry_digests.assert_not_called()
+        insights.supersede.assert_not_awaited()
+        insights.create.assert_not_awaited()
+
+    async def test_changed_week_recomputes(
+        self, engine: InsightEngine, insights: AsyncMock, journal: AsyncMock
+    ) -> None:
+        existing = make_ai_insight_row(period_start=WEEK, period_end=date(2025, 1, 11))
+        existing.metadata["fingerprint"] = EMPTY_FINGERPRINT
+        insights.list_by_period.return_value = [existing]
+
+        await engine.recompute_weeks(USER_ID, [WEEK])
+
+        journal.iter_entry_digests.assert_called_once_with(
+            USER_ID, WEEK_START, WEEK_START + timedelta(days=7)
+        )
+        insights.supersede.assert_awaited_once()
+        insights.create.assert_not_awaited()
+
+    async def test_new_week_stores_fingerprint(
+        self, engine: InsightEngine, insights: AsyncMock
+    ) -> None:
+        insights.list_by_period.return_value = []
+
+        await engine.recompute_weeks(USER_ID, [WEEK])
+
+        create_data = insights.create.await_args.args[1]
+        assert create_data.metadata["fingerprint"] == compute_entries_fingerprint([VERSION])
+
+    async def test_summary_covers_every_entry_of_the_week(
+        self, engine: InsightEngine, insights: AsyncMock, journal: AsyncMock
+    ) -> None:
+        insights.list_by_period.return_value = []
+        first = [_digest(WEEK_START + timedelta(minutes=i)) for i in range(100)]
+        second = [_digest(WEEK_START + timedelta(days=3, minutes=i)) for i in range(50)]
+        journal.iter_entry_digests.side_effect = lambda *args: _pages(first, second)
+
+        await engine.recompute_weeks(USER_ID, [WEEK])
+
+        create_data = insights.create.await_args.args[1]
+        assert create_data.metadata["entry_count"] == 150
+
+    async def test_single_version_query_for_window(
+        self, engine: InsightEngine, insights: AsyncMock, journal: AsyncMock
+    ) -> None:
+        insights.list_by_period.return_value = []
+
+        await engine.recompute_weeks(USER_ID, [date(2025, 1, 12), WEEK])
+
+        journal.list_entry_versions.assert_awaited_once_with(USER_ID, WEEK, date(2025, 1, 18))
+
+
+def _deviation(day: date, z_score: float) -> MoodDeviation:
+    return MoodDeviation(day=day, ratio=0.9, baseline_mean=0.1, baseline_std=0.1, z_score=z_score)
+
+
+class TestMoodAnomaly:
+    async def test_no_deviation_returns_none(
+        self, engine: InsightEngine, insights: AsyncMock, baselines: AsyncMock
+    ) -> None:
+        baselines.advance.return_value = []
+
+        assert await engine.detect_mood_anomaly(USER_ID) is None
+
+        insights.list_by_period.assert_not_awaited()
+        insights.create.assert_not_awaited()
+
+    async def test_latest_deviation_creates_insight(
+        self, engine: InsightEngine, insights: AsyncMock, baselines: AsyncMock
+    ) -> None:
+        baselines.advance.return_value = [
+            _deviation(date(2025, 1, 6), 2.5),
+            _deviation(date(2025, 1, 7), -3.0),
+        ]
+        insights.list_by_period.return_value = []
+
+        await engine.detect_mood_anomaly(USER_ID)
+
+        create_data = insights.create.await_args.args[1]
+        assert create_data.period_start == date(2025, 1, 7)
+        assert create_data.metadata["direction"] == "positive"
+        assert create_data.metadata["method"] == "ewma"
+
+    async def test_existing_anomaly_for_day_skips(
+        self, engine: InsightEngine, insights: AsyncMock, baselines: AsyncMock
+    ) -> None:
+        baselines.advance.return_value = [_deviation(date(2025, 1, 7), 2.5)]
+        insights.list_by_period.return_value = [make_ai_insight_row(insight_type="anomaly")]
+
+        assert await engine.detect_mood_anomaly(USER_ID) is None
+
+        insights.create.assert_not_awaited()
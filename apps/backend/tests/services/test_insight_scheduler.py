@@ -0,0 +1,215 @@
+import time
+import uuid
+from datetime import UTC, date, datetime
+from types import TracebackType
+
+import pytest
+
+from nstil.services.ai.insight_computations import week_start_for
+from nstil.services.ai.insight_scheduler import (
+    RECOMPUTE_WEEKLY_INSIGHTS_TASK,
+    InsightScheduler,
+    recompute_job_id,
+)
+from nstil.services.cache.ai_keys import insight_pending_weeks_key, insight_quiet_until_key
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, tuple[object, ...]]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        return None
+
+    def sadd(self, key: str, *values: str) -> None:
+        self._ops.append(("sadd", (key, *values)))
+
+    def expire(self, key: str, ttl: int) -> None:
+        self._ops.append(("expire", (key, ttl)))
+
+    def setex(self, key: str, ttl: int, value: str) -> None:
+        self._ops.append(("setex", (key, ttl, value)))
+
+    def smembers(self, key: str) -> None:
+        self._ops.append(("smembers", (key,)))
+
+    def delete(self, key: str) -> None:
+        self._ops.append(("delete", (key,)))
+
+    async def execute(self) -> list[object]:
+        results: list[object] = []
+        for name, args in self._ops:
+            results.append(getattr(self._redis, f"_{name}")(*args))
+        self._ops.clear()
+        return results
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.sets: dict[str, set[str]] = {}
+        self.values: dict[str, str] = {}
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    def _sadd(self, key: str, *values: str) -> int:
+        self.sets.setdefault(key, set()).update(values)
+        return len(values)
+
+    def _expire(self, key: str, ttl: int) -> bool:
+        return True
+
+    def _setex(self, key: str, ttl: int, value: str) -> bool:
+        self.values[key] = value
+        return True
+
+    def _smembers(self, key: str) -> set[str]:
+        return set(self.sets.get(key, set()))
+
+    def _delete(self, key: str) -> int:
+        return 1 if self.sets.pop(key, None) is not None else 0
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    async def exists(self, key: str) -> int:
+        return 1 if self.sets.get(key) else 0
+
+
+class FakeQueue:
+    def __init__(self) -> None:
+        self.jobs: dict[str, tuple[str, tuple[object, ...], float | None]] = {}
+
+    async def enqueue_job(
+        self,
+        function: str,
+        *args: object,
+        _job_id: str | None = None,
+        _defer_by: float | None = None,
+    ) -> object | None:
+        assert _job_id is not None
+        if _job_id in self.jobs:
+            return None
+        self.jobs[_job_id] = (function, args, _defer_by)
+        return object()
+
+
+class FailingQueue:
+    async def enqueue_job(self, function: str, *args: object, **kwargs: object) -> None:
+        raise ConnectionError("Redis unavailable")
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def fake_queue() -> FakeQueue:
+    return FakeQueue()
+
+
+@pytest.fixture
+def scheduler(fake_redis: FakeRedis, fake_queue: FakeQueue) -> InsightScheduler:
+    return InsightScheduler(fake_redis, fake_queue, 300)  # type: ignore[arg-type]
+
+
+class TestWeekStartFor:
+    def test_sunday_is_its_own_week_start(self) -> None:
+        assert week_start_for(datetime(2025, 1, 5, 12, tzinfo=UTC)) == date(2025, 1, 5)
+
+    def test_saturday_maps_to_previous_sunday(self) -> None:
+        assert week_start_for(datetime(2025, 1, 11, 23, tzinfo=UTC)) == date(2025, 1, 5)
+
+
+class TestSchedule:
+    async def test_records_pending_weeks(
+        self, scheduler: InsightScheduler, fake_redis: FakeRedis
+    ) -> None:
+        await scheduler.schedule(USER_ID, [date(2025, 1, 5), date(2024, 12, 29)])
+
+        assert fake_redis.sets[insight_pending_weeks_key(USER_ID)] == {
+            "2025-01-05",
+            "2024-12-29",
+        }
+
+    async def test_pushes_quiet_deadline_forward(
+        self, scheduler: InsightScheduler, fake_redis: FakeRedis
+    ) -> None:
+        before = time.time()
+        await scheduler.schedule(USER_ID, [date(2025, 1, 5)])
+
+        quiet_until = float(fake_redis.values[insight_quiet_until_key(USER_ID)])
+        assert quiet_until >= before + 300
+
+    async def test_enqueues_single_deferred_job_per_user(
+        self, scheduler: InsightScheduler, fake_queue: FakeQueue
+    ) -> None:
+        for _ in range(10):
+            await scheduler.schedule(USER_ID, [date(2025, 1, 5)])
+
+        assert list(fake_queue.jobs) == [recompute_job_id(USER_ID)]
+        function, args, defer_by = fake_queue.jobs[recompute_job_id(USER_ID)]
+        assert function == RECOMPUTE_WEEKLY_INSIGHTS_TASK
+        assert args == (str(USER_ID),)
+        assert defer_by == 300
+
+    async def test_no_weeks_is_noop(
+        self, scheduler: InsightScheduler, fake_redis: FakeRedis, fake_queue: FakeQueue
+    ) -> None:
+        await scheduler.schedule(USER_ID, [])
+
+        assert fake_redis.sets == {}
+        assert fake_queue.jobs == {}
+
+    async def test_queue_failure_is_swallowed(self, fake_redis: FakeRedis) -> None:
+        scheduler = InsightScheduler(fake_redis, FailingQueue(), 300)  # type: ignore[arg-type]
+
+        await scheduler.schedule(USER_ID, [date(2025, 1, 5)])
+
+
+class TestQuietPeriod:
+    async def test_no_deadline_is_quiet(self, scheduler: InsightScheduler) -> None:
+        assert await scheduler.seconds_until_quiet(USER_ID) == 0.0
+
+    async def test_recent_write_is_not_quiet(
+        self, scheduler: InsightScheduler, fake_redis: FakeRedis
+    ) -> None:
+        fake_redis.values[insight_quiet_until_key(USER_ID)] = str(time.time() + 120)
+
+        remaining = await scheduler.seconds_until_quiet(USER_ID)
+
+        assert 0 < remaining <= 120
+
+    async def test_elapsed_deadline_is_quiet(
+        self, scheduler: InsightScheduler, fake_redis: FakeRedis
+    ) -> None:
+        fake_redis.values[insight_quiet_until_key(USER_ID)] = str(time.time() - 5)
+
+        assert await scheduler.seconds_until_quiet(USER_ID) == 0.0
+
+
+class TestClaimPendingWeeks:
+    async def test_returns_sorted_weeks_and_clears(
+        self, scheduler: InsightScheduler, fake_redis: FakeRedis
+    ) -> None:
+        await scheduler.schedule(USER_ID, [date(2025, 1, 5), date(2024, 12, 29)])
+
+        weeks = await scheduler.claim_pending_weeks(USER_ID)
+
+        assert weeks == [date(2024, 12, 29), date(2025, 1, 5)]
+        assert not await scheduler.has_pending(USER_ID)
+
+    async def test_empty_when_nothing_pending(self, scheduler: InsightScheduler) -> None:
+        assert await scheduler.claim_pending_weeks(USER_ID) == []
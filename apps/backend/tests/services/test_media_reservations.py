@@ -0,0 +1,303 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from types import TracebackType
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from postgrest.exceptions import APIError
+from storage3.utils import StorageException
+
+from nstil.models.media import MediaUploadUrlRequest
+from nstil.services.media import (
+    FileTooLargeError,
+    InvalidMediaTypeError,
+    MediaLimitExceededError,
+    MediaService,
+    UploadNotReceivedError,
+    UploadReservationNotFoundError,
+)
+from nstil.services.media_reservations import MediaReservationStore
+from tests.factories import make_media_row
+
+USER_ID = uuid.uuid4()
+ENTRY_ID = uuid.uuid4()
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, tuple[Any, ...]]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        return None
+
+    def __getattr__(self, name: str) -> Any:
+        def record(*args: Any) -> None:
+            self._ops.append((name, args))
+
+        return record
+
+    async def execute(self) -> list[object]:
+        return [await getattr(self._redis, name)(*args) for name, args in self._ops]
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def setex(self, key: str, ttl: int, value: str) -> bool:
+        self.values[key] = value
+        return True
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    async def delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+    async def zadd(self, key: str, mapping: dict[str, float]) -> int:
+        self.zsets.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    async def zrem(self, key: str, member: str) -> int:
+        return 1 if self.zsets.get(key, {}).pop(member, None) is not None else 0
+
+    async def zrangebyscore(
+        self, key: str, low: str, high: float, start: int, num: int
+    ) -> list[str]:
+        members = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        return [member for member, score in members if score <= high][start : start + num]
+
+
+class FakeBucket:
+    def __init__(self) -> None:
+        self.objects: dict[str, tuple[int, str]] = {}
+        self.removed: list[str] = []
+
+    async def create_signed_upload_url(self, path: str) -> dict[str, str]:
+        return {"signed_url": f"https://storage/upload/{path}?token=t", "token": "t", "path": path}
+
+    async def info(self, path: str) -> dict[str, object]:
+        if path not in self.objects:
+            raise StorageException({"statusCode": 404})
+        size, content_type = self.objects[path]
+        return {"size": size, "content_type": content_type}
+
+    async def remove(self, paths: list[str]) -> list[dict[str, object]]:
+        self.removed.extend(paths)
+        return []
+
+
+@pytest.fixture
+def bucket() -> FakeBucket:
+    return FakeBucket()
+
+
+@pytest.fixture
+def store() -> MediaReservationStore:
+    return MediaReservationStore(FakeRedis())  # type: ignore[arg-type]
+
+
+def _client(bucket: FakeBucket, existing: list[dict[str, object]] | None = None) -> MagicMock:
+    client = MagicMock()
+    client.storage.from_.return_value = bucket
+    table = client.table.return_value
+    table.select.return_value.eq.return_value.execute = AsyncMock(
+        return_value=MagicMock(data=existing or [])
+    )
+
+    def rpc(name: str, params: dict[str, Any]) -> MagicMock:
+        rows = [
+            make_media_row(
+                user_id=str(USER_ID),
+                entry_id=str(ENTRY_ID),
+                storage_path=item["storage_path"],
+                size_bytes=item["size_bytes"],
+                content_type=item["content_type"],
+            ).model_dump(mode="json")
+            for item in params["p_items"]
+        ]
+        builder = MagicMock()
+        builder.execute = AsyncMock(return_value=MagicMock(data=rows))
+        return builder
+
+    client.rpc.side_effect = rpc
+    return client
+
+
+def _request(**overrides: Any) -> MediaUploadUrlRequest:
+    fields: dict[str, Any] = {
+        "file_name": "photo.jpg",
+        "content_type": "image/jpeg",
+        "size_bytes": 2048,
+        "width": 800,
+        "height": 600,
+    }
+    fields.update(overrides)
+    return MediaUploadUrlRequest(**fields)
+
+
+class TestReserveUpload:
+    async def test_returns_signed_url(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        service = MediaService(_client(bucket), reservations=store)
+
+        ticket = await service.reserve_upload(USER_ID, ENTRY_ID, _request())
+
+        assert ticket.storage_path.startswith(f"{USER_ID}/{ENTRY_ID}/{ticket.reservation_id}")
+        assert ticket.upload_url.startswith("https://storage/upload/")
+        reservation = await store.get(ticket.reservation_id)
+        assert reservation is not None
+        assert reservation.file_name == "photo.jpg"
+
+    async def test_rejects_oversized(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        service = MediaService(_client(bucket), reservations=store)
+        with pytest.raises(FileTooLargeError):
+            await service.reserve_upload(USER_ID, ENTRY_ID, _request(size_bytes=50 * 1024 * 1024))
+
+    async def test_rejects_full_entry(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        existing: list[dict[str, object]] = [{"content_type": "audio/m4a", "sort_order": 0}]
+        service = MediaService(_client(bucket, existing), reservations=store)
+        with pytest.raises(MediaLimitExceededError):
+            await service.reserve_upload(
+                USER_ID, ENTRY_ID, _request(content_type="audio/m4a", file_name="a.m4a")
+            )
+
+
+class TestFinalizeUpload:
+    async def test_inserts_row_with_actual_size(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        service = MediaService(_client(bucket), reservations=store)
+        ticket = await service.reserve_upload(USER_ID, ENTRY_ID, _request())
+        bucket.objects[ticket.storage_path] = (1500, "image/jpeg")
+
+        row = await service.finalize_upload(USER_ID, ENTRY_ID, ticket.reservation_id)
+
+        assert row.storage_path == ticket.storage_path
+        assert row.size_bytes == 1500
+        assert await store.get(ticket.reservation_id) is None
+        assert await store.claim_expired(datetime.now(UTC) + timedelta(days=1)) == []
+
+    async def test_database_limit_race_removes_object(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        client = _client(bucket)
+        service = MediaService(client, reservations=store)
+        ticket = await service.reserve_upload(USER_ID, ENTRY_ID, _request())
+        bucket.objects[ticket.storage_path] = (1500, "image/jpeg")
+        client.rpc.side_effect = None
+        client.rpc.return_value.execute = AsyncMock(
+            side_effect=APIError({"code": "NS002", "message": "Maximum of 10 images per entry"})
+        )
+
+        with pytest.raises(MediaLimitExceededError):
+            await service.finalize_upload(USER_ID, ENTRY_ID, ticket.reservation_id)
+
+        name, _ = client.rpc.call_args.args
+        assert name == "insert_entry_media_batch"
+        assert bucket.removed == [ticket.storage_path]
+
+    async def test_unexpected_failure_removes_object(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        client = _client(bucket)
+        service = MediaService(client, reservations=store)
+        ticket = await service.reserve_upload(USER_ID, ENTRY_ID, _request())
+        bucket.objects[ticket.storage_path] = (1500, "image/jpeg")
+        client.rpc.side_effect = None
+        client.rpc.return_value.execute = AsyncMock(side_effect=ConnectionError)
+
+        with pytest.raises(ConnectionError):
+            await service.finalize_upload(USER_ID, ENTRY_ID, ticket.reservation_id)
+
+        assert bucket.removed == [ticket.storage_path]
+
+    async def test_missing_object_keeps_reservation(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        service = MediaService(_client(bucket), reservations=store)
+        ticket = await service.reserve_upload(USER_ID, ENTRY_ID, _request())
+
+        with pytest.raises(UploadNotReceivedError):
+            await service.finalize_upload(USER_ID, ENTRY_ID, ticket.reservation_id)
+
+        assert await store.get(ticket.reservation_id) is not None
+
+    async def test_other_user_cannot_finalize(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        service = MediaService(_client(bucket), reservations=store)
+        ticket = await service.reserve_upload(USER_ID, ENTRY_ID, _request())
+
+        with pytest.raises(UploadReservationNotFoundError):
+            await service.finalize_upload(uuid.uuid4(), ENTRY_ID, ticket.reservation_id)
+
+    async def test_type_mismatch_removes_object(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        client = _client(bucket)
+        service = MediaService(client, reservations=store)
+        ticket = await service.reserve_upload(USER_ID, ENTRY_ID, _request())
+        bucket.objects[ticket.storage_path] = (1500, "image/png")
+
+        with pytest.raises(InvalidMediaTypeError):
+            await service.finalize_upload(USER_ID, ENTRY_ID, ticket.reservation_id)
+
+        assert bucket.removed == [ticket.storage_path]
+        client.rpc.assert_not_called()
+
+    async def test_oversized_object_removed(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        service = MediaService(_client(bucket), reservations=store)
+        ticket = await service.reserve_upload(USER_ID, ENTRY_ID, _request())
+        bucket.objects[ticket.storage_path] = (11 * 1024 * 1024, "image/jpeg")
+
+        with pytest.raises(FileTooLargeError):
+            await service.finalize_upload(USER_ID, ENTRY_ID, ticket.reservation_id)
+
+        assert bucket.removed == [ticket.storage_path]
+
+
+class TestCollectStaleUploads:
+    async def test_removes_only_expired(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        service = MediaService(_client(bucket), reservations=store)
+        ticket = await service.reserve_upload(USER_ID, ENTRY_ID, _request())
+
+        assert await service.collect_stale_uploads(datetime.now(UTC)) == 0
+        later = ticket.expires_at + timedelta(seconds=1)
+        assert await service.collect_stale_uploads(later) == 1
+        assert bucket.removed == [ticket.storage_path]
+        assert await service.collect_stale_uploads(later) == 0
+
+    async def test_finalize_after_expiry_fails(
+        self, bucket: FakeBucket, store: MediaReservationStore
+    ) -> None:
+        service = MediaService(_client(bucket), reservations=store)
+        ticket = await service.reserve_upload(USER_ID, ENTRY_ID, _request())
+        bucket.objects[ticket.storage_path] = (1500, "image/jpeg")
+        await service.collect_stale_uploads(ticket.expires_at + timedelta(seconds=1))
+
+        with pytest.raises(UploadReservationNotFoundError):
+            await service.finalize_upload(USER_ID, ENTRY_ID, ticket.reservation_id)
@@ -0,0 +1,342 @@
+import asyncio
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+
+from nstil.models.media import MediaUploadUrlRequest
+from nstil.services.cache.media_keys import resumable_upload_lock_key
+from nstil.services.media import (
+    FileTooLargeError,
+    MediaLimitExceededError,
+    MediaService,
+    UploadNotReceivedError,
+    UploadReservationNotFoundError,
+)
+from nstil.services.media_resumable import (
+    _LUA_RELEASE_LOCK,
+    ResumableUploadService,
+    UploadExpiredError,
+    UploadInProgressError,
+    UploadOffsetMismatchError,
+)
+from tests.factories import make_media_row
+
+USER_ID = uuid.uuid4()
+ENTRY_ID = uuid.uuid4()
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, tuple[Any, ...]]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        return None
+
+    def setex(self, key: str, ttl: int, value: object) -> None:
+        self._ops.append(("setex", (key, ttl, value)))
+
+    async def execute(self) -> list[object]:
+        return [await getattr(self._redis, name)(*args) for name, args in self._ops]
+
+
+class FakeScript:
+    def __init__(self, redis: "FakeRedis", source: str) -> None:
+        self._redis = redis
+        self._source = source
+
+    async def __call__(self, keys: Sequence[str], args: Sequence[object]) -> int:
+        key, token = keys[0], str(args[0])
+        if self._redis.values.get(key) != token:
+            return 0
+        if self._source == _LUA_RELEASE_LOCK:
+            del self._redis.values[key]
+        else:
+            self._redis.refreshes.append(key)
+        return 1
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.refreshes: list[str] = []
+
+    def register_script(self, source: str) -> FakeScript:
+        return FakeScript(self, source)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def setex(self, key: str, ttl: int, value: object) -> bool:
+        self.values[key] = str(value)
+        return True
+
+    async def set(
+        self,
+        key: str,
+        value: object,
+        nx: bool = False,
+        xx: bool = False,
+        ex: int | None = None,
+        keepttl: bool = False,
+    ) -> bool | None:
+        if (nx and key in self.values) or (xx and key not in self.values):
+            return None
+        self.values[key] = str(value)
+        return True
+
+    async def mget(self, *keys: str) -> list[str | None]:
+        return [self.values.get(key) for key in keys]
+
+    async def delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+
+async def _chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+async def _failing_chunks(part: bytes) -> AsyncIterator[bytes]:
+    yield part
+    raise ConnectionError
+
+
+def _request(size_bytes: int = 10) -> MediaUploadUrlRequest:
+    return MediaUploadUrlRequest(
+        file_name="voice.m4a",
+        content_type="audio/m4a",
+        size_bytes=size_bytes,
+        duration_ms=1000,
+    )
+
+
+@pytest.fixture
+def media() -> AsyncMock:
+    service = AsyncMock(spec=MediaService)
+    received: list[bytes] = []
+
+    async def upload(chunks: AsyncIterable[bytes], **kwargs: Any) -> object:
+        received.extend([chunk async for chunk in chunks])
+        return make_media_row(size_bytes=sum(len(c) for c in received))
+
+    service.upload.side_effect = upload
+    service.received = received
+    return service
+
+
+@pytest.fixture
+def uploads(media: AsyncMock, tmp_path: Path) -> ResumableUploadService:
+    return ResumableUploadService(FakeRedis(), media, tmp_path)  # type: ignore[arg-type]
+
+
+class TestCreate:
+    async def test_stages_empty_file(
+        self, uploads: ResumableUploadService, media: AsyncMock, tmp_path: Path
+    ) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+
+        assert created.offset == 0
+        assert created.size_bytes == 10
+        assert (tmp_path / f"{created.upload_id}.part").read_bytes() == b""
+        media.check_declared_upload.assert_awaited_once()
+
+    async def test_validation_error_propagates(
+        self, uploads: ResumableUploadService, media: AsyncMock, tmp_path: Path
+    ) -> None:
+        media.check_declared_upload.side_effect = MediaLimitExceededError("full")
+
+        with pytest.raises(MediaLimitExceededError):
+            await uploads.create(USER_ID, ENTRY_ID, _request())
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestAppend:
+    async def test_resumes_from_recorded_offset(
+        self, uploads: ResumableUploadService, tmp_path: Path
+    ) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+
+        with pytest.raises(ConnectionError):
+            await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, _failing_chunks(b"abcd"))
+
+        status = await uploads.status(USER_ID, ENTRY_ID, created.upload_id)
+        assert status.offset == 4
+        offset = await uploads.append(
+            USER_ID, ENTRY_ID, created.upload_id, 4, _chunks(b"efg", b"hij")
+        )
+        assert offset == 10
+        assert (tmp_path / f"{created.upload_id}.part").read_bytes() == b"abcdefghij"
+
+    async def test_offset_mismatch_reports_current(self, uploads: ResumableUploadService) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+        await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, _chunks(b"abc"))
+
+        with pytest.raises(UploadOffsetMismatchError) as exc_info:
+            await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, _chunks(b"abc"))
+
+        assert exc_info.value.offset == 3
+
+    async def test_rejects_bytes_past_declared_size(self, uploads: ResumableUploadService) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request(size_bytes=4))
+
+        with pytest.raises(FileTooLargeError):
+            await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, _chunks(b"ab", b"cde"))
+
+        assert (await uploads.status(USER_ID, ENTRY_ID, created.upload_id)).offset == 2
+
+    async def test_concurrent_writer_rejected(self, uploads: ResumableUploadService) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+
+        async def nested() -> AsyncIterator[bytes]:
+            yield b"ab"
+            await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 2, _chunks(b"cd"))
+
+        with pytest.raises(UploadInProgressError):
+            await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, nested())
+
+    async def test_missing_staging_file_expires_upload(
+        self, uploads: ResumableUploadService, tmp_path: Path
+    ) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+        await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, _chunks(b"abc"))
+        (tmp_path / f"{created.upload_id}.part").unlink()
+
+        with pytest.raises(UploadExpiredError):
+            await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 3, _chunks(b"def"))
+
+        with pytest.raises(UploadReservationNotFoundError):
+            await uploads.status(USER_ID, ENTRY_ID, created.upload_id)
+
+    async def test_other_user_cannot_append(self, uploads: ResumableUploadService) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+
+        with pytest.raises(UploadReservationNotFoundError):
+            await uploads.append(uuid.uuid4(), ENTRY_ID, created.upload_id, 0, _chunks(b"a"))
+
+
+class TestLock:
+    async def test_release_keeps_lock_taken_over_by_another_writer(
+        self, media: AsyncMock, tmp_path: Path
+    ) -> None:
+        redis = FakeRedis()
+        uploads = ResumableUploadService(redis, media, tmp_path)  # type: ignore[arg-type]
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+        key = resumable_upload_lock_key(created.upload_id)
+
+        async def taken_over() -> AsyncIterator[bytes]:
+            yield b"ab"
+            redis.values[key] = "other-writer"
+
+        await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, taken_over())
+
+        assert redis.values[key] == "other-writer"
+
+    async def test_refreshes_while_streaming(self, media: AsyncMock, tmp_path: Path) -> None:
+        redis = FakeRedis()
+        uploads = ResumableUploadService(
+            redis,  # type: ignore[arg-type]
+            media,
+            tmp_path,
+            lock_refresh_seconds=0.01,
+        )
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+        key = resumable_upload_lock_key(created.upload_id)
+
+        async def slow() -> AsyncIterator[bytes]:
+            yield b"ab"
+            await asyncio.sleep(0.05)
+            yield b"cd"
+
+        assert await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, slow()) == 4
+        assert key in redis.refreshes
+        assert key not in redis.values
+
+    async def test_lost_lock_stops_stream(self, media: AsyncMock, tmp_path: Path) -> None:
+        redis = FakeRedis()
+        uploads = ResumableUploadService(
+            redis,  # type: ignore[arg-type]
+            media,
+            tmp_path,
+            lock_refresh_seconds=0.01,
+        )
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+        key = resumable_upload_lock_key(created.upload_id)
+
+        async def expired() -> AsyncIterator[bytes]:
+            yield b"ab"
+            redis.values.pop(key)
+            await asyncio.sleep(0.05)
+            yield b"cd"
+
+        with pytest.raises(UploadInProgressError):
+            await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, expired())
+
+        assert (await uploads.status(USER_ID, ENTRY_ID, created.upload_id)).offset == 2
+
+
+class TestComplete:
+    async def test_streams_staged_file_to_media_service(
+        self, uploads: ResumableUploadService, media: AsyncMock, tmp_path: Path
+    ) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+        await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, _chunks(b"0123456789"))
+
+        row = await uploads.complete(USER_ID, ENTRY_ID, created.upload_id)
+
+        assert row.size_bytes == 10
+        assert b"".join(media.received) == b"0123456789"
+        assert media.upload.call_args.kwargs["content_type"] == "audio/m4a"
+        assert list(tmp_path.iterdir()) == []
+        with pytest.raises(UploadReservationNotFoundError):
+            await uploads.status(USER_ID, ENTRY_ID, created.upload_id)
+
+    async def test_incomplete_upload_rejected(
+        self, uploads: ResumableUploadService, media: AsyncMock
+    ) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+        await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, _chunks(b"0123"))
+
+        with pytest.raises(UploadNotReceivedError):
+            await uploads.complete(USER_ID, ENTRY_ID, created.upload_id)
+
+        media.upload.assert_not_called()
+
+    async def test_missing_staging_file_expires_upload(
+        self, uploads: ResumableUploadService, media: AsyncMock, tmp_path: Path
+    ) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+        await uploads.append(USER_ID, ENTRY_ID, created.upload_id, 0, _chunks(b"0123456789"))
+        (tmp_path / f"{created.upload_id}.part").unlink()
+
+        with pytest.raises(UploadExpiredError):
+            await uploads.complete(USER_ID, ENTRY_ID, created.upload_id)
+
+        media.upload.assert_not_called()
+        with pytest.raises(UploadReservationNotFoundError):
+            await uploads.status(USER_ID, ENTRY_ID, created.upload_id)
+
+    async def test_abort_discards_staging(
+        self, uploads: ResumableUploadService, tmp_path: Path
+    ) -> None:
+        created = await uploads.create(USER_ID, ENTRY_ID, _request())
+
+        await uploads.abort(USER_ID, ENTRY_ID, created.upload_id)
+
+        assert list(tmp_path.iterdir()) == []
+        with pytest.raises(UploadReservationNotFoundError):
+            await uploads.status(USER_ID, ENTRY_ID, created.upload_id)
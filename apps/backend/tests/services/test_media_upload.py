@@ -0,0 +1,402 @@
+import asyncio
+import hashlib
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from postgrest.exceptions import APIError
+
+from nstil.models.media import MAX_IMAGES_PER_ENTRY
+from nstil.services.media import (
+    BATCH_UPLOAD_CONCURRENCY,
+    BUCKET,
+    FileTooLargeError,
+    MediaLimitExceededError,
+    MediaService,
+    MediaSlots,
+    MediaUploadFile,
+    SizedChunks,
+)
+from nstil.services.media_variants import MediaVariantScheduler
+from nstil.services.media_waveform import WAVEFORM_BINS, MediaWaveformScheduler
+from tests.factories import make_media_row
+
+USER_ID = uuid.uuid4()
+ENTRY_ID = uuid.uuid4()
+CHUNK = b"\xff" * 1024
+
+
+async def _chunks(count: int) -> AsyncIterator[bytes]:
+    for _ in range(count):
+        yield CHUNK
+
+
+class FakeStorage:
+    def __init__(self, delay: float = 0) -> None:
+        self.received: dict[str, int] = {}
+        self.delay = delay
+        self.removed: list[str] = []
+        self.active = 0
+        self.peak = 0
+
+    async def post(self, url: str, content: AsyncIterable[bytes], **_: Any) -> MagicMock:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            total = 0
+            async for chunk in content:
+                total += len(chunk)
+                await asyncio.sleep(self.delay)
+            self.received[url] = total
+        finally:
+            self.active -= 1
+        return MagicMock()
+
+
+def _client(storage: FakeStorage, existing: list[dict[str, object]]) -> MagicMock:
+    client = MagicMock()
+    client.storage_url = "http://localhost:54321/storage/v1/"
+    client.options.headers = {"apikey": "key"}
+    client.storage.session.post = storage.post
+    client.storage.from_.return_value.remove = AsyncMock(side_effect=storage.removed.extend)
+    table = client.table.return_value
+    table.select.return_value.eq.return_value.execute = AsyncMock(
+        return_value=MagicMock(data=existing)
+    )
+
+    def rpc(name: str, params: dict[str, Any]) -> MagicMock:
+        next_sort_order = max((int(str(r["sort_order"])) + 1 for r in existing), default=0)
+        rows = [
+            make_media_row(
+                entry_id=str(ENTRY_ID),
+                storage_path=item["storage_path"],
+                content_type=item["content_type"],
+                size_bytes=item["size_bytes"],
+                sort_order=next_sort_order + i,
+            ).model_dump(mode="json")
+            for i, item in enumerate(params["p_items"])
+        ]
+        builder = MagicMock()
+        builder.execute = AsyncMock(return_value=MagicMock(data=rows))
+        return builder
+
+    client.rpc.side_effect = rpc
+    return client
+
+
+def _share_stored_object(client: MagicMock, copied: dict[str, object]) -> None:
+    rpc = client.rpc.side_effect
+
+    def shared(name: str, params: dict[str, Any]) -> MagicMock:
+        items = [item | {"storage_path": "u/e/original.jpg"} for item in params["p_items"]]
+        builder: MagicMock = rpc(name, params | {"p_items": items})
+        result = builder.execute.return_value
+        result.data = [row | copied for row in result.data]
+        return builder
+
+    client.rpc.side_effect = shared
+
+
+def _files(count: int, content_type: str = "image/jpeg", chunks: int = 2) -> list[MediaUploadFile]:
+    return [
+        MediaUploadFile(chunks=_chunks(chunks), file_name=f"{i}.jpg", content_type=content_type)
+        for i in range(count)
+    ]
+
+
+class TestSizedChunks:
+    async def test_counts_bytes(self) -> None:
+        body = SizedChunks(_chunks(3), 10 * 1024)
+        assert [c async for c in body] == [CHUNK] * 3
+        assert body.size == 3 * 1024
+
+    async def test_hashes_while_streaming(self) -> None:
+        body = SizedChunks(_chunks(3), 10 * 1024)
+        async for _ in body:
+            pass
+        assert body.content_hash == hashlib.sha256(CHUNK * 3).hexdigest()
+
+    async def test_enforces_limit_incrementally(self) -> None:
+        body = SizedChunks(_chunks(100), 2 * 1024)
+        seen = 0
+        with pytest.raises(FileTooLargeError):
+            async for chunk in body:
+                seen += len(chunk)
+        assert seen == 2 * 1024
+
+
+class TestMediaSlots:
+    def test_capacity(self) -> None:
+        MediaSlots(images=MAX_IMAGES_PER_ENTRY - 1, audio=0).check_capacity(audio=False)
+        with pytest.raises(MediaLimitExceededError):
+            MediaSlots(images=0, audio=1).check_capacity(audio=True)
+
+
+class TestStreamingUpload:
+    async def test_streams_and_records_size(self) -> None:
+        storage = FakeStorage()
+        existing: list[dict[str, object]] = [
+            {"content_type": "image/jpeg", "sort_order": 4},
+            {"content_type": "audio/m4a", "sort_order": 1},
+        ]
+        service = MediaService(_client(storage, existing))
+
+        row = await service.upload(USER_ID, ENTRY_ID, _chunks(5), "a.jpg", "image/jpeg")
+
+        assert row.size_bytes == 5 * 1024
+        assert row.sort_order == 5
+        (url,) = storage.received
+        assert url.startswith(f"http://localhost:54321/storage/v1/object/{BUCKET}/{USER_ID}/")
+        assert storage.received[url] == 5 * 1024
+
+    async def test_inserts_through_locking_rpc(self) -> None:
+        client = _client(FakeStorage(), [])
+        service = MediaService(client)
+
+        await service.upload(USER_ID, ENTRY_ID, _chunks(1), "a.jpg", "image/jpeg")
+
+        name, params = client.rpc.call_args.args
+        assert name == "insert_entry_media_batch"
+        (item,) = params["p_items"]
+        assert "sort_order" not in item
+        client.table.return_value.insert.assert_not_called()
+
+    async def test_database_limit_race_removes_object(self) -> None:
+        storage = FakeStorage()
+        client = _client(storage, [])
+        client.rpc.side_effect = None
+        client.rpc.return_value.execute = AsyncMock(
+            side_effect=APIError({"code": "NS002", "message": "Maximum of 1 audio file per entry"})
+        )
+        service = MediaService(client)
+
+        with pytest.raises(MediaLimitExceededError):
+            await service.upload(USER_ID, ENTRY_ID, _chunks(2), "a.m4a", "audio/m4a")
+
+        (path,) = storage.removed
+        assert path.startswith(f"{USER_ID}/{ENTRY_ID}/")
+
+    async def test_duplicate_content_reuses_stored_object(self) -> None:
+        storage = FakeStorage()
+        client = _client(storage, [])
+        rpc = client.rpc.side_effect
+
+        def shared(name: str, params: dict[str, Any]) -> MagicMock:
+            (item,) = params["p_items"]
+            return rpc(name, params | {"p_items": [item | {"storage_path": "u/e/original.jpg"}]})
+
+        client.rpc.side_effect = shared
+        service = MediaService(client)
+
+        row = await service.upload(USER_ID, ENTRY_ID, _chunks(2), "a.jpg", "image/jpeg")
+
+        (payload,) = client.rpc.call_args.args[1]["p_items"]
+        assert payload["content_hash"] == hashlib.sha256(CHUNK * 2).hexdigest()
+        assert row.storage_path == "u/e/original.jpg"
+        assert storage.removed == [payload["storage_path"]]
+
+    @pytest.mark.parametrize(
+        ("file_name", "content_type", "copied", "expected"),
+        [
+            ("a.jpg", "image/jpeg", {"thumbnail_path": "u/e/original.thumb.webp"}, False),
+            ("a.jpg", "image/jpeg", {}, True),
+            ("a.m4a", "audio/m4a", {"waveform_peaks": "\\x0102"}, False),
+            ("a.m4a", "audio/m4a", {}, True),
+        ],
+    )
+    async def test_duplicate_skips_processing_already_done(
+        self, file_name: str, content_type: str, copied: dict[str, object], expected: bool
+    ) -> None:
+        client = _client(FakeStorage(), [])
+        _share_stored_object(client, copied)
+        variants = AsyncMock(spec=MediaVariantScheduler)
+        waveforms = AsyncMock(spec=MediaWaveformScheduler)
+        service = MediaService(client, variants=variants, waveforms=waveforms)
+
+        await service.upload(USER_ID, ENTRY_ID, _chunks(1), file_name, content_type)
+
+        scheduler = waveforms if content_type.startswith("audio/") else variants
+        assert scheduler.schedule.await_count == int(expected)
+
+    async def test_new_content_keeps_stored_object(self) -> None:
+        storage = FakeStorage()
+        service = MediaService(_client(storage, []))
+
+        await service.upload(USER_ID, ENTRY_ID, _chunks(2), "a.jpg", "image/jpeg")
+
+        assert storage.removed == []
+
+    @pytest.mark.parametrize(
+        ("file_name", "content_type", "audio"),
+        [("a.jpg", "image/jpeg", False), ("a.m4a", "audio/m4a", True)],
+    )
+    async def test_schedules_processing_by_media_kind(
+        self, file_name: str, content_type: str, audio: bool
+    ) -> None:
+        variants = AsyncMock(spec=MediaVariantScheduler)
+        waveforms = AsyncMock(spec=MediaWaveformScheduler)
+        service = MediaService(_client(FakeStorage(), []), variants=variants, waveforms=waveforms)
+
+        row = await service.upload(USER_ID, ENTRY_ID, _chunks(1), file_name, content_type)
+
+        scheduled, skipped = (waveforms, variants) if audio else (variants, waveforms)
+        scheduled.schedule.assert_awaited_once_with(row.id, row.user_id)
+        skipped.schedule.assert_not_called()
+
+    async def test_client_waveform_stored_as_quantized_peaks(self) -> None:
+        client = _client(FakeStorage(), [])
+        service = MediaService(client)
+        amplitudes = [i / 999 for i in range(1000)]
+
+        await service.upload(
+            USER_ID, ENTRY_ID, _chunks(1), "a.m4a", "audio/m4a", waveform=amplitudes
+        )
+
+        (payload,) = client.rpc.call_args.args[1]["p_items"]
+        assert "waveform" not in payload
+        peaks = bytes.fromhex(payload["waveform_peaks"].removeprefix("\\x"))
+        assert len(peaks) == WAVEFORM_BINS
+        assert peaks[-1] == 255
+        assert list(peaks) == sorted(peaks)
+
+    async def test_limit_failure_cancels_transfer(self) -> None:
+        storage = FakeStorage(delay=0.01)
+        existing: list[dict[str, object]] = [
+            {"content_type": "audio/m4a", "sort_order": 0},
+        ]
+        client = _client(storage, existing)
+        service = MediaService(client)
+
+        with pytest.raises(MediaLimitExceededError):
+            await service.upload(USER_ID, ENTRY_ID, _chunks(50), "a.m4a", "audio/m4a")
+
+        assert storage.received == {}
+        assert storage.removed == []
+        client.rpc.assert_not_called()
+
+    async def test_limit_failure_after_transfer_removes_object(self) -> None:
+        storage = FakeStorage()
+        existing: list[dict[str, object]] = [
+            {"content_type": "audio/m4a", "sort_order": 0},
+        ]
+        client = _client(storage, existing)
+        slots = client.table.return_value.select.return_value.eq.return_value
+
+        async def slow_slots() -> MagicMock:
+            await asyncio.sleep(0.01)
+            return MagicMock(data=existing)
+
+        slots.execute = AsyncMock(side_effect=slow_slots)
+        service = MediaService(client)
+
+        with pytest.raises(MediaLimitExceededError):
+            await service.upload(USER_ID, ENTRY_ID, _chunks(2), "a.m4a", "audio/m4a")
+
+        (path,) = storage.removed
+        assert path.startswith(f"{USER_ID}/{ENTRY_ID}/")
+
+    async def test_oversize_stream_fails_without_insert(self) -> None:
+        storage = FakeStorage()
+        client = _client(storage, [])
+        service = MediaService(client)
+        too_many = 10 * 1024 + 1
+
+        with pytest.raises(FileTooLargeError):
+            await service.upload(USER_ID, ENTRY_ID, _chunks(too_many), "a.jpg", "image/jpeg")
+
+        client.rpc.assert_not_called()
+
+
+class TestBatchUpload:
+    async def test_uploads_concurrently_and_inserts_once(self) -> None:
+        storage = FakeStorage(delay=0.001)
+        existing: list[dict[str, object]] = [{"content_type": "image/jpeg", "sort_order": 2}]
+        client = _client(storage, existing)
+        service = MediaService(client)
+
+        rows = await service.upload_batch(USER_ID, ENTRY_ID, _files(6))
+
+        assert [row.sort_order for row in rows] == [3, 4, 5, 6, 7, 8]
+        assert len(storage.received) == 6
+        assert 1 < storage.peak <= BATCH_UPLOAD_CONCURRENCY
+        client.rpc.assert_called_once()
+        name, params = client.rpc.call_args.args
+        assert name == "insert_entry_media_batch"
+        assert [item["size_bytes"] for item in params["p_items"]] == [2 * 1024] * 6
+        client.table.return_value.insert.assert_not_called()
+
+    async def test_capacity_checked_once_for_whole_batch(self) -> None:
+        storage = FakeStorage(delay=0.01)
+        existing: list[dict[str, object]] = [
+            {"content_type": "image/jpeg", "sort_order": i}
+            for i in range(MAX_IMAGES_PER_ENTRY - 2)
+        ]
+        client = _client(storage, existing)
+        service = MediaService(client)
+
+        with pytest.raises(MediaLimitExceededError):
+            await service.upload_batch(USER_ID, ENTRY_ID, _files(3, chunks=20))
+
+        client.rpc.assert_not_called()
+        assert storage.received == {}
+
+    async def test_one_oversized_file_aborts_batch(self) -> None:
+        storage = FakeStorage()
+        client = _client(storage, [])
+        service = MediaService(client)
+        files = [*_files(2), *_files(1, chunks=10 * 1024 + 1)]
+
+        with pytest.raises(FileTooLargeError):
+            await service.upload_batch(USER_ID, ENTRY_ID, files)
+
+        assert sorted(storage.removed) == sorted(
+            url.split(f"/{BUCKET}/", 1)[1] for url in storage.received
+        )
+        client.rpc.assert_not_called()
+
+    async def test_database_limit_race_removes_objects(self) -> None:
+        storage = FakeStorage()
+        client = _client(storage, [])
+        client.rpc.side_effect = None
+        client.rpc.return_value.execute = AsyncMock(
+            side_effect=APIError({"code": "NS002", "message": "Maximum of 10 images per entry"})
+        )
+        service = MediaService(client)
+
+        with pytest.raises(MediaLimitExceededError, match="Maximum of 10"):
+            await service.upload_batch(USER_ID, ENTRY_ID, _files(2))
+
+        assert len(storage.removed) == 2
+
+    async def test_duplicates_within_batch_share_one_object(self) -> None:
+        storage = FakeStorage()
+        client = _client(storage, [])
+        rpc = client.rpc.side_effect
+
+        def dedup(name: str, params: dict[str, Any]) -> MagicMock:
+            first, *rest = params["p_items"]
+            items = [first, *(item | {"storage_path": first["storage_path"]} for item in rest)]
+            return rpc(name, params | {"p_items": items})
+
+        client.rpc.side_effect = dedup
+        service = MediaService(client)
+
+        rows = await service.upload_batch(USER_ID, ENTRY_ID, _files(3))
+
+        (_, params) = client.rpc.call_args.args
+        hashes = {item["content_hash"] for item in params["p_items"]}
+        assert hashes == {hashlib.sha256(CHUNK * 2).hexdigest()}
+        assert len({row.storage_path for row in rows}) == 1
+        assert storage.removed == [item["storage_path"] for item in params["p_items"][1:]]
+
+    async def test_batch_schedules_only_unprocessed_rows(self) -> None:
+        client = _client(FakeStorage(), [])
+        _share_stored_object(client, {"thumbnail_path": "u/e/original.thumb.webp"})
+        variants = AsyncMock(spec=MediaVariantScheduler)
+        service = MediaService(client, variants=variants)
+
+        await service.upload_batch(USER_ID, ENTRY_ID, _files(2))
+
+        variants.schedule.assert_not_called()
@@ -0,0 +1,222 @@
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+from urllib.parse import parse_qs, urlparse
+
+import jwt
+import pytest
+
+from nstil.models.media import MediaPreviewRow, MediaPreviewRowItem
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
+from nstil.services.cache.media_cache import MediaCacheService
+from nstil.services.media import BUCKET, SIGNED_URL_EXPIRY, MediaService
+from nstil.services.media_signer import MediaUrlSigner
+from tests.factories import make_media_row
+
+SECRET = "test-jwt-secret-with-enough-entropy"
+PATH = "user/entry/file.jpg"
+
+
+@pytest.fixture
+def signer() -> MediaUrlSigner:
+    return MediaUrlSigner("http://localhost:54321/", SECRET)
+
+
+@pytest.fixture
+def url_cache() -> AsyncMock:
+    cache = AsyncMock(spec=MediaCacheService)
+    cache.get_signed_urls.side_effect = lambda paths: [None] * len(paths)
+    return cache
+
+
+@pytest.fixture
+def client() -> MagicMock:
+    client = MagicMock()
+    bucket = client.storage.from_.return_value
+    bucket.create_signed_urls = AsyncMock(
+        side_effect=lambda paths, expires_in: [{"signedURL": f"remote/{p}"} for p in paths]
+    )
+    return client
+
+
+class TestMediaUrlSigner:
+    def test_signs_storage_url(self, signer: MediaUrlSigner) -> None:
+        url = urlparse(signer.sign(BUCKET, PATH, SIGNED_URL_EXPIRY))
+
+        assert url.path == f"/storage/v1/object/sign/{BUCKET}/{PATH}"
+        token = parse_qs(url.query)["token"][0]
+        claims = jwt.decode(token, SECRET, algorithms=["HS256"])
+        assert claims["url"] == f"{BUCKET}/{PATH}"
+        assert claims["exp"] - claims["iat"] == SIGNED_URL_EXPIRY
+
+    def test_quotes_path(self, signer: MediaUrlSigner) -> None:
+        url = signer.sign(BUCKET, "user/entry/my file.jpg", SIGNED_URL_EXPIRY)
+        assert "/my%20file.jpg?token=" in url
+
+
+class TestCreateSignedUrls:
+    async def test_empty(self, client: MagicMock, url_cache: AsyncMock) -> None:
+        service = MediaService(client, url_cache)
+        assert await service.create_signed_urls([]) == []
+        url_cache.get_signed_urls.assert_not_called()
+
+    async def test_cache_hits_skip_signing(self, client: MagicMock, url_cache: AsyncMock) -> None:
+        url_cache.get_signed_urls.side_effect = None
+        url_cache.get_signed_urls.return_value = ["cached/a", "cached/b"]
+        service = MediaService(client, url_cache)
+
+        assert await service.create_signed_urls(["a", "b"]) == ["cached/a", "cached/b"]
+        client.storage.from_.return_value.create_signed_urls.assert_not_called()
+        url_cache.set_signed_urls.assert_not_called()
+
+    async def test_misses_signed_remotely_and_cached(
+        self, client: MagicMock, url_cache: AsyncMock
+    ) -> None:
+        url_cache.get_signed_urls.side_effect = None
+        url_cache.get_signed_urls.return_value = ["cached/a", None, None]
+        service = MediaService(client, url_cache)
+
+        urls = await service.create_signed_urls(["a", "b", "b"])
+
+        assert urls == ["cached/a", "remote/b", "remote/b"]
+        client.storage.from_.return_value.create_signed_urls.assert_awaited_once_with(
+            paths=["b"], expires_in=SIGNED_URL_EXPIRY
+        )
+        url_cache.set_signed_urls.assert_awaited_once_with({"b": "remote/b"})
+
+    async def test_local_signer_skips_storage(
+        self, client: MagicMock, url_cache: AsyncMock, signer: MediaUrlSigner
+    ) -> None:
+        service = MediaService(client, url_cache, signer)
+
+        url = await service.create_signed_url(PATH)
+
+        assert url.startswith(f"http://localhost:54321/storage/v1/object/sign/{BUCKET}/{PATH}")
+        client.storage.from_.return_value.create_signed_urls.assert_not_called()
+        url_cache.set_signed_urls.assert_awaited_once_with({PATH: url})
+
+    async def test_without_cache(self, client: MagicMock) -> None:
+        service = MediaService(client)
+        assert await service.create_signed_urls(["a"]) == ["remote/a"]
+
+
+class TestSignPreviews:
+    async def test_signs_in_one_batch(self, client: MagicMock, url_cache: AsyncMock) -> None:
+        first, second = uuid.uuid4(), uuid.uuid4()
+        ids = [uuid.uuid4() for _ in range(3)]
+        previews = {
+            first: MediaPreviewRow(
+                items=[
+                    MediaPreviewRowItem(id=ids[0], storage_path="a"),
+                    MediaPreviewRowItem(id=ids[1], storage_path="b"),
+                ],
+                total_count=5,
+            ),
+            second: MediaPreviewRow(
+                items=[MediaPreviewRowItem(id=ids[2], storage_path="c")], total_count=1
+            ),
+        }
+        service = MediaService(client, url_cache)
+
+        result = await service.sign_previews(previews)
+
+        assert [item.url for item in result[first].items] == ["remote/a", "remote/b"]
+        assert result[first].total_count == 5
+        assert result[second].items[0].id == ids[2]
+        assert result[second].items[0].url == "remote/c"
+        client.storage.from_.return_value.create_signed_urls.assert_awaited_once()
+
+    async def test_prefers_thumbnails(self, client: MagicMock) -> None:
+        entry_id, media_id = uuid.uuid4(), uuid.uuid4()
+        preview = MediaPreviewRow(
+            items=[MediaPreviewRowItem(id=media_id, storage_path="a.jpg", thumbnail_path="a.t")],
+            total_count=1,
+        )
+
+        result = await MediaService(client).sign_previews({entry_id: preview})
+
+        assert result[entry_id].items[0].url == "remote/a.t"
+
+    async def test_empty(self, client: MagicMock) -> None:
+        assert await MediaService(client).sign_previews({}) == {}
+
+
+class TestMediaInvalidation:
+    async def test_delete_invalidates_previews(
+        self, client: MagicMock, url_cache: AsyncMock
+    ) -> None:
+        user_id, media_id = uuid.uuid4(), uuid.uuid4()
+        invalidator = AsyncMock(spec=CacheInvalidator)
+        service = MediaService(client, url_cache, invalidator=invalidator)
+        service.get_by_id = AsyncMock(  # type: ignore[method-assign]
+            return_value=make_media_row(storage_path=PATH)
+        )
+        client.storage.from_.return_value.remove = AsyncMock()
+        client.table.return_value.delete.return_value.eq.return_value.eq.return_value.execute = (
+            AsyncMock()
+        )
+
+        assert await service.delete(media_id, user_id) is True
+
+        url_cache.delete_signed_urls.assert_awaited_once_with([PATH])
+        invalidator.invalidate.assert_awaited_once_with(
+            user_id, CacheEvent.MEDIA_DELETED, media_id
+        )
+
+    async def test_delete_removes_variants(self, client: MagicMock, url_cache: AsyncMock) -> None:
+        service = MediaService(client, url_cache)
+        row = make_media_row(storage_path=PATH, thumbnail_path="t.webp", medium_path="m.webp")
+        service.get_by_id = AsyncMock(return_value=row)  # type: ignore[method-assign]
+        remove = client.storage.from_.return_value.remove = AsyncMock()
+        client.table.return_value.delete.return_value.eq.return_value.eq.return_value.execute = (
+            AsyncMock()
+        )
+
+        await service.delete(row.id, row.user_id)
+
+        remove.assert_awaited_once_with([PATH, "t.webp", "m.webp"])
+        url_cache.delete_signed_urls.assert_awaited_once_with([PATH, "t.webp", "m.webp"])
+
+    @pytest.mark.parametrize("shared", [True, False])
+    async def test_delete_keeps_object_still_referenced(
+        self, client: MagicMock, url_cache: AsyncMock, shared: bool
+    ) -> None:
+        service = MediaService(client, url_cache)
+        row = make_media_row(storage_path=PATH, content_hash="a" * 64)
+        service.get_by_id = AsyncMock(return_value=row)  # type: ignore[method-assign]
+        remove = client.storage.from_.return_value.remove = AsyncMock()
+        table = client.table.return_value
+        table.delete.return_value.eq.return_value.eq.return_value.execute = AsyncMock()
+        lookup = table.select.return_value.eq.return_value.eq.return_value.eq.return_value
+        lookup.limit.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[{"ref_count": 1}] if shared else [])
+        )
+
+        assert await service.delete(row.id, row.user_id) is True
+
+        client.table.assert_any_call("media_objects")
+        assert remove.await_count == (0 if shared else 1)
+        assert url_cache.delete_signed_urls.await_count == (0 if shared else 1)
+
+
+class TestMediaCacheService:
+    async def test_round_trip(self) -> None:
+        redis = AsyncMock()
+        redis.mget.return_value = ["url-a", None]
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        redis.pipeline = MagicMock(return_value=pipe)
+        pipe.__aenter__ = AsyncMock(return_value=pipe)
+        pipe.__aexit__ = AsyncMock(return_value=None)
+        cache = MediaCacheService(redis)
+
+        assert await cache.get_signed_urls(["a", "b"]) == ["url-a", None]
+        await cache.set_signed_urls({"b": "url-b"})
+
+        pipe.setex.assert_called_once()
+        pipe.execute.assert_awaited_once()
+
+    async def test_set_failure_is_swallowed(self) -> None:
+        redis = AsyncMock()
+        redis.pipeline = MagicMock(side_effect=ConnectionError)
+        await MediaCacheService(redis).set_signed_urls({"a": "url"})
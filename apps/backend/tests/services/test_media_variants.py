@@ -0,0 +1,159 @@
+import io
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+from PIL import Image
+
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
+from nstil.services.media import MediaService
+from nstil.services.media_variants import (
+    GENERATE_MEDIA_VARIANTS_TASK,
+    VARIANT_MAX_EDGE,
+    ImageVariant,
+    MediaVariantScheduler,
+    media_variants_job_id,
+    render_variants,
+    variant_path,
+)
+from tests.factories import make_media_row
+
+
+def _encode(image: Image.Image, fmt: str, **params: object) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **params)
+    return buffer.getvalue()
+
+
+def _photo(width: int, height: int) -> Image.Image:
+    rng = np.random.default_rng(7)
+    pixels = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    return Image.fromarray(pixels, "RGB")
+
+
+class TestRenderVariants:
+    def test_variants_fit_max_edges(self) -> None:
+        original = _encode(_photo(3000, 2000), "JPEG", quality=90)
+
+        variants = render_variants(original)
+
+        for variant, data in variants.items():
+            with Image.open(io.BytesIO(data)) as image:
+                assert image.format == "WEBP"
+                assert max(image.size) == VARIANT_MAX_EDGE[variant]
+                assert image.size[0] > image.size[1]
+        assert len(variants[ImageVariant.THUMBNAIL]) * 20 < len(original)
+
+    def test_applies_exif_orientation(self) -> None:
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        original = _encode(_photo(1600, 800), "JPEG", exif=exif)
+
+        variants = render_variants(original)
+
+        with Image.open(io.BytesIO(variants[ImageVariant.MEDIUM])) as image:
+            assert image.size == (640, 1280)
+
+    def test_keeps_alpha_and_small_sizes(self) -> None:
+        original = _encode(Image.new("RGBA", (200, 100), (255, 0, 0, 128)), "PNG")
+
+        variants = render_variants(original)
+
+        with Image.open(io.BytesIO(variants[ImageVariant.THUMBNAIL])) as image:
+            assert image.mode == "RGBA"
+            assert image.size == (200, 100)
+
+
+class TestVariantPath:
+    def test_replaces_extension(self) -> None:
+        path = variant_path("u/e/abc.jpg", ImageVariant.THUMBNAIL)
+        assert path == "u/e/abc.thumb.webp"
+
+    def test_without_extension(self) -> None:
+        assert variant_path("u/e/abc", ImageVariant.MEDIUM) == "u/e/abc.medium.webp"
+
+
+class TestMediaVariantScheduler:
+    async def test_enqueues_deduplicated_job(self) -> None:
+        queue = AsyncMock()
+        media_id, user_id = uuid.uuid4(), uuid.uuid4()
+
+        await MediaVariantScheduler(queue).schedule(media_id, user_id)
+
+        queue.enqueue_job.assert_awaited_once_with(
+            GENERATE_MEDIA_VARIANTS_TASK,
+            str(media_id),
+            str(user_id),
+            _job_id=media_variants_job_id(media_id),
+        )
+
+    async def test_enqueue_failure_is_swallowed(self) -> None:
+        queue = AsyncMock()
+        queue.enqueue_job.side_effect = ConnectionError
+
+        await MediaVariantScheduler(queue).schedule(uuid.uuid4(), uuid.uuid4())
+
+
+def _client(updated: list[dict[str, object]]) -> MagicMock:
+    client = MagicMock()
+    bucket = client.storage.from_.return_value
+    bucket.upload = AsyncMock()
+    bucket.remove = AsyncMock()
+    update = client.table.return_value.update
+    update.return_value.eq.return_value.eq.return_value.execute = AsyncMock(
+        return_value=MagicMock(data=updated)
+    )
+    return client
+
+
+class TestStoreVariants:
+    async def test_uploads_and_records_paths(self) -> None:
+        media = make_media_row(storage_path="u/e/m.jpg")
+        stored = media.model_copy(
+            update={"thumbnail_path": "u/e/m.thumb.webp", "medium_path": "u/e/m.medium.webp"}
+        )
+        client = _client([stored.model_dump(mode="json")])
+        invalidator = AsyncMock(spec=CacheInvalidator)
+        service = MediaService(client, invalidator=invalidator)
+
+        row = await service.store_variants(
+            media, {ImageVariant.THUMBNAIL: b"t", ImageVariant.MEDIUM: b"m"}
+        )
+
+        assert row is not None
+        assert row.thumbnail_path == "u/e/m.thumb.webp"
+        uploaded = {
+            c.kwargs["path"]: c.kwargs["file"]
+            for c in client.storage.from_.return_value.upload.call_args_list
+        }
+        assert uploaded == {"u/e/m.thumb.webp": b"t", "u/e/m.medium.webp": b"m"}
+        client.table.return_value.update.assert_called_once_with(
+            {"thumbnail_path": "u/e/m.thumb.webp", "medium_path": "u/e/m.medium.webp"}
+        )
+        invalidator.invalidate.assert_awaited_once_with(
+            media.user_id, CacheEvent.MEDIA_UPDATED, media.id
+        )
+
+    async def test_removes_variants_when_media_deleted(self) -> None:
+        media = make_media_row(storage_path="u/e/m.jpg")
+        client = _client([])
+        service = MediaService(client)
+
+        row = await service.store_variants(media, {ImageVariant.THUMBNAIL: b"t"})
+
+        assert row is None
+        client.storage.from_.return_value.remove.assert_awaited_once_with(["u/e/m.thumb.webp"])
+
+    async def test_keeps_variants_of_shared_object(self) -> None:
+        media = make_media_row(storage_path="u/e/m.jpg", content_hash="b" * 64)
+        client = _client([])
+        lookup = client.table.return_value.select.return_value.eq.return_value.eq.return_value
+        lookup.eq.return_value.limit.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[{"ref_count": 2}])
+        )
+        service = MediaService(client)
+
+        assert await service.store_variants(media, {ImageVariant.THUMBNAIL: b"t"}) is None
+
+        client.storage.from_.return_value.remove.assert_not_called()
@@ -0,0 +1,168 @@
+import base64
+import io
+import uuid
+import wave
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from nstil.models.media import EntryMediaResponse, EntryMediaRow
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
+from nstil.services.media import MediaService
+from nstil.services.media_waveform import (
+    GENERATE_MEDIA_WAVEFORM_TASK,
+    WAVEFORM_BINS,
+    MediaWaveformScheduler,
+    WaveformDecodeError,
+    extract_waveform,
+    media_waveform_job_id,
+    peak_envelope,
+    quantize_peaks,
+    waveform_from_amplitudes,
+)
+from tests.factories import make_media_row
+
+
+def _wav(samples: np.ndarray, rate: int = 16000, channels: int = 1) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as handle:
+        handle.setnchannels(channels)
+        handle.setsampwidth(2)
+        handle.setframerate(rate)
+        handle.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def _tone(seconds: float, rate: int = 16000) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return np.sin(2 * np.pi * 440 * t)
+
+
+class TestPeakEnvelope:
+    def test_takes_absolute_peak_per_bin(self) -> None:
+        samples = np.array([0.1, -0.9, 0.2, 0.3, -0.4, 0.0], dtype=np.float32)
+
+        envelope = peak_envelope(samples, bins=3)
+
+        assert envelope.tolist() == pytest.approx([0.9, 0.3, 0.4])
+
+    def test_stretches_short_input(self) -> None:
+        envelope = peak_envelope(np.array([0.5, 1.0], dtype=np.float32), bins=4)
+
+        assert envelope.tolist() == [0.5, 0.5, 1.0, 1.0]
+
+    def test_empty_input_is_silent(self) -> None:
+        assert peak_envelope(np.zeros(0, dtype=np.float32)).tolist() == [0.0] * WAVEFORM_BINS
+
+    def test_quantizes_to_uint8(self) -> None:
+        envelope = np.array([-0.5, 0.0, 0.5, 1.0, 2.0], dtype=np.float32)
+
+        assert list(quantize_peaks(envelope)) == [0, 0, 128, 255, 255]
+
+    def test_amplitudes_keep_their_scale(self) -> None:
+        peaks = waveform_from_amplitudes([0.5] * 300)
+
+        assert peaks == bytes([128]) * WAVEFORM_BINS
+
+
+class TestExtractWaveform:
+    def test_fixed_resolution_normalized_envelope(self) -> None:
+        fade_in = _tone(3) * np.linspace(0, 0.5, 3 * 16000)
+
+        peaks = extract_waveform(_wav(fade_in))
+
+        assert len(peaks) == WAVEFORM_BINS
+        assert peaks[-1] == 255
+        assert peaks[0] < 10
+        assert list(peaks) == sorted(peaks)
+
+    def test_downmixes_stereo(self) -> None:
+        stereo = np.repeat(_tone(1) * 0.5, 2)
+
+        peaks = extract_waveform(_wav(stereo, channels=2))
+
+        assert len(peaks) == WAVEFORM_BINS
+        assert min(peaks) > 200
+
+    def test_silence_is_flat(self) -> None:
+        assert extract_waveform(_wav(np.zeros(16000))) == bytes(WAVEFORM_BINS)
+
+    def test_invalid_audio_raises(self) -> None:
+        with pytest.raises(WaveformDecodeError):
+            extract_waveform(b"not audio" * 100)
+
+
+class TestMediaWaveformScheduler:
+    async def test_enqueues_deduplicated_job(self) -> None:
+        queue = AsyncMock()
+        media_id, user_id = uuid.uuid4(), uuid.uuid4()
+
+        await MediaWaveformScheduler(queue).schedule(media_id, user_id)
+
+        queue.enqueue_job.assert_awaited_once_with(
+            GENERATE_MEDIA_WAVEFORM_TASK,
+            str(media_id),
+            str(user_id),
+            _job_id=media_waveform_job_id(media_id),
+        )
+
+    async def test_enqueue_failure_is_swallowed(self) -> None:
+        queue = AsyncMock()
+        queue.enqueue_job.side_effect = ConnectionError
+
+        await MediaWaveformScheduler(queue).schedule(uuid.uuid4(), uuid.uuid4())
+
+
+class TestWaveformPeaksEncoding:
+    def test_row_decodes_bytea_hex(self) -> None:
+        data = make_media_row(content_type="audio/m4a").model_dump(mode="json")
+        data["waveform_peaks"] = "\\x00ff80"
+
+        row = EntryMediaRow.model_validate(data)
+
+        assert row.waveform_peaks == b"\x00\xff\x80"
+
+    def test_response_is_base64(self) -> None:
+        row = make_media_row(content_type="audio/m4a").model_copy(
+            update={"waveform_peaks": b"\x00\xff\x80"}
+        )
+
+        response = EntryMediaResponse.from_row(row, "https://signed")
+
+        assert response.waveform_peaks is not None
+        assert base64.b64decode(response.waveform_peaks) == b"\x00\xff\x80"
+        assert response.waveform is None
+
+
+class TestStoreWaveform:
+    async def test_records_peaks_and_invalidates(self) -> None:
+        media = make_media_row(content_type="audio/m4a", waveform=[0.1, 0.2])
+        stored = media.model_dump(mode="json") | {"waveform": None, "waveform_peaks": "\\x0102"}
+        client = MagicMock()
+        update = client.table.return_value.update
+        update.return_value.eq.return_value.eq.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[stored])
+        )
+        invalidator = AsyncMock(spec=CacheInvalidator)
+        service = MediaService(client, invalidator=invalidator)
+
+        row = await service.store_waveform(media, b"\x01\x02")
+
+        assert row is not None
+        assert row.waveform_peaks == b"\x01\x02"
+        update.assert_called_once_with({"waveform_peaks": "\\x0102", "waveform": None})
+        invalidator.invalidate.assert_awaited_once_with(
+            media.user_id, CacheEvent.MEDIA_UPDATED, media.id
+        )
+
+    async def test_deleted_media_returns_none(self) -> None:
+        client = MagicMock()
+        update = client.table.return_value.update
+        update.return_value.eq.return_value.eq.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[])
+        )
+        service = MediaService(client)
+
+        assert await service.store_waveform(make_media_row(), b"\x01") is None
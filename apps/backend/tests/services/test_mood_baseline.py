@@ -0,0 +1,269 @@
+import uuid
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nstil.models.calendar import DailyMoodRollup
+from nstil.models.mood_baseline import MoodBaselineRow
+from nstil.services.ai.mood_baseline import (
+    EWMA_ALPHA,
+    MIN_OBSERVATIONS,
+    SEED_DAYS,
+    MoodBaselineService,
+    MoodBaselineState,
+    MoodDeviation,
+    build_deviation_insight,
+    daily_difficult_ratios,
+    fold_observation,
+    z_score,
+)
+from nstil.services.journal import JournalService
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+OTHER_USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000002")
+TODAY = date(2025, 3, 1)
+
+
+def _rollup(
+    day: date, mood: str | None, count: int = 1, user_id: uuid.UUID = USER_ID
+) -> DailyMoodRollup:
+    return DailyMoodRollup(user_id=user_id, day=day, mood_category=mood, entry_count=count)
+
+
+def _stable_rollups(days: int, end: date) -> list[DailyMoodRollup]:
+    return [_rollup(end - timedelta(days=d), "happy") for d in range(days)]
+
+
+class TestDailyDifficultRatios:
+    def test_ratio_per_day_ignores_moodless(self) -> None:
+        day = date(2025, 1, 1)
+        rollups = [_rollup(day, "sad", 1), _rollup(day, "calm", 3), _rollup(day, None, 5)]
+        assert daily_difficult_ratios(rollups) == {day: 0.25}
+
+    def test_moodless_day_omitted(self) -> None:
+        assert daily_difficult_ratios([_rollup(date(2025, 1, 1), None)]) == {}
+
+
+class TestFoldObservation:
+    def test_first_observation_seeds_mean(self) -> None:
+        state = fold_observation(MoodBaselineState(), 0.4)
+        assert state == MoodBaselineState(mean=0.4, variance=0.0, observations=1)
+
+    def test_ewma_update(self) -> None:
+        state = fold_observation(MoodBaselineState(mean=0.0, variance=0.0, observations=1), 1.0)
+        assert state.mean == pytest.approx(EWMA_ALPHA)
+        assert state.variance == pytest.approx((1 - EWMA_ALPHA) * EWMA_ALPHA)
+        assert state.observations == 2
+
+
+class TestZScore:
+    def test_none_until_warm(self) -> None:
+        state = MoodBaselineState(mean=0.0, variance=0.04, observations=MIN_OBSERVATIONS - 1)
+        assert z_score(state, 1.0) is None
+
+    def test_std_floor_applies(self) -> None:
+        state = MoodBaselineState(mean=0.0, variance=0.0, observations=MIN_OBSERVATIONS)
+        assert z_score(state, 0.5) == pytest.approx(5.0)
+
+
+class TestBuildDeviationInsight:
+    def test_negative_direction(self) -> None:
+        insight = build_deviation_insight(
+            MoodDeviation(day=TODAY, ratio=1.0, baseline_mean=0.1, baseline_std=0.1, z_score=9.0)
+        )
+        assert insight.metadata["direction"] == "negative"
+        assert insight.period_start == TODAY
+        assert insight.confidence == 1.0
+
+
+@pytest.fixture
+def journal() -> AsyncMock:
+    return AsyncMock(spec=JournalService)
+
+
+@pytest.fixture
+def service(journal: AsyncMock) -> MoodBaselineService:
+    svc = MoodBaselineService(MagicMock(), journal)
+    svc.get = AsyncMock(return_value=None)  # type: ignore[method-assign]
+    svc._save = AsyncMock(return_value=True)  # type: ignore[method-assign]
+    return svc
+
+
+class TestAdvance:
+    async def test_seeds_from_history_and_flags_recent_spike(
+        self, service: MoodBaselineService, journal: AsyncMock
+    ) -> None:
+        yesterday = TODAY - timedelta(days=1)
+        journal.get_daily_mood_rollups.return_value = [
+            *_stable_rollups(30, yesterday - timedelta(days=1)),
+            _rollup(yesterday, "sad", 3),
+        ]
+
+        deviations = await service.advance(USER_ID, TODAY)
+
+        journal.get_daily_mood_rollups.assert_awaited_once_with(
+            [USER_ID], TODAY - timedelta(days=SEED_DAYS), yesterday
+        )
+        assert [d.day for d in deviations] == [yesterday]
+        assert deviations[0].z_score > 0
+        saved_state = service._save.await_args.args[1]  # type: ignore[attr-defined]
+        assert saved_state.observations == 31
+
+    async def test_resumes_after_last_day(
+        self, service: MoodBaselineService, journal: AsyncMock
+    ) -> None:
+        last_day = TODAY - timedelta(days=2)
+        service.get.return_value = MoodBaselineRow(  # type: ignore[attr-defined]
+            user_id=USER_ID,
+            ewma_mean=0.1,
+            ewma_variance=0.01,
+            observations=40,
+            last_day=last_day,
+            updated_at=datetime.now(UTC),
+        )
+        journal.get_daily_mood_rollups.return_value = []
+
+        assert await service.advance(USER_ID, TODAY) == []
+
+        journal.get_daily_mood_rollups.assert_awaited_once_with(
+            [USER_ID], TODAY - timedelta(days=1), TODAY - timedelta(days=1)
+        )
+
+    async def test_up_to_date_skips_queries(
+        self, service: MoodBaselineService, journal: AsyncMock
+    ) -> None:
+        service.get.return_value = MoodBaselineRow(  # type: ignore[attr-defined]
+            user_id=USER_ID,
+            ewma_mean=0.1,
+            ewma_variance=0.01,
+            observations=40,
+            last_day=TODAY - timedelta(days=1),
+            updated_at=datetime.now(UTC),
+        )
+
+        assert await service.advance(USER_ID, TODAY) == []
+
+        journal.get_daily_mood_rollups.assert_not_awaited()
+        service._save.assert_not_awaited()  # type: ignore[attr-defined]
+
+    async def test_superseded_advance_reports_nothing(
+        self, service: MoodBaselineService, journal: AsyncMock
+    ) -> None:
+        yesterday = TODAY - timedelta(days=1)
+        journal.get_daily_mood_rollups.return_value = [
+            *_stable_rollups(30, yesterday - timedelta(days=1)),
+            _rollup(yesterday, "sad", 3),
+        ]
+        service._save.return_value = False  # type: ignore[attr-defined]
+
+        assert await service.advance(USER_ID, TODAY) == []
+
+        service._save.assert_awaited_once()  # type: ignore[attr-defined]
+        assert service._save.await_args.args[3] is None  # type: ignore[attr-defined]
+
+    async def test_stale_deviations_not_returned(
+        self, service: MoodBaselineService, journal: AsyncMock
+    ) -> None:
+        spike = TODAY - timedelta(days=20)
+        journal.get_daily_mood_rollups.return_value = [
+            *_stable_rollups(30, spike - timedelta(days=1)),
+            _rollup(spike, "sad", 3),
+        ]
+
+        assert await service.advance(USER_ID, TODAY) == []
+
+
+def _baseline_row(user_id: uuid.UUID, last_day: date) -> MoodBaselineRow:
+    return MoodBaselineRow(
+        user_id=user_id,
+        ewma_mean=0.0,
+        ewma_variance=0.0,
+        observations=MIN_OBSERVATIONS,
+        last_day=last_day,
+        updated_at=datetime.now(UTC),
+    )
+
+
+class TestAdvanceMany:
+    @pytest.fixture
+    def batch_service(self, journal: AsyncMock) -> MoodBaselineService:
+        svc = MoodBaselineService(MagicMock(), journal)
+        svc.get_many = AsyncMock(return_value={})  # type: ignore[method-assign]
+        svc._save_many = AsyncMock(  # type: ignore[method-assign]
+            side_effect=lambda states, last_day, expected: set(states)
+        )
+        return svc
+
+    async def test_one_rollup_query_for_all_due_users(
+        self, batch_service: MoodBaselineService, journal: AsyncMock
+    ) -> None:
+        yesterday = TODAY - timedelta(days=1)
+        batch_service.get_many.return_value = {  # type: ignore[attr-defined]
+            USER_ID: _baseline_row(USER_ID, TODAY - timedelta(days=3)),
+        }
+        journal.get_daily_mood_rollups.return_value = [
+            _rollup(TODAY - timedelta(days=5), "sad", 3),
+            _rollup(yesterday, "sad", 3),
+            _rollup(yesterday, "happy", user_id=OTHER_USER_ID),
+        ]
+
+        deviations = await batch_service.advance_many([USER_ID, OTHER_USER_ID], TODAY)
+
+        journal.get_daily_mood_rollups.assert_awaited_once_with(
+            [USER_ID, OTHER_USER_ID], TODAY - timedelta(days=SEED_DAYS), yesterday
+        )
+        assert list(deviations) == [USER_ID]
+        assert [d.day for d in deviations[USER_ID]] == [yesterday]
+        states, last_day, expected = batch_service._save_many.await_args.args  # type: ignore[attr-defined]
+        assert last_day == yesterday
+        assert expected == {USER_ID: TODAY - timedelta(days=3), OTHER_USER_ID: None}
+        assert states[USER_ID].observations == MIN_OBSERVATIONS + 1
+        assert states[OTHER_USER_ID].observations == 1
+
+    async def test_up_to_date_users_skip_queries(
+        self, batch_service: MoodBaselineService, journal: AsyncMock
+    ) -> None:
+        batch_service.get_many.return_value = {  # type: ignore[attr-defined]
+            USER_ID: _baseline_row(USER_ID, TODAY - timedelta(days=1)),
+        }
+
+        assert await batch_service.advance_many([USER_ID], TODAY) == {}
+
+        journal.get_daily_mood_rollups.assert_not_awaited()
+        batch_service._save_many.assert_not_awaited()  # type: ignore[attr-defined]
+
+    async def test_users_advanced_concurrently_are_dropped(
+        self, batch_service: MoodBaselineService, journal: AsyncMock
+    ) -> None:
+        yesterday = TODAY - timedelta(days=1)
+        journal.get_daily_mood_rollups.return_value = [_rollup(yesterday, "sad", 3)]
+        batch_service.get_many.return_value = {  # type: ignore[attr-defined]
+            USER_ID: _baseline_row(USER_ID, TODAY - timedelta(days=2)),
+        }
+        batch_service._save_many.side_effect = None  # type: ignore[attr-defined]
+        batch_service._save_many.return_value = set()  # type: ignore[attr-defined]
+
+        assert await batch_service.advance_many([USER_ID], TODAY) == {}
+
+
+class TestSaveMany:
+    async def test_compare_and_set_rpc(self, journal: AsyncMock) -> None:
+        client = MagicMock()
+        client.rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=[str(USER_ID)]))
+        service = MoodBaselineService(client, journal)
+        last_day = TODAY - timedelta(days=1)
+
+        saved = await service._save_many(
+            {USER_ID: MoodBaselineState(0.2, 0.01, 20), OTHER_USER_ID: MoodBaselineState()},
+            last_day,
+            {USER_ID: TODAY - timedelta(days=2), OTHER_USER_ID: None},
+        )
+
+        assert saved == {USER_ID}
+        name, params = client.rpc.call_args.args
+        assert name == "advance_mood_baselines"
+        first, second = params["p_items"]
+        assert first["expected_last_day"] == (TODAY - timedelta(days=2)).isoformat()
+        assert first["last_day"] == last_day.isoformat()
+        assert second["expected_last_day"] is None
@@ -0,0 +1,236 @@
+import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nstil.models.journal import JournalEntryDigest
+from nstil.models.tag_mood_stats import TagMoodStatsRow
+from nstil.services.ai.insight import AIInsightService
+from nstil.services.ai.pattern_detection import (
+    EPOCH,
+    MIN_SUPPORT,
+    PATTERN_COLUMNS,
+    PATTERN_METHOD,
+    PatternDetectionService,
+    TagMoodCounts,
+    build_pattern_insight,
+    score_associations,
+)
+from tests.factories import DEFAULT_USER_ID, make_ai_insight_row
+
+USER_ID = uuid.UUID(DEFAULT_USER_ID)
+BASE_TIME = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def _digest(mood: str | None, tags: list[str], minutes: int = 0) -> JournalEntryDigest:
+    return JournalEntryDigest(
+        id=uuid.uuid4(),
+        created_at=BASE_TIME + timedelta(minutes=minutes),
+        mood_category=mood,
+        tags=tags,
+        entry_type="journal",
+    )
+
+
+def _skewed_history() -> list[JournalEntryDigest]:
+    entries = [_digest("anxious", ["work"], i) for i in range(8)]
+    entries += [_digest("happy", ["work"], 10)]
+    entries += [_digest("happy", ["family"], 20 + i) for i in range(10)]
+    entries += [_digest("calm", [], 40 + i) for i in range(10)]
+    return entries
+
+
+class FakeJournal:
+    def __init__(self, entries: list[JournalEntryDigest]) -> None:
+        self.entries = entries
+        self.calls: list[tuple[datetime, str]] = []
+        self.revised = False
+        self.revision_checks: list[tuple[datetime, datetime]] = []
+
+    async def has_revisions(
+        self, user_id: uuid.UUID, since: datetime, created_until: datetime
+    ) -> bool:
+        self.revision_checks.append((since, created_until))
+        return self.revised
+
+    async def iter_entry_digests(
+        self, user_id: uuid.UUID, start: datetime, end: datetime, columns: str
+    ) -> AsyncIterator[list[JournalEntryDigest]]:
+        self.calls.append((start, columns))
+        page = [e for e in self.entries if start <= e.created_at < end]
+        if page:
+            yield page
+
+
+class TestTagMoodCounts:
+    def test_counts_tags_once_per_entry_and_skips_moodless(self) -> None:
+        stats = TagMoodCounts()
+        stats.add(_digest("sad", ["work", "work", "sleep"]))
+        stats.add(_digest(None, ["work"]))
+        assert stats.counts == {"work": {"sad": 1}, "sleep": {"sad": 1}}
+        assert stats.mood_totals == {"sad": 1}
+
+
+class TestScoreAssociations:
+    def test_finds_overrepresented_pair(self) -> None:
+        stats = TagMoodCounts()
+        for entry in _skewed_history():
+            stats.add(entry)
+
+        associations = score_associations(stats)
+
+        assert associations[0].tag == "work"
+        assert associations[0].mood == "anxious"
+        assert associations[0].observed == 8
+        assert associations[0].lift > 3
+        assert all(a.observed >= MIN_SUPPORT for a in associations)
+
+    def test_below_support_ignored(self) -> None:
+        stats = TagMoodCounts()
+        for i in range(MIN_SUPPORT - 1):
+            stats.add(_digest("angry", ["traffic"], i))
+        stats.add(_digest("calm", [], 50))
+        assert score_associations(stats) == []
+
+    def test_empty(self) -> None:
+        assert score_associations(TagMoodCounts()) == []
+
+    def test_insight_metadata(self) -> None:
+        stats = TagMoodCounts()
+        for entry in _skewed_history():
+            stats.add(entry)
+        insight = build_pattern_insight(score_associations(stats)[0])
+        assert insight.metadata["method"] == PATTERN_METHOD
+        assert insight.metadata["tag"] == "work"
+        assert insight.insight_type.value == "pattern"
+
+
+@pytest.fixture
+def insights() -> AsyncMock:
+    mock = AsyncMock(spec=AIInsightService)
+    mock.list_insights.return_value = ([], False)
+    mock.create_many.return_value = []
+    return mock
+
+
+def _service(journal: FakeJournal, insights: AsyncMock) -> PatternDetectionService:
+    service = PatternDetectionService(MagicMock(), journal, insights)  # type: ignore[arg-type]
+    service.get_stats = AsyncMock(return_value=None)  # type: ignore[method-assign]
+    service._save = AsyncMock()  # type: ignore[method-assign]
+    return service
+
+
+class TestDetect:
+    async def test_first_run_scans_full_history(self, insights: AsyncMock) -> None:
+        journal = FakeJournal(_skewed_history())
+        service = _service(journal, insights)
+
+        await service.detect(USER_ID)
+
+        assert journal.calls == [(EPOCH, PATTERN_COLUMNS)]
+        items = insights.create_many.await_args.args[0]
+        assert items[0][1].metadata["tag"] == "work"
+        saved = service._save.await_args.args  # type: ignore[attr-defined]
+        assert saved[2] == len(journal.entries)
+        assert saved[3] == max(e.created_at for e in journal.entries)
+
+    async def test_incremental_run_starts_after_watermark(self, insights: AsyncMock) -> None:
+        watermark = BASE_TIME + timedelta(minutes=30)
+        journal = FakeJournal(_skewed_history())
+        service = _service(journal, insights)
+        service.get_stats.return_value = TagMoodStatsRow(  # type: ignore[attr-defined]
+            user_id=USER_ID,
+            counts={},
+            mood_totals={},
+            entries_scanned=20,
+            watermark=watermark,
+            synced_at=BASE_TIME,
+            updated_at=BASE_TIME,
+        )
+
+        await service.detect(USER_ID)
+
+        assert journal.calls[0][0] == watermark + timedelta(microseconds=1)
+        assert journal.revision_checks == [(BASE_TIME, watermark)]
+        saved = service._save.await_args.args  # type: ignore[attr-defined]
+        assert saved[2] == 30
+        assert saved[4] > BASE_TIME
+
+    async def test_revised_history_rebuilds(self, insights: AsyncMock) -> None:
+        journal = FakeJournal(_skewed_history())
+        journal.revised = True
+        service = _service(journal, insights)
+        service.get_stats.return_value = TagMoodStatsRow(  # type: ignore[attr-defined]
+            user_id=USER_ID,
+            counts={"stale": {"sad": 99}},
+            mood_totals={"sad": 99},
+            entries_scanned=99,
+            watermark=BASE_TIME + timedelta(minutes=30),
+            synced_at=BASE_TIME,
+            updated_at=BASE_TIME,
+        )
+
+        await service.detect(USER_ID)
+
+        assert journal.calls == [(EPOCH, PATTERN_COLUMNS)]
+        stats, entries_scanned = service._save.await_args.args[1:3]  # type: ignore[attr-defined]
+        assert "stale" not in stats.counts
+        assert entries_scanned == len(journal.entries)
+
+    async def test_unsynced_stats_rebuild(self, insights: AsyncMock) -> None:
+        journal = FakeJournal(_skewed_history())
+        service = _service(journal, insights)
+        service.get_stats.return_value = TagMoodStatsRow(  # type: ignore[attr-defined]
+            user_id=USER_ID,
+            counts={},
+            mood_totals={},
+            entries_scanned=20,
+            watermark=BASE_TIME + timedelta(minutes=30),
+            updated_at=BASE_TIME,
+        )
+
+        await service.detect(USER_ID)
+
+        assert journal.calls[0][0] == EPOCH
+        assert journal.revision_checks == []
+
+    async def test_no_new_entries_skips_scoring(self, insights: AsyncMock) -> None:
+        service = _service(FakeJournal([]), insights)
+        service.get_stats.return_value = TagMoodStatsRow(  # type: ignore[attr-defined]
+            user_id=USER_ID,
+            counts={"work": {"anxious": 8}},
+            mood_totals={"anxious": 8},
+            entries_scanned=8,
+            watermark=BASE_TIME,
+            synced_at=BASE_TIME,
+            updated_at=BASE_TIME,
+        )
+
+        assert await service.detect(USER_ID) == []
+
+        service._save.assert_not_awaited()  # type: ignore[attr-defined]
+        insights.create_many.assert_not_awaited()
+
+    async def test_known_patterns_not_duplicated(self, insights: AsyncMock) -> None:
+        existing = make_ai_insight_row(insight_type="pattern")
+        existing.metadata.update({"method": PATTERN_METHOD, "tag": "work", "mood": "anxious"})
+        insights.list_insights.return_value = ([existing], False)
+        service = _service(FakeJournal(_skewed_history()), insights)
+
+        await service.detect(USER_ID)
+
+        items = insights.create_many.await_args.args[0]
+        assert all(
+            (i.metadata["tag"], i.metadata["mood"]) != ("work", "anxious") for _, i in items
+        )
+
+    async def test_full_rebuild_ignores_stored_stats(self, insights: AsyncMock) -> None:
+        journal = FakeJournal(_skewed_history())
+        service = _service(journal, insights)
+
+        await service.detect(USER_ID, full=True)
+
+        service.get_stats.assert_not_awaited()  # type: ignore[attr-defined]
+        assert journal.calls[0][0] == EPOCH
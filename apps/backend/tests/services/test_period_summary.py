@@ -0,0 +1,152 @@
+import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC, date, datetime
+from unittest.mock import AsyncMock
+
+import pytest
+
+from nstil.models.ai_insight import InsightType
+from nstil.models.journal import JournalEntryDigest
+from nstil.services.ai.insight import AIInsightService
+from nstil.services.ai.period_summary import (
+    PeriodAccumulator,
+    PeriodSummaryService,
+    month_bounds,
+    year_bounds,
+)
+from tests.factories import DEFAULT_USER_ID, make_ai_insight_row
+
+USER_ID = uuid.UUID(DEFAULT_USER_ID)
+
+
+def _digest(
+    day: int = 1,
+    mood: str | None = "calm",
+    tags: list[str] | None = None,
+    entry_type: str = "journal",
+    body: str = "hello",
+) -> JournalEntryDigest:
+    return JournalEntryDigest(
+        id=uuid.uuid4(),
+        created_at=datetime(2025, 1, day, 12, tzinfo=UTC),
+        mood_category=mood,
+        tags=tags or [],
+        entry_type=entry_type,
+        body=body,
+    )
+
+
+class FakeJournal:
+    def __init__(self, pages: list[list[JournalEntryDigest]]) -> None:
+        self.pages = pages
+        self.calls: list[tuple[datetime, datetime]] = []
+
+    async def iter_entry_digests(
+        self, user_id: uuid.UUID, start: datetime, end: datetime
+    ) -> AsyncIterator[list[JournalEntryDigest]]:
+        self.calls.append((start, end))
+        for page in self.pages:
+            yield page
+
+
+class TestBounds:
+    def test_month_bounds(self) -> None:
+        assert month_bounds(2024, 2) == (date(2024, 2, 1), date(2024, 2, 29))
+
+    def test_december_bounds(self) -> None:
+        assert month_bounds(2024, 12) == (date(2024, 12, 1), date(2024, 12, 31))
+
+    def test_year_bounds(self) -> None:
+        assert year_bounds(2025) == (date(2025, 1, 1), date(2025, 12, 31))
+
+
+class TestPeriodAccumulator:
+    def test_folds_statistics(self) -> None:
+        acc = PeriodAccumulator()
+        acc.add(_digest(day=1, mood="sad", tags=["work"], body="a" * 10))
+        acc.add(_digest(day=1, mood="sad", tags=["work", "sleep"], body="b" * 20))
+        acc.add(_digest(day=2, mood=None, entry_type="gratitude", body=""))
+
+        insight = acc.to_insight(
+            InsightType.MONTHLY_SUMMARY, "January 2025", "this month", *month_bounds(2025, 1)
+        )
+
+        assert insight.metadata["entry_count"] == 3
+        assert insight.metadata["active_days"] == 2
+        assert insight.metadata["dominant_mood"] == "sad"
+        assert insight.metadata["top_tags"] == ["work", "sleep"]
+        assert insight.metadata["avg_entry_length"] == 10
+        assert insight.metadata["entry_types"] == {"journal": 2, "gratitude": 1}
+        assert "3 entries across 2 days this month" in insight.content
+
+
+@pytest.fixture
+def insights() -> AsyncMock:
+    mock = AsyncMock(spec=AIInsightService)
+    mock.list_by_period.return_value = []
+    mock.create.return_value = make_ai_insight_row(insight_type="monthly_summary")
+    return mock
+
+
+class TestPeriodSummaryService:
+    async def test_streams_all_pages_into_one_insight(self, insights: AsyncMock) -> None:
+        journal = FakeJournal([[_digest(day=1), _digest(day=2)], [_digest(day=3)]])
+        service = PeriodSummaryService(journal, insights)  # type: ignore[arg-type]
+
+        await service.summarize_month(USER_ID, 2025, 1)
+
+        assert journal.calls == [
+            (datetime(2025, 1, 1, tzinfo=UTC), datetime(2025, 2, 1, tzinfo=UTC))
+        ]
+        create_data = insights.create.await_args.args[1]
+        assert create_data.insight_type == InsightType.MONTHLY_SUMMARY
+        assert create_data.metadata["entry_count"] == 3
+        assert create_data.title == "January 2025"
+
+    async def test_empty_period_writes_nothing(self, insights: AsyncMock) -> None:
+        service = PeriodSummaryService(FakeJournal([]), insights)  # type: ignore[arg-type]
+
+        assert await service.summarize_year(USER_ID, 2024) is None
+
+        insights.create.assert_not_awaited()
+        insights.soft_delete.assert_not_awaited()
+
+    async def test_emptied_period_retires_summary(self, insights: AsyncMock) -> None:
+        existing = make_ai_insight_row(insight_type="monthly_summary")
+        insights.list_by_period.return_value = [existing]
+        service = PeriodSummaryService(FakeJournal([]), insights)  # type: ignore[arg-type]
+
+        assert await service.summarize_month(USER_ID, 2025, 1) is None
+
+        insights.soft_delete.assert_awaited_once_with(USER_ID, existing.id)
+        insights.create.assert_not_awaited()
+        insights.supersede.assert_not_awaited()
+
+    async def test_changed_period_supersedes(self, insights: AsyncMock) -> None:
+        existing = make_ai_insight_row(insight_type="yearly_summary")
+        existing.metadata["entry_count"] = 1
+        insights.list_by_period.return_value = [existing]
+        service = PeriodSummaryService(
+            FakeJournal([[_digest(day=1), _digest(day=2)]]),
+            insights,  # type: ignore[arg-type]
+        )
+
+        await service.summarize_year(USER_ID, 2025)
+
+        insights.supersede.assert_awaited_once()
+        assert insights.supersede.await_args.args[1] == existing.id
+        insights.create.assert_not_awaited()
+
+    async def test_unchanged_period_skips(self, insights: AsyncMock) -> None:
+        journal = FakeJournal([[_digest(day=1)]])
+        service = PeriodSummaryService(journal, insights)  # type: ignore[arg-type]
+        await service.summarize_year(USER_ID, 2025)
+        existing = make_ai_insight_row(insight_type="yearly_summary")
+        existing.metadata.update(insights.create.await_args.args[1].metadata)
+        insights.list_by_period.return_value = [existing]
+        insights.create.reset_mock()
+
+        assert await service.summarize_year(USER_ID, 2025) is None
+
+        insights.create.assert_not_awaited()
+        insights.supersede.assert_not_awaited()
@@ -0,0 +1,54 @@
+import uuid
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from nstil.services.profile import ProfileService
+
+
+class FakeQuery:
+    def __init__(self, ids: list[str], page_size: int) -> None:
+        self.ids = ids
+        self.page_size = page_size
+        self.after: str | None = None
+        self.execute = AsyncMock(side_effect=self._execute)
+
+    def gt(self, column: str, value: str) -> "FakeQuery":
+        self.after = value
+        return self
+
+    async def _execute(self) -> MagicMock:
+        remaining = [i for i in self.ids if self.after is None or i > self.after]
+        return MagicMock(data=[{"id": i} for i in remaining[: self.page_size]])
+
+
+def _client(ids: list[str], page_size: int) -> tuple[MagicMock, list[FakeQuery]]:
+    queries: list[FakeQuery] = []
+
+    def limit(count: int) -> FakeQuery:
+        queries.append(FakeQuery(ids, count))
+        return queries[-1]
+
+    client = MagicMock()
+    select: Any = client.table.return_value.select.return_value
+    select.order.return_value.limit.side_effect = limit
+    return client, queries
+
+
+class TestIterUserIds:
+    async def test_pages_by_id(self) -> None:
+        ids = sorted(str(uuid.uuid4()) for _ in range(5))
+        client, queries = _client(ids, 2)
+
+        pages = [page async for page in ProfileService(client).iter_user_ids(page_size=2)]
+
+        assert [[str(u) for u in page] for page in pages] == [ids[:2], ids[2:4], ids[4:]]
+        assert [q.after for q in queries] == [None, ids[1], ids[3]]
+
+    async def test_stops_after_exact_final_page(self) -> None:
+        ids = sorted(str(uuid.uuid4()) for _ in range(2))
+        client, queries = _client(ids, 2)
+
+        pages = [page async for page in ProfileService(client).iter_user_ids(page_size=2)]
+
+        assert len(pages) == 1
+        assert len(queries) == 2
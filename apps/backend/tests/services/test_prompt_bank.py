@@ -55,6 +55,23 @@ class TestGetById:
         assert PromptBank.get_by_id("nonexistent-id") is None
 
 
+class TestGetIdByContent:
+    def test_matches_content(self) -> None:
+        first = CHECK_IN_PROMPTS[0]
+        assert PromptBank.get_id_by_content(first.prompt_type, first.content) == first.id
+
+    def test_ignores_surrounding_whitespace(self) -> None:
+        first = CHECK_IN_PROMPTS[0]
+        assert PromptBank.get_id_by_content(first.prompt_type, f"  {first.content}\n") == first.id
+
+    def test_wrong_type_returns_none(self) -> None:
+        first = CHECK_IN_PROMPTS[0]
+        assert PromptBank.get_id_by_content("reflection", first.content) is None
+
+    def test_unknown_content_returns_none(self) -> None:
+        assert PromptBank.get_id_by_content("check_in", "Not a bank prompt") is None
+
+
 class TestGetByType:
     def test_returns_correct_type(self) -> None:
         results = PromptBank.get_by_type("check_in")
@@ -0,0 +1,123 @@
+import itertools
+
+import pytest
+
+from nstil.services.ai.prompt_bank import PromptBank
+from nstil.services.ai.prompt_bank.index import PromptIndex, iter_set_bits, nth_set_bit
+from nstil.services.ai.prompt_bank.types import CuratedPrompt, PromptIntensity, PromptTag
+
+INTENSITY_RANK = {
+    PromptIntensity.LIGHT: 0,
+    PromptIntensity.MODERATE: 1,
+    PromptIntensity.DEEP: 2,
+}
+
+
+def _reference_filter(
+    prompts: list[CuratedPrompt],
+    mood_category: str | None,
+    exclude_ids: frozenset[str] | None,
+    exclude_topics: frozenset[str] | None,
+    max_intensity: PromptIntensity | None,
+) -> list[CuratedPrompt]:
+    result = prompts
+    if mood_category is not None:
+        result = [
+            p
+            for p in result
+            if mood_category in p.mood_categories or "neutral" in p.mood_categories
+        ]
+    if exclude_ids:
+        result = [p for p in result if p.id not in exclude_ids]
+    if exclude_topics:
+        result = [p for p in result if not p.tags & exclude_topics]
+    if max_intensity is not None:
+        threshold = INTENSITY_RANK[max_intensity]
+        result = [p for p in result if INTENSITY_RANK[p.intensity] <= threshold]
+    return result
+
+
+def _prompt(ordinal: int, moods: set[str], intensity: PromptIntensity) -> CuratedPrompt:
+    return CuratedPrompt(
+        id=f"t-{ordinal:03d}",
+        prompt_type="test",
+        content=f"Prompt {ordinal}",
+        mood_categories=frozenset(moods),
+        tags=frozenset({PromptTag.WORK}) if ordinal % 2 else frozenset(),
+        intensity=intensity,
+    )
+
+
+class TestSetBits:
+    def test_iter_set_bits(self) -> None:
+        assert list(iter_set_bits(0b101001)) == [0, 3, 5]
+
+    def test_iter_set_bits_empty(self) -> None:
+        assert list(iter_set_bits(0)) == []
+
+    def test_nth_set_bit(self) -> None:
+        mask = (1 << 2) | (1 << 70) | (1 << 500)
+        assert nth_set_bit(mask, 0) == 2
+        assert nth_set_bit(mask, 1) == 70
+        assert nth_set_bit(mask, 2) == 500
+
+
+class TestPromptIndex:
+    def test_build_masks(self) -> None:
+        prompts = (
+            _prompt(0, {"happy"}, PromptIntensity.LIGHT),
+            _prompt(1, {"sad"}, PromptIntensity.DEEP),
+            _prompt(2, {"neutral"}, PromptIntensity.MODERATE),
+        )
+        index = PromptIndex.build(prompts)
+        assert index.full == 0b111
+        assert index.by_mood["happy"] == 0b001
+        assert index.by_tag[PromptTag.WORK] == 0b010
+        assert index.up_to_intensity[PromptIntensity.LIGHT] == 0b001
+        assert index.up_to_intensity[PromptIntensity.MODERATE] == 0b101
+        assert index.up_to_intensity[PromptIntensity.DEEP] == 0b111
+
+    def test_mood_mask_includes_neutral(self) -> None:
+        prompts = (
+            _prompt(0, {"happy"}, PromptIntensity.LIGHT),
+            _prompt(1, {"sad"}, PromptIntensity.LIGHT),
+            _prompt(2, {"neutral"}, PromptIntensity.LIGHT),
+        )
+        index = PromptIndex.build(prompts)
+        assert index.members(index.mood_mask("sad")) == [prompts[1], prompts[2]]
+        assert index.members(index.mood_mask("unknown")) == [prompts[2]]
+
+    def test_exclude_unknown_id_is_ignored(self) -> None:
+        index = PromptIndex.build((_prompt(0, {"happy"}, PromptIntensity.LIGHT),))
+        assert index.select(exclude_ids=frozenset({"other"})) == index.full
+
+    def test_pick_empty_returns_none(self) -> None:
+        index = PromptIndex.build((_prompt(0, {"happy"}, PromptIntensity.LIGHT),))
+        assert index.pick(0) is None
+
+    def test_pick_only_returns_members(self) -> None:
+        prompts = tuple(_prompt(i, {"happy"}, PromptIntensity.LIGHT) for i in range(200))
+        index = PromptIndex.build(prompts)
+        mask = (1 << 17) | (1 << 133)
+        picks = {index.pick(mask) for _ in range(50)}
+        assert picks <= {prompts[17], prompts[133]}
+
+
+@pytest.mark.parametrize("prompt_type", PromptBank.available_types())
+def test_filtered_matches_reference(prompt_type: str) -> None:
+    prompts = PromptBank.get_by_type(prompt_type)
+    exclude_ids_options = [None, frozenset({prompts[0].id, prompts[-1].id})]
+    exclude_topics_options = [
+        None,
+        frozenset({PromptTag.RELATIONSHIPS}),
+        frozenset({PromptTag.EMOTIONS, PromptTag.WORK}),
+    ]
+    moods = [None, "happy", "sad", "anxious", "unknown"]
+    intensities = [None, *PromptIntensity]
+
+    for mood, ids, topics, intensity in itertools.product(
+        moods, exclude_ids_options, exclude_topics_options, intensities
+    ):
+        expected = _reference_filter(prompts, mood, ids, topics, intensity)
+        actual = PromptBank.get_filtered(prompt_type, mood, ids, topics, intensity)
+        assert actual == expected
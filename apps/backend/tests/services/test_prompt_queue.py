@@ -0,0 +1,293 @@
+import uuid
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from types import TracebackType
+from unittest.mock import AsyncMock
+
+import pytest
+
+from nstil.models.ai_context import (
+    AIContextProfile,
+    AIContextPrompt,
+    AIContextResponse,
+    AIContextStats,
+)
+from nstil.models.ai_prompt import AIPromptCreate, PlannedPrompt, PromptType
+from nstil.services.ai.prompt import AIPromptService
+from nstil.services.ai.prompt_bank import PromptBank
+from nstil.services.ai.prompt_engine import PromptEngine, plan_prompt, plan_prompt_queue
+from nstil.services.ai.prompt_queue import (
+    AUTO_PROMPT_SLOT,
+    PRECOMPUTE_PROMPTS_TASK,
+    PromptQueue,
+    precompute_job_id,
+    prompt_queue_generation_key,
+    prompt_slots,
+)
+from nstil.services.cache.ai_keys import ai_context_pattern, prompt_queue_key
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
+from nstil.services.cached_ai_context import CachedAIContextService
+from tests.factories import make_ai_prompt_row
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+SESSION_ID = uuid.uuid4()
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, tuple[object, ...]]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        return None
+
+    def get(self, key: str) -> None:
+        self._ops.append(("get", (key,)))
+
+    def setex(self, key: str, ttl: int, value: str) -> None:
+        self._ops.append(("setex", (key, ttl, value)))
+
+    def delete(self, *keys: str) -> None:
+        self._ops.append(("delete", keys))
+
+    async def execute(self) -> list[object]:
+        results = [getattr(self._redis, f"_{name}")(*args) for name, args in self._ops]
+        self._ops.clear()
+        return results
+
+
+class FakeStoreScript:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+
+    async def __call__(self, keys: Sequence[str], args: Sequence[object]) -> int:
+        if self._redis.values.get(keys[0], "0") != str(args[0]):
+            return 0
+        for key, value in zip(keys[1:], args[2:], strict=True):
+            self._redis.values[key] = str(value)
+        return 1
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    def register_script(self, source: str) -> FakeStoreScript:
+        return FakeStoreScript(self)
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    def _get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    def _setex(self, key: str, ttl: int, value: str) -> bool:
+        self.values[key] = value
+        return True
+
+    def _delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+
+def _context(
+    recent_prompts: list[AIContextPrompt] | None = None,
+    prompt_style: str = "gentle",
+) -> AIContextResponse:
+    return AIContextResponse(
+        recent_entries=[],
+        mood_distribution=[],
+        recent_prompts=recent_prompts or [],
+        recent_sessions=[],
+        stats=AIContextStats(
+            total_entries=0,
+            entries_last_7d=0,
+            check_ins_total=0,
+            check_ins_last_7d=0,
+            avg_entry_length_7d=None,
+            last_entry_at=None,
+        ),
+        profile=AIContextProfile(prompt_style=prompt_style, topics_to_avoid=[], goals=[]),
+    )
+
+
+def _recent(prompt_type: str, content: str, curated_id: str | None) -> AIContextPrompt:
+    return AIContextPrompt(
+        prompt_type=prompt_type,
+        content=content,
+        status="delivered",
+        source="curated",
+        curated_id=curated_id,
+        created_at=datetime.now(UTC),
+    )
+
+
+def _planned(content: str = "How are you feeling?") -> PlannedPrompt:
+    return PlannedPrompt(
+        curated_id="ci_001",
+        data=AIPromptCreate(prompt_type=PromptType.CHECK_IN, content=content),
+    )
+
+
+class TestPromptQueue:
+    async def test_store_then_pop(self) -> None:
+        redis = FakeRedis()
+        queue = PromptQueue(redis)  # type: ignore[arg-type]
+
+        assert await queue.store(USER_ID, {"check_in": _planned()}, 0)
+        popped = await queue.pop(USER_ID, "check_in")
+
+        assert popped == _planned()
+
+    async def test_pop_consumes_every_slot(self) -> None:
+        redis = FakeRedis()
+        queue = PromptQueue(redis)  # type: ignore[arg-type]
+        await queue.store(USER_ID, {"check_in": _planned(), AUTO_PROMPT_SLOT: _planned()}, 0)
+
+        await queue.pop(USER_ID, "check_in")
+
+        assert await queue.pop(USER_ID, AUTO_PROMPT_SLOT) is None
+        assert redis.values == {}
+
+    async def test_store_rejects_plans_from_older_generation(self) -> None:
+        redis = FakeRedis()
+        queue = PromptQueue(redis)  # type: ignore[arg-type]
+        generation = await queue.generation(USER_ID)
+        redis.values[prompt_queue_generation_key(USER_ID)] = str(generation + 1)
+
+        assert not await queue.store(USER_ID, {"check_in": _planned()}, generation)
+        assert await queue.pop(USER_ID, "check_in") is None
+
+    async def test_store_accepts_current_generation(self) -> None:
+        redis = FakeRedis()
+        redis.values[prompt_queue_generation_key(USER_ID)] = "4"
+        queue = PromptQueue(redis)  # type: ignore[arg-type]
+
+        assert await queue.generation(USER_ID) == 4
+        assert await queue.store(USER_ID, {"check_in": _planned()}, 4)
+
+    async def test_pop_miss(self) -> None:
+        queue = PromptQueue(FakeRedis())  # type: ignore[arg-type]
+        assert await queue.pop(USER_ID, "guided") is None
+
+    async def test_schedule_refill_is_deduplicated_per_user(self) -> None:
+        jobs = AsyncMock()
+        queue = PromptQueue(FakeRedis(), jobs)  # type: ignore[arg-type]
+
+        await queue.schedule_refill(USER_ID)
+
+        args, kwargs = jobs.enqueue_job.call_args
+        assert args == (PRECOMPUTE_PROMPTS_TASK, str(USER_ID))
+        assert kwargs["_job_id"] == precompute_job_id(USER_ID)
+
+    async def test_schedule_refill_without_job_queue(self) -> None:
+        await PromptQueue(FakeRedis()).schedule_refill(USER_ID)  # type: ignore[arg-type]
+
+    def test_slots_are_dropped_with_context(self) -> None:
+        prefix = ai_context_pattern(USER_ID).rstrip("*")
+        assert all(prompt_queue_key(USER_ID, s).startswith(prefix) for s in prompt_slots())
+
+
+class TestPlanPromptQueue:
+    def test_plans_every_bank_type_and_auto(self) -> None:
+        plans = plan_prompt_queue(_context())
+        assert set(plans) == set(prompt_slots())
+        assert plans[AUTO_PROMPT_SLOT].data.prompt_type == PromptType.CHECK_IN
+        assert all(p.data.session_id is None for p in plans.values())
+
+    def test_plans_requested_type(self) -> None:
+        planned = plan_prompt(_context(), PromptType.GUIDED.value)
+        assert planned is not None
+        assert planned.data.prompt_type == PromptType.GUIDED
+        assert planned.curated_id
+        assert planned.data.curated_id == planned.curated_id
+
+    def test_excludes_recent_prompts_by_curated_id(self) -> None:
+        bank = PromptBank.get_by_type(PromptType.CHECK_IN.value)
+        recent = [_recent(p.prompt_type, "edited", p.id) for p in bank[1:]]
+
+        planned = plan_prompt(_context(recent, "analytical"), PromptType.CHECK_IN.value)
+
+        assert planned is not None
+        assert planned.curated_id == bank[0].id
+
+    def test_excludes_legacy_rows_by_content(self) -> None:
+        bank = PromptBank.get_by_type(PromptType.CHECK_IN.value)
+        recent = [_recent(p.prompt_type, p.content, None) for p in bank[:-1]]
+
+        planned = plan_prompt(_context(recent, "analytical"), PromptType.CHECK_IN.value)
+
+        assert planned is not None
+        assert planned.curated_id == bank[-1].id
+
+
+class TestGenerate:
+    @pytest.fixture
+    def prompts(self) -> AsyncMock:
+        mock = AsyncMock(spec=AIPromptService)
+        mock.create.return_value = make_ai_prompt_row()
+        return mock
+
+    async def test_queue_hit_skips_context(self, prompts: AsyncMock) -> None:
+        context = AsyncMock(spec=CachedAIContextService)
+        queue = AsyncMock(spec=PromptQueue)
+        queue.pop.return_value = _planned()
+        invalidator = AsyncMock(spec=CacheInvalidator)
+        engine = PromptEngine(context, prompts, queue, invalidator)
+
+        await engine.generate(USER_ID, PromptType.CHECK_IN, session_id=SESSION_ID)
+
+        queue.pop.assert_awaited_once_with(USER_ID, PromptType.CHECK_IN.value)
+        context.get_context.assert_not_called()
+        created = prompts.create.call_args.args[1]
+        assert created.content == "How are you feeling?"
+        assert created.session_id == SESSION_ID
+        invalidator.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.PROMPT_CREATED, prompts.create.return_value.id
+        )
+
+    async def test_queue_miss_falls_back_to_sync_path(self, prompts: AsyncMock) -> None:
+        context = AsyncMock(spec=CachedAIContextService)
+        context.get_context.return_value = _context()
+        queue = AsyncMock(spec=PromptQueue)
+        queue.pop.return_value = None
+        invalidator = AsyncMock(spec=CacheInvalidator)
+        engine = PromptEngine(context, prompts, queue, invalidator)
+
+        await engine.generate(USER_ID)
+
+        queue.pop.assert_awaited_once_with(USER_ID, AUTO_PROMPT_SLOT)
+        context.get_context.assert_awaited_once_with(USER_ID)
+        assert prompts.create.call_args.args[1].prompt_type == PromptType.CHECK_IN
+        invalidator.invalidate.assert_awaited_once_with(
+            USER_ID, CacheEvent.PROMPT_CREATED, prompts.create.return_value.id
+        )
+
+    async def test_entry_prompt_uses_reflection_slot(self, prompts: AsyncMock) -> None:
+        queue = AsyncMock(spec=PromptQueue)
+        queue.pop.return_value = _planned()
+        engine = PromptEngine(AsyncMock(spec=CachedAIContextService), prompts, queue)
+
+        await engine.generate(USER_ID, entry_id=uuid.uuid4())
+
+        queue.pop.assert_awaited_once_with(USER_ID, PromptType.REFLECTION.value)
+
+    async def test_without_queue(self, prompts: AsyncMock) -> None:
+        context = AsyncMock(spec=CachedAIContextService)
+        context.get_context.return_value = _context()
+
+        row = await PromptEngine(context, prompts).generate(USER_ID, PromptType.GUIDED)
+
+        assert row is not None
+        context.get_context.assert_awaited_once()
@@ -0,0 +1,254 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from realtime import RealtimeSubscribeStates
+
+from nstil.services.cache.dependencies import TABLE_EVENTS, event_for_row_change
+from nstil.services.cache.families import CacheEvent
+from nstil.services.cache.invalidator import CacheInvalidator
+from nstil.services.cache.row_changes import (
+    ROW_CHANGE_EVENT,
+    ROW_CHANGE_TOPIC,
+    RowChange,
+    RowChangeListener,
+)
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+ROW_ID = uuid.UUID("00000000-0000-0000-0000-000000000099")
+
+
+def _payload(**overrides: object) -> dict[str, object]:
+    payload: dict[str, object] = {
+        "table": "journal_entries",
+        "user_id": str(USER_ID),
+        "id": str(ROW_ID),
+        "op": "update",
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.fixture
+def invalidator() -> AsyncMock:
+    return AsyncMock(spec=CacheInvalidator)
+
+
+@pytest.fixture
+def listener(invalidator: AsyncMock) -> RowChangeListener:
+    return RowChangeListener(MagicMock(), invalidator, queue_size=2)
+
+
+class TestRowChange:
+    def test_from_payload(self) -> None:
+        change = RowChange.from_payload(_payload())
+        assert change == RowChange("journal_entries", USER_ID, ROW_ID, "update")
+
+    def test_missing_id(self) -> None:
+        change = RowChange.from_payload(_payload(id=None))
+        assert change is not None
+        assert change.row_id is None
+
+    @pytest.mark.parametrize(
+        "payload",
+        [{}, _payload(user_id="not-a-uuid"), _payload(id="bad"), {"table": "journals"}],
+    )
+    def test_malformed(self, payload: dict[str, object]) -> None:
+        assert RowChange.from_payload(payload) is None
+
+
+class TestTableEvents:
+    def test_soft_delete_maps_to_entry_deleted(self) -> None:
+        assert event_for_row_change("journal_entries", "delete") == CacheEvent.ENTRY_DELETED
+
+    def test_profile_writes_map_to_profile_updated(self) -> None:
+        assert event_for_row_change("user_ai_profiles", "insert") == CacheEvent.AI_PROFILE_UPDATED
+
+    def test_unknown_table(self) -> None:
+        assert event_for_row_change("notification_preferences", "update") is None
+
+    def test_every_table_covers_all_ops(self) -> None:
+        tables = {table for table, _ in TABLE_EVENTS}
+        for table in tables:
+            for op in ("insert", "update", "delete"):
+                assert (table, op) in TABLE_EVENTS
+
+
+class TestHandle:
+    async def test_invalidates_mapped_event(
+        self, listener: RowChangeListener, invalidator: AsyncMock
+    ) -> None:
+        await listener.handle(RowChange("journals", USER_ID, ROW_ID, "update"))
+
+        invalidator.invalidate.assert_awaited_once_with(USER_ID, CacheEvent.SPACE_UPDATED, ROW_ID)
+
+    async def test_ignores_unknown_table(
+        self, listener: RowChangeListener, invalidator: AsyncMock
+    ) -> None:
+        await listener.handle(RowChange("tags", USER_ID, ROW_ID, "insert"))
+
+        invalidator.invalidate.assert_not_called()
+
+
+def _channel() -> MagicMock:
+    channel = MagicMock()
+    channel.subscribe = AsyncMock(return_value=channel)
+    channel.is_closed = False
+    return channel
+
+
+async def _settle() -> None:
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+class TestListener:
+    async def test_broadcast_reaches_invalidator(self, invalidator: AsyncMock) -> None:
+        channel = _channel()
+        supabase = MagicMock()
+        supabase.channel.return_value = channel
+        supabase.remove_channel = AsyncMock()
+        listener = RowChangeListener(supabase, invalidator)
+
+        listener.start()
+        await asyncio.sleep(0)
+        supabase.channel.assert_called_once()
+        assert supabase.channel.call_args.args[0] == ROW_CHANGE_TOPIC
+        event, callback = channel.on_broadcast.call_args.args
+        assert event == ROW_CHANGE_EVENT
+
+        callback({"event": ROW_CHANGE_EVENT, "payload": _payload(op="insert")})
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await listener.stop()
+
+        invalidator.invalidate.assert_awaited_once_with(USER_ID, CacheEvent.ENTRY_CREATED, ROW_ID)
+        supabase.remove_channel.assert_awaited_once_with(channel)
+
+    async def test_subscribe_failure_is_retried(self, invalidator: AsyncMock) -> None:
+        failing, healthy = _channel(), _channel()
+        failing.subscribe.side_effect = ConnectionError
+        supabase = MagicMock()
+        supabase.channel.side_effect = [failing, healthy]
+        supabase.remove_channel = AsyncMock()
+        listener = RowChangeListener(supabase, invalidator, retry_base_seconds=0)
+
+        listener.start()
+        await _settle()
+        await listener.stop()
+
+        assert supabase.channel.call_count == 2
+        healthy.subscribe.assert_awaited_once()
+        invalidator.invalidate.assert_not_called()
+
+    async def test_channel_error_resubscribes(self, invalidator: AsyncMock) -> None:
+        first, second = _channel(), _channel()
+        supabase = MagicMock()
+        supabase.channel.side_effect = [first, second]
+        supabase.remove_channel = AsyncMock()
+        listener = RowChangeListener(supabase, invalidator, retry_base_seconds=0)
+
+        listener.start()
+        await _settle()
+        (on_state,) = first.subscribe.await_args.args
+        on_state(RealtimeSubscribeStates.CHANNEL_ERROR, ConnectionError("gone"))
+        await _settle()
+        await listener.stop()
+
+        supabase.remove_channel.assert_any_await(first)
+        second.subscribe.assert_awaited_once()
+
+    async def test_closed_channel_resubscribes(self, invalidator: AsyncMock) -> None:
+        first, second = _channel(), _channel()
+        supabase = MagicMock()
+        supabase.channel.side_effect = [first, second]
+        supabase.remove_channel = AsyncMock()
+        listener = RowChangeListener(
+            supabase, invalidator, retry_base_seconds=0, health_check_seconds=0
+        )
+
+        listener.start()
+        await _settle()
+        first.is_closed = True
+        await _settle()
+        await listener.stop()
+
+        second.subscribe.assert_awaited_once()
+
+    async def test_first_subscribe_keeps_cache(self, invalidator: AsyncMock) -> None:
+        channel = _channel()
+        supabase = MagicMock()
+        supabase.channel.return_value = channel
+        supabase.remove_channel = AsyncMock()
+        listener = RowChangeListener(supabase, invalidator)
+
+        listener.start()
+        await _settle()
+        (on_state,) = channel.subscribe.await_args.args
+        on_state(RealtimeSubscribeStates.SUBSCRIBED)
+        await _settle()
+        await listener.stop()
+
+        invalidator.invalidate_all.assert_not_called()
+
+    async def test_resubscribe_invalidates_everything(self, invalidator: AsyncMock) -> None:
+        first, second = _channel(), _channel()
+        supabase = MagicMock()
+        supabase.channel.side_effect = [first, second]
+        supabase.remove_channel = AsyncMock()
+        listener = RowChangeListener(supabase, invalidator, retry_base_seconds=0)
+
+        listener.start()
+        await _settle()
+        (on_state,) = first.subscribe.await_args.args
+        on_state(RealtimeSubscribeStates.SUBSCRIBED)
+        on_state(RealtimeSubscribeStates.TIMED_OUT)
+        await _settle()
+        invalidator.invalidate_all.assert_not_called()
+
+        (on_state,) = second.subscribe.await_args.args
+        on_state(RealtimeSubscribeStates.SUBSCRIBED)
+        await _settle()
+        await listener.stop()
+
+        invalidator.invalidate_all.assert_awaited_once_with()
+
+    async def test_subscribe_after_failure_invalidates_everything(
+        self, invalidator: AsyncMock
+    ) -> None:
+        failing, healthy = _channel(), _channel()
+        failing.subscribe.side_effect = ConnectionError
+        supabase = MagicMock()
+        supabase.channel.side_effect = [failing, healthy]
+        supabase.remove_channel = AsyncMock()
+        listener = RowChangeListener(supabase, invalidator, retry_base_seconds=0)
+
+        listener.start()
+        await _settle()
+        (on_state,) = healthy.subscribe.await_args.args
+        on_state(RealtimeSubscribeStates.SUBSCRIBED)
+        await _settle()
+        await listener.stop()
+
+        invalidator.invalidate_all.assert_awaited_once_with()
+
+    async def test_dropped_change_invalidates_everything(self, invalidator: AsyncMock) -> None:
+        listener = RowChangeListener(MagicMock(), invalidator, queue_size=1)
+        message = {"event": ROW_CHANGE_EVENT, "payload": _payload(), "type": "broadcast"}
+
+        listener.start()
+        for _ in range(2):
+            listener.on_broadcast(message)  # type: ignore[arg-type]
+        await _settle()
+        await listener.stop()
+
+        invalidator.invalidate_all.assert_awaited_once_with()
+
+    def test_malformed_broadcast_is_dropped(self, listener: RowChangeListener) -> None:
+        listener.on_broadcast({"event": ROW_CHANGE_EVENT, "payload": {}})  # type: ignore[typeddict-item]
+
+    def test_full_queue_drops(self, listener: RowChangeListener) -> None:
+        message = {"event": ROW_CHANGE_EVENT, "payload": _payload(), "type": "broadcast"}
+        for _ in range(3):
+            listener.on_broadcast(message)  # type: ignore[arg-type]
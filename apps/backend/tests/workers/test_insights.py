@@ -0,0 +1,124 @@
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from datetime import UTC, date, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from arq import Retry
+
+from nstil.services.ai.insight_batch import BATCH_CHUNK_SIZE, BatchInsightEngine
+from nstil.services.ai.insight_computations import sunday_week_start
+from nstil.services.ai.insight_engine import InsightEngine
+from nstil.services.ai.insight_scheduler import InsightScheduler
+from nstil.workers.insights import nightly_insights, recompute_weekly_insights
+from tests.factories import DEFAULT_USER_ID, make_ai_insight_row
+
+USER_ID = uuid.UUID(DEFAULT_USER_ID)
+
+
+@pytest.fixture
+def scheduler() -> AsyncMock:
+    mock = AsyncMock(spec=InsightScheduler)
+    mock.quiet_period_seconds = 300
+    mock.seconds_until_quiet.return_value = 0.0
+    mock.claim_pending_weeks.return_value = [date(2025, 1, 5)]
+    mock.has_pending.return_value = False
+    return mock
+
+
+@pytest.fixture
+def engine() -> AsyncMock:
+    mock = AsyncMock(spec=InsightEngine)
+    mock.recompute_weeks.return_value = [make_ai_insight_row()]
+    return mock
+
+
+@pytest.fixture
+def queue() -> AsyncMock:
+    return AsyncMock()
+
+
+@pytest.fixture
+def patched(scheduler: AsyncMock, engine: AsyncMock, queue: AsyncMock) -> Iterator[None]:
+    with (
+        patch("nstil.workers.insights.build_insight_scheduler", return_value=scheduler),
+        patch("nstil.workers.insights.build_insight_engine", return_value=engine),
+        patch("nstil.workers.insights.get_job_queue", return_value=queue),
+    ):
+        yield
+
+
+@pytest.mark.usefixtures("patched")
+class TestRecomputeWeeklyInsights:
+    async def test_recomputes_only_pending_weeks(
+        self, scheduler: AsyncMock, engine: AsyncMock
+    ) -> None:
+        result = await recompute_weekly_insights({}, str(USER_ID))
+
+        assert result == 1
+        engine.recompute_weeks.assert_called_once_with(USER_ID, [date(2025, 1, 5)])
+
+    async def test_resummarizes_closed_periods_of_recomputed_weeks(self, queue: AsyncMock) -> None:
+        await recompute_weekly_insights({}, str(USER_ID))
+
+        jobs = {call.kwargs["_job_id"] for call in queue.enqueue_job.await_args_list}
+        assert jobs == {f"monthly_summary:{USER_ID}:2025-01", f"yearly_summary:{USER_ID}:2025"}
+
+    async def test_current_week_enqueues_no_summaries(
+        self, scheduler: AsyncMock, queue: AsyncMock
+    ) -> None:
+        scheduler.claim_pending_weeks.return_value = [sunday_week_start(datetime.now(UTC).date())]
+
+        await recompute_weekly_insights({}, str(USER_ID))
+
+        enqueued = [call.args[2:] for call in queue.enqueue_job.await_args_list]
+        today = datetime.now(UTC).date()
+        assert (today.year, today.month) not in enqueued
+
+    async def test_defers_while_writes_are_recent(
+        self, scheduler: AsyncMock, engine: AsyncMock
+    ) -> None:
+        scheduler.seconds_until_quiet.return_value = 42.0
+
+        with pytest.raises(Retry) as exc_info:
+            await recompute_weekly_insights({}, str(USER_ID))
+
+        assert exc_info.value.defer_score == 42000
+        scheduler.claim_pending_weeks.assert_not_called()
+        engine.recompute_weeks.assert_not_called()
+
+    async def test_reschedules_when_writes_arrive_during_run(
+        self, scheduler: AsyncMock, engine: AsyncMock
+    ) -> None:
+        scheduler.has_pending.return_value = True
+
+        with pytest.raises(Retry) as exc_info:
+            await recompute_weekly_insights({}, str(USER_ID))
+
+        assert exc_info.value.defer_score == 300000
+        engine.recompute_weeks.assert_called_once()
+
+
+class TestNightlyInsights:
+    async def test_runs_every_page_of_users(self) -> None:
+        pages = [[uuid.uuid4(), uuid.uuid4()], [uuid.uuid4()]]
+
+        async def iter_user_ids(page_size: int) -> AsyncIterator[list[uuid.UUID]]:
+            assert page_size == BATCH_CHUNK_SIZE
+            for page in pages:
+                yield page
+
+        profiles = MagicMock()
+        profiles.iter_user_ids = iter_user_ids
+        engine = AsyncMock(spec=BatchInsightEngine)
+        engine.run.side_effect = [[make_ai_insight_row()], []]
+
+        with (
+            patch("nstil.workers.insights.build_batch_insight_engine", return_value=engine),
+            patch("nstil.workers.insights.build_profile_service", return_value=profiles),
+        ):
+            result = await nightly_insights({})
+
+        assert result == 1
+        assert [call.args[0] for call in engine.run.await_args_list] == pages
+        assert len({call.args[1] for call in engine.run.await_args_list}) == 1
@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, patch
+
+from nstil.services.media import MediaService
+from nstil.services.media_variants import ImageVariant
+from nstil.services.media_waveform import WaveformDecodeError
+from nstil.workers.media import (
+    collect_stale_uploads,
+    generate_media_variants,
+    generate_media_waveform,
+)
+from tests.factories import make_media_row
+
+
+class TestCollectStaleUploads:
+    async def test_delegates_to_media_service(self) -> None:
+        service = AsyncMock(spec=MediaService)
+        service.collect_stale_uploads.return_value = 3
+
+        with patch("nstil.workers.media.build_media_service", return_value=service):
+            removed = await collect_stale_uploads({})
+
+        assert removed == 3
+        service.collect_stale_uploads.assert_awaited_once()
+
+
+def _render(data: bytes) -> dict[ImageVariant, bytes]:
+    return {ImageVariant.THUMBNAIL: data[:1], ImageVariant.MEDIUM: data[:2]}
+
+
+class TestGenerateMediaVariants:
+    async def _run(self, service: AsyncMock, media_id: str, user_id: str) -> bool:
+        with (
+            ThreadPoolExecutor(max_workers=1) as pool,
+            patch("nstil.workers.media.build_media_service", return_value=service),
+            patch("nstil.workers.media.get_process_pool", return_value=pool),
+            patch("nstil.workers.media.render_variants", _render),
+        ):
+            return await generate_media_variants({}, media_id, user_id)
+
+    async def test_renders_and_stores(self) -> None:
+        media = make_media_row()
+        service = AsyncMock(spec=MediaService)
+        service.get_by_id.return_value = media
+        service.download.return_value = b"original"
+        service.store_variants.return_value = media
+
+        assert await self._run(service, str(media.id), str(media.user_id)) is True
+
+        service.download.assert_awaited_once_with(media.storage_path)
+        service.store_variants.assert_awaited_once_with(
+            media, {ImageVariant.THUMBNAIL: b"o", ImageVariant.MEDIUM: b"or"}
+        )
+
+    async def test_skips_audio(self) -> None:
+        media = make_media_row(content_type="audio/m4a")
+        service = AsyncMock(spec=MediaService)
+        service.get_by_id.return_value = media
+
+        assert await self._run(service, str(media.id), str(media.user_id)) is False
+
+        service.download.assert_not_called()
+
+    async def test_skips_existing_variants(self) -> None:
+        media = make_media_row(thumbnail_path="t.webp", medium_path="m.webp")
+        service = AsyncMock(spec=MediaService)
+        service.get_by_id.return_value = media
+
+        assert await self._run(service, str(media.id), str(media.user_id)) is False
+
+        service.download.assert_not_called()
+
+    async def test_skips_deleted_media(self) -> None:
+        media = make_media_row()
+        service = AsyncMock(spec=MediaService)
+        service.get_by_id.return_value = None
+
+        assert await self._run(service, str(media.id), str(media.user_id)) is False
+
+
+def _extract(data: bytes) -> bytes:
+    if data == b"corrupt":
+        raise WaveformDecodeError(data.decode())
+    return data[:2]
+
+
+class TestGenerateMediaWaveform:
+    async def _run(self, service: AsyncMock, media_id: str, user_id: str) -> bool:
+        with (
+            ThreadPoolExecutor(max_workers=1) as pool,
+            patch("nstil.workers.media.build_media_service", return_value=service),
+            patch("nstil.workers.media.get_process_pool", return_value=pool),
+            patch("nstil.workers.media.extract_waveform", _extract),
+        ):
+            return await generate_media_waveform({}, media_id, user_id)
+
+    async def test_extracts_and_stores(self) -> None:
+        media = make_media_row(content_type="audio/m4a")
+        service = AsyncMock(spec=MediaService)
+        service.get_by_id.return_value = media
+        service.download.return_value = b"audio"
+        service.store_waveform.return_value = media
+
+        assert await self._run(service, str(media.id), str(media.user_id)) is True
+
+        service.download.assert_awaited_once_with(media.storage_path)
+        service.store_waveform.assert_awaited_once_with(media, b"au")
+
+    async def test_skips_images(self) -> None:
+        media = make_media_row()
+        service = AsyncMock(spec=MediaService)
+        service.get_by_id.return_value = media
+
+        assert await self._run(service, str(media.id), str(media.user_id)) is False
+
+        service.download.assert_not_called()
+
+    async def test_undecodable_audio_keeps_row(self) -> None:
+        media = make_media_row(content_type="audio/m4a")
+        service = AsyncMock(spec=MediaService)
+        service.get_by_id.return_value = media
+        service.download.return_value = b"corrupt"
+
+        assert await self._run(service, str(media.id), str(media.user_id)) is False
+
+        service.store_waveform.assert_not_called()
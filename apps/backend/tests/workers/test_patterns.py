@@ -0,0 +1,49 @@
+import uuid
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from nstil.services.ai.pattern_detection import PatternDetectionService
+from nstil.workers.patterns import nightly_patterns, pattern_detection
+from tests.factories import DEFAULT_USER_ID, make_ai_insight_row
+
+USER_ID = uuid.UUID(DEFAULT_USER_ID)
+
+
+class TestPatternDetectionTask:
+    async def test_returns_generated_count(self) -> None:
+        service = AsyncMock(spec=PatternDetectionService)
+        service.detect.return_value = [make_ai_insight_row(insight_type="pattern")]
+
+        with patch("nstil.workers.patterns.build_pattern_detection_service", return_value=service):
+            result = await pattern_detection({}, str(USER_ID), full=True)
+
+        assert result == 1
+        service.detect.assert_awaited_once_with(USER_ID, full=True)
+
+
+class TestNightlyPatterns:
+    async def test_enqueues_one_job_per_user(self) -> None:
+        pages = [[uuid.uuid4(), uuid.uuid4()], [uuid.uuid4()]]
+
+        async def iter_user_ids(page_size: int) -> AsyncIterator[list[uuid.UUID]]:
+            for page in pages:
+                yield page
+
+        profiles = MagicMock()
+        profiles.iter_user_ids = iter_user_ids
+        queue = AsyncMock()
+        queue.enqueue_job.side_effect = [MagicMock(), None, MagicMock()]
+
+        with (
+            patch("nstil.workers.patterns.build_profile_service", return_value=profiles),
+            patch("nstil.workers.patterns.get_job_queue", return_value=queue),
+        ):
+            result = await nightly_patterns({})
+
+        assert result == 2
+        users = [uid for page in pages for uid in page]
+        calls = queue.enqueue_job.await_args_list
+        assert [call.args for call in calls] == [("pattern_detection", str(u)) for u in users]
+        assert [call.kwargs["_job_id"] for call in calls] == [
+            f"pattern_detection:{u}" for u in users
+        ]
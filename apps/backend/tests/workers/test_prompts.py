@@ -0,0 +1,92 @@
+import uuid
+from unittest.mock import AsyncMock, patch
+
+from nstil.models.ai_context import AIContextProfile, AIContextResponse, AIContextStats
+from nstil.services.ai.context import AIContextService
+from nstil.services.ai.prompt_queue import AUTO_PROMPT_SLOT, PromptQueue
+from nstil.workers.prompts import PRECOMPUTE_MAX_ATTEMPTS, precompute_prompts
+from tests.factories import DEFAULT_USER_ID
+
+USER_ID = uuid.UUID(DEFAULT_USER_ID)
+
+
+def _context() -> AIContextResponse:
+    return AIContextResponse(
+        recent_entries=[],
+        mood_distribution=[],
+        recent_prompts=[],
+        recent_sessions=[],
+        stats=AIContextStats(
+            total_entries=0,
+            entries_last_7d=0,
+            check_ins_total=0,
+            check_ins_last_7d=0,
+            avg_entry_length_7d=None,
+            last_entry_at=None,
+        ),
+        profile=AIContextProfile(prompt_style="gentle", topics_to_avoid=[], goals=[]),
+    )
+
+
+class TestPrecomputePrompts:
+    async def test_stores_plans_from_fresh_context(self) -> None:
+        context_service = AsyncMock(spec=AIContextService)
+        context_service.get_context.return_value = _context()
+        queue = AsyncMock(spec=PromptQueue)
+        queue.generation.return_value = 3
+        queue.store.return_value = True
+
+        with (
+            patch(
+                "nstil.workers.prompts.build_uncached_context_service",
+                return_value=context_service,
+            ),
+            patch("nstil.workers.prompts.build_prompt_queue", return_value=queue),
+        ):
+            count = await precompute_prompts({}, str(USER_ID))
+
+        context_service.get_context.assert_awaited_once_with(USER_ID)
+        stored_user, plans, generation = queue.store.call_args.args
+        assert stored_user == USER_ID
+        assert AUTO_PROMPT_SLOT in plans
+        assert generation == 3
+        assert count == len(plans)
+
+    async def test_recomputes_when_refill_requested_mid_run(self) -> None:
+        context_service = AsyncMock(spec=AIContextService)
+        context_service.get_context.return_value = _context()
+        queue = AsyncMock(spec=PromptQueue)
+        queue.generation.side_effect = [1, 2]
+        queue.store.side_effect = [False, True]
+
+        with (
+            patch(
+                "nstil.workers.prompts.build_uncached_context_service",
+                return_value=context_service,
+            ),
+            patch("nstil.workers.prompts.build_prompt_queue", return_value=queue),
+        ):
+            count = await precompute_prompts({}, str(USER_ID))
+
+        assert context_service.get_context.await_count == 2
+        assert [c.args[2] for c in queue.store.call_args_list] == [1, 2]
+        assert count > 0
+
+    async def test_gives_up_when_always_superseded(self) -> None:
+        context_service = AsyncMock(spec=AIContextService)
+        context_service.get_context.return_value = _context()
+        queue = AsyncMock(spec=PromptQueue)
+        queue.generation.return_value = 1
+        queue.store.return_value = False
+
+        with (
+            patch(
+                "nstil.workers.prompts.build_uncached_context_service",
+                return_value=context_service,
+            ),
+            patch("nstil.workers.prompts.build_prompt_queue", return_value=queue),
+        ):
+            count = await precompute_prompts({}, str(USER_ID))
+
+        assert count == 0
+        assert queue.store.await_count == PRECOMPUTE_MAX_ATTEMPTS
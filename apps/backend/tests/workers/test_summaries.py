@@ -0,0 +1,131 @@
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from datetime import UTC, date, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nstil.services.ai.period_summary import PeriodSummaryService
+from nstil.workers.summaries import (
+    closed_periods,
+    enqueue_period_summaries,
+    monthly_summary,
+    period_summaries,
+    previous_month,
+    yearly_summary,
+)
+from tests.factories import DEFAULT_USER_ID, make_ai_insight_row
+
+USER_ID = uuid.UUID(DEFAULT_USER_ID)
+
+
+@pytest.fixture
+def service() -> AsyncMock:
+    return AsyncMock(spec=PeriodSummaryService)
+
+
+@pytest.fixture
+def patched(service: AsyncMock) -> Iterator[None]:
+    with patch("nstil.workers.summaries.build_period_summary_service", return_value=service):
+        yield
+
+
+class TestPreviousMonth:
+    def test_mid_year(self) -> None:
+        assert previous_month(datetime(2025, 6, 15, tzinfo=UTC)) == (2025, 5)
+
+    def test_january_wraps(self) -> None:
+        assert previous_month(datetime(2025, 1, 3, tzinfo=UTC)) == (2024, 12)
+
+
+class TestClosedPeriods:
+    def test_week_spanning_two_closed_months(self) -> None:
+        months, years = closed_periods([date(2025, 1, 26)], date(2025, 3, 10))
+
+        assert months == {(2025, 1), (2025, 2)}
+        assert years == set()
+
+    def test_current_month_is_open(self) -> None:
+        assert closed_periods([date(2025, 3, 2)], date(2025, 3, 10)) == (set(), set())
+
+    def test_previous_year_is_closed(self) -> None:
+        months, years = closed_periods([date(2024, 12, 29)], date(2025, 1, 10))
+
+        assert months == {(2024, 12)}
+        assert years == {2024}
+
+
+class TestEnqueuePeriodSummaries:
+    async def test_one_job_per_period_with_stable_ids(self) -> None:
+        queue = AsyncMock()
+
+        enqueued = await enqueue_period_summaries(queue, USER_ID, {(2024, 12)}, {2024})
+
+        assert enqueued == 2
+        monthly, yearly = queue.enqueue_job.await_args_list
+        assert monthly.args == ("monthly_summary", str(USER_ID), 2024, 12)
+        assert monthly.kwargs["_job_id"] == f"monthly_summary:{USER_ID}:2024-12"
+        assert yearly.args == ("yearly_summary", str(USER_ID), 2024)
+        assert yearly.kwargs["_job_id"] == f"yearly_summary:{USER_ID}:2024"
+
+    async def test_duplicate_jobs_not_counted(self) -> None:
+        queue = AsyncMock()
+        queue.enqueue_job.return_value = None
+
+        assert await enqueue_period_summaries(queue, USER_ID, {(2025, 1)}, set()) == 0
+
+
+class TestPeriodSummariesCron:
+    async def _run(self, now: datetime) -> AsyncMock:
+        users = [uuid.uuid4(), uuid.uuid4()]
+
+        async def iter_user_ids(page_size: int) -> AsyncIterator[list[uuid.UUID]]:
+            yield users
+
+        profiles = MagicMock()
+        profiles.iter_user_ids = iter_user_ids
+        queue = AsyncMock()
+        clock = MagicMock(wraps=datetime)
+        clock.now.return_value = now
+
+        with (
+            patch("nstil.workers.summaries.build_profile_service", return_value=profiles),
+            patch("nstil.workers.summaries.get_job_queue", return_value=queue),
+            patch("nstil.workers.summaries.datetime", clock),
+        ):
+            assert await period_summaries({}) == queue.enqueue_job.await_count
+        return queue
+
+    async def test_enqueues_previous_month_for_every_user(self) -> None:
+        queue = await self._run(datetime(2025, 6, 1, 4, tzinfo=UTC))
+
+        calls = queue.enqueue_job.await_args_list
+        assert len(calls) == 2
+        assert {call.args[0] for call in calls} == {"monthly_summary"}
+        assert {call.args[2:] for call in calls} == {(2025, 5)}
+
+    async def test_january_also_enqueues_previous_year(self) -> None:
+        queue = await self._run(datetime(2025, 1, 1, 4, tzinfo=UTC))
+
+        tasks = [call.args[0] for call in queue.enqueue_job.await_args_list]
+        assert tasks.count("monthly_summary") == 2
+        assert tasks.count("yearly_summary") == 2
+
+
+@pytest.mark.usefixtures("patched")
+class TestSummaryTasks:
+    async def test_monthly_summary_returns_insight_id(self, service: AsyncMock) -> None:
+        row = make_ai_insight_row(insight_type="monthly_summary")
+        service.summarize_month.return_value = row
+
+        result = await monthly_summary({}, str(USER_ID), 2025, 3)
+
+        assert result == str(row.id)
+        service.summarize_month.assert_awaited_once_with(USER_ID, 2025, 3)
+
+    async def test_yearly_summary_defaults_to_previous_year(self, service: AsyncMock) -> None:
+        service.summarize_year.return_value = None
+
+        assert await yearly_summary({}, str(USER_ID)) is None
+
+        service.summarize_year.assert_awaited_once_with(USER_ID, datetime.now(UTC).year - 1)
@@ -1,3 +1,5 @@
+import { decodeWaveformPeaks } from "@/lib/audioUtils";
+
 import { VoicePlayer } from "./VoicePlayer";
 import { VoiceRecorderActive, VoiceRecorderInline } from "./VoiceRecorder";
 import type { VoiceMemoProps } from "./types";
@@ -61,7 +63,11 @@ export function VoiceMemoSection({
       <VoicePlayer
         uri={existingAudio.url}
         durationMs={existingAudio.duration_ms ?? 0}
-        waveform={existingAudio.waveform ?? undefined}
+        waveform={
+          existingAudio.waveform_peaks
+            ? decodeWaveformPeaks(existingAudio.waveform_peaks)
+            : (existingAudio.waveform ?? undefined)
+        }
         onRemove={onRemove}
       />
     );
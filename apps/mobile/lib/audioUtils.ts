@@ -5,6 +5,7 @@ import type { AudioContentType } from "@/types";
 
 const MAX_DURATION_MS = 5 * 60 * 1000;
 const METERING_INTERVAL_MS = 100;
+const WAVEFORM_PEAK_LEVELS = 255;
 
 export const AUDIO_CONSTANTS = {
   maxDurationMs: MAX_DURATION_MS,
@@ -142,3 +143,12 @@ export function downsampleAmplitudes(
 
   return result;
 }
+
+export function decodeWaveformPeaks(encoded: string): number[] {
+  const binary = atob(encoded);
+  const levels: number[] = [];
+  for (let i = 0; i < binary.length; i++) {
+    levels.push(binary.charCodeAt(i) / WAVEFORM_PEAK_LEVELS);
+  }
+  return levels;
+}
@@ -104,6 +104,7 @@ export interface AIPrompt {
   readonly content: string;
   readonly context: Record<string, unknown>;
   readonly source: PromptSource;
+  readonly curated_id: string | null;
   readonly mood_category: MoodCategory | null;
   readonly session_id: string | null;
   readonly entry_id: string | null;
@@ -194,6 +195,7 @@ export interface AIContextEntry {
   readonly id: string;
   readonly title: string;
   readonly body: string;
+  readonly body_length: number | null;
   readonly mood_category: string | null;
   readonly mood_specific: string | null;
   readonly tags: string[];
@@ -214,6 +216,7 @@ export interface AIContextPrompt {
   readonly content: string;
   readonly status: string;
   readonly source: string;
+  readonly curated_id: string | null;
   readonly created_at: string;
 }
 
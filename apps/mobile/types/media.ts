@@ -24,8 +24,11 @@ export interface EntryMedia {
   readonly height: number | null;
   readonly duration_ms: number | null;
   readonly waveform: readonly number[] | null;
+  readonly waveform_peaks: string | null;
   readonly sort_order: number;
   readonly url: string;
+  readonly thumbnail_url: string | null;
+  readonly medium_url: string | null;
   readonly created_at: string;
 }
 
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import UTC, date, datetime, timedelta
+
+from nstil.models.calendar import CalendarDay, DailyMoodRollup
+from nstil.services.ai.insight_batch import (
+    MOOD_CATEGORIES,
+    STREAK_WINDOW_DAYS,
+    build_rollup_tensor,
+    compute_batch_insights,
+)
+from nstil.services.ai.insight_computations import (
+    build_streak_insight,
+    compute_streak_from_calendar,
+    find_streak_milestone,
+)
+
+DEFAULT_USERS = 5000
+DAY_ACTIVE_PROBABILITY = 0.7
+MOOD_PROBABILITY = 0.9
+MAX_ENTRIES_PER_DAY = 3
+SEED = 7
+
+
+def generate_rollups(user_ids: list[uuid.UUID], start: date, today: date) -> list[DailyMoodRollup]:
+    rng = random.Random(SEED)
+    rollups: list[DailyMoodRollup] = []
+    days = (today - start).days + 1
+    for user_id in user_ids:
+        for offset in range(days):
+            if rng.random() > DAY_ACTIVE_PROBABILITY:
+                continue
+            day = start + timedelta(days=offset)
+            for _ in range(rng.randint(1, MAX_ENTRIES_PER_DAY)):
+                mood = rng.choice(MOOD_CATEGORIES) if rng.random() < MOOD_PROBABILITY else None
+                rollups.append(
+                    DailyMoodRollup(user_id=user_id, day=day, mood_category=mood, entry_count=1)
+                )
+    return rollups
+
+
+def build_per_user_inputs(rollups: list[DailyMoodRollup]) -> dict[uuid.UUID, list[CalendarDay]]:
+    per_day: dict[uuid.UUID, dict[date, int]] = defaultdict(lambda: defaultdict(int))
+    for rollup in rollups:
+        per_day[rollup.user_id][rollup.day] += rollup.entry_count
+
+    return {
+        user_id: [
+            CalendarDay(date=d.isoformat(), mood_category=None, mood_specific=None, entry_count=c)
+            for d, c in days.items()
+        ]
+        for user_id, days in per_day.items()
+    }
+
+
+def run_per_user(rollups: list[DailyMoodRollup], today: date) -> int:
+    return compute_per_user(build_per_user_inputs(rollups), today)
+
+
+def compute_per_user(inputs: dict[uuid.UUID, list[CalendarDay]], today: date) -> int:
+    generated = 0
+    for calendar in inputs.values():
+        streak = compute_streak_from_calendar(calendar, today)
+        milestone = find_streak_milestone(streak)
+        if milestone is not None:
+            build_streak_insight(streak, milestone, today)
+            generated += 1
+    return generated
+
+
+def run_batch(
+    rollups: list[DailyMoodRollup], user_ids: list[uuid.UUID], start: date, today: date
+) -> int:
+    return len(compute_batch_insights(build_rollup_tensor(rollups, user_ids, start, today), today))
+
+
+def _timed(run: Callable[[], int]) -> tuple[float, int]:
+    began = time.perf_counter()
+    result = run()
+    return time.perf_counter() - began, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark batch vs per-user insight computation")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    args = parser.parse_args()
+
+    today = datetime.now(UTC).date()
+    start = today - timedelta(days=STREAK_WINDOW_DAYS - 1)
+    user_ids = [uuid.uuid4() for _ in range(args.users)]
+
+    print(f"Generating rollups for {args.users} users over {STREAK_WINDOW_DAYS} days...")
+    rollups = generate_rollups(user_ids, start, today)
+    print(f"  {len(rollups)} rollup rows")
+
+    per_user_elapsed, per_user_count = _timed(lambda: run_per_user(rollups, today))
+    batch_elapsed, batch_count = _timed(lambda: run_batch(rollups, user_ids, start, today))
+    inputs = build_per_user_inputs(rollups)
+    tensor = build_rollup_tensor(rollups, user_ids, start, today)
+    compute_elapsed, _ = _timed(lambda: compute_per_user(inputs, today))
+    vector_elapsed, _ = _timed(lambda: len(compute_batch_insights(tensor, today)))
+
+    print("End to end (from rollups):")
+    print(f"  per-user: {per_user_elapsed:.3f}s ({per_user_count} insights)")
+    print(f"  batch:    {batch_elapsed:.3f}s ({batch_count} insights)")
+    print(f"  speedup:  {per_user_elapsed / batch_elapsed:.1f}x")
+    print("Computation only (inputs prebuilt):")
+    print(f"  per-user: {compute_elapsed:.3f}s")
+    print(f"  batch:    {vector_elapsed:.3f}s")
+    print(f"  speedup:  {compute_elapsed / vector_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
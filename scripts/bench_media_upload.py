@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from collections.abc import AsyncIterable, Awaitable, Callable
+
+from fastapi import UploadFile
+
+from nstil.api.upload import iter_upload_with_limit
+from nstil.models.media import MAX_AUDIO_FILE_SIZE_BYTES
+from nstil.services.media import SizedChunks
+
+DEFAULT_CONCURRENCY = (1, 4, 16)
+SPOOL_MAX_SIZE = 1024 * 1024
+WRITE_BLOCK = b"\x00" * (1024 * 1024)
+MIB = 1024 * 1024
+
+
+def make_upload(size: int) -> UploadFile:
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)  # noqa: SIM115
+    remaining = size
+    while remaining > 0:
+        block = WRITE_BLOCK[: min(remaining, len(WRITE_BLOCK))]
+        spool.write(block)
+        remaining -= len(block)
+    spool.seek(0)
+    return UploadFile(file=spool, filename="bench.m4a", size=size)
+
+
+async def sink_bytes(data: bytes) -> int:
+    await asyncio.sleep(0)
+    return len(data)
+
+
+async def sink_stream(chunks: AsyncIterable[bytes]) -> int:
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        await asyncio.sleep(0)
+    return total
+
+
+async def buffered(file: UploadFile, max_bytes: int) -> int:
+    chunks = bytearray()
+    while chunk := await file.read(64 * 1024):
+        chunks.extend(chunk)
+        if len(chunks) > max_bytes:
+            raise ValueError("too large")
+    return await sink_bytes(bytes(chunks))
+
+
+async def streamed(file: UploadFile, max_bytes: int) -> int:
+    body = SizedChunks(iter_upload_with_limit(file, max_bytes), max_bytes)
+    return await sink_stream(body)
+
+
+async def run(
+    strategy: Callable[[UploadFile, int], Awaitable[int]], concurrency: int, size: int
+) -> tuple[float, float]:
+    uploads = [make_upload(size) for _ in range(concurrency)]
+    tracemalloc.start()
+    began = time.perf_counter()
+    await asyncio.gather(*(strategy(u, MAX_AUDIO_FILE_SIZE_BYTES) for u in uploads))
+    elapsed = time.perf_counter() - began
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for upload in uploads:
+        await upload.close()
+    return peak / MIB, elapsed * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Peak memory of buffered vs streamed uploads")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(DEFAULT_CONCURRENCY))
+    parser.add_argument("--size-mb", type=int, default=MAX_AUDIO_FILE_SIZE_BYTES // MIB)
+    args = parser.parse_args()
+
+    size = args.size_mb * MIB
+    print(f"{args.size_mb} MiB per upload")
+    print(f"{'uploads':>8} {'buffered MiB':>13} {'streamed MiB':>13} {'ms buf':>8} {'ms str':>8}")
+    for concurrency in args.concurrency:
+        buf_peak, buf_ms = asyncio.run(run(buffered, concurrency, size))
+        str_peak, str_ms = asyncio.run(run(streamed, concurrency, size))
+        print(
+            f"{concurrency:>8} {buf_peak:>13.1f} {str_peak:>13.1f} {buf_ms:>8.0f} {str_ms:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
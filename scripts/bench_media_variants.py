@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import argparse
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from nstil.services.media_variants import ImageVariant, render_variants
+
+KIB = 1024
+
+
+def make_photo(width: int, height: int, seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack(
+        [
+            128 + 100 * np.sin(x / (97 + seed)),
+            128 + 100 * np.cos(y / 131),
+            128 + 100 * np.sin((x + y) / 173),
+        ],
+        axis=-1,
+    )
+    noise = rng.normal(0, 18, size=base.shape)
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Preview bytes and render time of variants")
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    args = parser.parse_args()
+
+    photos = [make_photo(args.width, args.height, seed) for seed in range(args.images)]
+    original = sum(len(p) for p in photos) / len(photos)
+
+    began = time.perf_counter()
+    rendered = [render_variants(photo) for photo in photos]
+    serial_ms = (time.perf_counter() - began) * 1000
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context) as pool:
+        list(pool.map(render_variants, photos[:1]))
+        began = time.perf_counter()
+        list(pool.map(render_variants, photos))
+        pooled_ms = (time.perf_counter() - began) * 1000
+
+    print(f"{args.images} images, {args.width}x{args.height} JPEG")
+    print(f"{'variant':>10} {'avg KiB':>10} {'vs original':>12}")
+    print(f"{'original':>10} {original / KIB:>10.1f} {1:>11.0f}x")
+    for variant in ImageVariant:
+        size = sum(len(r[variant]) for r in rendered) / len(rendered)
+        print(f"{variant.value:>10} {size / KIB:>10.1f} {original / size:>11.0f}x")
+    print(f"render serial {serial_ms:.0f} ms, pool of {args.workers} {pooled_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
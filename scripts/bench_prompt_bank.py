@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from nstil.services.ai.prompt_bank import PromptBank
+from nstil.services.ai.prompt_bank.index import PromptIndex
+from nstil.services.ai.prompt_bank.types import CuratedPrompt, PromptIntensity, PromptTag
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_ITERATIONS = 20000
+MOODS = ("happy", "calm", "sad", "anxious", "angry", "neutral")
+INTENSITY_RANK = {
+    PromptIntensity.LIGHT: 0,
+    PromptIntensity.MODERATE: 1,
+    PromptIntensity.DEEP: 2,
+}
+EXCLUDED_IDS = 10
+SEED = 7
+
+
+def generate_prompts(size: int) -> tuple[CuratedPrompt, ...]:
+    rng = random.Random(SEED)
+    tags = list(PromptTag)
+    return tuple(
+        CuratedPrompt(
+            id=f"bench-{i:06d}",
+            prompt_type="bench",
+            content=f"Benchmark prompt {i}",
+            mood_categories=frozenset(rng.sample(MOODS, rng.randint(1, 3))),
+            tags=frozenset(rng.sample(tags, rng.randint(0, 3))),
+            intensity=rng.choice(list(PromptIntensity)),
+        )
+        for i in range(size)
+    )
+
+
+def scan_random(
+    prompts: tuple[CuratedPrompt, ...],
+    mood_category: str,
+    exclude_ids: frozenset[str],
+    exclude_topics: frozenset[str],
+    max_intensity: PromptIntensity,
+) -> CuratedPrompt | None:
+    threshold = INTENSITY_RANK[max_intensity]
+    candidates = [
+        p
+        for p in prompts
+        if (mood_category in p.mood_categories or "neutral" in p.mood_categories)
+        and p.id not in exclude_ids
+        and not p.tags & exclude_topics
+        and INTENSITY_RANK[p.intensity] <= threshold
+    ]
+    if not candidates:
+        return None
+    return random.choice(candidates)
+
+
+def _timed(run: Callable[[], object], iterations: int) -> float:
+    began = time.perf_counter()
+    for _ in range(iterations):
+        run()
+    return (time.perf_counter() - began) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bitset vs scan prompt selection")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    args = parser.parse_args()
+
+    exclude_topics = frozenset({PromptTag.RELATIONSHIPS, PromptTag.WORK})
+    print(f"Current bank: {PromptBank.count()} prompts")
+    print(f"{'size':>8} {'scan (us)':>12} {'bitset (us)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        prompts = generate_prompts(size)
+        index = PromptIndex.build(prompts)
+        exclude_ids = frozenset(p.id for p in prompts[:EXCLUDED_IDS])
+
+        scan = _timed(
+            lambda prompts=prompts, exclude_ids=exclude_ids: scan_random(
+                prompts, "sad", exclude_ids, exclude_topics, PromptIntensity.MODERATE
+            ),
+            args.iterations,
+        )
+        bitset = _timed(
+            lambda index=index, exclude_ids=exclude_ids: index.pick(
+                index.select("sad", exclude_ids, exclude_topics, PromptIntensity.MODERATE)
+            ),
+            args.iterations,
+        )
+        print(f"{size:>8} {scan:>12.2f} {bitset:>12.2f} {scan / bitset:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
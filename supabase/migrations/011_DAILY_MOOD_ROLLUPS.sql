@@ -0,0 +1,32 @@
+create or replace function public.get_daily_mood_rollups(
+    p_user_ids uuid[],
+    p_start date,
+    p_end date
+)
+returns table (
+    user_id uuid,
+    day date,
+    mood_category text,
+    entry_count bigint
+)
+language sql
+stable
+security definer
+set search_path = ''
+as $$
+    select
+        e.user_id,
+        (e.created_at at time zone 'UTC')::date as day,
+        e.mood_category,
+        count(*) as entry_count
+    from public.journal_entries e
+    where e.user_id = any(p_user_ids)
+      and e.deleted_at is null
+      and e.created_at >= p_start::timestamp at time zone 'UTC'
+      and e.created_at < (p_end + 1)::timestamp at time zone 'UTC'
+    group by e.user_id, 2, e.mood_category
+    order by e.user_id, 2
+$$;
+
+revoke execute on function public.get_daily_mood_rollups(uuid[], date, date)
+    from public, anon, authenticated;
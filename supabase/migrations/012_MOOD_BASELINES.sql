@@ -0,0 +1,30 @@
+create table public.mood_baselines (
+    user_id             uuid primary key references auth.users on delete cascade,
+    ewma_mean           double precision not null default 0,
+    ewma_variance       double precision not null default 0
+                        constraint mood_baselines_variance_non_negative
+                        check (ewma_variance >= 0),
+    observations        integer not null default 0
+                        constraint mood_baselines_observations_non_negative
+                        check (observations >= 0),
+    last_day            date not null,
+    updated_at          timestamptz not null default now()
+);
+
+create trigger handle_mood_baselines_updated_at
+    before update on public.mood_baselines
+    for each row
+    execute function extensions.moddatetime(updated_at);
+
+alter table public.mood_baselines enable row level security;
+
+create policy "Users can view their own mood baseline"
+    on public.mood_baselines for select
+    using (auth.uid() = user_id);
+
+create policy "Service role full access on mood_baselines"
+    on public.mood_baselines
+    for all
+    to service_role
+    using (true)
+    with check (true);
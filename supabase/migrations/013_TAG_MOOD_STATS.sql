@@ -0,0 +1,28 @@
+create table public.tag_mood_stats (
+    user_id             uuid primary key references auth.users on delete cascade,
+    counts              jsonb not null default '{}'::jsonb,
+    mood_totals         jsonb not null default '{}'::jsonb,
+    entries_scanned     integer not null default 0
+                        constraint tag_mood_stats_entries_non_negative
+                        check (entries_scanned >= 0),
+    watermark           timestamptz,
+    updated_at          timestamptz not null default now()
+);
+
+create trigger handle_tag_mood_stats_updated_at
+    before update on public.tag_mood_stats
+    for each row
+    execute function extensions.moddatetime(updated_at);
+
+alter table public.tag_mood_stats enable row level security;
+
+create policy "Users can view their own tag mood stats"
+    on public.tag_mood_stats for select
+    using (auth.uid() = user_id);
+
+create policy "Service role full access on tag_mood_stats"
+    on public.tag_mood_stats
+    for all
+    to service_role
+    using (true)
+    with check (true);
@@ -0,0 +1,210 @@
+create or replace function public.check_in_lock_session(
+    p_user_id uuid,
+    p_session_id uuid
+)
+returns public.ai_sessions
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_session public.ai_sessions;
+begin
+    select *
+    into v_session
+    from public.ai_sessions
+    where id = p_session_id
+      and user_id = p_user_id
+      and deleted_at is null
+    for update;
+
+    if not found then
+        raise exception 'Session % not found', p_session_id using errcode = 'NS001';
+    end if;
+    if v_session.status <> 'active' then
+        raise exception 'Session % is not active', p_session_id using errcode = 'NS001';
+    end if;
+    if v_session.session_type <> 'check_in' then
+        raise exception 'Session % is not a check-in session', p_session_id using errcode = 'NS001';
+    end if;
+
+    return v_session;
+end;
+$$;
+
+revoke execute on function public.check_in_lock_session(uuid, uuid)
+    from public, anon, authenticated;
+
+
+create or replace function public.check_in_start(
+    p_user_id uuid,
+    p_trigger_source text,
+    p_prompt_id uuid
+)
+returns setof public.ai_sessions
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_session public.ai_sessions;
+    v_content text;
+begin
+    insert into public.ai_sessions (user_id, session_type, trigger_source, flow_state)
+    values (
+        p_user_id,
+        'check_in',
+        p_trigger_source,
+        jsonb_build_object('step', 'prompted', 'prompt_id', p_prompt_id)
+    )
+    returning * into v_session;
+
+    update public.ai_prompts
+    set session_id = v_session.id,
+        status = 'delivered',
+        delivered_at = now()
+    where id = p_prompt_id
+      and user_id = p_user_id
+      and deleted_at is null
+    returning content into v_content;
+
+    if not found then
+        raise exception 'Prompt % not found', p_prompt_id using errcode = 'NS001';
+    end if;
+
+    insert into public.ai_messages (session_id, user_id, role, content, sort_order)
+    values (v_session.id, p_user_id, 'assistant', v_content, 0);
+
+    return next v_session;
+end;
+$$;
+
+revoke execute on function public.check_in_start(uuid, text, uuid)
+    from public, anon, authenticated;
+
+
+create or replace function public.check_in_respond(
+    p_user_id uuid,
+    p_session_id uuid,
+    p_mood_category text,
+    p_mood_specific text,
+    p_response_text text
+)
+returns setof public.ai_sessions
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_session public.ai_sessions;
+    v_step text;
+    v_prompt_id uuid;
+begin
+    v_session := public.check_in_lock_session(p_user_id, p_session_id);
+    v_step := coalesce(v_session.flow_state->>'step', '');
+
+    if v_step <> 'prompted' then
+        raise exception 'Cannot respond: session is in step ''%''', v_step using errcode = 'NS001';
+    end if;
+
+    v_prompt_id := (v_session.flow_state->>'prompt_id')::uuid;
+    if v_prompt_id is not null then
+        update public.ai_prompts
+        set status = 'engaged',
+            engaged_at = now()
+        where id = v_prompt_id
+          and user_id = p_user_id
+          and deleted_at is null;
+    end if;
+
+    if p_response_text <> '' then
+        insert into public.ai_messages (session_id, user_id, role, content, sort_order)
+        select p_session_id, p_user_id, 'user', p_response_text, coalesce(max(m.sort_order), -1) + 1
+        from public.ai_messages m
+        where m.session_id = p_session_id
+          and m.deleted_at is null;
+    end if;
+
+    update public.ai_sessions
+    set flow_state = flow_state || jsonb_build_object(
+            'step', 'responded',
+            'mood_category', p_mood_category,
+            'mood_specific', p_mood_specific,
+            'response_text', p_response_text
+        )
+    where id = p_session_id
+    returning * into v_session;
+
+    return next v_session;
+end;
+$$;
+
+revoke execute on function public.check_in_respond(uuid, uuid, text, text, text)
+    from public, anon, authenticated;
+
+
+create or replace function public.check_in_finish(
+    p_user_id uuid,
+    p_session_id uuid,
+    p_status text,
+    p_entry_id uuid default null
+)
+returns setof public.ai_sessions
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_session public.ai_sessions;
+    v_step text;
+    v_prompt_id uuid;
+    v_flow_state jsonb;
+begin
+    v_session := public.check_in_lock_session(p_user_id, p_session_id);
+    v_step := coalesce(v_session.flow_state->>'step', '');
+    v_prompt_id := (v_session.flow_state->>'prompt_id')::uuid;
+    v_flow_state := v_session.flow_state;
+
+    if p_status in ('completed', 'converted') then
+        if v_step <> 'responded' then
+            raise exception 'Cannot finish: session is in step ''%''', v_step using errcode = 'NS001';
+        end if;
+        v_flow_state := v_flow_state || jsonb_build_object('step', 'completed');
+        if p_entry_id is not null then
+            v_flow_state := v_flow_state || jsonb_build_object('entry_id', p_entry_id);
+        end if;
+    elsif p_status <> 'abandoned' then
+        raise exception 'Unsupported check-in status %', p_status using errcode = 'NS001';
+    end if;
+
+    if v_prompt_id is not null and p_status = 'converted' then
+        update public.ai_prompts
+        set status = 'converted',
+            converted_at = now(),
+            converted_entry_id = p_entry_id
+        where id = v_prompt_id
+          and user_id = p_user_id
+          and deleted_at is null;
+    elsif v_prompt_id is not null and p_status = 'abandoned' then
+        update public.ai_prompts
+        set status = 'dismissed',
+            dismissed_at = now()
+        where id = v_prompt_id
+          and user_id = p_user_id
+          and deleted_at is null;
+    end if;
+
+    update public.ai_sessions
+    set status = p_status,
+        entry_id = coalesce(p_entry_id, entry_id),
+        flow_state = v_flow_state,
+        completed_at = now()
+    where id = p_session_id
+    returning * into v_session;
+
+    return next v_session;
+end;
+$$;
+
+revoke execute on function public.check_in_finish(uuid, uuid, text, uuid)
+    from public, anon, authenticated;
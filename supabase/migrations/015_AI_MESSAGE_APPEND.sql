@@ -0,0 +1,60 @@
+create or replace function public.append_ai_messages(
+    p_user_id uuid,
+    p_session_id uuid,
+    p_messages jsonb
+)
+returns setof public.ai_messages
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_next integer;
+begin
+    perform 1
+    from public.ai_sessions
+    where id = p_session_id
+      and user_id = p_user_id
+      and deleted_at is null
+    for update;
+
+    if not found then
+        raise exception 'Session % not found', p_session_id using errcode = 'P0002';
+    end if;
+
+    select coalesce(max(sort_order), -1) + 1
+    into v_next
+    from public.ai_messages
+    where session_id = p_session_id
+      and deleted_at is null;
+
+    return query
+    insert into public.ai_messages (
+        session_id,
+        user_id,
+        role,
+        content,
+        sort_order,
+        token_count,
+        latency_ms,
+        model_id,
+        metadata
+    )
+    select
+        p_session_id,
+        p_user_id,
+        m.value->>'role',
+        m.value->>'content',
+        v_next + m.ordinal::integer - 1,
+        (m.value->>'token_count')::integer,
+        (m.value->>'latency_ms')::integer,
+        m.value->>'model_id',
+        coalesce(m.value->'metadata', '{}'::jsonb)
+    from jsonb_array_elements(p_messages) with ordinality as m(value, ordinal)
+    order by m.ordinal
+    returning *;
+end;
+$$;
+
+revoke execute on function public.append_ai_messages(uuid, uuid, jsonb)
+    from public, anon, authenticated;
@@ -0,0 +1,146 @@
+alter table public.ai_prompts
+    add column curated_id text;
+
+
+create or replace function public.get_ai_context(
+    p_user_id uuid,
+    p_entry_limit int default 10,
+    p_days_back int default 14
+)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = ''
+as $$
+    with recent_entries as (
+        select
+            je.id, je.title, je.body, je.mood_category, je.mood_specific,
+            je.tags, je.entry_type, je.location, je.created_at,
+            j.name as journal_name
+        from public.journal_entries je
+        join public.journals j on j.id = je.journal_id
+        where je.user_id = p_user_id
+          and je.deleted_at is null
+          and je.created_at >= now() - (p_days_back || ' days')::interval
+        order by je.created_at desc
+        limit p_entry_limit
+    ),
+    mood_distribution as (
+        select
+            mood_category,
+            mood_specific,
+            count(*) as count
+        from public.journal_entries
+        where user_id = p_user_id
+          and deleted_at is null
+          and mood_category is not null
+          and created_at >= now() - (p_days_back || ' days')::interval
+        group by mood_category, mood_specific
+        order by count desc
+    ),
+    recent_prompts as (
+        select
+            prompt_type, content, status, source, curated_id, created_at
+        from public.ai_prompts
+        where user_id = p_user_id
+          and deleted_at is null
+          and created_at >= now() - interval '7 days'
+        order by created_at desc
+        limit 10
+    ),
+    recent_sessions as (
+        select
+            id, session_type, status, trigger_source, created_at, completed_at
+        from public.ai_sessions
+        where user_id = p_user_id
+          and deleted_at is null
+          and created_at >= now() - interval '7 days'
+        order by created_at desc
+        limit 5
+    ),
+    entry_stats as (
+        select
+            count(*) as total_entries,
+            count(*) filter (where created_at >= now() - interval '7 days') as entries_last_7d,
+            count(*) filter (where entry_type = 'check_in') as check_ins_total,
+            count(*) filter (
+                where entry_type = 'check_in'
+                and created_at >= now() - interval '7 days'
+            ) as check_ins_last_7d,
+            avg(char_length(body)) filter (
+                where created_at >= now() - interval '7 days'
+            ) as avg_entry_length_7d,
+            max(created_at) as last_entry_at
+        from public.journal_entries
+        where user_id = p_user_id
+          and deleted_at is null
+          and created_at >= now() - (p_days_back || ' days')::interval
+    ),
+    user_profile as (
+        select
+            prompt_style, topics_to_avoid, goals
+        from public.user_ai_profiles
+        where user_id = p_user_id
+    )
+    select jsonb_build_object(
+        'recent_entries', coalesce(
+            (select jsonb_agg(jsonb_build_object(
+                'id', re.id,
+                'title', re.title,
+                'body', left(re.body, 500),
+                'mood_category', re.mood_category,
+                'mood_specific', re.mood_specific,
+                'tags', re.tags,
+                'entry_type', re.entry_type,
+                'location', re.location,
+                'journal_name', re.journal_name,
+                'created_at', re.created_at
+            )) from recent_entries re),
+            '[]'::jsonb
+        ),
+        'mood_distribution', coalesce(
+            (select jsonb_agg(jsonb_build_object(
+                'mood_category', md.mood_category,
+                'mood_specific', md.mood_specific,
+                'count', md.count
+            )) from mood_distribution md),
+            '[]'::jsonb
+        ),
+        'recent_prompts', coalesce(
+            (select jsonb_agg(jsonb_build_object(
+                'prompt_type', rp.prompt_type,
+                'content', rp.content,
+                'status', rp.status,
+                'source', rp.source,
+                'curated_id', rp.curated_id,
+                'created_at', rp.created_at
+            )) from recent_prompts rp),
+            '[]'::jsonb
+        ),
+        'recent_sessions', coalesce(
+            (select jsonb_agg(jsonb_build_object(
+                'id', rs.id,
+                'session_type', rs.session_type,
+                'status', rs.status,
+                'trigger_source', rs.trigger_source,
+                'created_at', rs.created_at,
+                'completed_at', rs.completed_at
+            )) from recent_sessions rs),
+            '[]'::jsonb
+        ),
+        'stats', (select jsonb_build_object(
+            'total_entries', es.total_entries,
+            'entries_last_7d', es.entries_last_7d,
+            'check_ins_total', es.check_ins_total,
+            'check_ins_last_7d', es.check_ins_last_7d,
+            'avg_entry_length_7d', round(es.avg_entry_length_7d::numeric),
+            'last_entry_at', es.last_entry_at
+        ) from entry_stats es),
+        'profile', (select jsonb_build_object(
+            'prompt_style', up.prompt_style,
+            'topics_to_avoid', up.topics_to_avoid,
+            'goals', up.goals
+        ) from user_profile up)
+    );
+$$;
@@ -0,0 +1,46 @@
+create or replace function public.get_ai_context_entries(
+    p_user_id uuid,
+    p_entry_limit int default 10,
+    p_days_back int default 14
+)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = ''
+as $$
+    with recent_entries as (
+        select
+            je.id, je.title, je.body, je.mood_category, je.mood_specific,
+            je.tags, je.entry_type, je.location, je.created_at,
+            j.name as journal_name
+        from public.journal_entries je
+        join public.journals j on j.id = je.journal_id
+        where je.user_id = p_user_id
+          and je.deleted_at is null
+          and je.created_at >= now() - (p_days_back || ' days')::interval
+        order by je.created_at desc
+        limit p_entry_limit
+    )
+    select jsonb_build_object(
+        'recent_entries', coalesce(
+            (select jsonb_agg(jsonb_build_object(
+                'id', re.id,
+                'title', re.title,
+                'body', left(re.body, 500),
+                'body_length', char_length(re.body),
+                'mood_category', re.mood_category,
+                'mood_specific', re.mood_specific,
+                'tags', re.tags,
+                'entry_type', re.entry_type,
+                'location', re.location,
+                'journal_name', re.journal_name,
+                'created_at', re.created_at
+            ) order by re.created_at desc) from recent_entries re),
+            '[]'::jsonb
+        )
+    );
+$$;
+
+revoke execute on function public.get_ai_context_entries(uuid, int, int)
+    from public, anon, authenticated;
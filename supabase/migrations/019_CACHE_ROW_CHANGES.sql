@@ -0,0 +1,70 @@
+create or replace function public.notify_row_change()
+returns trigger
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_row jsonb;
+    v_op text;
+begin
+    if coalesce(auth.role(), '') = 'service_role' then
+        return null;
+    end if;
+
+    if tg_op = 'DELETE' then
+        v_row := to_jsonb(old);
+        v_op := 'delete';
+    else
+        v_row := to_jsonb(new);
+        v_op := lower(tg_op);
+        if tg_op = 'UPDATE'
+            and v_row->>'deleted_at' is not null
+            and to_jsonb(old)->>'deleted_at' is null then
+            v_op := 'delete';
+        end if;
+    end if;
+
+    perform realtime.send(
+        jsonb_build_object(
+            'table', tg_table_name,
+            'user_id', v_row->>'user_id',
+            'id', coalesce(v_row->>'id', v_row->>'user_id'),
+            'op', v_op
+        ),
+        'row_change',
+        'cache:row_changes',
+        true
+    );
+    return null;
+end;
+$$;
+
+revoke execute on function public.notify_row_change()
+    from public, anon, authenticated;
+
+
+create trigger notify_journal_entries_change
+    after insert or update or delete on public.journal_entries
+    for each row
+    execute function public.notify_row_change();
+
+create trigger notify_journals_change
+    after insert or update or delete on public.journals
+    for each row
+    execute function public.notify_row_change();
+
+create trigger notify_user_ai_profiles_change
+    after insert or update or delete on public.user_ai_profiles
+    for each row
+    execute function public.notify_row_change();
+
+create trigger notify_ai_sessions_change
+    after insert or update or delete on public.ai_sessions
+    for each row
+    execute function public.notify_row_change();
+
+create trigger notify_ai_prompts_change
+    after insert or update or delete on public.ai_prompts
+    for each row
+    execute function public.notify_row_change();
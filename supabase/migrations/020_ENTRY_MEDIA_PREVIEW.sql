@@ -0,0 +1,40 @@
+create or replace function public.media_preview(p_entry public.journal_entries)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = ''
+as $$
+    select jsonb_build_object(
+        'items', coalesce(
+            (select jsonb_agg(jsonb_build_object(
+                'id', m.id,
+                'storage_path', m.storage_path
+            ) order by m.sort_order)
+            from (
+                select id, storage_path, sort_order
+                from public.entry_media
+                where entry_id = p_entry.id
+                  and user_id = p_entry.user_id
+                order by sort_order
+                limit 3
+            ) m),
+            '[]'::jsonb
+        ),
+        'total_count', (
+            select count(*)
+            from public.entry_media
+            where entry_id = p_entry.id
+              and user_id = p_entry.user_id
+        )
+    );
+$$;
+
+revoke execute on function public.media_preview(public.journal_entries)
+    from public, anon, authenticated;
+
+
+create trigger notify_entry_media_change
+    after insert or update or delete on public.entry_media
+    for each row
+    execute function public.notify_row_change();
@@ -0,0 +1,78 @@
+create or replace function public.insert_entry_media_batch(
+    p_user_id uuid,
+    p_entry_id uuid,
+    p_items jsonb,
+    p_max_images int,
+    p_max_audio int
+)
+returns setof public.entry_media
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_images int;
+    v_audio int;
+    v_next_sort_order int;
+    v_new_images int;
+    v_new_audio int;
+begin
+    perform 1
+    from public.journal_entries
+    where id = p_entry_id
+      and user_id = p_user_id
+      and deleted_at is null
+    for update;
+
+    if not found then
+        raise exception 'Entry % not found', p_entry_id using errcode = 'P0002';
+    end if;
+
+    select
+        count(*) filter (where content_type not like 'audio/%'),
+        count(*) filter (where content_type like 'audio/%'),
+        coalesce(max(sort_order) + 1, 0)
+    into v_images, v_audio, v_next_sort_order
+    from public.entry_media
+    where entry_id = p_entry_id;
+
+    select
+        count(*) filter (where item->>'content_type' not like 'audio/%'),
+        count(*) filter (where item->>'content_type' like 'audio/%')
+    into v_new_images, v_new_audio
+    from jsonb_array_elements(p_items) as item;
+
+    if v_images + v_new_images > p_max_images then
+        raise exception 'Maximum of % images per entry', p_max_images using errcode = 'NS002';
+    end if;
+    if v_audio + v_new_audio > p_max_audio then
+        raise exception 'Maximum of % audio file per entry', p_max_audio using errcode = 'NS002';
+    end if;
+
+    return query
+    with inserted as (
+        insert into public.entry_media (
+            entry_id, user_id, storage_path, file_name, content_type, size_bytes,
+            width, height, duration_ms, waveform, sort_order
+        )
+        select
+            p_entry_id,
+            p_user_id,
+            e.item->>'storage_path',
+            e.item->>'file_name',
+            e.item->>'content_type',
+            (e.item->>'size_bytes')::bigint,
+            (e.item->>'width')::int,
+            (e.item->>'height')::int,
+            (e.item->>'duration_ms')::int,
+            nullif(e.item->'waveform', 'null'::jsonb),
+            v_next_sort_order + e.idx::int - 1
+        from jsonb_array_elements(p_items) with ordinality as e(item, idx)
+        returning *
+    )
+    select * from inserted order by sort_order;
+end;
+$$;
+
+revoke execute on function public.insert_entry_media_batch(uuid, uuid, jsonb, int, int)
+    from public, anon, authenticated;
@@ -0,0 +1,40 @@
+alter table public.entry_media
+    add column thumbnail_path text,
+    add column medium_path text;
+
+
+create or replace function public.media_preview(p_entry public.journal_entries)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = ''
+as $$
+    select jsonb_build_object(
+        'items', coalesce(
+            (select jsonb_agg(jsonb_build_object(
+                'id', m.id,
+                'storage_path', m.storage_path,
+                'thumbnail_path', m.thumbnail_path
+            ) order by m.sort_order)
+            from (
+                select id, storage_path, thumbnail_path, sort_order
+                from public.entry_media
+                where entry_id = p_entry.id
+                  and user_id = p_entry.user_id
+                order by sort_order
+                limit 3
+            ) m),
+            '[]'::jsonb
+        ),
+        'total_count', (
+            select count(*)
+            from public.entry_media
+            where entry_id = p_entry.id
+              and user_id = p_entry.user_id
+        )
+    );
+$$;
+
+revoke execute on function public.media_preview(public.journal_entries)
+    from public, anon, authenticated;
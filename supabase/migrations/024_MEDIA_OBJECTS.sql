@@ -0,0 +1,209 @@
+create table public.media_objects (
+    user_id         uuid not null references auth.users(id) on delete cascade,
+    content_hash    text not null,
+    storage_path    text not null,
+    ref_count       integer not null default 1,
+    created_at      timestamptz not null default now(),
+
+    primary key (user_id, content_hash),
+
+    constraint media_objects_hash_format
+        check (content_hash ~ '^[0-9a-f]{64}$'),
+
+    constraint media_objects_ref_count_positive
+        check (ref_count > 0)
+);
+
+alter table public.media_objects enable row level security;
+
+create policy "Users can read own media objects"
+    on public.media_objects
+    for select
+    using (auth.uid() = user_id);
+
+create policy "Service role full access on media_objects"
+    on public.media_objects
+    for all
+    to service_role
+    using (true)
+    with check (true);
+
+
+alter table public.entry_media
+    add column content_hash text;
+
+create index idx_entry_media_content_hash
+    on public.entry_media (user_id, content_hash)
+    where content_hash is not null;
+
+
+create or replace function public.acquire_media_object()
+returns trigger
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_storage_path text;
+    v_sibling record;
+begin
+    if new.content_hash is null then
+        return new;
+    end if;
+
+    insert into public.media_objects (user_id, content_hash, storage_path)
+    values (new.user_id, new.content_hash, new.storage_path)
+    on conflict (user_id, content_hash)
+        do update set ref_count = public.media_objects.ref_count + 1
+    returning storage_path into v_storage_path;
+
+    if v_storage_path <> new.storage_path then
+        new.storage_path := v_storage_path;
+
+        select thumbnail_path, medium_path, waveform_peaks
+        into v_sibling
+        from public.entry_media
+        where user_id = new.user_id
+          and content_hash = new.content_hash
+          and storage_path = v_storage_path
+        order by thumbnail_path is null, created_at
+        limit 1;
+
+        if found then
+            new.thumbnail_path := v_sibling.thumbnail_path;
+            new.medium_path := v_sibling.medium_path;
+            new.waveform_peaks := coalesce(v_sibling.waveform_peaks, new.waveform_peaks);
+        end if;
+    end if;
+
+    return new;
+end;
+$$;
+
+revoke execute on function public.acquire_media_object()
+    from public, anon, authenticated;
+
+
+create or replace function public.release_media_object()
+returns trigger
+language plpgsql
+security definer
+set search_path = ''
+as $$
+begin
+    if old.content_hash is null then
+        return null;
+    end if;
+
+    delete from public.media_objects
+    where user_id = old.user_id
+      and content_hash = old.content_hash
+      and storage_path = old.storage_path
+      and ref_count <= 1;
+
+    if not found then
+        update public.media_objects
+        set ref_count = ref_count - 1
+        where user_id = old.user_id
+          and content_hash = old.content_hash
+          and storage_path = old.storage_path;
+    end if;
+
+    return null;
+end;
+$$;
+
+revoke execute on function public.release_media_object()
+    from public, anon, authenticated;
+
+
+create trigger acquire_entry_media_object
+    before insert on public.entry_media
+    for each row
+    execute function public.acquire_media_object();
+
+create trigger release_entry_media_object
+    after delete on public.entry_media
+    for each row
+    execute function public.release_media_object();
+
+
+create or replace function public.insert_entry_media_batch(
+    p_user_id uuid,
+    p_entry_id uuid,
+    p_items jsonb,
+    p_max_images int,
+    p_max_audio int
+)
+returns setof public.entry_media
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_images int;
+    v_audio int;
+    v_next_sort_order int;
+    v_new_images int;
+    v_new_audio int;
+begin
+    perform 1
+    from public.journal_entries
+    where id = p_entry_id
+      and user_id = p_user_id
+      and deleted_at is null
+    for update;
+
+    if not found then
+        raise exception 'Entry % not found', p_entry_id using errcode = 'P0002';
+    end if;
+
+    select
+        count(*) filter (where content_type not like 'audio/%'),
+        count(*) filter (where content_type like 'audio/%'),
+        coalesce(max(sort_order) + 1, 0)
+    into v_images, v_audio, v_next_sort_order
+    from public.entry_media
+    where entry_id = p_entry_id;
+
+    select
+        count(*) filter (where item->>'content_type' not like 'audio/%'),
+        count(*) filter (where item->>'content_type' like 'audio/%')
+    into v_new_images, v_new_audio
+    from jsonb_array_elements(p_items) as item;
+
+    if v_images + v_new_images > p_max_images then
+        raise exception 'Maximum of % images per entry', p_max_images using errcode = 'NS002';
+    end if;
+    if v_audio + v_new_audio > p_max_audio then
+        raise exception 'Maximum of % audio file per entry', p_max_audio using errcode = 'NS002';
+    end if;
+
+    return query
+    with inserted as (
+        insert into public.entry_media (
+            entry_id, user_id, storage_path, file_name, content_type, size_bytes,
+            width, height, duration_ms, waveform_peaks, content_hash, sort_order
+        )
+        select
+            p_entry_id,
+            p_user_id,
+            e.item->>'storage_path',
+            e.item->>'file_name',
+            e.item->>'content_type',
+            (e.item->>'size_bytes')::bigint,
+            (e.item->>'width')::int,
+            (e.item->>'height')::int,
+            (e.item->>'duration_ms')::int,
+            (e.item->>'waveform_peaks')::bytea,
+            e.item->>'content_hash',
+            v_next_sort_order + e.idx::int - 1
+        from jsonb_array_elements(p_items) with ordinality as e(item, idx)
+        returning *
+    )
+    select * from inserted order by sort_order;
+end;
+$$;
+
+revoke execute on function public.insert_entry_media_batch(uuid, uuid, jsonb, int, int)
+    from public, anon, authenticated;
@@ -0,0 +1,5 @@
+alter table public.tag_mood_stats
+    add column synced_at timestamptz;
+
+create index idx_journal_entries_user_updated
+    on public.journal_entries (user_id, updated_at);
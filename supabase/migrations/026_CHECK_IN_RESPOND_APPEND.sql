@@ -0,0 +1,58 @@
+create or replace function public.check_in_respond(
+    p_user_id uuid,
+    p_session_id uuid,
+    p_mood_category text,
+    p_mood_specific text,
+    p_response_text text
+)
+returns setof public.ai_sessions
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_session public.ai_sessions;
+    v_step text;
+    v_prompt_id uuid;
+begin
+    v_session := public.check_in_lock_session(p_user_id, p_session_id);
+    v_step := coalesce(v_session.flow_state->>'step', '');
+
+    if v_step <> 'prompted' then
+        raise exception 'Cannot respond: session is in step ''%''', v_step using errcode = 'NS001';
+    end if;
+
+    v_prompt_id := (v_session.flow_state->>'prompt_id')::uuid;
+    if v_prompt_id is not null then
+        update public.ai_prompts
+        set status = 'engaged',
+            engaged_at = now()
+        where id = v_prompt_id
+          and user_id = p_user_id
+          and deleted_at is null;
+    end if;
+
+    if p_response_text <> '' then
+        perform public.append_ai_messages(
+            p_user_id,
+            p_session_id,
+            jsonb_build_array(jsonb_build_object('role', 'user', 'content', p_response_text))
+        );
+    end if;
+
+    update public.ai_sessions
+    set flow_state = flow_state || jsonb_build_object(
+            'step', 'responded',
+            'mood_category', p_mood_category,
+            'mood_specific', p_mood_specific,
+            'response_text', p_response_text
+        )
+    where id = p_session_id
+    returning * into v_session;
+
+    return next v_session;
+end;
+$$;
+
+revoke execute on function public.check_in_respond(uuid, uuid, text, text, text)
+    from public, anon, authenticated;
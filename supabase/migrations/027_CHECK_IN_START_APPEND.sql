@@ -0,0 +1,48 @@
+create or replace function public.check_in_start(
+    p_user_id uuid,
+    p_trigger_source text,
+    p_prompt_id uuid
+)
+returns setof public.ai_sessions
+language plpgsql
+security definer
+set search_path = ''
+as $$
+declare
+    v_session public.ai_sessions;
+    v_content text;
+begin
+    insert into public.ai_sessions (user_id, session_type, trigger_source, flow_state)
+    values (
+        p_user_id,
+        'check_in',
+        p_trigger_source,
+        jsonb_build_object('step', 'prompted', 'prompt_id', p_prompt_id)
+    )
+    returning * into v_session;
+
+    update public.ai_prompts
+    set session_id = v_session.id,
+        status = 'delivered',
+        delivered_at = now()
+    where id = p_prompt_id
+      and user_id = p_user_id
+      and deleted_at is null
+    returning content into v_content;
+
+    if not found then
+        raise exception 'Prompt % not found', p_prompt_id using errcode = 'NS001';
+    end if;
+
+    perform public.append_ai_messages(
+        p_user_id,
+        v_session.id,
+        jsonb_build_array(jsonb_build_object('role', 'assistant', 'content', v_content))
+    );
+
+    return next v_session;
+end;
+$$;
+
+revoke execute on function public.check_in_start(uuid, text, uuid)
+    from public, anon, authenticated;
@@ -0,0 +1,51 @@
+create or replace function public.advance_mood_baselines(p_items jsonb)
+returns setof uuid
+language plpgsql
+security definer
+set search_path = ''
+as $$
+begin
+    return query
+    with items as (
+        select
+            (item->>'user_id')::uuid as user_id,
+            (item->>'ewma_mean')::double precision as ewma_mean,
+            (item->>'ewma_variance')::double precision as ewma_variance,
+            (item->>'observations')::integer as observations,
+            (item->>'last_day')::date as last_day,
+            (item->>'expected_last_day')::date as expected_last_day
+        from jsonb_array_elements(p_items) as item
+    ),
+    inserted as (
+        insert into public.mood_baselines (
+            user_id,
+            ewma_mean,
+            ewma_variance,
+            observations,
+            last_day
+        )
+        select i.user_id, i.ewma_mean, i.ewma_variance, i.observations, i.last_day
+        from items i
+        where i.expected_last_day is null
+        on conflict (user_id) do nothing
+        returning mood_baselines.user_id
+    ),
+    updated as (
+        update public.mood_baselines b
+        set ewma_mean = i.ewma_mean,
+            ewma_variance = i.ewma_variance,
+            observations = i.observations,
+            last_day = i.last_day
+        from items i
+        where b.user_id = i.user_id
+          and b.last_day = i.expected_last_day
+        returning b.user_id
+    )
+    select inserted.user_id from inserted
+    union all
+    select updated.user_id from updated;
+end;
+$$;
+
+revoke execute on function public.advance_mood_baselines(jsonb)
+    from public, anon, authenticated;